@@ -2,6 +2,9 @@
 #include "jcc_fb.h" // Must be first - framebuffer at offset 0 for APDU_sendBytesLong
 #include "video.h" // Compressed frame data (generated by encode.py)
 
+#define FB_DELTA_BLOCK 4 // One row
+#include "jcc_fb_delta.h"
+
 #define INS_FRAME 0x01
 #define INS_RESET 0x02
 
@@ -120,9 +123,7 @@ void process(APDU apdu, short apdu_len) {
             current_frame = 0;
         }
 
-        APDU_setOutgoing(apdu);
-        APDU_setOutgoingLength(apdu, FB_SIZE);
-        APDU_sendBytesLong(apdu, framebuffer, 0, FB_SIZE);
+        fb_send(apdu, buffer[APDU_P1]);
         return;
     }
 
@@ -632,7 +632,7 @@ class BenchDriver(BaseDriver):
             iters = FIXED_ITERS.get(name, iterations)
             hi = (iters >> 8) & 0xFF
             lo = iters & 0xFF
-            return f"80{0x10 + bi:02X}000002{hi:02X}{lo:02X}"
+            return bytes([0x80, 0x10 + bi, 0x00, 0x00, 0x02, hi, lo])
 
         # suite_avgs[bench_index] = list of per-suite averages
         suite_avgs = [[] for _ in BENCHMARKS]
@@ -640,10 +640,9 @@ class BenchDriver(BaseDriver):
         with self.get_session(backend) as session:
             # Warmup
             print("  warmup...", end=" ", flush=True)
-            for bi, (name, _, _) in enumerate(BENCHMARKS):
-                if name in skip:
-                    continue
-                session.send(_apdu(bi, name))
+            session.send_many([
+                _apdu(bi, name) for bi, (name, _, _) in enumerate(BENCHMARKS) if name not in skip
+            ])
             print("done\n")
 
             for si in range(suites):
@@ -658,7 +657,7 @@ class BenchDriver(BaseDriver):
                     times = []
                     for _ in range(runs):
                         start = time.perf_counter()
-                        data, sw = session.send(apdu)
+                        data, sw = session.send_raw(apdu)
                         elapsed = time.perf_counter() - start
                         if sw != 0x9000:
                             print(f"SW={sw:04X}", end=" ")
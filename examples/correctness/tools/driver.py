@@ -746,8 +746,8 @@ def to_signed_short(data: bytes) -> int:
 
 
 def build_apdu(ins, p1=0, p2=0, le=0):
-    """Build a simple APDU hex string."""
-    return f"80{ins:02X}{p1:02X}{p2:02X}{le:02X}"
+    """Build a simple APDU."""
+    return bytes([0x80, ins, p1, p2, le])
 
 
 class CorrectnessDriver(BaseDriver):
@@ -760,23 +760,22 @@ class CorrectnessDriver(BaseDriver):
         failures = []
 
         with self.get_session(backend) as session:
-            for ins, p1, expected, desc in TESTS:
-                apdu = build_apdu(ins, p1, 0, 2)
-                data, sw = session.send(apdu)
-
-                if sw != 0x9000:
-                    failures.append(f"[{ins:02X}/{p1:2}] {desc}: SW={sw:04X}")
-                    failed += 1
-                    continue
-
-                result = to_signed_short(data)
-                if result == expected:
-                    passed += 1
-                else:
-                    failures.append(
-                        f"[{ins:02X}/{p1:2}] {desc}: got {result}, expected {expected}"
-                    )
-                    failed += 1
+            responses = session.send_many([build_apdu(ins, p1, 0, 2) for ins, p1, _, _ in TESTS])
+
+        for (ins, p1, expected, desc), (data, sw) in zip(TESTS, responses):
+            if sw != 0x9000:
+                failures.append(f"[{ins:02X}/{p1:2}] {desc}: SW={sw:04X}")
+                failed += 1
+                continue
+
+            result = to_signed_short(data)
+            if result == expected:
+                passed += 1
+            else:
+                failures.append(
+                    f"[{ins:02X}/{p1:2}] {desc}: got {result}, expected {expected}"
+                )
+                failed += 1
 
         # Summary
         print("=" * 50)
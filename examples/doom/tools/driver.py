@@ -19,6 +19,8 @@ except ImportError:
     Image = None
 
 # Paths (driver.py is at examples/doom/tools/)
+from jcc.driver.screen import ScreenConfig, decode
+from jcc.driver.session import CardSession, DaemonSession, Session, SimSession
 from jcc.jcdk import config_dir, sim_client_cmd
 
 ROOT = Path(__file__).parent.parent.parent.parent
@@ -58,6 +60,7 @@ INS_TEST_BSP = 0x88
 # Screen constants
 SCREEN_WIDTH = 64
 SCREEN_HEIGHT = 40
+SCREEN = ScreenConfig(SCREEN_WIDTH, SCREEN_HEIGHT, "2bpp", layout="column")
 FRAMEBUFFER_SIZE = SCREEN_WIDTH * SCREEN_HEIGHT * 2 // 8  # 2bpp packed
 TARGET_FPS = 35
 
@@ -108,57 +111,6 @@ def build_apdu(ins: int, p1: int = 0, p2: int = 0, data: bytes = None, ne: int =
     return apdu
 
 
-class CardSession:
-    """Persistent session with the JavaCard applet."""
-
-    def __init__(self, aid=APPLET_AID):
-        self.aid = aid
-        self.process = None
-        self._start()
-
-    def _start(self):
-        cmd = sim_client_cmd("session", self.aid)
-        self.process = subprocess.Popen(
-            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=ROOT
-        )
-        line = self.process.stdout.readline()
-        resp = json.loads(line)
-        if not resp.get("ready"):
-            raise RuntimeError(f"Session failed to start: {resp}")
-
-    def send(self, apdu_hex: str) -> tuple[bytes, int]:
-        """Send APDU, return (data, sw)."""
-        self.process.stdin.write(apdu_hex + "\n")
-        self.process.stdin.flush()
-        line = self.process.stdout.readline()
-        resp = json.loads(line)
-        if "error" in resp:
-            raise RuntimeError(resp["error"])
-        data = bytes.fromhex(resp.get("data", ""))
-        sw = resp.get("sw", 0)
-        return data, sw
-
-    def send_ok(self, apdu_hex: str) -> bytes:
-        """Send APDU, raise on non-9000 SW, return data."""
-        data, sw = self.send(apdu_hex)
-        if sw != 0x9000:
-            raise RuntimeError(f"APDU failed: SW={sw:04X}")
-        return data
-
-    def close(self):
-        if self.process:
-            self.process.stdin.write("quit\n")
-            self.process.stdin.flush()
-            self.process.wait()
-            self.process = None
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, *args):
-        self.close()
-
-
 def load_applet(jar_path: str):
     """Load applet onto simulator."""
     cmd = sim_client_cmd("load", jar_path, PKG_AID, APPLET_AID, APPLET_AID)
@@ -296,81 +248,6 @@ def format_log_entry(entry: bytes) -> str:
         return f"Unknown type 0x{msg_type:02X}"
 
 
-class DaemonSession:
-    """Session that talks to the persistent daemon instead of creating a new connection."""
-
-    def __init__(self):
-        from session import send_command
-
-        self._send_command = send_command
-
-    def send(self, apdu_hex: str) -> tuple[bytes, int]:
-        """Send APDU, return (data, sw)."""
-        resp = self._send_command({"action": "apdu", "apdu": apdu_hex})
-        if "error" in resp:
-            raise RuntimeError(resp["error"])
-        return bytes.fromhex(resp.get("data", "")), resp.get("sw", 0)
-
-    def send_ok(self, apdu_hex: str) -> bytes:
-        """Send APDU, raise on non-9000 SW, return data."""
-        resp = self._send_command({"action": "apdu_ok", "apdu": apdu_hex})
-        if "error" in resp:
-            raise RuntimeError(resp["error"])
-        return bytes.fromhex(resp.get("data", ""))
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, *args):
-        pass  # Daemon keeps connection open
-
-
-class RealCardSession:
-    """Session with real JavaCard via pyscard."""
-
-    def __init__(self, aid=APPLET_AID):
-        try:
-            from smartcard.System import readers
-        except ImportError:
-            sys.exit("Install pyscard: pip install pyscard")
-
-        r = readers()
-        if not r:
-            raise RuntimeError("No card readers found")
-
-        print(f"Reader: {r[0]}")
-        self.conn = r[0].createConnection()
-        self.conn.connect()
-
-        # Select applet
-        aid_bytes = bytes.fromhex(aid)
-        _, sw1, sw2 = self.conn.transmit([0x00, 0xA4, 0x04, 0x00, len(aid_bytes)] + list(aid_bytes))
-        if (sw1 << 8 | sw2) != 0x9000:
-            raise RuntimeError(f"Select failed: {sw1:02X}{sw2:02X}")
-
-    def send(self, apdu_hex: str) -> tuple:
-        """Send APDU, return (data, sw)."""
-        data, sw1, sw2 = self.conn.transmit(list(bytes.fromhex(apdu_hex)))
-        return bytes(data), (sw1 << 8 | sw2)
-
-    def send_ok(self, apdu_hex: str) -> bytes:
-        """Send APDU, raise on non-9000 SW, return data."""
-        data, sw = self.send(apdu_hex)
-        if sw != 0x9000:
-            raise RuntimeError(f"APDU failed: SW={sw:04X}")
-        return data
-
-    def close(self):
-        if self.conn:
-            self.conn.disconnect()
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, *args):
-        self.close()
-
-
 # Global flag for real card mode
 _use_real_card = False
 
@@ -384,15 +261,15 @@ def set_real_card_mode(use_card: bool):
 def get_session():
     """Get a session - uses real card, daemon, or direct simulator connection."""
     if _use_real_card:
-        return RealCardSession()
+        return CardSession(APPLET_AID)
     try:
-        from session import is_running
+        from session import SOCKET_PATH, is_running
 
         if is_running():
-            return DaemonSession()
+            return DaemonSession(SOCKET_PATH)
     except ImportError:
         pass
-    return CardSession()
+    return SimSession(APPLET_AID)
 
 
 def cmd_read_log(args):
@@ -449,16 +326,21 @@ def cmd_test_tables(args):
         report_errors("tantoangle", errors)
 
 
-def test_table(session: CardSession, ins: int, expected: list[int], chunk_size: int = 64) -> list[tuple]:
+def test_table(session: Session, ins: int, expected: list[int], chunk_size: int = 64) -> list[tuple]:
     """Query table and compare against expected values."""
     errors = []
     total = len(expected)
 
-    for start in range(0, total, chunk_size):
-        p1 = (start >> 8) & 0xFF
-        p2 = start & 0xFF
-        # Request chunk_size * 4 bytes (each value is 4 bytes)
-        data = session.send_ok(build_apdu(ins, p1, p2, ne=chunk_size * 4))
+    # Request chunk_size * 4 bytes per APDU (each value is 4 bytes), all in one batch
+    starts = range(0, total, chunk_size)
+    responses = session.send_many([
+        bytes.fromhex(build_apdu(ins, (start >> 8) & 0xFF, start & 0xFF, ne=chunk_size * 4))
+        for start in starts
+    ])
+
+    for start, (data, sw) in zip(starts, responses):
+        if sw != 0x9000:
+            raise RuntimeError(f"APDU failed: SW={sw:04X}")
 
         # Parse as big-endian signed 32-bit ints
         for i in range(0, len(data), 4):
@@ -527,42 +409,31 @@ def cmd_test_math(args):
         print("Expected keys: fixedmul, fixeddiv, pointtoangle")
 
 
-def test_math_op(session: CardSession, ins: int, cases: list) -> list[tuple]:
+def test_math_op(session: Session, ins: int, cases: list, batch_size: int = 100) -> list[tuple]:
     """Test a binary math operation."""
     errors = []
-    for i, case in enumerate(cases):
-        a, b, expected = case
-        # Pack two 32-bit signed ints
-        data = struct.pack(">ii", a, b)
-        resp = session.send_ok(build_apdu(ins, data=data, ne=4))
-        actual = struct.unpack(">i", resp)[0]
-        if actual != expected:
-            errors.append((i, a, b, expected, actual))
-
-        if (i + 1) % 100 == 0:
-            print(f"\r  {i + 1}/{len(cases)}", end="", flush=True)
+    for first in range(0, len(cases), batch_size):
+        batch = cases[first : first + batch_size]
+        # Pack two 32-bit signed ints per case
+        responses = session.send_many([
+            bytes.fromhex(build_apdu(ins, data=struct.pack(">ii", a, b), ne=4)) for a, b, _ in batch
+        ])
+        for i, (a, b, expected), (resp, sw) in zip(range(first, len(cases)), batch, responses):
+            if sw != 0x9000:
+                raise RuntimeError(f"APDU failed: SW={sw:04X}")
+            actual = struct.unpack(">i", resp)[0]  # Signed (matches JDOOM)
+            if actual != expected:
+                errors.append((i, a, b, expected, actual))
+
+        print(f"\r  {first + len(batch)}/{len(cases)}", end="", flush=True)
 
     print()
     return errors
 
 
-def test_pointtoangle(session: CardSession, cases: list) -> list[tuple]:
+def test_pointtoangle(session: Session, cases: list) -> list[tuple]:
     """Test PointToAngle function."""
-    errors = []
-    for i, case in enumerate(cases):
-        x, y, expected = case
-        # Pack two 32-bit signed ints
-        data = struct.pack(">ii", x, y)
-        resp = session.send_ok(build_apdu(INS_TEST_POINTTOANGLE, data=data, ne=4))
-        actual = struct.unpack(">i", resp)[0]  # Signed (matches JDOOM)
-        if actual != expected:
-            errors.append((i, x, y, expected, actual))
-
-        if (i + 1) % 100 == 0:
-            print(f"\r  {i + 1}/{len(cases)}", end="", flush=True)
-
-    print()
-    return errors
+    return test_math_op(session, INS_TEST_POINTTOANGLE, cases)
 
 
 def report_math_errors(name: str, errors: list[tuple]):
@@ -582,35 +453,17 @@ def report_math_errors(name: str, errors: list[tuple]):
         print(f"    ... and {len(errors) - 5} more")
 
 
-def get_pixel(data: bytes, x: int, y: int) -> int:
-    """Get pixel value (0-3) at (x, y) from framebuffer.
-
-    Uses column-major layout: each column is SCREEN_HEIGHT/4 = 10 bytes.
-    """
-    column_bytes = SCREEN_HEIGHT // 4  # = 10
-    byte_idx = x * column_bytes + (y // 4)
-    shift = (3 - (y % 4)) * 2
-    return (data[byte_idx] >> shift) & 0x03
-
-
 def render_ascii(data: bytes):
     """Render framebuffer as simple ASCII art."""
     chars = " .+#"  # 0=black, 1=dark, 2=light, 3=white
-    for y in range(SCREEN_HEIGHT):
-        row = ""
-        for x in range(SCREEN_WIDTH):
-            pixel = get_pixel(data, x, y)
-            row += chars[pixel]
-        print(row)
+    for row in decode(SCREEN, data):
+        print("".join(chars[pixel] for pixel in row))
 
 
 def render_hex(data: bytes):
     """Render framebuffer as hex digits (0-3 per pixel)."""
-    for y in range(SCREEN_HEIGHT):
-        row = ""
-        for x in range(SCREEN_WIDTH):
-            row += f"{get_pixel(data, x, y):X}"
-        print(row)
+    for row in decode(SCREEN, data):
+        print("".join("0123"[pixel] for pixel in row))
 
 
 def render_halfblock(data: bytes, grayscale: bool = False):
@@ -631,11 +484,12 @@ def render_halfblock(data: bytes, grayscale: bool = False):
     print("┏" + "━" * SCREEN_WIDTH + "┓")
 
     # Process two rows at a time
+    pixels = decode(SCREEN, data)
     for y in range(0, SCREEN_HEIGHT, 2):
         row = "┃"
         for x in range(SCREEN_WIDTH):
-            top = get_pixel(data, x, y)
-            bot = get_pixel(data, x, y + 1) if y + 1 < SCREEN_HEIGHT else 0
+            top = pixels[y][x]
+            bot = pixels[y + 1][x] if y + 1 < SCREEN_HEIGHT else 0
 
             top_color = colors[top]
             bot_color = colors[bot]
@@ -898,12 +752,13 @@ def render_game_frame(
     ui_elements.append((current_line, left_pad, f"{color}│{RESET} ╭{'─' * SCREEN_WIDTH}╮ {color}│{RESET}"))
     current_line += 1
 
+    pixels = decode(SCREEN, data)
     for y in range(0, SCREEN_HEIGHT, 2):
         color = gradient_color(current_line - ui_start_line, ui_height)
         row = f"{color}│{RESET} │"
         for x in range(SCREEN_WIDTH):
-            top = get_pixel(data, x, y)
-            bot = get_pixel(data, x, y + 1) if y + 1 < SCREEN_HEIGHT else 0
+            top = pixels[y][x]
+            bot = pixels[y + 1][x] if y + 1 < SCREEN_HEIGHT else 0
             top_c = colors[top]
             bot_c = colors[bot]
             row += f"\033[38;5;{top_c}m\033[48;5;{bot_c}m▀"
@@ -0,0 +1,264 @@
+"""Instruction cost model from measured JCVM timings.
+
+The bench suite (examples/bench) times short bytecode sequences on a real
+card and writes results.json: for each benchmark, the average time in
+milliseconds of `iterations` runs of its loop body. A CostModel turns those
+timings into per-instruction costs in microseconds so that codegen can pick
+the cheaper of two equivalent instruction sequences.
+
+Costs are relative. Most benchmarks push a value and pop it again, so a
+push cannot be timed on its own: pop is the zero point and every other cost
+is measured against it (pop2, being cheaper than two pops, comes out
+negative). Comparing two sequences with the same stack effect is exact,
+which is the only way the compiler uses these numbers.
+"""
+
+import json
+import math
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from statistics import median
+from typing import Any
+
+from jcc.errors import ConfigError
+from jcc.ir.types import JCType
+
+# Tables shipped with jcc, in data/costs/
+BUNDLED_COST_TABLES = ("j3r180",)
+DEFAULT_COST_TABLE = "j3r180"
+
+# Benchmark whose body is empty; its time is the loop overhead
+_BASELINE_BENCHMARK = "empty"
+
+# Instruction → (benchmark, the other instructions in its body). Entries are
+# derived in order, so each may only refer to instructions above it.
+_DERIVATIONS: dict[str, tuple[str, tuple[str, ...]]] = {
+    "sconst": ("sconst", ("pop",)),
+    "bspush": ("bspush", ("pop",)),
+    "sspush": ("sspush", ("pop",)),
+    "sload": ("sload", ("pop",)),
+    "aload": ("aload", ("pop",)),
+    "sstore": ("sstore_sload", ("sconst",)),
+    "sinc": ("sinc_sload", ()),
+    "pop2": ("pop2_baseline", ("sconst", "sconst")),
+    "dup": ("dup", ("sconst", "pop", "pop")),
+    "iconst": ("iconst", ("pop2",)),
+    "bipush": ("bipush_int", ("pop2",)),
+    "sipush": ("sipush_int", ("pop2",)),
+    "iipush": ("iipush", ("pop2",)),
+    "iload": ("iload_i2s", ("pop2",)),
+    "istore": ("istore_iload", ("iconst",)),
+    "iinc": ("iinc", ()),
+    **{
+        f"s{op}": (f"s{op}", ("sconst", "sconst", "pop"))
+        for op in ("add", "sub", "mul", "div", "rem", "and", "or", "xor", "shl", "shr", "ushr")
+    },
+    **{
+        f"i{op}": (f"i{op}", ("iconst", "iconst", "pop2"))
+        for op in ("add", "sub", "mul", "div", "rem", "and", "or", "xor", "shl", "shr", "ushr")
+    },
+    "sneg": ("sneg", ("sconst", "pop")),
+    "ineg": ("ineg", ("iconst", "pop2")),
+    "s2b": ("s2b", ("sconst", "pop")),
+    "i2s": ("s2i_i2s", ("iconst", "pop")),
+    "i2b": ("i2b", ("iconst", "pop")),
+    "icmp": ("icmp", ("iconst", "iconst", "pop")),
+    "ifeq": ("ifeq", ("sconst",)),
+    "ifne": ("ifne", ("sconst",)),
+    "if_scmplt": ("if_scmplt", ("sconst", "sconst")),
+    "if_scmpeq": ("if_scmpeq", ("sconst", "sconst")),
+    "goto_w": ("goto_w", ()),
+    "slookupswitch": ("slookupswitch", ("sconst",)),
+    "stableswitch": ("stableswitch", ("sconst",)),
+    "getstatic_a": ("getstatic_a", ("pop",)),
+    "getstatic_b": ("getstatic_b", ("pop",)),
+    "getstatic_s": ("getstatic_s", ("pop",)),
+    "putstatic_b": ("putstatic_b", ("sconst",)),
+    "putstatic_s": ("putstatic_s", ("sconst",)),
+    "getfield_a_this": ("getfield_a_this", ("pop",)),
+    "baload": ("baload", ("getstatic_a", "sconst", "pop")),
+    "saload": ("saload", ("getstatic_a", "sconst", "pop")),
+    "bastore": ("bastore", ("getstatic_a", "sconst", "sconst")),
+    "sastore": ("sastore", ("getstatic_a", "sconst", "sconst")),
+    "invokestatic": ("invoke_void", ()),
+}
+
+# Unmeasured instructions priced as a measured equivalent
+_ALIASES = {
+    "astore": "sstore",
+    "goto": "goto_w",
+    "itableswitch": "stableswitch",
+    "ilookupswitch": "slookupswitch",
+}
+
+
+class CostModelError(ConfigError):
+    """Invalid or unreadable cost table."""
+
+
+@dataclass(frozen=True)
+class CostModel:
+    """Per-instruction costs for one card, in microseconds relative to pop.
+
+    Attributes:
+        source: Name of the table the costs came from.
+        costs: Base mnemonic (sload for sload_0..3) → cost.
+        default: Cost of instructions the table does not cover.
+    """
+
+    source: str
+    costs: Mapping[str, float]
+    default: float
+
+    def cost(self, mnemonic: str) -> float:
+        """Cost of one instruction, by mnemonic (sload_2, sconst_m1, ...)."""
+        base = _base_mnemonic(mnemonic)
+        found = self.costs.get(base)
+        if found is None:
+            found = self.costs.get(_ALIASES.get(base, ""), self.default)
+        return found
+
+    def sequence_cost(self, mnemonics: Iterable[str]) -> float:
+        """Total cost of a straight-line instruction sequence."""
+        return sum(self.cost(m) for m in mnemonics)
+
+    def const_cost(self, value: int, ty: JCType) -> float:
+        """Cost of pushing a constant with the most compact encoding."""
+        if ty == JCType.INT:
+            small, byte, short, full = "iconst", "bipush", "sipush", "iipush"
+        else:
+            small, byte, short, full = "sconst", "bspush", "sspush", "sspush"
+        if -1 <= value <= 5:
+            return self.cost(small)
+        if -128 <= value <= 127:
+            return self.cost(byte)
+        if -32768 <= value <= 32767:
+            return self.cost(short)
+        return self.cost(full)
+
+    def lookupswitch_cost(self, cases: int) -> float:
+        """Estimated cost of a lookupswitch over the given number of cases.
+
+        The bench times a single-case lookupswitch. Pairs are sorted so the
+        VM can binary search them; each further probe is priced as a
+        compare-and-branch (if_scmplt instead of pop2).
+        """
+        probe = self.cost("if_scmplt") - self.cost("pop2")
+        return self.cost("slookupswitch") + probe * math.log2(max(cases, 1))
+
+    def saves(
+        self,
+        original: str,
+        replacement: str,
+        setup: Iterable[str],
+        uses: float,
+        extra: float = 0.0,
+    ) -> bool:
+        """Whether replacing uses of one instruction with another pays off.
+
+        Args:
+            original: Instruction executed at each use today.
+            replacement: Instruction executed at each use instead.
+            setup: Instructions executed once to enable the replacement.
+            uses: Expected executions of the use sites.
+            extra: Any further one-off cost of the replacement.
+        """
+        saved = uses * (self.cost(original) - self.cost(replacement))
+        return saved > self.sequence_cost(setup) + extra
+
+
+def _base_mnemonic(mnemonic: str) -> str:
+    """Strip a short-form suffix: sload_3 → sload, iconst_m1 → iconst."""
+    stem, sep, suffix = mnemonic.rpartition("_")
+    if sep and (suffix.isdigit() or suffix == "m1"):
+        return stem
+    return mnemonic
+
+
+def cost_model_from_results(results: Mapping[str, Any], source: str) -> CostModel:
+    """Derive per-instruction costs from a results.json document.
+
+    Instructions whose benchmarks are missing from the results are left
+    out and fall back to the model's default cost.
+
+    Raises:
+        CostModelError: If the document lacks iterations or the baseline.
+    """
+    try:
+        iterations = int(results["iterations"])
+        times = {b["name"]: float(b["avg_ms"]) for b in results["benchmarks"]}
+    except (KeyError, TypeError, ValueError) as e:
+        raise CostModelError(f"Malformed cost table {source}: {e}") from e
+    if iterations <= 0 or _BASELINE_BENCHMARK not in times:
+        raise CostModelError(
+            f"Cost table {source} needs positive iterations and an "
+            f"{_BASELINE_BENCHMARK!r} benchmark"
+        )
+
+    # µs per loop iteration, loop overhead removed
+    baseline = times[_BASELINE_BENCHMARK]
+    body_us = {
+        name: (ms - baseline) * 1000 / iterations for name, ms in times.items()
+    }
+
+    costs: dict[str, float] = {"pop": 0.0}
+    for mnemonic, (benchmark, others) in _DERIVATIONS.items():
+        if benchmark in body_us and all(o in costs for o in others):
+            costs[mnemonic] = body_us[benchmark] - sum(costs[o] for o in others)
+
+    return CostModel(
+        source=source,
+        costs=costs,
+        default=median(costs.values()),
+    )
+
+
+def load_cost_model(path: Path) -> CostModel:
+    """Load a cost model from a results.json file written by the bench driver.
+
+    Raises:
+        CostModelError: If the file can't be read or parsed.
+    """
+    try:
+        results = json.loads(path.read_text())
+    except (OSError, ValueError) as e:
+        raise CostModelError(f"Cannot read cost table {path}: {e}") from e
+    return cost_model_from_results(results, path.name)
+
+
+def bundled_cost_model(name: str = DEFAULT_COST_TABLE) -> CostModel:
+    """Load one of the cost tables shipped with jcc (cached per name).
+
+    Raises:
+        CostModelError: If no table of that name is bundled.
+    """
+    if name not in BUNDLED_COST_TABLES:
+        raise CostModelError(
+            f"Unknown cost table {name!r} (bundled: {', '.join(BUNDLED_COST_TABLES)})"
+        )
+    return _load_bundled(name)
+
+
+@cache
+def _load_bundled(name: str) -> CostModel:
+    return load_cost_model(Path(__file__).parent.parent / "data" / "costs" / f"{name}.json")
+
+
+def select_cost_model(spec: str | None, project_dir: Path) -> CostModel:
+    """Resolve [options].cost_model from jcc.toml.
+
+    Args:
+        spec: A bundled table name, a results.json path relative to the
+            project directory, or None for the default table.
+        project_dir: Directory containing jcc.toml.
+
+    Raises:
+        CostModelError: If the table can't be loaded.
+    """
+    if spec is None:
+        return bundled_cost_model()
+    if spec in BUNDLED_COST_TABLES:
+        return bundled_cost_model(spec)
+    return load_cost_model(project_dir / spec)
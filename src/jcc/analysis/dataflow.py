@@ -10,19 +10,21 @@ Used by:
 
 from collections.abc import Callable
 
+from jcc.ir.facts import FunctionFacts
 from jcc.ir.instructions import Instruction, get_result
 from jcc.ir.module import Function
 from jcc.ir.types import SSAName
-from jcc.ir.utils import build_definition_map
 from jcc.ir.values import SSARef
 
 
 class DataflowAnalysis:
     """Mixin providing dataflow propagation methods for SSA analyses."""
 
-    def __init__(self, func: Function):
+    def __init__(self, func: Function, facts: FunctionFacts | None = None):
+        if facts is None:
+            facts = FunctionFacts(func)
         self.func = func
-        self.def_map = build_definition_map(func)
+        self.def_map = facts.def_map
 
     def propagate_backward(
         self,
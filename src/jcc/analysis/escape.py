@@ -11,6 +11,9 @@ the operand stack below the call arguments.
 
 The LIFO constraint (value not on top when needed) is handled during
 expression building, not escape analysis.
+
+With a cost model, a cheap pure value with several uses in its block may
+stay off the slots and be re-evaluated at each use instead.
 """
 
 from collections import defaultdict
@@ -18,11 +21,16 @@ from collections.abc import Mapping
 from dataclasses import dataclass
 
 from jcc.analysis.base import PhaseOutput
+from jcc.analysis.cost import CostModel
 from jcc.analysis.phi import PhiInfo
-from jcc.ir.instructions import CallInst, GEPInst, get_result
+from jcc.ir.facts import FunctionFacts
+from jcc.ir.instructions import BinaryInst, CallInst, GEPInst, Instruction, get_result
 from jcc.ir.module import Function
-from jcc.ir.types import BlockLabel, SSAName
-from jcc.ir.values import SSARef
+from jcc.ir.types import BlockLabel, JCType, SSAName
+from jcc.ir.values import Const, SSARef
+
+# Binary ops that compile to a single side-effect-free JCVM instruction
+_REMAT_OPS = frozenset({"add", "sub", "mul", "and", "or", "xor"})
 
 
 @dataclass(frozen=True)
@@ -45,13 +53,21 @@ class EscapeInfo(PhaseOutput):
 def analyze_escapes(
     func: Function,
     phi_info: PhiInfo,
+    facts: FunctionFacts | None = None,
+    costs: CostModel | None = None,
 ) -> EscapeInfo:
     """Determine which values need local slots.
 
     Args:
         func: The function to analyze
         phi_info: Phi analysis results (phi results always escape)
+        facts: Shared def map for func. Built here if None.
+        costs: Target cost model. If given, multi-use values that are
+            cheaper to re-evaluate than to store and reload keep no slot.
     """
+    if facts is None:
+        facts = FunctionFacts(func)
+
     escapes: set[SSAName] = set()
     reasons: dict[SSAName, str] = {}
     use_counts: dict[SSAName, int] = defaultdict(int)
@@ -88,22 +104,25 @@ def analyze_escapes(
                             escapes.add(name)
                             reasons[name] = f"used in {block.label}, defined in {def_block[name]}"
 
+    # Def map for forced-root check and GEP index lookthrough
+    def_map = facts.def_map
+
     # All multi-use values escape. Without a slot, non-escaping values get
     # re-evaluated at each use site by rebuilding the expression tree. This
     # is incorrect if the tree contains side effects (loads, calls) and
     # benchmarking shows sstore+sload (~1.0 us) is cheaper than or equal to
     # re-evaluating even a single sadd (~1.1 us), so there's no performance
-    # reason to keep multi-use values on the stack either.
+    # reason to keep multi-use values on the stack either. A cost model may
+    # disagree for a single pure op; those are decided last, below.
+    rematerializable: set[SSAName] = set()
     for name, count in use_counts.items():
         if count > 1 and name not in escapes and name not in gep_names:
+            if costs is not None and _is_pure_op(def_map.get(name)):
+                rematerializable.add(name)
+                continue
             escapes.add(name)
             reasons[name] = "multi-use"
 
-    # Build def map for forced-root check and GEP index lookthrough
-    from jcc.ir.utils import build_definition_map
-
-    def_map = build_definition_map(func)
-
     # Call results with uses must escape. Calls are forced roots (emitted
     # for side effects regardless of whether their result is used), so a
     # non-escaping call result gets emitted twice: once as the root
@@ -139,8 +158,54 @@ def analyze_escapes(
                             escapes.add(idx_value.name)
                             reasons[idx_value.name] = f"GEP index for pointer phi {phi_name}"
 
+    # Re-evaluating reads the operands again at each use, so they must have
+    # slots (liveness then keeps them alive until the last use). Values are
+    # visited in definition order, so a re-evaluated operand has already been
+    # decided (and fails the check).
+    if rematerializable:
+        assert costs is not None
+        for block in func.blocks:
+            for instr in block.instructions:
+                name = get_result(instr)
+                if name is None or name not in rematerializable or name in escapes:
+                    continue
+                assert isinstance(instr, BinaryInst)
+                if not _rematerialize_is_cheaper(instr, use_counts[name], escapes, costs):
+                    escapes.add(name)
+                    reasons[name] = "multi-use"
+
     return EscapeInfo(
         escapes=frozenset(escapes),
         use_counts=dict(use_counts),
         escape_reasons=reasons,
     )
+
+
+def _is_pure_op(instr: Instruction | None) -> bool:
+    """Whether instr is a single side-effect-free short or int op."""
+    return (
+        isinstance(instr, BinaryInst)
+        and instr.op in _REMAT_OPS
+        and instr.ty in (JCType.SHORT, JCType.INT)
+    )
+
+
+def _rematerialize_is_cheaper(
+    instr: BinaryInst,
+    uses: int,
+    escapes: set[SSAName],
+    costs: CostModel,
+) -> bool:
+    """Compare evaluating instr at every use with storing and reloading it."""
+    prefix = "i" if instr.ty == JCType.INT else "s"
+    expr = costs.cost(prefix + instr.op)
+    for operand in instr.operands:
+        if isinstance(operand, Const):
+            expr += costs.const_cost(operand.value, instr.ty)
+        elif isinstance(operand, SSARef) and operand.name in escapes:
+            expr += costs.cost(prefix + "load")
+        else:
+            return False
+
+    keep = expr + costs.cost(prefix + "store") + uses * costs.cost(prefix + "load")
+    return uses * expr < keep
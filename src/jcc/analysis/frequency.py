@@ -0,0 +1,68 @@
+"""Block execution frequencies for code layout.
+
+Frequencies are relative: only their order within one function matters.
+They come from one of two sources:
+
+- A measured profile: the per-block counts `jcc profile --save` collects
+  from a `profile_blocks = true` build.
+- A static estimate: each level of loop nesting multiplies a block's
+  frequency by LOOP_WEIGHT, and blocks that end in unreachable (the tail
+  of an exception throw) are cold.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+from jcc.ir.facts import FunctionFacts
+from jcc.ir.instructions import UnreachableInst
+from jcc.ir.types import BlockLabel
+
+# Assumed iterations of a loop, for weighting blocks inside it
+LOOP_WEIGHT = 8
+
+
+@dataclass(frozen=True)
+class FunctionCounts:
+    """Measured execution counts for one function.
+
+    Attributes:
+        calls: Times the function was entered (the entry block's count).
+        blocks: Count of each other block; empty if only calls were counted.
+    """
+
+    calls: int
+    blocks: Mapping[str, int] = field(default_factory=lambda: dict[str, int]())
+
+
+def static_frequencies(facts: FunctionFacts) -> dict[BlockLabel, float]:
+    """Estimate block frequencies from loop nesting."""
+    depth = facts.loop_depth
+    return {
+        block.label: (
+            0.0
+            if isinstance(block.terminator, UnreachableInst)
+            else float(LOOP_WEIGHT ** depth.get(block.label, 0))
+        )
+        for block in facts.func.blocks
+    }
+
+
+def block_frequencies(
+    facts: FunctionFacts,
+    counts: FunctionCounts | None = None,
+) -> dict[BlockLabel, float]:
+    """Block frequencies from measured counts, or a static estimate.
+
+    Counts only replace the estimate when they cover blocks; a profile of
+    function entries alone says nothing about layout within a function.
+    """
+    if counts is None or not counts.blocks:
+        return static_frequencies(facts)
+
+    entry = facts.func.entry_block.label
+    return {
+        block.label: float(
+            counts.calls if block.label == entry else counts.blocks.get(block.label, 0)
+        )
+        for block in facts.func.blocks
+    }
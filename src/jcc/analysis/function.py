@@ -1,9 +1,14 @@
 """Per-function analysis orchestration."""
 
+import os
 from collections.abc import Mapping
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import repeat
 
 from jcc.analysis.callgraph import CallGraph
+from jcc.analysis.cost import CostModel
 from jcc.analysis.escape import analyze_escapes
 from jcc.analysis.globals import AllocationResult
 from jcc.analysis.graph_color import color_graph
@@ -17,9 +22,15 @@ from jcc.analysis.narrowing import (
 )
 from jcc.analysis.offset_phi import OffsetPhiInfo, detect_offset_phis
 from jcc.analysis.phi import PhiInfo, analyze_phis
+from jcc.analysis.slot_order import permute_slots
+from jcc.ir.facts import FunctionFacts
 from jcc.ir.module import Function, Module
 from jcc.ir.range_metadata import ValueRange
 from jcc.ir.types import JCType, SSAName
+from jcc.timings import BuildTimings, timed_call
+
+# Phase name of per-function analysis in BuildTimings
+ANALYSIS_PHASE = "function analysis"
 
 
 @dataclass(frozen=True)
@@ -31,12 +42,14 @@ class FunctionAnalysis:
     - NarrowingResult: i32->i16 narrowing info
     - PhiInfo: phi sources for codegen
     - OffsetPhiInfo: offset phis (ptr stored as SHORT offset)
+    - FunctionFacts: def/use maps and CFG, reused by codegen
     """
 
     locals: FunctionLocals
     narrowing: NarrowingResult
     phi_info: PhiInfo
     offset_phi_info: OffsetPhiInfo | None = None
+    facts: FunctionFacts | None = field(default=None, repr=False, compare=False)
 
 
 def analyze_function(
@@ -45,19 +58,29 @@ def analyze_function(
     callee_params: ParamNarrowability | None = None,
     allocation: AllocationResult | None = None,
     range_info: dict[SSAName, ValueRange] | None = None,
+    facts: FunctionFacts | None = None,
+    costs: CostModel | None = None,
 ) -> FunctionAnalysis:
     """Run phi, narrowing, escape, interference, and coloring analyses.
 
+    Colored slots are then renumbered by loop-weighted access count.
+
+    facts is shared by every analysis and returned in the result so codegen
+    can reuse it. It is built here if None. costs is the target cost model
+    consulted by escape analysis.
+
     Raises:
         AnalysisError: If hard limits are exceeded.
     """
     if limits is None:
         limits = Limits()
+    if facts is None:
+        facts = FunctionFacts(func)
 
     phi_info = analyze_phis(func)
-    narrowing = analyze_narrowing(func, callee_params, range_info)
-    escapes = analyze_escapes(func, phi_info)
-    interference = build_interference_graph(func, escapes, narrowing)
+    narrowing = analyze_narrowing(func, callee_params, range_info, facts)
+    escapes = analyze_escapes(func, phi_info, facts, costs)
+    interference = build_interference_graph(func, escapes, narrowing, facts)
 
     # Parameters have fixed slots (0, 1, 2, ...) that must be respected
     param_slots: dict[SSAName, int] = {}
@@ -69,22 +92,25 @@ def analyze_function(
         slot += p.ty.slots
     slots = color_graph(interference, phi_info, param_slots, param_types)
 
+    # Hottest values first, so they get the one-byte load/store forms
+    slots = permute_slots(slots, facts, first_free=slot)
+
     # Offset phi detection (if allocation available)
     # Must happen before build_function_locals so type override is applied
     offset_phi_info: OffsetPhiInfo | None = None
     if allocation is not None:
-        from jcc.ir.utils import build_definition_map
-
-        def_map = build_definition_map(func)
-        offset_phi_info = detect_offset_phis(phi_info, allocation, def_map)
+        offset_phi_info = detect_offset_phis(phi_info, allocation, facts.def_map)
 
-    locals_result = build_function_locals(func, narrowing, slots, limits, offset_phi_info)
+    locals_result = build_function_locals(
+        func, narrowing, slots, limits, offset_phi_info, facts,
+    )
 
     return FunctionAnalysis(
         locals=locals_result,
         narrowing=narrowing,
         phi_info=phi_info,
         offset_phi_info=offset_phi_info,
+        facts=facts,
     )
 
 
@@ -94,6 +120,9 @@ def analyze_all_functions(
     limits: Limits | None = None,
     allocation: AllocationResult | None = None,
     range_info: dict[str, dict[SSAName, ValueRange]] | None = None,
+    jobs: int = 1,
+    costs: CostModel | None = None,
+    timings: BuildTimings | None = None,
 ) -> dict[str, FunctionAnalysis]:
     """Analyze all functions with inter-procedural narrowing.
 
@@ -107,13 +136,28 @@ def analyze_all_functions(
         limits: Resource limits for locals/stack. Uses defaults if None.
         allocation: Global memory allocation. If provided, enables
             offset phi detection for pointer optimization.
+        jobs: Number of processes to analyze functions in. 1 analyzes
+              in this process; 0 uses one process per CPU. Functions
+              whose callees are all analyzed run together, one call
+              graph level at a time.
+        costs: Target cost model consulted by escape analysis.
+        timings: Records each function's analysis time under
+            ANALYSIS_PHASE, if given.
 
     Returns:
-        Mapping from function name to its FunctionAnalysis.
+        Mapping from function name to its FunctionAnalysis, in
+        topological order.
 
     Raises:
         AnalysisError: If hard limits exceeded.
     """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if jobs > 1 and len(call_graph.topological_order) > 1:
+        return _analyze_levels_parallel(
+            module, call_graph, limits, allocation, range_info, jobs, costs, timings,
+        )
+
     results: dict[str, FunctionAnalysis] = {}
     accumulated_params: dict[str, Mapping[int, bool]] = {}
 
@@ -130,10 +174,69 @@ def analyze_all_functions(
 
         # Analyze the function
         func_ranges = range_info.get(func_name) if range_info else None
-        result = analyze_function(func, limits, callee_info, allocation, func_ranges)
+        result, wall, cpu = timed_call(
+            analyze_function, func, limits, callee_info, allocation, func_ranges, costs=costs,
+        )
         results[func_name] = result
+        if timings is not None:
+            timings.record_function(ANALYSIS_PHASE, func_name, wall, cpu)
 
         # Extract param narrowability for callers to use
         accumulated_params[func_name] = get_param_narrowable(result.narrowing, func)
 
     return results
+
+
+def _call_graph_levels(call_graph: CallGraph) -> list[list[str]]:
+    """Group functions so each group's callees are all in earlier groups.
+
+    A function's level is one more than the deepest level among its
+    callees (0 for leaves). Each level keeps topological order.
+    """
+    depth: dict[str, int] = {}
+    levels: list[list[str]] = []
+    for name in call_graph.topological_order:
+        level = 1 + max((depth[callee] for callee in call_graph.edges[name]), default=-1)
+        depth[name] = level
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(name)
+    return levels
+
+
+def _analyze_levels_parallel(
+    module: Module,
+    call_graph: CallGraph,
+    limits: Limits | None,
+    allocation: AllocationResult | None,
+    range_info: dict[str, dict[SSAName, ValueRange]] | None,
+    jobs: int,
+    costs: CostModel | None,
+    timings: BuildTimings | None,
+) -> dict[str, FunctionAnalysis]:
+    """analyze_all_functions over a process pool, one level at a time."""
+    results: dict[str, FunctionAnalysis] = {}
+    accumulated_params: dict[str, Mapping[int, bool]] = {}
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for level in _call_graph_levels(call_graph):
+            funcs = [module.functions[name] for name in level]
+            callee_infos = [
+                {callee: accumulated_params[callee] for callee in call_graph.edges[name]}
+                for name in level
+            ]
+            ranges = [range_info.get(name) if range_info else None for name in level]
+
+            # Functions in a level are independent; results come back in order
+            chunksize = max(1, len(level) // (jobs * 4))
+            analyses = pool.map(
+                partial(timed_call, analyze_function), funcs, repeat(limits), callee_infos,
+                repeat(allocation), ranges, repeat(None), repeat(costs), chunksize=chunksize,
+            )
+            for name, func, (result, wall, cpu) in zip(level, funcs, analyses):
+                results[name] = result
+                if timings is not None:
+                    timings.record_function(ANALYSIS_PHASE, name, wall, cpu)
+                accumulated_params[name] = get_param_narrowable(result.narrowing, func)
+
+    return {name: results[name] for name in call_graph.topological_order}
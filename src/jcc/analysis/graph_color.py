@@ -5,7 +5,9 @@ Values that don't interfere can share the same slot (color).
 
 Uses DSatur (degree of saturation) ordering:
 1. Pick uncolored node with highest saturation (most distinct colors
-   among already-colored neighbors), tie-break by degree then name
+   among already-colored neighbors), tie-break by degree then name.
+   Candidates live in a heap keyed on that order; saturation only grows,
+   so stale entries are skipped on pop instead of being removed
 2. Assign colors greedily, avoiding neighbor colors
 3. Bidirectional coalesce preference for phis:
    - When coloring a phi, prefer its already-colored sources' colors
@@ -17,6 +19,7 @@ and never need to spill. The goal is to minimize slot count.
 
 from collections.abc import Mapping
 from dataclasses import dataclass
+from heapq import heapify, heappop, heappush
 
 from jcc.analysis.base import PhaseOutput
 from jcc.analysis.interference import InterferenceGraph
@@ -89,8 +92,7 @@ def color_graph(
             num_slots=num_slots,
         )
 
-    # Build adjacency for efficient neighbor lookup
-    adjacency = _build_adjacency(graph)
+    adjacency = graph.adjacency
 
     # Build reverse mapping: SSA name -> list of phis it is a source of
     source_to_phis = _build_source_to_phi_map(phi_info)
@@ -98,12 +100,15 @@ def color_graph(
     # Color assignment
     assignments: dict[SSAName, int] = {}
     slot_types: dict[int, JCType] = {}
+    # First-assigned value covering each slot (the owner type checks use)
+    slot_owners: dict[int, SSAName] = {}
 
     # Pre-color parameters to their fixed slots
     for node in graph.nodes:
         if node in param_slots:
             fixed_slot = param_slots[node]
             assignments[node] = fixed_slot
+            _record_owner(node, fixed_slot, graph.node_types, slot_owners)
 
             # Record slot type
             node_type = graph.node_types[node]
@@ -134,24 +139,29 @@ def color_graph(
             if neighbor in assignments:
                 saturation[node].add(assignments[neighbor])
 
+    # Max saturation, then max degree, then min name (deterministic).
+    # An entry is current only while its saturation matches the node's.
+    heap = [(-len(saturation[n]), -len(adjacency[n]), n) for n in remaining]
+    heapify(heap)
+
     while remaining:
-        # Max saturation, then max degree, then min name (deterministic)
-        node = min(
-            remaining,
-            key=lambda n: (-len(saturation[n]), -len(adjacency[n]), n),
-        )
+        neg_sat, _, node = heappop(heap)
+        if node not in remaining or -neg_sat != len(saturation[node]):
+            continue
         remaining.remove(node)
 
         color = _choose_color(
             node,
             adjacency,
             assignments,
+            slot_owners,
             phi_info,
             source_to_phis,
             graph.node_types,
             reserved_slots,
         )
         assignments[node] = color
+        _record_owner(node, color, graph.node_types, slot_owners)
 
         # Record slot type for all slots this value occupies
         node_type = graph.node_types[node]
@@ -161,8 +171,12 @@ def color_graph(
 
         # Update saturation for uncolored neighbors
         for neighbor in adjacency[node]:
-            if neighbor in remaining:
+            if neighbor in remaining and color not in saturation[neighbor]:
                 saturation[neighbor].add(color)
+                heappush(
+                    heap,
+                    (-len(saturation[neighbor]), -len(adjacency[neighbor]), neighbor),
+                )
 
     # num_slots must account for multi-slot values (INT uses 2 slots)
     # AND parameter slots (even if params aren't in the interference graph,
@@ -195,21 +209,22 @@ def _build_source_to_phi_map(phi_info: PhiInfo) -> dict[SSAName, list[SSAName]]:
     return result
 
 
-def _build_adjacency(graph: InterferenceGraph) -> dict[SSAName, set[SSAName]]:
-    """Build adjacency list from edge set."""
-    adjacency: dict[SSAName, set[SSAName]] = {node: set() for node in graph.nodes}
-
-    for a, b in graph.edges:
-        adjacency[a].add(b)
-        adjacency[b].add(a)
-
-    return adjacency
+def _record_owner(
+    name: SSAName,
+    base_slot: int,
+    node_types: Mapping[SSAName, JCType],
+    slot_owners: dict[int, SSAName],
+) -> None:
+    """Record name as owner of the slots it covers, unless already owned."""
+    for offset in range(node_types[name].slots):
+        slot_owners.setdefault(base_slot + offset, name)
 
 
 def _choose_color(
     node: SSAName,
-    adjacency: dict[SSAName, set[SSAName]],
+    adjacency: Mapping[SSAName, frozenset[SSAName]],
     assignments: dict[SSAName, int],
+    slot_owners: dict[int, SSAName],
     phi_info: PhiInfo,
     source_to_phis: dict[SSAName, list[SSAName]],
     node_types: Mapping[SSAName, JCType],
@@ -252,12 +267,11 @@ def _choose_color(
                 return False
         # Check type compatibility and reject partial overlaps
         for offset in range(slots_needed):
-            existing_base = _get_slot_base(base + offset, assignments, node_types)
-            if existing_base is not None:
-                if existing_base != base:
+            owner = slot_owners.get(base + offset)
+            if owner is not None:
+                if assignments[owner] != base:
                     return False  # Partial overlap with different variable
-                existing = node_types[_get_slot_owner(base + offset, assignments, node_types)]
-                if not _types_can_share(node_type, existing):
+                if not _types_can_share(node_type, node_types[owner]):
                     return False
         return True
 
@@ -308,28 +322,3 @@ def _types_can_share(t1: JCType, t2: JCType) -> bool:
     # BYTE and SHORT can share
     return True
 
-
-def _get_slot_base(
-    slot: int,
-    assignments: dict[SSAName, int],
-    node_types: Mapping[SSAName, JCType],
-) -> int | None:
-    """Get the base slot of the variable occupying this slot, or None."""
-    for name, base_slot in assignments.items():
-        ty = node_types[name]
-        if base_slot <= slot < base_slot + ty.slots:
-            return base_slot
-    return None
-
-
-def _get_slot_owner(
-    slot: int,
-    assignments: dict[SSAName, int],
-    node_types: Mapping[SSAName, JCType],
-) -> SSAName:
-    """Get the name of the variable occupying this slot."""
-    for name, base_slot in assignments.items():
-        ty = node_types[name]
-        if base_slot <= slot < base_slot + ty.slots:
-            return name
-    raise ValueError(f"No variable at slot {slot}")
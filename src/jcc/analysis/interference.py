@@ -6,22 +6,27 @@ interference graph used for slot allocation via graph coloring.
 
 Special case: Phis in the same block always interfere, regardless of liveness.
 This preserves parallel semantics—all phis read old values before any write.
+
+Escaping values are numbered densely in name order, and live sets are Python
+ints used as bitsets: bit i is set when the i-th value is live.
 """
 
-from collections import defaultdict
-from collections.abc import Mapping
+from collections import deque
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass
+from functools import cached_property
 
 from jcc.analysis.base import PhaseOutput
 from jcc.analysis.escape import EscapeInfo
 from jcc.analysis.narrowing import NarrowingResult
+from jcc.ir.facts import FunctionFacts
 from jcc.ir.instructions import (
     PhiInst,
     get_result,
 )
-from jcc.ir.module import Function
+from jcc.ir.module import Block, Function
 from jcc.ir.types import BlockLabel, JCType, SSAName
-from jcc.ir.utils import build_successor_map, get_instruction_type
+from jcc.ir.utils import get_instruction_type
 from jcc.ir.values import SSARef
 
 
@@ -54,25 +59,29 @@ class InterferenceGraph(PhaseOutput):
 
         return errors
 
+    @cached_property
+    def adjacency(self) -> Mapping[SSAName, frozenset[SSAName]]:
+        """Neighbor sets for every node, built once from the edge set."""
+        adjacency: dict[SSAName, set[SSAName]] = {node: set() for node in self.nodes}
+        for a, b in self.edges:
+            adjacency.setdefault(a, set()).add(b)
+            adjacency.setdefault(b, set()).add(a)
+        return {node: frozenset(neighbors) for node, neighbors in adjacency.items()}
+
     def interferes(self, a: SSAName, b: SSAName) -> bool:
         """Check if two values interfere."""
-        return (a, b) in self.edges or (b, a) in self.edges
+        return b in self.neighbors(a)
 
     def neighbors(self, node: SSAName) -> frozenset[SSAName]:
         """Get all nodes that interfere with the given node."""
-        result: set[SSAName] = set()
-        for a, b in self.edges:
-            if a == node:
-                result.add(b)
-            elif b == node:
-                result.add(a)
-        return frozenset(result)
+        return self.adjacency.get(node, frozenset())
 
 
 def build_interference_graph(
     func: Function,
     escapes: EscapeInfo,
     narrowing: NarrowingResult,
+    facts: FunctionFacts | None = None,
 ) -> InterferenceGraph:
     """Build interference graph from liveness analysis.
 
@@ -82,6 +91,8 @@ def build_interference_graph(
     1. Two values are live at the same program point (specifically,
        when one is defined while the other is live)
     2. Two phis are defined in the same block (parallel semantics)
+
+    facts supplies the def map and CFG; it is built here if None.
     """
     # Only escaping values need slots, so only they are in the graph
     nodes = escapes.escapes
@@ -96,24 +107,18 @@ def build_interference_graph(
     # Compute storage types for all nodes
     node_types = _compute_node_types(func, nodes, narrowing)
 
-    # Compute liveness and build interference edges
-    edges = _compute_interference_edges(func, nodes)
+    # Compute liveness and build interference rows (one bitset per node)
+    if facts is None:
+        facts = FunctionFacts(func)
+    live = _LiveBits(nodes, facts.def_map)
+    rows = _compute_interference_rows(func, live, facts)
 
     # Add same-block phi interference
-    _add_same_block_phi_interference(func, nodes, edges)
-
-    # Normalize edges (ensure a < b lexicographically for dedup)
-    normalized_edges: set[tuple[SSAName, SSAName]] = set()
-    for a, b in edges:
-        if a != b:  # No self-edges
-            if a < b:
-                normalized_edges.add((a, b))
-            else:
-                normalized_edges.add((b, a))
+    _add_same_block_phi_interference(func, live, rows)
 
     return InterferenceGraph(
         nodes=nodes,
-        edges=frozenset(normalized_edges),
+        edges=_normalized_edges(live.names, rows),
         node_types=node_types,
     )
 
@@ -146,117 +151,120 @@ def _compute_node_types(
     return result
 
 
-def _compute_interference_edges(
-    func: Function,
-    nodes: frozenset[SSAName],
-) -> set[tuple[SSAName, SSAName]]:
-    """Compute interference edges via liveness analysis.
+# Per-instruction summary: (index of the defined node or None, operand bits)
+_InstrBits = tuple[int | None, int]
 
-    Two values interfere if one is live at the definition point of the other.
+
+class _LiveBits:
+    """Dense numbering of escaping values and their bitset uses.
 
     Non-escaping values are inlined into expression trees during codegen,
     which extends the effective live range of their escaping operands to
-    the root instruction. We account for this by tracing through non-escaping
-    intermediates to find all transitively-referenced escaping values.
+    the root instruction. A use of a non-escaping value therefore stands for
+    all escaping values it transitively references; those sets are traced
+    once per name and memoized.
     """
-    edges: set[tuple[SSAName, SSAName]] = set()
 
-    # Build def map for tracing non-escaping intermediates
-    def_map: dict[SSAName, object] = {}
-    for block in func.blocks:
+    def __init__(self, nodes: frozenset[SSAName], def_map: Mapping[SSAName, object]) -> None:
+        self.names: list[SSAName] = sorted(nodes)
+        self.index: dict[SSAName, int] = {name: i for i, name in enumerate(self.names)}
+        self._def_map = def_map
+        self._transitive: dict[SSAName, int] = {}
+
+    def value_bits(self, name: SSAName) -> int:
+        """Bits of the escaping values a use of name keeps live."""
+        i = self.index.get(name)
+        if i is not None:
+            return 1 << i
+        cached = self._transitive.get(name)
+        if cached is not None:
+            return cached
+
+        bits = 0
+        worklist = [name]
+        visited: set[SSAName] = set()
+        while worklist:
+            n = worklist.pop()
+            if n in visited:
+                continue
+            visited.add(n)
+            i = self.index.get(n)
+            if i is not None:
+                bits |= 1 << i
+                continue  # Don't trace through escaping values
+            if n in self._transitive:
+                bits |= self._transitive[n]
+                continue
+            defn = self._def_map.get(n)
+            if defn is not None:
+                for op in defn.operands:  # type: ignore[attr-defined]
+                    if isinstance(op, SSARef):
+                        worklist.append(op.name)
+
+        self._transitive[name] = bits
+        return bits
+
+    def operand_bits(self, instr: object) -> int:
+        """Bits of the escaping values an instruction's operands keep live."""
+        bits = 0
+        for operand in instr.operands:  # type: ignore[attr-defined]
+            if isinstance(operand, SSARef):
+                bits |= self.value_bits(operand.name)
+        return bits
+
+    def summarize(self, block: Block) -> list[_InstrBits]:
+        """Defined node index (or None) and operand bits, per instruction."""
+        summary: list[_InstrBits] = []
         for instr in block.all_instructions:
             result = get_result(instr)
-            if result is not None:
-                def_map[result] = instr
+            defined = self.index.get(result) if result is not None else None
+            summary.append((defined, self.operand_bits(instr)))
+        return summary
 
-    # Build CFG for liveness analysis
-    successors = build_successor_map(func)
+
+def _compute_interference_rows(
+    func: Function,
+    live: _LiveBits,
+    facts: FunctionFacts,
+) -> list[int]:
+    """Compute interference via liveness analysis, one bitset row per node.
+
+    Two values interfere if one is live at the definition point of the other.
+    Row i holds the values live when node i is defined.
+    """
+    summaries = {block.label: live.summarize(block) for block in func.blocks}
 
     # Compute block-level liveness first (for efficiency)
-    _, live_out = _compute_block_liveness(func, nodes, successors, def_map)
+    live_out = _compute_block_liveness(func, live, summaries, facts)
+
+    rows = [0] * len(live.names)
 
     # Now compute instruction-level interference
     for block in func.blocks:
         # Start with live_out of block
-        currently_live: set[SSAName] = set(live_out[block.label])
+        currently_live = live_out[block.label]
 
         # Process instructions in reverse order
-        instructions = list(block.all_instructions)
-        for instr in reversed(instructions):
-            # Get the definition (if any)
-            defined = get_result(instr)
-
-            # If this instruction defines a node, it interferes with
-            # everything currently live (except itself)
-            if defined is not None and defined in nodes:
-                for live_val in currently_live:
-                    if live_val != defined:
-                        edges.add((defined, live_val))
-
-            # Update liveness: remove def, add uses
-            if defined is not None and defined in nodes:
-                currently_live.discard(defined)
+        for defined, uses in reversed(summaries[block.label]):
+            # A defined node interferes with everything currently live
+            # (except itself); then it stops being live above its def
+            if defined is not None:
+                bit = 1 << defined
+                rows[defined] |= currently_live & ~bit
+                currently_live &= ~bit
 
-            _add_operand_uses(instr, nodes, def_map, currently_live)
+            currently_live |= uses
 
-    return edges
-
-
-def _add_operand_uses(
-    instr: object,
-    nodes: frozenset[SSAName],
-    def_map: dict[SSAName, object],
-    currently_live: set[SSAName],
-) -> None:
-    """Add escaping values used by an instruction to the live set.
-
-    For direct escaping operands, add them directly. For non-escaping
-    operands, trace through their definitions to find the escaping values
-    they transitively reference. This accounts for expression tree inlining:
-    when a non-escaping value is inlined into a root, the escaping values
-    in its sub-tree are effectively used at the root's emission point.
-    """
-    for operand in instr.operands:  # type: ignore[attr-defined]
-        if not isinstance(operand, SSARef):
-            continue
-        if operand.name in nodes:
-            currently_live.add(operand.name)
-        else:
-            # Non-escaping: trace through to find escaping values
-            _collect_transitive_uses(operand.name, nodes, def_map, currently_live)
-
-
-def _collect_transitive_uses(
-    name: SSAName,
-    nodes: frozenset[SSAName],
-    def_map: dict[SSAName, object],
-    result: set[SSAName],
-) -> None:
-    """Find escaping values transitively referenced by a non-escaping value."""
-    worklist = [name]
-    visited: set[SSAName] = set()
-    while worklist:
-        n = worklist.pop()
-        if n in visited:
-            continue
-        visited.add(n)
-        if n in nodes:
-            result.add(n)
-            continue  # Don't trace through escaping values
-        defn = def_map.get(n)
-        if defn is not None:
-            for op in defn.operands:  # type: ignore[attr-defined]
-                if isinstance(op, SSARef):
-                    worklist.append(op.name)
+    return rows
 
 
 def _compute_block_liveness(
     func: Function,
-    nodes: frozenset[SSAName],
-    successors: dict[BlockLabel, list[BlockLabel]],
-    def_map: dict[SSAName, object],
-) -> tuple[dict[BlockLabel, set[SSAName]], dict[BlockLabel, set[SSAName]]]:
-    """Compute live_in and live_out for each block.
+    live: _LiveBits,
+    summaries: Mapping[BlockLabel, Sequence[_InstrBits]],
+    facts: FunctionFacts,
+) -> dict[BlockLabel, int]:
+    """Compute live_out for each block.
 
     Uses standard backward dataflow analysis:
     - live_out[B] = union of live_in[S] for all successors S of B
@@ -265,101 +273,124 @@ def _compute_block_liveness(
     For phi nodes: the use of a phi operand is in the predecessor block,
     not the block containing the phi.
 
-    Non-escaping operands are traced through to find transitive escaping
-    uses, matching the instruction-level analysis in _add_operand_uses.
+    Blocks are visited from a worklist seeded in postorder (successors
+    before predecessors, then unreachable blocks), and a block's predecessors are revisited only
+    when its live_in changes.
     """
     # Compute defs and uses for each block
-    block_defs: dict[BlockLabel, set[SSAName]] = {}
-    block_uses: dict[BlockLabel, set[SSAName]] = {}
+    block_defs: dict[BlockLabel, int] = {}
+    block_uses: dict[BlockLabel, int] = {}
 
     for block in func.blocks:
-        defs: set[SSAName] = set()
-        uses: set[SSAName] = set()
+        defs = 0
+        uses = 0
 
-        for instr in block.all_instructions:
+        for instr, (defined, instr_uses) in zip(block.all_instructions, summaries[block.label]):
             # Phi operands are NOT used in this block - they're used in predecessors
             if isinstance(instr, PhiInst):
-                result = instr.result
-                if result in nodes:
-                    defs.add(result)
+                if defined is not None:
+                    defs |= 1 << defined
                 continue
 
             # Uses that aren't already defined in this block
-            # Trace through non-escaping intermediates (same as _add_operand_uses)
-            instr_uses: set[SSAName] = set()
-            _add_operand_uses(instr, nodes, def_map, instr_uses)
-            for name in instr_uses:
-                if name not in defs:
-                    uses.add(name)
-
-            # Definitions
-            result = get_result(instr)
-            if result is not None and result in nodes:
-                defs.add(result)
+            uses |= instr_uses & ~defs
+
+            if defined is not None:
+                defs |= 1 << defined
 
         block_defs[block.label] = defs
         block_uses[block.label] = uses
 
     # Handle phi operand uses: they're "used" at the end of the predecessor
-    phi_uses_from_pred: dict[BlockLabel, set[SSAName]] = defaultdict(set)
+    phi_uses_from_pred: dict[BlockLabel, int] = {}
     for block in func.blocks:
         for instr in block.phi_instructions:
             for value, from_label in instr.incoming:
                 if isinstance(value, SSARef):
-                    if value.name in nodes:
-                        phi_uses_from_pred[from_label].add(value.name)
-                    else:
-                        # Non-escaping phi source (e.g., GEP result): trace through
-                        # to find transitive escaping operands that need to stay live.
-                        _collect_transitive_uses(
-                            value.name, nodes, def_map, phi_uses_from_pred[from_label]
-                        )
-
-    # Initialize live sets
-    live_in: dict[BlockLabel, set[SSAName]] = {b.label: set() for b in func.blocks}
-    live_out: dict[BlockLabel, set[SSAName]] = {b.label: set() for b in func.blocks}
+                    phi_uses_from_pred[from_label] = phi_uses_from_pred.get(
+                        from_label, 0
+                    ) | live.value_bits(value.name)
 
-    # Fixed-point iteration
-    changed = True
-    while changed:
-        changed = False
+    successors = facts.successors
+    predecessors = facts.predecessors
 
-        for block in func.blocks:
-            label = block.label
+    live_in: dict[BlockLabel, int] = {b.label: 0 for b in func.blocks}
+    live_out: dict[BlockLabel, int] = {b.label: 0 for b in func.blocks}
 
-            # live_out = union of live_in of successors + phi uses from this block
-            new_live_out: set[SSAName] = set()
-            for succ_label in successors.get(label, []):
-                new_live_out |= live_in[succ_label]
-            # Add phi operands that this block provides
-            new_live_out |= phi_uses_from_pred[label]
+    worklist = deque(reversed(facts.rpo))
+    worklist.extend(b.label for b in func.blocks if b.label not in facts.rpo_index)
+    queued = set(worklist)
+    while worklist:
+        label = worklist.popleft()
+        queued.discard(label)
 
-            # live_in = (live_out - defs) | uses
-            new_live_in = (new_live_out - block_defs[label]) | block_uses[label]
+        # live_out = union of live_in of successors + phi uses from this block
+        new_live_out = phi_uses_from_pred.get(label, 0)
+        for succ_label in successors[label]:
+            new_live_out |= live_in[succ_label]
+        live_out[label] = new_live_out
 
-            if new_live_in != live_in[label] or new_live_out != live_out[label]:
-                live_in[label] = new_live_in
-                live_out[label] = new_live_out
-                changed = True
+        # live_in = (live_out - defs) | uses
+        new_live_in = (new_live_out & ~block_defs[label]) | block_uses[label]
+        if new_live_in != live_in[label]:
+            live_in[label] = new_live_in
+            for pred in predecessors[label]:
+                if pred not in queued:
+                    queued.add(pred)
+                    worklist.append(pred)
 
-    return live_in, live_out
+    return live_out
 
 
 def _add_same_block_phi_interference(
     func: Function,
-    nodes: frozenset[SSAName],
-    edges: set[tuple[SSAName, SSAName]],
+    live: _LiveBits,
+    rows: list[int],
 ) -> None:
-    """Add interference edges between phis in the same block.
+    """Add interference between phis in the same block.
 
     Phis in the same block execute with parallel semantics:
     all read old values before any write new values. Therefore
     they must be considered simultaneously live.
     """
     for block in func.blocks:
-        phis = [instr.result for instr in block.phi_instructions if instr.result in nodes]
+        phis = [
+            live.index[instr.result]
+            for instr in block.phi_instructions
+            if instr.result in live.index
+        ]
 
         # All pairs of phis in the same block interfere
-        for i, phi_a in enumerate(phis):
-            for phi_b in phis[i + 1 :]:
-                edges.add((phi_a, phi_b))
+        mask = 0
+        for i in phis:
+            mask |= 1 << i
+        for i in phis:
+            rows[i] |= mask & ~(1 << i)
+
+
+def _normalized_edges(
+    names: Sequence[SSAName],
+    rows: Sequence[int],
+) -> frozenset[tuple[SSAName, SSAName]]:
+    """Turn bitset rows into edges with a < b lexicographically.
+
+    Nodes are numbered in name order, so comparing indices orders names.
+    """
+    edges: set[tuple[SSAName, SSAName]] = set()
+    for i, row in enumerate(rows):
+        a = names[i]
+        for j in _bit_indices(row):
+            b = names[j]
+            edges.add((a, b) if i < j else (b, a))
+    return frozenset(edges)
+
+
+def _bit_indices(mask: int) -> list[int]:
+    """Indices of the set bits in mask, lowest first."""
+    bits = bin(mask)[:1:-1]  # Binary digits, least significant first
+    indices: list[int] = []
+    i = bits.find("1")
+    while i >= 0:
+        indices.append(i)
+        i = bits.find("1", i + 1)
+    return indices
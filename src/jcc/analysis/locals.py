@@ -9,6 +9,7 @@ from jcc.analysis.dataflow import DataflowAnalysis
 from jcc.analysis.graph_color import SlotAssignments
 from jcc.analysis.narrowing import NarrowingResult
 from jcc.analysis.offset_phi import OffsetPhiInfo
+from jcc.ir.facts import FunctionFacts
 from jcc.ir.instructions import BinaryInst, PhiInst, SelectInst, get_result
 from jcc.ir.module import Function
 from jcc.ir.types import JCType, SSAName
@@ -133,6 +134,7 @@ def build_function_locals(
     slots: SlotAssignments,
     limits: Limits,
     offset_phi_info: OffsetPhiInfo | None = None,
+    facts: FunctionFacts | None = None,
 ) -> FunctionLocals:
     """Build unified FunctionLocals from analysis results.
 
@@ -198,7 +200,7 @@ def build_function_locals(
                     register_types[name] = JCType.SHORT
 
     # Analyze which BYTE values may have overflowed (need truncation at observation points)
-    byte_tainted = _analyze_byte_taint(func, value_types)
+    byte_tainted = _analyze_byte_taint(func, value_types, facts)
 
     return FunctionLocals(
         value_types=value_types,
@@ -241,8 +243,13 @@ class ByteTaintAnalysis(DataflowAnalysis):
     Safe (not tainted): Constants, loads, parameters, cast results.
     """
 
-    def __init__(self, func: Function, value_types: Mapping[SSAName, JCType]):
-        super().__init__(func)
+    def __init__(
+        self,
+        func: Function,
+        value_types: Mapping[SSAName, JCType],
+        facts: FunctionFacts | None = None,
+    ):
+        super().__init__(func, facts)
         self.value_types = value_types
 
     def analyze(self) -> frozenset[SSAName]:
@@ -269,9 +276,10 @@ class ByteTaintAnalysis(DataflowAnalysis):
 def _analyze_byte_taint(
     func: Function,
     value_types: Mapping[SSAName, JCType],
+    facts: FunctionFacts | None = None,
 ) -> frozenset[SSAName]:
     """Analyze which BYTE values may have overflowed. See ByteTaintAnalysis."""
-    return ByteTaintAnalysis(func, value_types).analyze()
+    return ByteTaintAnalysis(func, value_types, facts).analyze()
 
 
 def _collect_value_types(func: Function) -> dict[SSAName, JCType]:
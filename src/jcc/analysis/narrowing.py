@@ -23,6 +23,7 @@ from dataclasses import dataclass
 
 from jcc.analysis.base import PhaseOutput
 from jcc.analysis.dataflow import DataflowAnalysis
+from jcc.ir.facts import FunctionFacts
 from jcc.ir.instructions import (
     BinaryInst,
     CallInst,
@@ -103,8 +104,9 @@ class NarrowingAnalysis(DataflowAnalysis):
         func: Function,
         callee_params: ParamNarrowability | None = None,
         range_info: dict[SSAName, ValueRange] | None = None,
+        facts: FunctionFacts | None = None,
     ):
-        super().__init__(func)
+        super().__init__(func, facts)
         self.callee_params = callee_params
         self.range_info = range_info
 
@@ -229,6 +231,7 @@ def analyze_narrowing(
     func: Function,
     callee_params: ParamNarrowability | None = None,
     range_info: dict[SSAName, ValueRange] | None = None,
+    facts: FunctionFacts | None = None,
 ) -> NarrowingResult:
     """Analyze which i32 values can be narrowed to i16.
 
@@ -241,11 +244,12 @@ def analyze_narrowing(
             conservatively treats all i32 call arguments as seeds.
         range_info: Value ranges from LLVM's LazyValueInfo (via jcc_annotate plugin).
             If a value's range fits in i16, it can skip being marked as a seed.
+        facts: Shared def map for func. Built here if None.
 
     Returns:
         NarrowingResult with wide_values, narrowed_values, and reasons.
     """
-    analysis = NarrowingAnalysis(func, callee_params, range_info)
+    analysis = NarrowingAnalysis(func, callee_params, range_info, facts)
     return analysis.analyze()
 
 
@@ -13,6 +13,12 @@ Dynamic offset example (LICM-hoisted GEPs):
     %gep2 = gep i8, ptr @FRAMEBUFFER, i32 %end_byte
     %sink = phi ptr [ %gep1, %bb1 ], [ %gep2, %bb2 ]
     → offsets are %start_byte and %end_byte (SSA values, SlotSource moves)
+
+Stepped example (induction pointers from jcc.opt.ivsr):
+    %p = phi ptr [ gep i8 @TABLE+8, %entry ], [ %p.next, %latch ]
+    %p.next = getelementptr i8, ptr %p, i32 4
+    → offset from %entry is constant; from %latch it is OffsetStep(4 bytes in
+      elements, e.g. 2 for decomposed INTs), a StepSource move emitted as sinc
 """
 
 from collections.abc import Mapping
@@ -21,8 +27,15 @@ from dataclasses import dataclass
 from jcc.analysis.globals import AllocationResult, AllocatedStruct, GlobalInfo
 from jcc.analysis.phi import PhiInfo, PhiSource
 from jcc.ir.instructions import GEPInst, Instruction
-from jcc.ir.types import BlockLabel, GlobalName, SSAName
-from jcc.ir.values import GlobalRef, InlineGEP, SSARef, Value
+from jcc.ir.types import BlockLabel, GlobalName, JCType, SSAName
+from jcc.ir.values import Const, GlobalRef, InlineGEP, SSARef, Value
+
+
+@dataclass(frozen=True)
+class OffsetStep:
+    """An edge that advances the phi's own offset by a constant."""
+
+    delta: int  # Memory array elements
 
 
 @dataclass(frozen=True)
@@ -30,7 +43,8 @@ class OffsetPhiResult:
     """Resolved offset phi with base global and per-edge offsets."""
 
     base_global: GlobalName  # All sources point to this global
-    offsets: Mapping[BlockLabel, int | SSAName]  # from_block -> constant or SSA index
+    offsets: Mapping[BlockLabel, int | SSAName | OffsetStep]  # from_block -> offset source
+    field_offset: int = 0  # Structs: byte offset of the field the offsets index
 
 
 @dataclass(frozen=True)
@@ -49,7 +63,9 @@ class OffsetPhiInfo:
         """Check if a phi is an offset phi."""
         return name in self.offset_phis
 
-    def get_offset(self, phi_name: SSAName, from_block: BlockLabel) -> int | SSAName:
+    def get_offset(
+        self, phi_name: SSAName, from_block: BlockLabel,
+    ) -> int | SSAName | OffsetStep:
         """Get the memory offset for a specific phi edge."""
         return self.offset_phis[phi_name].offsets[from_block]
 
@@ -57,6 +73,10 @@ class OffsetPhiInfo:
         """Get the base global for an offset phi."""
         return self.offset_phis[phi_name].base_global
 
+    def get_field_offset(self, phi_name: SSAName) -> int:
+        """Get the byte offset of the struct field an offset phi indexes."""
+        return self.offset_phis[phi_name].field_offset
+
 
 def detect_offset_phis(
     phi_info: PhiInfo,
@@ -66,10 +86,12 @@ def detect_offset_phis(
     """Detect phis where all sources point to the same base global.
 
     A phi qualifies as an offset phi if:
-    1. All sources resolve to the same base global
+    1. All sources resolve to the same base global (and struct field)
     2. Each source is either:
        a. GlobalRef or InlineGEP with constant offset, OR
-       b. SSARef → GEP on the same global with a dynamic index (requires def_map)
+       b. SSARef → GEP on the same global with a dynamic index (requires def_map), OR
+       c. SSARef → byte GEP on the phi itself with a constant offset (requires
+          def_map), as long as another source fixes the global
 
     Args:
         phi_info: Phi analysis results with source information
@@ -82,7 +104,7 @@ def detect_offset_phis(
     offset_phis: dict[SSAName, OffsetPhiResult] = {}
 
     for phi_name, sources in phi_info.phi_sources.items():
-        resolved = _try_resolve_offset_sources(sources, allocation, def_map)
+        resolved = _try_resolve_offset_sources(phi_name, sources, allocation, def_map)
         if resolved is not None:
             offset_phis[phi_name] = resolved
 
@@ -90,6 +112,7 @@ def detect_offset_phis(
 
 
 def _try_resolve_offset_sources(
+    phi_name: SSAName,
     sources: tuple[PhiSource, ...],
     allocation: AllocationResult,
     def_map: Mapping[SSAName, Instruction] | None,
@@ -98,42 +121,104 @@ def _try_resolve_offset_sources(
 
     Returns None if:
     - Any source cannot be resolved to a global + offset
-    - Sources point to different base globals
+    - Sources point to different base globals or struct fields
+    - Every source is a step (nothing fixes the global)
     """
     if not sources:
         return None
 
-    base_global: GlobalName | None = None
-    offsets: dict[BlockLabel, int | SSAName] = {}
+    base: tuple[GlobalName, int] | None = None
+    offsets: dict[BlockLabel, int | SSAName | OffsetStep] = {}
+    steps: dict[BlockLabel, int] = {}
 
     for source in sources:
+        step = _resolve_step_bytes(phi_name, source.value, def_map)
+        if step is not None:
+            steps[source.from_block] = step
+            continue
+
         result = _resolve_source_offset(source.value, allocation, def_map)
         if result is None:
             return None
 
-        global_name, mem_offset = result
+        global_name, mem_offset, field_offset = result
 
-        # All sources must use the same base global
-        if base_global is None:
-            base_global = global_name
-        elif base_global != global_name:
+        # All sources must use the same base global and field
+        if base is None:
+            base = (global_name, field_offset)
+        elif base != (global_name, field_offset):
             return None
 
         offsets[source.from_block] = mem_offset
 
-    assert base_global is not None  # At least one source exists
-    return OffsetPhiResult(base_global=base_global, offsets=offsets)
+    if base is None:
+        return None
+    base_global, field_offset = base
+
+    info = allocation.lookup(base_global)
+    assert info is not None  # Resolved above
+    for from_block, step_bytes in steps.items():
+        delta = mem_step(info, field_offset, step_bytes)
+        if delta is None:
+            return None
+        offsets[from_block] = OffsetStep(delta=delta)
+
+    return OffsetPhiResult(base_global=base_global, offsets=offsets, field_offset=field_offset)
+
+
+def _resolve_step_bytes(
+    phi_name: SSAName,
+    value: Value,
+    def_map: Mapping[SSAName, Instruction] | None,
+) -> int | None:
+    """Byte step of a source that is `getelementptr i8, ptr <phi>, C`, else None."""
+    if not isinstance(value, SSARef) or def_map is None:
+        return None
+    defn = def_map.get(value.name)
+    if not isinstance(defn, GEPInst) or defn.source_type != "i8":
+        return None
+    if defn.base != SSARef(name=phi_name) or len(defn.indices) != 1:
+        return None
+    index = defn.indices[0]
+    return index.value if isinstance(index, Const) else None
+
+
+def mem_step(
+    info: GlobalInfo | AllocatedStruct,
+    field_offset: int,
+    step_bytes: int,
+) -> int | None:
+    """Convert a pointer step in LLVM bytes to memory array elements.
+
+    For a struct array, only whole-struct steps can be followed: one struct
+    is stride bytes in LLVM, but elem_count elements in the field's region
+    of the SOA layout.
+
+    Returns:
+        The step in elements, or None if it does not map onto the layout.
+    """
+    if isinstance(info, GlobalInfo):
+        elem_size = info.mem_array.element_type.byte_size
+        if step_bytes % elem_size != 0:
+            return None
+        return step_bytes // elem_size
+
+    field = info.field_at_byte_offset(field_offset)
+    if field is None or info.stride <= 0 or step_bytes % info.stride != 0:
+        return None
+    return step_bytes // info.stride * field.elem_count
 
 
 def _resolve_source_offset(
     value: Value,
     allocation: AllocationResult,
     def_map: Mapping[SSAName, Instruction] | None,
-) -> tuple[GlobalName, int | SSAName] | None:
-    """Resolve a phi source value to (global_name, offset).
+) -> tuple[GlobalName, int | SSAName, int] | None:
+    """Resolve a phi source value to (global_name, offset, field_offset).
 
     Offset is either a constant int (for GlobalRef/InlineGEP) or an SSAName
-    (for dynamic-index GEPs resolved via def_map).
+    (for dynamic-index GEPs resolved via def_map). field_offset is the byte
+    offset of the struct field it indexes, 0 for arrays and struct bases.
     """
     if isinstance(value, GlobalRef):
         return _resolve_global_ref(value.name, allocation)
@@ -152,13 +237,13 @@ def _resolve_ssa_gep(
     name: SSAName,
     allocation: AllocationResult,
     def_map: Mapping[SSAName, Instruction],
-) -> tuple[GlobalName, SSAName] | None:
+) -> tuple[GlobalName, SSAName, int] | None:
     """Resolve an SSARef to a GEP instruction with a dynamic index.
 
     Handles LICM-hoisted GEPs like:
         %gep = getelementptr i8, ptr @GLOBAL, i32 %dynamic_index
 
-    Returns (global_name, index_ssa_name) or None if not a recognized pattern.
+    Returns (global_name, index_ssa_name, 0) or None if not a recognized pattern.
     """
     defn = def_map.get(name)
     if not isinstance(defn, GEPInst):
@@ -178,22 +263,22 @@ def _resolve_ssa_gep(
     if allocation.lookup(base_global) is None:
         return None
 
-    return (base_global, index.name)
+    return (base_global, index.name, 0)
 
 
 def _resolve_global_ref(
     name: GlobalName,
     allocation: AllocationResult,
-) -> tuple[GlobalName, int] | None:
+) -> tuple[GlobalName, int, int] | None:
     """Resolve a direct global reference to its memory offset."""
     info = allocation.lookup(name)
 
     if isinstance(info, GlobalInfo):
-        return (name, info.mem_offset)
+        return (name, info.mem_offset, 0)
 
     if isinstance(info, AllocatedStruct) and info.fields:
         # Use field 0's offset for the struct base
-        return (name, info.fields[0].mem_offset)
+        return (name, info.fields[0].mem_offset, info.fields[0].byte_offset)
 
     return None
 
@@ -201,7 +286,7 @@ def _resolve_global_ref(
 def _resolve_inline_gep(
     gep: InlineGEP,
     allocation: AllocationResult,
-) -> tuple[GlobalName, int] | None:
+) -> tuple[GlobalName, int, int] | None:
     """Resolve an inline GEP to its memory offset.
 
     For byte-offset GEPs (source_type is i8), the indices are byte offsets.
@@ -215,30 +300,41 @@ def _resolve_inline_gep(
 
     # Compute byte offset from GEP indices
     # For inline GEPs, indices are typically constant byte offsets
-    byte_offset = sum(gep.indices)
+    resolved = mem_offset_at(info, sum(gep.indices))
+    if resolved is None:
+        return None
+    return (base_global, *resolved)
 
+
+def mem_offset_at(
+    info: GlobalInfo | AllocatedStruct,
+    byte_offset: int,
+) -> tuple[int, int] | None:
+    """Convert an LLVM byte offset into a global to a memory array index.
+
+    Returns:
+        (memory offset, field byte offset), or None if byte_offset is not
+        element-aligned. The field byte offset is 0 for simple arrays.
+    """
     if isinstance(info, GlobalInfo):
         # Simple array - convert byte offset to element index
         elem_size = info.mem_array.element_type.byte_size
         if byte_offset % elem_size != 0:
             # Non-aligned access - can't handle
             return None
-        elem_offset = byte_offset // elem_size
-        return (base_global, info.mem_offset + elem_offset)
+        return (info.mem_offset + byte_offset // elem_size, 0)
 
-    # Must be AllocatedStruct at this point
-    assert isinstance(info, AllocatedStruct)
     # Struct - need to find the field at this byte offset
-    # For now, only handle simple case where byte_offset targets a field
     decomposed = info.decompose_byte_offset(byte_offset)
     if decomposed is None:
         return None
     field, struct_index = decomposed
     # Compute element offset within the field's memory array
     offset_in_field = byte_offset - (struct_index * info.stride + field.byte_offset)
-    elem_size = field.jc_type.byte_size
+    # Decomposed INTs are two SHORT elements each
+    elem_size = JCType.SHORT.byte_size if field.decomposed_int else field.jc_type.byte_size
     if offset_in_field % elem_size != 0:
         return None
     elem_in_field = offset_in_field // elem_size
     total_offset = field.mem_offset + struct_index * field.elem_count + elem_in_field
-    return (base_global, total_offset)
+    return (total_offset, field.byte_offset)
@@ -0,0 +1,109 @@
+"""Frequency-ordered slot numbering.
+
+JCVM has one-byte forms of the local load and store instructions
+(sload_0..sload_3, aload_0..3, iload_0..3 and their stores) for slots 0-3
+only; every other slot costs an operand byte on each access. Graph
+coloring picks slot numbers with no notion of how often a value is used,
+so a loop counter can easily land in slot 7.
+
+This pass renumbers colored slots after the fact, hottest first. A slot's
+heat is the loop-weighted count of its loads and stores (see
+jcc.analysis.frequency): every def and use of a value assigned to it counts
+its block's static frequency. Phi moves happen at the end of each
+predecessor, so they count there. Parameter slots are fixed by the calling
+convention and stay where they are.
+"""
+
+from dataclasses import replace
+
+from jcc.analysis.frequency import static_frequencies
+from jcc.analysis.graph_color import SlotAssignments
+from jcc.ir.facts import FunctionFacts
+from jcc.ir.instructions import PhiInst, get_result
+from jcc.ir.types import SSAName
+from jcc.ir.values import SSARef
+
+
+def permute_slots(
+    slots: SlotAssignments,
+    facts: FunctionFacts,
+    first_free: int,
+) -> SlotAssignments:
+    """Renumber non-parameter slots so the most accessed come first.
+
+    Coloring never puts two values at overlapping but different base
+    slots, so each base slot and the values sharing it move as one unit,
+    two slots wide if it holds an INT. Units are packed from first_free
+    in order of heat; ties keep their colored order.
+
+    Args:
+        slots: Coloring result.
+        facts: Facts of the colored function.
+        first_free: First slot after the parameters.
+
+    Returns:
+        Assignments with the same sharing, renumbered.
+    """
+    weights = _access_weights(facts)
+
+    # Base slot -> (heat, width) of each movable unit
+    units: dict[int, tuple[float, int]] = {}
+    for name, base in slots.assignments.items():
+        if base < first_free:
+            continue
+        heat, width = units.get(base, (0.0, 1))
+        width = max(width, slots.slot_types[base].slots)
+        units[base] = (heat + weights.get(name, 0.0), width)
+
+    if not units:
+        return slots
+
+    renumber: dict[int, int] = {}
+    next_slot = first_free
+    for base in sorted(units, key=lambda b: (-units[b][0], b)):
+        renumber[base] = next_slot
+        next_slot += units[base][1]
+
+    slot_types = {slot: ty for slot, ty in slots.slot_types.items() if slot < first_free}
+    for base, new_base in renumber.items():
+        for offset in range(units[base][1]):
+            slot_types[new_base + offset] = slots.slot_types[base + offset]
+
+    return replace(
+        slots,
+        assignments={
+            name: renumber.get(base, base) for name, base in slots.assignments.items()
+        },
+        slot_types=slot_types,
+        num_slots=max(next_slot, first_free),
+    )
+
+
+def _access_weights(facts: FunctionFacts) -> dict[SSAName, float]:
+    """Loop-weighted count of the loads and stores of each value."""
+    frequencies = static_frequencies(facts)
+    weights: dict[SSAName, float] = {}
+
+    def count(name: SSAName, weight: float) -> None:
+        weights[name] = weights.get(name, 0.0) + weight
+
+    for block in facts.func.blocks:
+        freq = frequencies[block.label]
+        for instr in block.all_instructions:
+            if isinstance(instr, PhiInst):
+                # Moved into place at the end of each predecessor
+                for value, pred in instr.incoming:
+                    edge = frequencies.get(pred, 0.0)
+                    count(instr.result, edge)
+                    if isinstance(value, SSARef):
+                        count(value.name, edge)
+                continue
+
+            result = get_result(instr)
+            if result is not None:
+                count(result, freq)
+            for operand in instr.operands:
+                if isinstance(operand, SSARef):
+                    count(operand.name, freq)
+
+    return weights
@@ -0,0 +1,201 @@
+"""On-disk cache for parsed API export data.
+
+Running exp2text starts a JVM per package, which dominates the fixed cost
+of a build. The parsed result for each package is stored as compact JSON
+under ~/.config/jcc/cache/api/, keyed by a fingerprint of the export
+directory, the package name and the contents of its .exp files.
+
+Any change to the export files (or to CACHE_VERSION) produces a new key,
+so stale entries are never read; they are only removed by clear_cache().
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from jcc.api.parser import ParseResult
+from jcc.api.types import ClassInfo, MethodInfo, PackageInfo
+from jcc.ir.types import JCType
+from jcc.jcdk import JCDKPaths, config_dir
+
+# Bump when the serialized layout or the parser output changes.
+CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """A single cached package, as reported by list_entries()."""
+
+    path: Path
+    package: str
+    export_dir: str
+    size: int
+
+
+def cache_dir() -> Path:
+    """Return the API cache directory (~/.config/jcc/cache/api)."""
+    return config_dir() / "cache" / "api"
+
+
+def package_key(jcdk: JCDKPaths, package: str) -> str | None:
+    """Compute the cache key for a package.
+
+    Args:
+        jcdk: Resolved JCDK paths.
+        package: Dotted package name (e.g., "javacard.framework").
+
+    Returns:
+        Hex digest identifying the package's export files, or None if the
+        package directory has no .exp files to fingerprint.
+    """
+    # Layout: <package_path>/javacard/<last>.exp
+    package_dir = jcdk.export_dir / package.replace(".", "/")
+    exp_files = sorted((package_dir / "javacard").glob("*.exp"))
+    if not exp_files:
+        return None
+
+    h = hashlib.sha256()
+    h.update(f"v{CACHE_VERSION}\0{jcdk.export_dir.resolve()}\0{package}\0".encode())
+    for exp in exp_files:
+        h.update(str(exp.relative_to(package_dir)).encode() + b"\0")
+        h.update(exp.read_bytes())
+    return h.hexdigest()
+
+
+def load_cached(jcdk: JCDKPaths, package: str) -> ParseResult | None:
+    """Load a cached ParseResult for a package.
+
+    Returns None on a miss, or if the entry is unreadable or was written
+    by a different CACHE_VERSION.
+    """
+    key = package_key(jcdk, package)
+    if key is None:
+        return None
+    path = cache_dir() / f"{key}.json"
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != CACHE_VERSION:
+        return None
+    try:
+        return _decode_result(data["result"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def store_cached(jcdk: JCDKPaths, package: str, result: ParseResult) -> None:
+    """Store a ParseResult for a package.
+
+    Failures to write are ignored: the cache is an optimization only.
+    """
+    key = package_key(jcdk, package)
+    if key is None:
+        return
+    data = {
+        "version": CACHE_VERSION,
+        "package": package,
+        "export_dir": str(jcdk.export_dir),
+        "result": _encode_result(result),
+    }
+    directory = cache_dir()
+    path = directory / f"{key}.json"
+    tmp = path.with_suffix(".tmp")
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(data, separators=(",", ":")))
+        tmp.replace(path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+def list_entries() -> list[CacheEntry]:
+    """List all cache entries, sorted by package name."""
+    entries: list[CacheEntry] = []
+    directory = cache_dir()
+    if not directory.is_dir():
+        return entries
+    for path in directory.glob("*.json"):
+        try:
+            data = json.loads(path.read_text())
+            package = str(data.get("package", "?"))
+            export_dir = str(data.get("export_dir", "?"))
+        except (OSError, ValueError):
+            package, export_dir = "?", "?"
+        entries.append(CacheEntry(
+            path=path, package=package, export_dir=export_dir, size=path.stat().st_size,
+        ))
+    return sorted(entries, key=lambda e: (e.package, e.export_dir))
+
+
+def clear_cache() -> int:
+    """Remove all cache entries.
+
+    Returns:
+        Number of entries removed.
+    """
+    directory = cache_dir()
+    if not directory.is_dir():
+        return 0
+    removed = 0
+    for path in directory.glob("*.json"):
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+# === Serialization ===
+
+
+def _encode_result(result: ParseResult) -> dict[str, Any]:
+    pkg = result.package
+    return {
+        "package": None if pkg is None else [
+            pkg.name, pkg.aid, pkg.major_version, pkg.minor_version,
+        ],
+        "classes": [
+            [
+                cls.name,
+                cls.token,
+                cls.package_name,
+                [
+                    [m.method_name, m.method_token, m.descriptor, m.is_static,
+                     None if m.return_type is None else m.return_type.name]
+                    for overloads in cls.methods.values()
+                    for m in overloads
+                ],
+            ]
+            for cls in result.classes
+        ],
+    }
+
+
+def _decode_result(data: dict[str, Any]) -> ParseResult:
+    pkg = data["package"]
+    package = None if pkg is None else PackageInfo(
+        name=pkg[0], aid=pkg[1], major_version=pkg[2], minor_version=pkg[3],
+    )
+
+    classes: list[ClassInfo] = []
+    for name, token, package_name, methods in data["classes"]:
+        by_name: dict[str, list[MethodInfo]] = {}
+        for method_name, method_token, descriptor, is_static, ret in methods:
+            by_name.setdefault(method_name, []).append(MethodInfo(
+                class_name=name,
+                class_token=token,
+                method_name=method_name,
+                method_token=method_token,
+                descriptor=descriptor,
+                is_static=is_static,
+                return_type=None if ret is None else JCType[ret],
+            ))
+        classes.append(ClassInfo(
+            name=name,
+            token=token,
+            methods={k: tuple(v) for k, v in by_name.items()},
+            package_name=package_name,
+        ))
+
+    return ParseResult(classes=classes, package=package)
@@ -1,14 +1,16 @@
 """Load JavaCard API registry from SDK export files.
 
 Uses the SDK's exp2text tool to convert binary .exp files to text,
-then parses the output to build the API registry.
+then parses the output to build the API registry. Parsed packages are
+cached on disk (see jcc.api.cache) so exp2text only runs on a miss.
 """
 
 import subprocess
 import tempfile
 from pathlib import Path
 
-from jcc.api.parser import parse_exp_text
+from jcc.api import cache
+from jcc.api.parser import ParseResult, parse_exp_text
 from jcc.api.types import APIRegistry, ClassInfo, PackageInfo
 from jcc.jcdk import JCDKPaths, get_jcdk
 
@@ -16,12 +18,14 @@ from jcc.jcdk import JCDKPaths, get_jcdk
 def load_api_registry(
     jcdk: JCDKPaths,
     packages: list[str] | None = None,
+    use_cache: bool = True,
 ) -> APIRegistry:
     """Load API registry by running exp2text and parsing output.
 
     Args:
         jcdk: Resolved JCDK paths from get_jcdk().
         packages: List of packages to load. Defaults to common packages.
+        use_cache: Read and populate the on-disk cache of parsed packages.
 
     Returns:
         APIRegistry containing all classes and methods from specified packages.
@@ -39,8 +43,7 @@ def load_api_registry(
     package_infos: dict[str, PackageInfo] = {}
 
     for package in packages:
-        text = _run_exp2text(jcdk, package)
-        result = parse_exp_text(text)
+        result = _load_package(jcdk, package, use_cache)
         for cls in result.classes:
             classes[cls.name] = cls
         if result.package is not None:
@@ -49,6 +52,19 @@ def load_api_registry(
     return APIRegistry(classes=classes, packages=package_infos)
 
 
+def _load_package(jcdk: JCDKPaths, package: str, use_cache: bool) -> ParseResult:
+    """Load one package, consulting the on-disk cache first."""
+    if use_cache:
+        cached = cache.load_cached(jcdk, package)
+        if cached is not None:
+            return cached
+
+    result = parse_exp_text(_run_exp2text(jcdk, package))
+    if use_cache:
+        cache.store_cached(jcdk, package, result)
+    return result
+
+
 def _run_exp2text(jcdk: JCDKPaths, package: str) -> str:
     """Run exp2text tool and return output.
 
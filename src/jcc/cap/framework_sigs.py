@@ -97,15 +97,17 @@ def _parse_type_char(descriptor: str, pos: int) -> tuple[VType, int]:
 # ==========================================================================
 
 
-def build_registry_index(
-    registry: APIRegistry,
-) -> dict[tuple[str, int, int, bool], MethodSignature]:
+# (package_aid_hex, class_token, method_token, is_static) → signature
+RegistryIndex = dict[tuple[str, int, int, bool], MethodSignature]
+
+
+def build_registry_index(registry: APIRegistry) -> RegistryIndex:
     """Build token-indexed lookup from an APIRegistry.
 
     Maps (package_aid_hex, class_token, method_token, is_static) → MethodSignature
     parsed from JVM descriptors with full array type information.
     """
-    index: dict[tuple[str, int, int, bool], MethodSignature] = {}
+    index: RegistryIndex = {}
 
     for pkg_name, pkg_info in registry.packages.items():
         # Normalize AID: "0xA0:0x0:0x0:0x0:0x62:0x1:0x1" → "A0000000620101"
@@ -129,7 +131,7 @@ def build_registry_index(
 
 
 def get_registry_signature(
-    registry_index: dict[tuple[str, int, int, bool], MethodSignature],
+    registry_index: RegistryIndex,
     import_aids: list[str],
     package_token: int,
     class_token: int,
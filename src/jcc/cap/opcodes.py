@@ -11,9 +11,10 @@ from typing import Literal
 # s1 = signed byte (branch offset)
 # u2 = unsigned short (big-endian)
 # s2 = signed short (branch offset)
+# i4 = signed int (big-endian)
 # cp = constant pool index (2 bytes)
 # mn = m,n pair encoded in single byte for dup_x/swap_x
-OperandType = Literal['u1', 's1', 'u2', 's2', 'cp', 'mn', 'atype']
+OperandType = Literal['u1', 's1', 'u2', 's2', 'i4', 'cp', 'mn', 'atype']
 
 
 @dataclass
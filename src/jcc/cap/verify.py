@@ -7,9 +7,14 @@ Uses abstract interpretation to track stack/register types and provides
 detailed error messages with JCA source correlation.
 """
 
+import os
+from bisect import bisect_left
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum, auto
+from functools import partial
+from heapq import heappop, heappush
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -29,9 +34,15 @@ from .models import (
     CPVirtualMethodRef,
     CPSuperMethodRef,
 )
-from .opcodes import OPCODES, get_opcode, get_opcode_size, is_branch_opcode, parse_switch
-from .disasm import disassemble_method
-from .framework_sigs import get_registry_signature
+from .opcodes import (
+    OPCODES,
+    OpcodeInfo,
+    get_opcode,
+    get_opcode_size,
+    is_branch_opcode,
+    parse_switch,
+)
+from .framework_sigs import RegistryIndex, get_registry_signature
 
 
 # =============================================================================
@@ -365,7 +376,7 @@ def get_opcode_type_effects(
     operands: list[int],
     constant_pool: ConstantPoolComponent | None,
     descriptor: DescriptorComponent | None,
-    registry_index: dict | None = None,
+    registry_index: RegistryIndex | None = None,
     import_aids: list[str] | None = None,
 ) -> TypeEffect:
     """Get expected input types and output types for an opcode.
@@ -702,7 +713,7 @@ def _resolve_invoke_signature(
     mnemonic: str,
     constant_pool: ConstantPoolComponent | None,
     descriptor: DescriptorComponent | None,
-    registry_index: dict | None = None,
+    registry_index: RegistryIndex | None = None,
     import_aids: list[str] | None = None,
 ) -> MethodSignature | None:
     """Resolve method signature from constant pool reference.
@@ -858,6 +869,104 @@ def _parse_method_type(
     return MethodSignature(param_types, return_type, is_static)
 
 
+# =============================================================================
+# Decoded Bytecode
+# =============================================================================
+
+_RETURN_MNEMONICS = ("return", "sreturn", "ireturn", "areturn")
+
+# Control never falls through these to the next instruction
+_UNCONDITIONAL_MNEMONICS = _RETURN_MNEMONICS + ("goto", "goto_w", "athrow")
+
+
+@dataclass(frozen=True)
+class _Instruction:
+    """A decoded instruction."""
+
+    pc: int
+    opcode: int
+    info: OpcodeInfo | None  # None for unknown opcodes
+    size: int
+    operands: list[int]
+    targets: list[int]  # Absolute branch targets (empty if not a branch)
+
+    @property
+    def mnemonic(self) -> str:
+        return self.info.mnemonic if self.info is not None else f"<0x{self.opcode:02X}>"
+
+
+class _MethodCode:
+    """A method's bytecode, decoded once and shared by every verifier pass.
+
+    Instructions are decoded in one linear sweep, like the disassembler,
+    which also collects the branch targets. Type effects are resolved the first time an instruction is executed
+    and cached, so unreachable code is never resolved.
+    """
+
+    def __init__(
+        self,
+        method: MethodInfo,
+        constant_pool: ConstantPoolComponent | None,
+        descriptor: DescriptorComponent | None,
+        registry_index: RegistryIndex | None,
+        import_aids: list[str] | None,
+    ) -> None:
+        self.bytecode = method.bytecode
+        self.instructions: dict[int, _Instruction] = {}
+        self._effects: dict[int, TypeEffect] = {}
+        self._constant_pool = constant_pool
+        self._descriptor = descriptor
+        self._registry_index = registry_index
+        self._import_aids = import_aids
+
+        self.branch_targets: set[int] = set()
+        pc = 0
+        while pc < len(self.bytecode):
+            insn = self._decode(pc)
+            self.branch_targets.update(insn.targets)
+            pc += insn.size
+        self.sorted_targets = sorted(self.branch_targets)
+
+    def at(self, pc: int) -> _Instruction:
+        """Instruction at pc (decoded on demand if off the linear sweep)."""
+        insn = self.instructions.get(pc)
+        return insn if insn is not None else self._decode(pc)
+
+    def effect(self, insn: _Instruction) -> TypeEffect:
+        """Type effect of an instruction."""
+        effect = self._effects.get(insn.pc)
+        if effect is None:
+            effect = get_opcode_type_effects(
+                insn.opcode, insn.operands, self._constant_pool, self._descriptor,
+                registry_index=self._registry_index, import_aids=self._import_aids,
+            )
+            self._effects[insn.pc] = effect
+        return effect
+
+    def next_target(self, pc: int) -> int | None:
+        """First branch target at or after pc."""
+        i = bisect_left(self.sorted_targets, pc)
+        return self.sorted_targets[i] if i < len(self.sorted_targets) else None
+
+    def _decode(self, pc: int) -> _Instruction:
+        opcode = self.bytecode[pc]
+        info = get_opcode(opcode)
+        if info is None:
+            insn = _Instruction(pc, opcode, None, 1, [], [])
+        else:
+            operands = _decode_operands(opcode, self.bytecode, pc)
+            insn = _Instruction(
+                pc=pc,
+                opcode=opcode,
+                info=info,
+                size=get_opcode_size(opcode, self.bytecode, pc),
+                operands=operands,
+                targets=_get_branch_targets(opcode, operands, pc, self.bytecode),
+            )
+        self.instructions[pc] = insn
+        return insn
+
+
 # =============================================================================
 # Main Verification
 # =============================================================================
@@ -870,7 +979,7 @@ def verify_method(
     jca_map: "JCAMap | None" = None,
     trace_depth: int = 20,
     strict: bool = False,
-    registry_index: dict | None = None,
+    registry_index: RegistryIndex | None = None,
     import_aids: list[str] | None = None,
 ) -> VerifyResult:
     """Verify a single method's bytecode.
@@ -878,6 +987,11 @@ def verify_method(
     Uses abstract interpretation to track stack/register types.
     Iterates until register types stabilize.
 
+    Sun-style verification runs as a worklist over basic blocks that only
+    revisits blocks whose entry state changed. If that finds anything to
+    report, the method is re-run as linear passes over the whole bytecode,
+    which is what produces errors and traces.
+
     Args:
         method: Method to verify
         constant_pool: For resolving CP references
@@ -910,9 +1024,161 @@ def verify_method(
         result.warnings.append(param_warning)
     initial_regs = state.regs.copy()
 
-    # Find branch targets
-    disasm = disassemble_method(method, constant_pool)
-    branch_targets = disasm.branch_targets
+    code = _MethodCode(method, constant_pool, descriptor, registry_index, import_aids)
+
+    if not strict and _verify_blocks(code, method, initial_regs):
+        return result
+
+    _verify_linear(code, method, state, initial_regs, result, jca_map, strict)
+    return result
+
+
+def _verify_blocks(code: _MethodCode, method: MethodInfo, initial_regs: list[VType]) -> bool:
+    """Sun-style verification as a worklist over basic blocks.
+
+    Blocks start at pc 0 and at each branch target, except that a return
+    at a branch target is executed in place and never merged into (as in
+    the linear passes). Each block's entry state is kept, and a block is
+    only executed again when that state changes.
+
+    Blocks are processed in pc order in rounds that mirror the linear
+    passes: a change to a later block is handled in the same round, a
+    change to an earlier block (a back edge) in the next. A block is
+    therefore executed with exactly the states the linear passes would
+    use, minus the repeats that cannot change anything.
+
+    Returns:
+        True if the method verifies with nothing to report. False as soon
+        as anything would be reported (error, warning or unverifiable
+        instruction), or if a branch target falls inside an instruction;
+        the caller then runs the linear passes to build the report.
+    """
+    bytecode = code.bytecode
+    if any(0 <= t < len(bytecode) and t not in code.instructions for t in code.branch_targets):
+        return False
+
+    leaders = {
+        t for t in code.branch_targets
+        if 0 <= t < len(bytecode) and code.at(t).mnemonic not in _RETURN_MNEMONICS
+    }
+    starts = sorted(leaders | {0})
+    block_end = dict(zip(starts, starts[1:] + [len(bytecode)]))
+
+    # Entry state of each block, as (stack types, register types).
+    # Block 0 starts from the initial state; if it is also a branch target,
+    # that state is merged with what the branches bring.
+    entry_states: dict[int, tuple[list[VType], list[VType]]] = {}
+    if 0 in leaders:
+        entry_states[0] = ([], initial_regs.copy())
+
+    # Scratch result: anything recorded here means a report is needed
+    scratch = VerifyResult(success=True, method_index=method.index, method_offset=method.offset)
+    state = VerifierState.create(len(initial_regs), max_trace=0)
+
+    # The first round visits every block, as the first linear pass does
+    pending = set(starts)
+
+    for _ in range(_MAX_VERIFY_ITERATIONS):
+        if not pending:
+            return True
+
+        queue = sorted(pending)
+        queued = set(queue)
+        next_pending: set[int] = set()
+
+        while queue:
+            start = heappop(queue)
+            queued.discard(start)
+            end = block_end[start]
+
+            live = True
+            if start in entry_states:
+                stack, regs = entry_states[start]
+                state.stack = [StackValue(t, start, None) for t in stack]
+                state.regs = regs.copy()
+                pc: int | None = start
+            elif start == 0:
+                state.stack = []
+                state.regs = initial_regs.copy()
+                pc = 0
+            else:
+                # Reached only from dead code: skip ahead, executing any
+                # returns at branch targets on the way (with an empty stack)
+                state.stack = []
+                live = False
+                pc = code.next_target(start + 1)
+
+            while pc is not None and pc < end:
+                insn = code.at(pc)
+                if insn.info is None:
+                    return False
+                if _execute(insn, code.effect(insn), state, method, scratch, None):
+                    return False
+                if scratch.warnings:
+                    return False
+
+                for target in _record_branch_states(insn, state, entry_states):
+                    if target not in block_end:
+                        continue
+                    if target > start:
+                        if target not in queued:
+                            heappush(queue, target)
+                            queued.add(target)
+                    else:
+                        next_pending.add(target)
+
+                if insn.mnemonic in _UNCONDITIONAL_MNEMONICS:
+                    state.stack = []
+                    live = False
+                    pc = code.next_target(pc + insn.size)
+                else:
+                    live = True
+                    pc += insn.size
+
+            # Fall through into the next block
+            if live and end < len(bytecode):
+                current_stack = state.get_stack_types()
+                if end in entry_states:
+                    old_stack, old_regs = entry_states[end]
+                    if len(current_stack) != len(old_stack):
+                        return False
+                    new_stack = [lub(a, b) for a, b in zip(current_stack, old_stack)]
+                    new_regs = [lub(a, b) for a, b in zip(state.regs, old_regs)]
+                    if new_stack == old_stack and new_regs == old_regs:
+                        continue
+                    entry_states[end] = (new_stack, new_regs)
+                else:
+                    entry_states[end] = (current_stack, state.regs.copy())
+                if end not in queued:
+                    heappush(queue, end)
+                    queued.add(end)
+
+        pending = next_pending
+
+    # Loop exhausted without stabilizing - this is a bug in the verifier
+    raise AssertionError(
+        f"Type analysis failed to converge after {_MAX_VERIFY_ITERATIONS} iterations "
+        f"for method at offset {method.offset}. This indicates a bug in the verifier."
+    )
+
+
+def _verify_linear(
+    code: _MethodCode,
+    method: MethodInfo,
+    state: VerifierState,
+    initial_regs: list[VType],
+    result: VerifyResult,
+    jca_map: "JCAMap | None",
+    strict: bool,
+) -> None:
+    """Verify with linear passes over the whole bytecode.
+
+    Each pass walks the bytecode from pc 0, merging with the states
+    recorded at branch targets, until a pass changes nothing. Errors and
+    traces come from this walk, so they follow bytecode order.
+    """
+    bytecode = code.bytecode
+    branch_targets = code.branch_targets
 
     # Sun-style: dictionary of (stack_types, reg_types) at each branch target
     branch_states: dict[int, tuple[list[VType], list[VType]]] = {}
@@ -924,37 +1190,33 @@ def verify_method(
         state.regs = initial_regs.copy()
         state.trace.clear()
 
-        pc = 0
-        bytecode = method.bytecode
+        pc: int | None = 0
         in_dead_code = False  # True after goto/return/athrow until we reach a branch target
 
-        while pc < len(bytecode):
-            opcode = bytecode[pc]
-            info = get_opcode(opcode)
+        while pc is not None and pc < len(bytecode):
+            insn = code.at(pc)
 
-            if info is None:
+            if insn.info is None:
                 result.errors.append(_make_error(
-                    pc, f"Unknown opcode 0x{opcode:02X}",
-                    f"<0x{opcode:02X}>", [], state.get_stack_types(), state, jca_map
+                    pc, f"Unknown opcode 0x{insn.opcode:02X}",
+                    insn.mnemonic, [], state.get_stack_types(), state, jca_map
                 ))
                 result.success = False
-                return result
+                return
 
-            size = get_opcode_size(opcode, bytecode, pc)
-            operands = _decode_operands(opcode, bytecode, pc)
+            mnemonic = insn.info.mnemonic
 
             # Handle branch targets
-            is_return = info.mnemonic in ("return", "sreturn", "ireturn", "areturn")
-            if pc in branch_targets and not is_return:
+            if pc in branch_targets and mnemonic not in _RETURN_MNEMONICS:
                 if strict:
                     # Leroy R1: Branch targets must have empty stack
                     if state.stack:
                         result.errors.append(_make_error(
                             pc, "Non-empty stack at branch target (strict mode)",
-                            info.mnemonic, [], state.get_stack_types(), state, jca_map
+                            mnemonic, [], state.get_stack_types(), state, jca_map
                         ))
                         result.success = False
-                        return result
+                        return
                 else:
                     # Sun-style: use recorded states at branch targets
                     current_stack = state.get_stack_types()
@@ -974,10 +1236,10 @@ def verify_method(
                             result.errors.append(_make_error(
                                 pc, f"Stack height mismatch at branch target: "
                                     f"was {len(old_stack)}, now {len(current_stack)}",
-                                info.mnemonic, old_stack, current_stack, state, jca_map
+                                mnemonic, old_stack, current_stack, state, jca_map
                             ))
                             result.success = False
-                            return result
+                            return
                         else:
                             # Merge stack types with LUB
                             new_stack = [lub(a, b) for a, b in zip(current_stack, old_stack)]
@@ -989,18 +1251,15 @@ def verify_method(
                                 branch_states[pc] = (new_stack, new_regs)
                                 changed = True
 
-                            # Use merged state going forward
+                            # Use merged state going forward. Copy the registers:
+                            # later stores must not leak into the recorded entry state.
                             state.stack = [StackValue(t, pc, None) for t in new_stack]
-                            state.regs = new_regs
+                            state.regs = new_regs.copy()
                     else:
                         if in_dead_code:
                             # No real state yet — skip to next branch target.
                             # Back-edges will deposit real state and set changed=True.
-                            next_targets = [t for t in sorted(branch_targets) if t > pc]
-                            if next_targets:
-                                pc = next_targets[0]
-                            else:
-                                break
+                            pc = code.next_target(pc + 1)
                             continue
                         # First time reaching from live code
                         branch_states[pc] = (current_stack, current_regs)
@@ -1009,319 +1268,340 @@ def verify_method(
                     # We've processed the branch target, no longer in dead code
                     in_dead_code = False
 
-            # Get type effects for this instruction
-            effect = get_opcode_type_effects(
-                opcode, operands, constant_pool, descriptor,
-                registry_index=registry_index, import_aids=import_aids,
-            )
+            if _execute(insn, code.effect(insn), state, method, result, jca_map):
+                return
 
-            # Handle special stack operations
-            if effect.kind == OpcodeKind.SKIP:
-                result.warnings.append(f"Cannot fully verify: {effect.skip_reason}")
-                return result
+            # Record stack state at branch targets
+            # This is critical: when a branch is taken, execution continues
+            # at the target with the current (post-instruction) stack state
+            if _record_branch_states(insn, state, branch_states):
+                changed = True
 
-            if effect.kind == OpcodeKind.DUP:
-                if not state.stack:
-                    result.errors.append(_make_error(
-                        pc, "Stack underflow for dup",
-                        info.mnemonic, [VType.SHORT], [], state, jca_map
-                    ))
-                    result.success = False
-                    return result
-                stack_before = state.get_stack_types().copy()
-                state.stack.append(StackValue(state.stack[-1].vtype, pc, None))
-                if len(state.stack) > method.max_stack:
-                    result.errors.append(_make_error(
-                        pc, f"Stack overflow: {len(state.stack)} > max_stack {method.max_stack}",
-                        info.mnemonic, [], state.get_stack_types(), state, jca_map
-                    ))
-                    result.success = False
-                    return result
-                state.trace.append(TraceEntry(pc, info.mnemonic, stack_before, state.get_stack_types()))
-                pc += size
-                continue
+            # After unconditional control flow (return, goto, athrow),
+            # code doesn't continue linearly - skip to next branch target
+            if mnemonic in _UNCONDITIONAL_MNEMONICS:
+                state.stack = []
+                in_dead_code = True  # Mark that we're skipping, not following real control flow
+                pc = code.next_target(pc + insn.size)
+            else:
+                pc += insn.size
 
-            if effect.kind == OpcodeKind.DUP2:
-                if len(state.stack) < 2:
-                    result.errors.append(_make_error(
-                        pc, "Stack underflow for dup2",
-                        info.mnemonic, [VType.SHORT, VType.SHORT], state.get_stack_types(), state, jca_map
-                    ))
-                    result.success = False
-                    return result
-                stack_before = state.get_stack_types().copy()
-                state.stack.append(StackValue(state.stack[-2].vtype, pc, None))
-                state.stack.append(StackValue(state.stack[-2].vtype, pc, None))
-                if len(state.stack) > method.max_stack:
-                    result.errors.append(_make_error(
-                        pc, f"Stack overflow: {len(state.stack)} > max_stack {method.max_stack}",
-                        info.mnemonic, [], state.get_stack_types(), state, jca_map
-                    ))
-                    result.success = False
-                    return result
-                state.trace.append(TraceEntry(pc, info.mnemonic, stack_before, state.get_stack_types()))
-                pc += size
-                continue
+        # Check if we've stabilized
+        if not changed:
+            break
+    else:
+        # Loop exhausted without stabilizing - this is a bug in the verifier
+        raise AssertionError(
+            f"Type analysis failed to converge after {_MAX_VERIFY_ITERATIONS} iterations "
+            f"for method at offset {method.offset}. This indicates a bug in the verifier."
+        )
 
-            if effect.kind == OpcodeKind.POP:
-                if not state.stack:
-                    result.errors.append(_make_error(
-                        pc, "Stack underflow for pop",
-                        info.mnemonic, [VType.SHORT], [], state, jca_map
-                    ))
-                    result.success = False
-                    return result
-                stack_before = state.get_stack_types().copy()
-                state.stack.pop()
-                state.trace.append(TraceEntry(pc, info.mnemonic, stack_before, state.get_stack_types()))
-                pc += size
-                continue
 
-            if effect.kind == OpcodeKind.POP2:
-                if len(state.stack) < 2:
-                    result.errors.append(_make_error(
-                        pc, "Stack underflow for pop2",
-                        info.mnemonic, [VType.SHORT, VType.SHORT], state.get_stack_types(), state, jca_map
-                    ))
-                    result.success = False
-                    return result
-                stack_before = state.get_stack_types().copy()
-                state.stack.pop()
-                state.stack.pop()
-                state.trace.append(TraceEntry(pc, info.mnemonic, stack_before, state.get_stack_types()))
-                pc += size
-                continue
+def _record_branch_states(
+    insn: _Instruction,
+    state: VerifierState,
+    branch_states: dict[int, tuple[list[VType], list[VType]]],
+) -> list[int]:
+    """Merge the post-instruction state into the states at branch targets.
 
-            if effect.kind == OpcodeKind.DUP_X:
-                m, n = effect.m, effect.n
-                stack_before = state.get_stack_types().copy()
-                if len(state.stack) < m + n:
-                    # Oracle's verifier doesn't fail on this - may be dead code
-                    result.warnings.append(
-                        f"PC {pc}: dup_x {m},{n} needs {m + n} stack slots, have {len(state.stack)} (may be dead code)"
-                    )
-                    while len(state.stack) < m + n:
-                        state.stack.insert(0, StackValue(VType.BOT, pc, None))
-                items = [state.stack.pop() for _ in range(m + n)]
-                items.reverse()
-                top_m = items[-m:] if m > 0 else []
-                for item in items:
-                    state.stack.append(StackValue(item.vtype, pc, None))
-                for item in top_m:
-                    state.stack.append(StackValue(item.vtype, pc, None))
-                if len(state.stack) > method.max_stack:
-                    result.errors.append(_make_error(
-                        pc, f"Stack overflow: {len(state.stack)} > max_stack {method.max_stack}",
-                        info.mnemonic, [], state.get_stack_types(), state, jca_map
-                    ))
-                    result.success = False
-                    return result
-                state.trace.append(TraceEntry(pc, info.mnemonic, stack_before, state.get_stack_types()))
-                pc += size
-                continue
+    Returns:
+        Targets whose recorded state changed.
+    """
+    if not insn.targets:
+        return []
 
-            if effect.kind == OpcodeKind.SWAP_X:
-                m, n = effect.m, effect.n
-                stack_before = state.get_stack_types().copy()
-                if len(state.stack) < m + n:
-                    result.warnings.append(
-                        f"PC {pc}: swap_x {m},{n} needs {m + n} stack slots, have {len(state.stack)} (may be dead code)"
-                    )
-                    while len(state.stack) < m + n:
-                        state.stack.insert(0, StackValue(VType.BOT, pc, None))
-                items = [state.stack.pop() for _ in range(m + n)]
-                items.reverse()
-                next_n = items[:n]
-                top_m = items[n:]
-                for item in top_m:
-                    state.stack.append(StackValue(item.vtype, pc, None))
-                for item in next_n:
-                    state.stack.append(StackValue(item.vtype, pc, None))
-                state.trace.append(TraceEntry(pc, info.mnemonic, stack_before, state.get_stack_types()))
-                pc += size
-                continue
+    changed: list[int] = []
+    current_stack = state.get_stack_types()
+    current_regs = state.regs.copy()
+
+    for target in insn.targets:
+        if target in branch_states:
+            old_stack, old_regs = branch_states[target]
+            # Merge with existing state using LUB
+            if len(current_stack) == len(old_stack):
+                new_stack = [lub(a, b) for a, b in zip(current_stack, old_stack)]
+                new_regs = [lub(a, b) for a, b in zip(current_regs, old_regs)]
+                if new_stack != old_stack or new_regs != old_regs:
+                    branch_states[target] = (new_stack, new_regs)
+                    changed.append(target)
+            # Stack height mismatch will be caught when we reach the target
+        else:
+            branch_states[target] = (current_stack, current_regs)
+            changed.append(target)
 
-            # Normal instruction - use expected/outputs from effect
-            expected = effect.expected
-            outputs = effect.outputs
+    return changed
 
-            # Check stack has enough values
-            if len(state.stack) < len(expected):
-                result.errors.append(_make_error(
-                    pc, f"Stack underflow: need {len(expected)}, have {len(state.stack)}",
-                    info.mnemonic, expected, state.get_stack_types(), state, jca_map
-                ))
-                result.success = False
-                return result
 
-            # Check operand types
-            stack_types = state.get_stack_types()
-            for i, exp_type in enumerate(expected):
-                actual_idx = len(stack_types) - len(expected) + i
-                actual_type = stack_types[actual_idx]
+def _execute(
+    insn: _Instruction,
+    effect: TypeEffect,
+    state: VerifierState,
+    method: MethodInfo,
+    result: VerifyResult,
+    jca_map: "JCAMap | None",
+) -> bool:
+    """Check an instruction against the state and apply its type effect.
 
-                if not _types_compatible(exp_type, actual_type):
-                    result.errors.append(_make_error(
-                        pc, f"Type mismatch at stack position {i}",
-                        info.mnemonic, expected, stack_types[-len(expected):], state, jca_map
-                    ))
-                    result.success = False
-                    return result
-
-            # Record trace before execution
-            stack_before = state.get_stack_types().copy()
-
-            # Execute instruction abstractly
-            # Pop inputs
-            for _ in range(len(expected)):
-                state.stack.pop()
-
-            # Push outputs
-            for out_type in outputs:
-                state.stack.append(StackValue(out_type, pc, None))
-
-            # Handle store instructions - update register types
-            if info.mnemonic.startswith(("sstore", "istore", "astore")):
-                slot = _get_store_slot(info.mnemonic, operands)
-                if slot is not None and slot < len(state.regs):
-                    # Determine stored type - stores overwrite, not LUB
-                    if info.mnemonic.startswith("sstore"):
-                        state.regs[slot] = VType.SHORT
-                    elif info.mnemonic.startswith("istore"):
-                        state.regs[slot] = VType.INT_LO
-                        if slot + 1 < len(state.regs):
-                            state.regs[slot + 1] = VType.INT_HI
-                    else:
-                        state.regs[slot] = VType.REF
+    Returns:
+        True if verification must stop: an error was recorded in result, or
+        the instruction cannot be verified (recorded as a warning).
+    """
+    pc = insn.pc
+    mnemonic = insn.mnemonic
+    operands = insn.operands
 
-            # Handle load instructions - check register types
-            if info.mnemonic.startswith(("sload", "iload", "aload")):
-                slot = _get_store_slot(info.mnemonic, operands)
-                if slot is not None and slot < len(state.regs):
-                    reg_type = state.regs[slot]
-                    expected_type = _get_load_expected_type(info.mnemonic)
+    # Handle special stack operations
+    if effect.kind == OpcodeKind.SKIP:
+        result.warnings.append(f"Cannot fully verify: {effect.skip_reason}")
+        return True
 
-                    if reg_type == VType.BOT:
-                        # Oracle treats loading from uninitialized locals as an error
-                        result.errors.append(_make_error(
-                            pc, f"Loading from uninitialized register r{slot}",
-                            info.mnemonic, [expected_type], [VType.BOT], state, jca_map
-                        ))
-                        result.success = False
-                        return result
-                    elif reg_type == VType.TOP:
-                        result.errors.append(_make_error(
-                            pc, f"Loading from register r{slot} with conflicting types",
-                            info.mnemonic, [expected_type], [reg_type], state, jca_map
-                        ))
-                        result.success = False
-                        return result
+    if effect.kind == OpcodeKind.DUP:
+        if not state.stack:
+            result.errors.append(_make_error(
+                pc, "Stack underflow for dup",
+                mnemonic, [VType.SHORT], [], state, jca_map
+            ))
+            result.success = False
+            return True
+        stack_before = state.get_stack_types().copy()
+        state.stack.append(StackValue(state.stack[-1].vtype, pc, None))
+        if len(state.stack) > method.max_stack:
+            result.errors.append(_make_error(
+                pc, f"Stack overflow: {len(state.stack)} > max_stack {method.max_stack}",
+                mnemonic, [], state.get_stack_types(), state, jca_map
+            ))
+            result.success = False
+            return True
+        state.trace.append(TraceEntry(pc, mnemonic, stack_before, state.get_stack_types()))
+        return False
 
-                    # iload: strict check — r[slot] must be INT_LO, r[slot+1] must be INT_HI
-                    if info.mnemonic.startswith("iload"):
-                        hi_slot = slot + 1
-                        hi_type = state.regs[hi_slot] if hi_slot < len(state.regs) else VType.BOT
-                        if reg_type != VType.INT_LO or hi_type != VType.INT_HI:
-                            result.errors.append(_make_error(
-                                pc, f"ILOAD({slot}): int expected (r{slot}={reg_type.name}, r{hi_slot}={hi_type.name})",
-                                info.mnemonic, [VType.INT_LO, VType.INT_HI],
-                                [reg_type, hi_type], state, jca_map
-                            ))
-                            result.success = False
-                            return result
-                    # sload: strict check — r[slot] must be SHORT, not INT_LO
-                    elif info.mnemonic.startswith("sload"):
-                        if reg_type == VType.INT_LO:
-                            result.errors.append(_make_error(
-                                pc, f"SLOAD({slot}): short expected (r{slot}={reg_type.name})",
-                                info.mnemonic, [VType.SHORT], [reg_type], state, jca_map
-                            ))
-                            result.success = False
-                            return result
-                        elif not _types_compatible(expected_type, reg_type):
-                            result.errors.append(_make_error(
-                                pc, f"Register r{slot} type mismatch",
-                                info.mnemonic, [expected_type], [reg_type], state, jca_map
-                            ))
-                            result.success = False
-                            return result
-                    elif not _types_compatible(expected_type, reg_type):
-                        result.errors.append(_make_error(
-                            pc, f"Register r{slot} type mismatch",
-                            info.mnemonic, [expected_type], [reg_type], state, jca_map
-                        ))
-                        result.success = False
-                        return result
+    if effect.kind == OpcodeKind.DUP2:
+        if len(state.stack) < 2:
+            result.errors.append(_make_error(
+                pc, "Stack underflow for dup2",
+                mnemonic, [VType.SHORT, VType.SHORT], state.get_stack_types(), state, jca_map
+            ))
+            result.success = False
+            return True
+        stack_before = state.get_stack_types().copy()
+        state.stack.append(StackValue(state.stack[-2].vtype, pc, None))
+        state.stack.append(StackValue(state.stack[-2].vtype, pc, None))
+        if len(state.stack) > method.max_stack:
+            result.errors.append(_make_error(
+                pc, f"Stack overflow: {len(state.stack)} > max_stack {method.max_stack}",
+                mnemonic, [], state.get_stack_types(), state, jca_map
+            ))
+            result.success = False
+            return True
+        state.trace.append(TraceEntry(pc, mnemonic, stack_before, state.get_stack_types()))
+        return False
 
-            # Check stack overflow
-            if len(state.stack) > method.max_stack:
-                result.errors.append(_make_error(
-                    pc, f"Stack overflow: {len(state.stack)} > max_stack {method.max_stack}",
-                    info.mnemonic, [], state.get_stack_types(), state, jca_map
-                ))
-                result.success = False
-                return result
+    if effect.kind == OpcodeKind.POP:
+        if not state.stack:
+            result.errors.append(_make_error(
+                pc, "Stack underflow for pop",
+                mnemonic, [VType.SHORT], [], state, jca_map
+            ))
+            result.success = False
+            return True
+        stack_before = state.get_stack_types().copy()
+        state.stack.pop()
+        state.trace.append(TraceEntry(pc, mnemonic, stack_before, state.get_stack_types()))
+        return False
 
-            # Record stack state at branch targets
-            # This is critical: when a branch is taken, execution continues
-            # at the target with the current (post-instruction) stack state
-            if is_branch_opcode(opcode):
-                targets = _get_branch_targets(opcode, operands, pc, bytecode)
-                current_stack = state.get_stack_types()
-                current_regs = state.regs.copy()
+    if effect.kind == OpcodeKind.POP2:
+        if len(state.stack) < 2:
+            result.errors.append(_make_error(
+                pc, "Stack underflow for pop2",
+                mnemonic, [VType.SHORT, VType.SHORT], state.get_stack_types(), state, jca_map
+            ))
+            result.success = False
+            return True
+        stack_before = state.get_stack_types().copy()
+        state.stack.pop()
+        state.stack.pop()
+        state.trace.append(TraceEntry(pc, mnemonic, stack_before, state.get_stack_types()))
+        return False
 
-                for target in targets:
-                    if target in branch_states:
-                        old_stack, old_regs = branch_states[target]
-                        # Merge with existing state using LUB
-                        if len(current_stack) == len(old_stack):
-                            new_stack = [lub(a, b) for a, b in zip(current_stack, old_stack)]
-                            new_regs = [lub(a, b) for a, b in zip(current_regs, old_regs)]
-                            if new_stack != old_stack or new_regs != old_regs:
-                                branch_states[target] = (new_stack, new_regs)
-                                changed = True
-                        # Stack height mismatch will be caught when we reach the target
-                    else:
-                        branch_states[target] = (current_stack, current_regs)
-                        changed = True
+    if effect.kind == OpcodeKind.DUP_X:
+        m, n = effect.m, effect.n
+        stack_before = state.get_stack_types().copy()
+        if len(state.stack) < m + n:
+            # Oracle's verifier doesn't fail on this - may be dead code
+            result.warnings.append(
+                f"PC {pc}: dup_x {m},{n} needs {m + n} stack slots, have {len(state.stack)} (may be dead code)"
+            )
+            while len(state.stack) < m + n:
+                state.stack.insert(0, StackValue(VType.BOT, pc, None))
+        items = [state.stack.pop() for _ in range(m + n)]
+        items.reverse()
+        top_m = items[-m:] if m > 0 else []
+        for item in items:
+            state.stack.append(StackValue(item.vtype, pc, None))
+        for item in top_m:
+            state.stack.append(StackValue(item.vtype, pc, None))
+        if len(state.stack) > method.max_stack:
+            result.errors.append(_make_error(
+                pc, f"Stack overflow: {len(state.stack)} > max_stack {method.max_stack}",
+                mnemonic, [], state.get_stack_types(), state, jca_map
+            ))
+            result.success = False
+            return True
+        state.trace.append(TraceEntry(pc, mnemonic, stack_before, state.get_stack_types()))
+        return False
 
-            # Record trace (only if stack changed)
-            stack_after = state.get_stack_types().copy()
-            if stack_before != stack_after:
-                state.trace.append(TraceEntry(
-                    pc=pc,
-                    instruction=info.mnemonic,
-                    stack_before=stack_before,
-                    stack_after=stack_after,
-                ))
+    if effect.kind == OpcodeKind.SWAP_X:
+        m, n = effect.m, effect.n
+        stack_before = state.get_stack_types().copy()
+        if len(state.stack) < m + n:
+            result.warnings.append(
+                f"PC {pc}: swap_x {m},{n} needs {m + n} stack slots, have {len(state.stack)} (may be dead code)"
+            )
+            while len(state.stack) < m + n:
+                state.stack.insert(0, StackValue(VType.BOT, pc, None))
+        items = [state.stack.pop() for _ in range(m + n)]
+        items.reverse()
+        next_n = items[:n]
+        top_m = items[n:]
+        for item in top_m:
+            state.stack.append(StackValue(item.vtype, pc, None))
+        for item in next_n:
+            state.stack.append(StackValue(item.vtype, pc, None))
+        state.trace.append(TraceEntry(pc, mnemonic, stack_before, state.get_stack_types()))
+        return False
 
-            # After unconditional control flow (return, goto, athrow),
-            # code doesn't continue linearly - skip to next branch target
-            if info.mnemonic in ("return", "sreturn", "ireturn", "areturn",
-                                 "goto", "goto_w", "athrow"):
-                state.stack = []
-                in_dead_code = True  # Mark that we're skipping, not following real control flow
-                # Find next branch target after current PC
-                pc += size
-                next_targets = [t for t in sorted(branch_targets) if t >= pc]
-                if next_targets:
-                    pc = next_targets[0]
-                else:
-                    break  # No more branch targets, end this pass
+    # Normal instruction - use expected/outputs from effect
+    expected = effect.expected
+    outputs = effect.outputs
+
+    # Check stack has enough values
+    if len(state.stack) < len(expected):
+        result.errors.append(_make_error(
+            pc, f"Stack underflow: need {len(expected)}, have {len(state.stack)}",
+            mnemonic, expected, state.get_stack_types(), state, jca_map
+        ))
+        result.success = False
+        return True
+
+    # Check operand types
+    stack_types = state.get_stack_types()
+    for i, exp_type in enumerate(expected):
+        actual_idx = len(stack_types) - len(expected) + i
+        actual_type = stack_types[actual_idx]
+
+        if not _types_compatible(exp_type, actual_type):
+            result.errors.append(_make_error(
+                pc, f"Type mismatch at stack position {i}",
+                mnemonic, expected, stack_types[-len(expected):], state, jca_map
+            ))
+            result.success = False
+            return True
+
+    # Record trace before execution
+    stack_before = state.get_stack_types().copy()
+
+    # Execute instruction abstractly
+    # Pop inputs
+    for _ in range(len(expected)):
+        state.stack.pop()
+
+    # Push outputs
+    for out_type in outputs:
+        state.stack.append(StackValue(out_type, pc, None))
+
+    # Handle store instructions - update register types
+    if mnemonic.startswith(("sstore", "istore", "astore")):
+        slot = _get_store_slot(mnemonic, operands)
+        if slot is not None and slot < len(state.regs):
+            # Determine stored type - stores overwrite, not LUB
+            if mnemonic.startswith("sstore"):
+                state.regs[slot] = VType.SHORT
+            elif mnemonic.startswith("istore"):
+                state.regs[slot] = VType.INT_LO
+                if slot + 1 < len(state.regs):
+                    state.regs[slot + 1] = VType.INT_HI
             else:
-                pc += size
+                state.regs[slot] = VType.REF
 
-        # Check if we've stabilized
-        if not changed:
-            break
-    else:
-        # Loop exhausted without stabilizing - this is a bug in the verifier
-        raise AssertionError(
-            f"Type analysis failed to converge after {_MAX_VERIFY_ITERATIONS} iterations "
-            f"for method at offset {method.offset}. This indicates a bug in the verifier."
-        )
+    # Handle load instructions - check register types
+    if mnemonic.startswith(("sload", "iload", "aload")):
+        slot = _get_store_slot(mnemonic, operands)
+        if slot is not None and slot < len(state.regs):
+            reg_type = state.regs[slot]
+            expected_type = _get_load_expected_type(mnemonic)
 
-    return result
+            if reg_type == VType.BOT:
+                # Oracle treats loading from uninitialized locals as an error
+                result.errors.append(_make_error(
+                    pc, f"Loading from uninitialized register r{slot}",
+                    mnemonic, [expected_type], [VType.BOT], state, jca_map
+                ))
+                result.success = False
+                return True
+            elif reg_type == VType.TOP:
+                result.errors.append(_make_error(
+                    pc, f"Loading from register r{slot} with conflicting types",
+                    mnemonic, [expected_type], [reg_type], state, jca_map
+                ))
+                result.success = False
+                return True
+
+            # iload: strict check — r[slot] must be INT_LO, r[slot+1] must be INT_HI
+            if mnemonic.startswith("iload"):
+                hi_slot = slot + 1
+                hi_type = state.regs[hi_slot] if hi_slot < len(state.regs) else VType.BOT
+                if reg_type != VType.INT_LO or hi_type != VType.INT_HI:
+                    result.errors.append(_make_error(
+                        pc, f"ILOAD({slot}): int expected (r{slot}={reg_type.name}, r{hi_slot}={hi_type.name})",
+                        mnemonic, [VType.INT_LO, VType.INT_HI],
+                        [reg_type, hi_type], state, jca_map
+                    ))
+                    result.success = False
+                    return True
+            # sload: strict check — r[slot] must be SHORT, not INT_LO
+            elif mnemonic.startswith("sload"):
+                if reg_type == VType.INT_LO:
+                    result.errors.append(_make_error(
+                        pc, f"SLOAD({slot}): short expected (r{slot}={reg_type.name})",
+                        mnemonic, [VType.SHORT], [reg_type], state, jca_map
+                    ))
+                    result.success = False
+                    return True
+                elif not _types_compatible(expected_type, reg_type):
+                    result.errors.append(_make_error(
+                        pc, f"Register r{slot} type mismatch",
+                        mnemonic, [expected_type], [reg_type], state, jca_map
+                    ))
+                    result.success = False
+                    return True
+            elif not _types_compatible(expected_type, reg_type):
+                result.errors.append(_make_error(
+                    pc, f"Register r{slot} type mismatch",
+                    mnemonic, [expected_type], [reg_type], state, jca_map
+                ))
+                result.success = False
+                return True
+
+    # Check stack overflow
+    if len(state.stack) > method.max_stack:
+        result.errors.append(_make_error(
+            pc, f"Stack overflow: {len(state.stack)} > max_stack {method.max_stack}",
+            mnemonic, [], state.get_stack_types(), state, jca_map
+        ))
+        result.success = False
+        return True
+
+    # Record trace (only if stack changed)
+    stack_after = state.get_stack_types().copy()
+    if stack_before != stack_after:
+        state.trace.append(TraceEntry(
+            pc=pc,
+            instruction=mnemonic,
+            stack_before=stack_before,
+            stack_after=stack_after,
+        ))
+
+    return False
 
 
 def _set_param_types(
@@ -1535,6 +1815,7 @@ def verify_cap(
     jca_map: "JCAMap | None" = None,
     trace_depth: int = 20,
     strict: bool = False,
+    workers: int = 1,
 ) -> list[VerifyResult]:
     """Verify all methods in a CAP file.
 
@@ -1543,27 +1824,34 @@ def verify_cap(
         jca_map: Optional JCA mapping for source correlation
         trace_depth: Number of recent instructions in trace
         strict: If True, use Leroy's strict R1/R2 rules
+        workers: Number of processes to verify methods in. 1 verifies
+                 in this process; 0 uses one process per CPU.
 
     Returns:
         List of VerifyResult, one per method
     """
-    results = []
-
     if not cap.method:
-        return results
-
-    for method in cap.method.methods:
-        result = verify_method(
-            method,
-            cap.constant_pool,
-            cap.descriptor,
-            jca_map,
-            trace_depth,
-            strict,
-        )
-        results.append(result)
+        return []
+
+    methods = cap.method.methods
+    verify = partial(
+        verify_method,
+        constant_pool=cap.constant_pool,
+        descriptor=cap.descriptor,
+        jca_map=jca_map,
+        trace_depth=trace_depth,
+        strict=strict,
+    )
+
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(methods) <= 1:
+        return [verify(method) for method in methods]
 
-    return results
+    # Methods are independent; results come back in method order
+    chunksize = max(1, len(methods) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(verify, methods, chunksize=chunksize))
 
 
 # =============================================================================
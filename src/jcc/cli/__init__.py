@@ -6,6 +6,8 @@ Usage:
     jcc run-setup-toolchain         # interactive toolchain setup
     jcc run-verify CAP              # bytecode verification
     jcc run-sim CAP [CAP ...]       # start simulator, load applets, stream output
+    jcc cache [--clear]             # inspect or clear the API registry cache
+    jcc profile PROJECT             # hot spots of a `profile = true` build
 """
 
 import sys
@@ -41,10 +43,32 @@ def main(
             help="LLVM installation directory",
         ),
     ] = None,
+    incremental: Annotated[
+        bool,
+        cyclopts.Parameter(help="Reuse unchanged artifacts from build/.jcc-cache/"),
+    ] = False,
+    jobs: Annotated[
+        int,
+        cyclopts.Parameter(
+            name=["--jobs", "-j"],
+            help="Processes for per-function analysis and codegen (0 = one per CPU)",
+        ),
+    ] = 1,
+    timings: Annotated[
+        bool,
+        cyclopts.Parameter(help="Print time and peak memory per phase and slowest functions"),
+    ] = False,
+    timings_json: Annotated[
+        Path | None,
+        cyclopts.Parameter(help="Write phase and per-function timings to this JSON file"),
+    ] = None,
 ) -> None:
     """Build a JavaCard applet."""
     from jcc.cli.build import run_build
-    run_build(path, llvm_root=llvm_root)
+    run_build(
+        path, llvm_root=llvm_root, incremental=incremental, jobs=jobs, timings=timings,
+        timings_json=timings_json,
+    )
 
 
 @app.command(name="run-setup")
@@ -96,6 +120,66 @@ def sim_cmd(
     run_sim(list(projects))
 
 
+@app.command(name="cache")
+def cache_cmd(
+    *,
+    clear: Annotated[
+        bool,
+        cyclopts.Parameter(help="Remove all cached entries"),
+    ] = False,
+) -> None:
+    """Inspect or clear the on-disk API registry cache."""
+    from jcc.cli.cache import run_cache
+    run_cache(clear=clear)
+
+
+@app.command(name="profile")
+def profile_cmd(
+    project: Annotated[
+        Path,
+        cyclopts.Parameter(
+            help="Project directory of a loaded profile build",
+            show_default=False,
+        ),
+    ] = Path("."),
+    /,
+    *,
+    frames: Annotated[
+        int,
+        cyclopts.Parameter(help="Frames to run before printing the table"),
+    ] = 30,
+    frame_ins: Annotated[
+        int,
+        cyclopts.Parameter(help="INS of the applet's frame command"),
+    ] = 0x01,
+    card: Annotated[
+        bool,
+        cyclopts.Parameter(help="Use a real card instead of the simulator"),
+    ] = False,
+    top: Annotated[
+        int,
+        cyclopts.Parameter(help="Rows per table"),
+    ] = 20,
+    save: Annotated[
+        Path | None,
+        cyclopts.Parameter(
+            help="Also write the counts here, for [options].block_profile",
+            show_default=False,
+        ),
+    ] = None,
+) -> None:
+    """Run frames on a profile build and print per-function and per-block counts."""
+    from jcc.cli.profile import run_profile
+    run_profile(
+        project,
+        frames=frames,
+        frame_ins=frame_ins,
+        backend="card" if card else None,
+        top=top,
+        save=save,
+    )
+
+
 def run() -> None:
     """Entry point for the CLI."""
     if len(sys.argv) == 1:
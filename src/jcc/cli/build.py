@@ -5,17 +5,32 @@ from pathlib import Path
 
 from jcc.errors import BackendError
 from jcc.pipeline import build_project
+from jcc.timings import BuildTimings
 
 
 def run_build(
     path: Path = Path("."),
     *,
     llvm_root: Path | None = None,
+    incremental: bool = False,
+    jobs: int = 1,
+    timings: bool = False,
+    timings_json: Path | None = None,
 ) -> None:
     """Build a JavaCard applet."""
+    recorder = BuildTimings(trace_memory=True) if timings or timings_json else None
     try:
-        cap_path = build_project(path, llvm_root)
+        cap_path = build_project(
+            path, llvm_root, incremental=incremental, jobs=jobs, timings=recorder,
+        )
         print(f"Built: {cap_path}")
     except BackendError as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
+
+    if recorder is not None:
+        if timings:
+            print("Timings:")
+            print(recorder.report())
+        if timings_json is not None:
+            recorder.write_json(timings_json)
@@ -0,0 +1,22 @@
+"""Cache: inspect or clear the on-disk API registry cache."""
+
+from jcc.api.cache import cache_dir, clear_cache, list_entries
+
+
+def run_cache(*, clear: bool = False) -> None:
+    """List cached API packages, or remove them all."""
+    if clear:
+        removed = clear_cache()
+        print(f"Removed {removed} cache entries from {cache_dir()}")
+        return
+
+    entries = list_entries()
+    print(f"API cache: {cache_dir()}")
+    if not entries:
+        print("  (empty)")
+        return
+    total = 0
+    for entry in entries:
+        total += entry.size
+        print(f"  {entry.package:36s} {entry.size:8d} B  {entry.export_dir}")
+    print(f"{len(entries)} entries, {total} bytes")
@@ -0,0 +1,61 @@
+"""Profile: run frames on a profile build and print its hot spots."""
+
+import sys
+from pathlib import Path
+
+from jcc.driver.apdu import build_apdu
+from jcc.driver.config import load_config
+from jcc.driver.profile import fetch_counters, format_hotspots
+from jcc.driver.session import get_session
+from jcc.output.profile import (
+    ProfileMapError,
+    function_counts,
+    load_profile_map,
+    write_block_counts,
+)
+
+
+def run_profile(
+    project: Path,
+    *,
+    frames: int = 30,
+    frame_ins: int = 0x01,
+    backend: str | None = None,
+    top: int = 20,
+    save: Path | None = None,
+) -> None:
+    """Send frames to a loaded profile build and print the hottest code.
+
+    Counters are read (and reset on the card) after every frame so their
+    16 bits never wrap; the table shows the totals over all frames. With
+    save, the totals are also written as a counts file for block layout.
+    """
+    config = load_config(project)
+    map_path = project / "build" / f"{config.applet_class}.profile.json"
+    try:
+        layout = load_profile_map(map_path)
+    except ProfileMapError as e:
+        print(f"Error: {e} (build with `profile = true` first)", file=sys.stderr)
+        sys.exit(1)
+
+    ne = config.screen.framebuffer_size if config.screen else 0
+    totals = [0] * len(layout.counters)
+    with get_session(config.applet_aid, backend, config.daemon_socket) as session:
+        # Drop whatever ran before the first frame (install, select)
+        fetch_counters(session, layout)
+        for frame in range(frames):
+            _, sw = session.send(build_apdu(frame_ins, data=bytes([0]), ne=ne))
+            if sw != 0x9000:
+                print(f"Error at frame {frame}: SW={sw:04X}", file=sys.stderr)
+                sys.exit(1)
+            for i, n in enumerate(fetch_counters(session, layout)):
+                totals[i] += n
+
+    print(f"Profile of {config.applet_class} over {frames} frames")
+    print()
+    print(format_hotspots(layout, totals, frames, top=top))
+
+    if save is not None:
+        write_block_counts(function_counts(layout, totals), save)
+        print()
+        print(f"Counts saved to {save} (set [options].block_profile to use them)")
@@ -57,6 +57,7 @@ from jcc.codegen.expr import (
     UnreachableStmt,
     UserCallExpr,
 )
+from jcc.ir.facts import FunctionFacts
 from jcc.ir.instructions import (
     BinaryInst,
     BranchInst,
@@ -77,7 +78,6 @@ from jcc.ir.instructions import (
 )
 from jcc.ir.module import Block, Function
 from jcc.ir.types import GlobalName, JCType, SSAName
-from jcc.ir.utils import build_definition_map
 from jcc.ir.values import Const, GlobalRef, InlineGEP, Null, SSARef, Undef, Value
 
 
@@ -146,12 +146,18 @@ def create_build_context(
     offset_phi_info: "OffsetPhiInfo | None" = None,
     scalar_field_lookup: Mapping[tuple[MemArray, int], tuple[int, JCType]] | None = None,
     constructor_cp: Mapping[str, tuple[int, int]] | None = None,
+    facts: FunctionFacts | None = None,
 ) -> BuildContext:
-    """Create a BuildContext for a function."""
+    """Create a BuildContext for a function.
+
+    The def map comes from facts, which is built here if None.
+    """
+    if facts is None:
+        facts = FunctionFacts(func)
     return BuildContext(
         func=func,
         locals=locals,
-        def_map=build_definition_map(func),
+        def_map=facts.def_map,
         allocation=allocation,
         api=api,
         user_functions=user_functions,
@@ -1666,11 +1672,12 @@ def _resolve_offset_phi_pointer(
     if isinstance(info, GlobalInfo):
         mem_array = info.mem_array
     else:
-        # AllocatedStruct - use the first field's memory array
+        # AllocatedStruct - use the memory array of the field the offsets index
         assert isinstance(info, AllocatedStruct)
-        if not info.fields:
-            raise ValueError(f"Empty struct in offset phi: {base_global}")
-        mem_array = info.fields[0].mem_array
+        field = info.field_at_byte_offset(ctx.offset_phi_info.get_field_offset(phi_name))
+        if field is None:
+            raise ValueError(f"No field for offset phi into struct: {base_global}")
+        mem_array = field.mem_array
 
     # Build the array reference and offset expressions
     array_cp = ctx.mem_array_cp.get(mem_array)
@@ -1895,6 +1902,8 @@ def _resolve_gep_on_offset_phi(
 
     # Structs need field-level decomposition for SOA layout
     if isinstance(info, AllocatedStruct):
+        if ctx.offset_phi_info.get_field_offset(phi_name) != 0:
+            raise ValueError(f"GEP on offset phi into a struct field not supported: {gep}")
         return _resolve_phi_struct_gep(gep, info, slot, ctx)
 
     # Simple array: flat arithmetic
@@ -13,12 +13,14 @@ pops/pushes metadata, and max_stack is computed post-emission via CFG
 analysis in stack.py. This correctly handles branching patterns.
 """
 
-from dataclasses import dataclass, field
+from collections.abc import Mapping
+from dataclasses import dataclass, field, replace
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from jcc.output.constant_pool import ConstantPool
 
+from jcc.analysis.cost import CostModel
 from jcc.analysis.globals import AllocationResult, MemArray
 from jcc.analysis.locals import FunctionLocals, Limits
 from jcc.analysis.offset_phi import OffsetPhiInfo
@@ -27,6 +29,16 @@ from jcc.api.types import MethodInfo
 from jcc.codegen import ops
 from jcc.codegen.build import build_block_trees, create_build_context
 from jcc.codegen.stack import compute_max_stack
+from jcc.codegen.layout import layout_blocks
+from jcc.codegen.switch import (
+    CompareChain,
+    LookupLeaf,
+    RangeSplit,
+    SwitchPlan,
+    TableLeaf,
+    cases_of,
+    plan_switch,
+)
 from jcc.codegen.expr import (
     APICallExpr,
     ArrayLoadExpr,
@@ -58,13 +70,16 @@ from jcc.codegen.expr import (
     UnreachableStmt,
     UserCallExpr,
 )
+from jcc.codegen.global_peephole import global_peephole_optimize
 from jcc.codegen.peephole import peephole_optimize
 from jcc.codegen.phi_moves import (
     PhiMove,
     TempAllocator,
     build_phi_moves,
+    hoist_step_moves,
     emit_phi_moves_optimized,
 )
+from jcc.ir.facts import FunctionFacts
 from jcc.ir.instructions import ICmpPred
 from jcc.ir.module import Block, Function
 from jcc.ir.types import BlockLabel, JCType
@@ -83,6 +98,10 @@ class EmitContext:
     - Label counter for synthetic labels
     - Limits for code generation decisions
     - Temp allocator for temp slot allocation (memcpy loops, phi moves)
+    - Optional cost model for choosing between equivalent sequences
+    - The label of the block emitted next, which branches may fall into,
+      and out-of-line stubs to emit after the last block
+    - Optional block frequencies, for weighing switch cases
 
     Note: Stack depth is NOT tracked here. It's computed post-emission
     via CFG analysis in stack.py.
@@ -91,6 +110,10 @@ class EmitContext:
     limits: Limits = field(default_factory=Limits)
     instructions: list[ops.Instruction] = field(default_factory=lambda: [])
     temps: TempAllocator | None = None
+    costs: CostModel | None = None
+    next_label: BlockLabel | None = None
+    frequencies: Mapping[BlockLabel, float] | None = None
+    deferred: list[ops.Instruction] = field(default_factory=lambda: [])
     _label_counter: int = field(default=0, init=False)
 
     def emit(self, instr: ops.Instruction) -> None:
@@ -825,6 +848,13 @@ def emit_terminator(
             raise ValueError(f"Unknown terminator: {type(term).__name__}")
 
 
+_NEGATED_PRED: dict[ICmpPred, ICmpPred] = {
+    "eq": "ne", "ne": "eq",
+    "slt": "sge", "sge": "slt", "sgt": "sle", "sle": "sgt",
+    "ult": "uge", "uge": "ult", "ugt": "ule", "ule": "ugt",
+}
+
+
 def emit_conditional_branch(
     cond: TypedExpr,
     true_target: BlockLabel,
@@ -856,11 +886,35 @@ def emit_conditional_branch(
     false_label:
         <phi_moves for false_target>
         goto false_target
+
+    When false_target is the block emitted next, the condition is negated
+    so that it falls through instead. See _emit_branch_tails for how the
+    tails shrink when a target falls through or has no phi moves.
     """
+    negate = ctx.next_label == false_target and true_target != false_target
+    if negate:
+        true_target, false_target = false_target, true_target
+
     if isinstance(cond, CompareExpr):
+        if negate:
+            cond = replace(cond, pred=_NEGATED_PRED[cond.pred])
         _emit_fused_branch(cond, true_target, false_target, phi_moves, temps, ctx)
     else:
-        _emit_materialized_branch(cond, true_target, false_target, phi_moves, temps, ctx)
+        _emit_materialized_branch(cond, true_target, false_target, phi_moves, temps, ctx, negate)
+
+
+def _false_branch_label(
+    false_target: BlockLabel,
+    phi_moves: dict[BlockLabel, list[PhiMove]],
+    ctx: EmitContext,
+) -> BlockLabel:
+    """Where a conditional branch jumps when its condition is false.
+
+    The target itself when the edge has no phi moves, otherwise a stub.
+    """
+    if phi_moves.get(false_target):
+        return ctx.fresh_label()
+    return false_target
 
 
 def _emit_fused_branch(
@@ -873,7 +927,7 @@ def _emit_fused_branch(
 ) -> None:
     """Emit comparison fused directly into conditional branch."""
     is_unsigned = _is_unsigned_pred(cmp.pred)
-    false_label = ctx.fresh_label()
+    false_label = _false_branch_label(false_target, phi_moves, ctx)
 
     if is_unsigned:
         emit_expr(cmp.left, ctx)
@@ -938,17 +992,29 @@ def _emit_branch_tails(
     temps: TempAllocator,
     ctx: EmitContext,
 ) -> None:
-    """Emit the true/false tails after a fused comparison branch."""
+    """Emit the true/false tails after a conditional branch to false_label.
+
+    The true path follows the branch and skips its goto when true_target
+    is the next block. When false_label is a stub for the false edge's
+    phi moves, the stub follows the true path's goto, or goes out of line
+    after the last block when the true path falls through.
+    """
     # True path (fallthrough)
     true_moves = phi_moves.get(true_target, [])
     emit_phi_moves_optimized(true_moves, temps, ctx.emit)
-    ctx.emit(ops.goto(true_target))
+    falls_through = true_target == ctx.next_label
+    if not falls_through:
+        ctx.emit(ops.goto(true_target))
 
-    # False path
-    ctx.emit(ops.label(false_label))
+    if false_label == false_target:
+        return  # Branched straight to the target
+
+    # False path stub
+    emit = ctx.deferred.append if falls_through else ctx.emit
+    emit(ops.label(false_label))
     false_moves = phi_moves.get(false_target, [])
-    emit_phi_moves_optimized(false_moves, temps, ctx.emit)
-    ctx.emit(ops.goto(false_target))
+    emit_phi_moves_optimized(false_moves, temps, emit)
+    emit(ops.goto(false_target))
 
 
 def _emit_materialized_branch(
@@ -958,23 +1024,18 @@ def _emit_materialized_branch(
     phi_moves: dict[BlockLabel, list[PhiMove]],
     temps: TempAllocator,
     ctx: EmitContext,
+    negate: bool = False,
 ) -> None:
-    """Fallback: emit condition as boolean, then branch on it."""
+    """Fallback: emit condition as boolean, then branch on it.
+
+    With negate, the boolean is true on the false path (ifne, not ifeq).
+    """
     emit_expr(cond, ctx)
 
-    false_label = ctx.fresh_label()
-    ctx.emit(ops.ifeq(false_label))
+    false_label = _false_branch_label(false_target, phi_moves, ctx)
+    ctx.emit(ops.ifne(false_label) if negate else ops.ifeq(false_label))
 
-    # True branch
-    true_moves = phi_moves.get(true_target, [])
-    emit_phi_moves_optimized(true_moves, temps, ctx.emit)
-    ctx.emit(ops.goto(true_target))
-
-    # False branch
-    ctx.emit(ops.label(false_label))
-    false_moves = phi_moves.get(false_target, [])
-    emit_phi_moves_optimized(false_moves, temps, ctx.emit)
-    ctx.emit(ops.goto(false_target))
+    _emit_branch_tails(true_target, false_target, false_label, phi_moves, temps, ctx)
 
 
 def emit_switch(
@@ -987,18 +1048,35 @@ def emit_switch(
 ) -> None:
     """Emit switch statement with phi moves.
 
-    Uses lookupswitch for sparse cases, tableswitch for dense.
+    With a cost model, the dispatch is planned by codegen.switch: tables,
+    lookups, equality chains and range splits, weighted by ctx.frequencies
+    when known. Without one, uses lookupswitch for sparse cases and
+    tableswitch for dense.
     Phi moves are emitted before each target jump.
     """
-    emit_expr(value, ctx)
-
     if not cases:
         # No cases - just jump to default
+        emit_expr(value, ctx)
         default_moves = phi_moves.get(default, [])
         emit_phi_moves_optimized(default_moves, temps, ctx.emit)
         ctx.emit(ops.goto(default))
         return
 
+    if ctx.costs is not None:
+        plan = plan_switch(
+            cases,
+            value.ty,
+            ctx.costs,
+            ctx.limits,
+            weights=ctx.frequencies,
+            default=default,
+            in_slot=isinstance(value, LoadSlotExpr),
+        )
+        _emit_switch_plan(value, default, plan, phi_moves, temps, ctx)
+        return
+
+    emit_expr(value, ctx)
+
     # Determine if tableswitch is appropriate
     case_values = [c[0] for c in cases]
     min_val = min(case_values)
@@ -1016,6 +1094,32 @@ def emit_switch(
         emit_lookupswitch(value, default, cases, phi_moves, temps, ctx)
 
 
+def _switch_edges(
+    targets: set[BlockLabel],
+    phi_moves: dict[BlockLabel, list[PhiMove]],
+    ctx: EmitContext,
+) -> dict[BlockLabel, BlockLabel]:
+    """Synthetic label for each target whose edge needs phi moves."""
+    return {
+        target: ctx.fresh_label()
+        for target in sorted(targets)
+        if target in phi_moves and phi_moves[target]
+    }
+
+
+def _emit_switch_stubs(
+    synthetic_labels: dict[BlockLabel, BlockLabel],
+    phi_moves: dict[BlockLabel, list[PhiMove]],
+    temps: TempAllocator,
+    ctx: EmitContext,
+) -> None:
+    """Emit synthetic blocks: phi moves, then a jump to the real target."""
+    for target, synthetic in synthetic_labels.items():
+        ctx.emit(ops.label(synthetic))
+        emit_phi_moves_optimized(phi_moves[target], temps, ctx.emit)
+        ctx.emit(ops.goto(target))
+
+
 def emit_tableswitch(
     value: TypedExpr,
     default: BlockLabel,
@@ -1031,38 +1135,32 @@ def emit_tableswitch(
     If any target has phi moves, we create synthetic intermediate blocks:
     switch -> _phi_target -> [phi moves] -> goto real_target
     """
-    case_map = dict(cases)
-
-    # Collect all unique targets (including default)
-    all_targets = {default}
-    for i in range(low, high + 1):
-        all_targets.add(case_map.get(i, default))
+    synthetic_labels = _switch_edges({default} | {t for _, t in cases}, phi_moves, ctx)
+    _emit_table(value.ty, default, cases, low, high, synthetic_labels, ctx)
+    _emit_switch_stubs(synthetic_labels, phi_moves, temps, ctx)
 
-    # Create synthetic labels for targets with phi moves
-    synthetic_labels: dict[BlockLabel, BlockLabel] = {}
-    for target in all_targets:
-        if target in phi_moves and phi_moves[target]:
-            synthetic_labels[target] = ctx.fresh_label()
-
-    # Build switch targets, redirecting to synthetic labels where needed
-    switch_targets: list[BlockLabel] = []
-    for i in range(low, high + 1):
-        target = case_map.get(i, default)
-        switch_targets.append(synthetic_labels.get(target, target))
 
+def _emit_table(
+    ty: JCType,
+    default: BlockLabel,
+    cases: tuple[tuple[int, BlockLabel], ...],
+    low: int,
+    high: int,
+    synthetic_labels: dict[BlockLabel, BlockLabel],
+    ctx: EmitContext,
+) -> None:
+    """Emit the tableswitch instruction, jumping via synthetic labels."""
+    case_map = dict(cases)
+    switch_targets = tuple(
+        synthetic_labels.get(t, t) for t in (case_map.get(i, default) for i in range(low, high + 1))
+    )
     switch_default = synthetic_labels.get(default, default)
 
-    # Emit the switch instruction - use INT variant for INT values
-    if value.ty == JCType.INT:
-        ctx.emit(ops.itableswitch(switch_default, low, high, tuple(switch_targets)))
+    # Use INT variant for INT values
+    if ty == JCType.INT:
+        ctx.emit(ops.itableswitch(switch_default, low, high, switch_targets))
     else:
-        ctx.emit(ops.stableswitch(switch_default, low, high, tuple(switch_targets)))
-
-    # Emit synthetic blocks for phi moves
-    for target, synthetic in synthetic_labels.items():
-        ctx.emit(ops.label(synthetic))
-        emit_phi_moves_optimized(phi_moves[target], temps, ctx.emit)
-        ctx.emit(ops.goto(target))
+        ctx.emit(ops.stableswitch(switch_default, low, high, switch_targets))
 
 
 def emit_lookupswitch(
@@ -1077,35 +1175,123 @@ def emit_lookupswitch(
 
     If any target has phi moves, we create synthetic intermediate blocks.
     """
-    # Collect all unique targets (including default)
-    all_targets = {default} | {target for _, target in cases}
-
-    # Create synthetic labels for targets with phi moves
-    synthetic_labels: dict[BlockLabel, BlockLabel] = {}
-    for target in all_targets:
-        if target in phi_moves and phi_moves[target]:
-            synthetic_labels[target] = ctx.fresh_label()
+    synthetic_labels = _switch_edges({default} | {t for _, t in cases}, phi_moves, ctx)
+    _emit_lookup(value.ty, default, cases, synthetic_labels, ctx)
+    _emit_switch_stubs(synthetic_labels, phi_moves, temps, ctx)
 
-    # Build cases with redirected targets
-    redirected_cases: list[tuple[int, BlockLabel]] = []
-    for case_val, target in cases:
-        redirected_cases.append((case_val, synthetic_labels.get(target, target)))
 
+def _emit_lookup(
+    ty: JCType,
+    default: BlockLabel,
+    cases: tuple[tuple[int, BlockLabel], ...],
+    synthetic_labels: dict[BlockLabel, BlockLabel],
+    ctx: EmitContext,
+) -> None:
+    """Emit the lookupswitch instruction, jumping via synthetic labels."""
     # Sort by value (required by lookupswitch)
-    sorted_cases = tuple(sorted(redirected_cases, key=lambda x: x[0]))
+    sorted_cases = tuple(sorted((v, synthetic_labels.get(t, t)) for v, t in cases))
     switch_default = synthetic_labels.get(default, default)
 
-    # Emit the switch instruction - use INT variant for INT values
-    if value.ty == JCType.INT:
+    # Use INT variant for INT values
+    if ty == JCType.INT:
         ctx.emit(ops.ilookupswitch(switch_default, sorted_cases))
     else:
         ctx.emit(ops.slookupswitch(switch_default, sorted_cases))
 
-    # Emit synthetic blocks for phi moves
-    for target, synthetic in synthetic_labels.items():
-        ctx.emit(ops.label(synthetic))
-        emit_phi_moves_optimized(phi_moves[target], temps, ctx.emit)
-        ctx.emit(ops.goto(target))
+
+def _emit_switch_plan(
+    value: TypedExpr,
+    default: BlockLabel,
+    plan: SwitchPlan,
+    phi_moves: dict[BlockLabel, list[PhiMove]],
+    temps: TempAllocator,
+    ctx: EmitContext,
+) -> None:
+    """Emit a planned switch: the dispatch code, then phi move stubs.
+
+    A lone table or lookup takes the value straight from its expression.
+    Other plans probe it several times, from its slot or from a temp.
+    """
+    targets = {default} | {t for _, t in cases_of(plan)}
+    synthetic_labels = _switch_edges(targets, phi_moves, ctx)
+
+    emit_expr(value, ctx)
+    if isinstance(value, LoadSlotExpr):
+        slot = value.slot
+    elif isinstance(plan, (TableLeaf, LookupLeaf)):
+        slot = None
+    else:
+        slot = temps.allocate(value.ty.slots)
+        ctx.emit(ops.store_for_type(slot, value.ty))
+        ctx.emit(ops.load_for_type(slot, value.ty))
+
+    _emit_plan_node(plan, value.ty, slot, default, synthetic_labels, True, ctx)
+    temps.reset()
+    _emit_switch_stubs(synthetic_labels, phi_moves, temps, ctx)
+
+
+def _emit_plan_node(
+    plan: SwitchPlan,
+    ty: JCType,
+    slot: int | None,
+    default: BlockLabel,
+    synthetic_labels: dict[BlockLabel, BlockLabel],
+    loaded: bool,
+    ctx: EmitContext,
+) -> None:
+    """Emit one node of a switch plan.
+
+    loaded says whether the value is already on the stack (only for the
+    first probe); otherwise each probe loads it from slot.
+    """
+    def load() -> None:
+        nonlocal loaded
+        if not loaded:
+            assert slot is not None, "Switch value reloaded without a slot"
+            ctx.emit(ops.load_for_type(slot, ty))
+        loaded = False
+
+    def edge(target: BlockLabel) -> BlockLabel:
+        return synthetic_labels.get(target, target)
+
+    match plan:
+        case TableLeaf(low=low, high=high, cases=cases):
+            load()
+            _emit_table(ty, default, cases, low, high, synthetic_labels, ctx)
+
+        case LookupLeaf(cases=cases):
+            load()
+            _emit_lookup(ty, default, cases, synthetic_labels, ctx)
+
+        case CompareChain(cases=cases, rest=rest):
+            for case_val, target in cases:
+                load()
+                if ty == JCType.INT:
+                    ctx.emit_const(case_val, ty)
+                    ctx.emit(ops.icmp())
+                    ctx.emit(ops.ifeq(edge(target)))
+                elif case_val == 0:
+                    ctx.emit(ops.ifeq(edge(target)))
+                else:
+                    ctx.emit_const(case_val, ty)
+                    ctx.emit(ops.if_scmpeq(edge(target)))
+            if rest is None:
+                ctx.emit(ops.goto(edge(default)))
+            else:
+                _emit_plan_node(rest, ty, slot, default, synthetic_labels, False, ctx)
+
+        case RangeSplit(pivot=pivot, below=below, above=above):
+            above_label = ctx.fresh_label()
+            load()
+            ctx.emit_const(pivot, ty)
+            if ty == JCType.INT:
+                ctx.emit(ops.icmp())
+                ctx.emit(ops.ifge(above_label))
+            else:
+                ctx.emit(ops.if_scmpge(above_label))
+            _emit_plan_node(below, ty, slot, default, synthetic_labels, False, ctx)
+            ctx.emit(ops.label(above_label))
+            _emit_plan_node(above, ty, slot, default, synthetic_labels, False, ctx)
 
 
 # === Block Emission ===
@@ -1117,6 +1303,8 @@ def emit_block(
     phi_moves: dict[BlockLabel, list[PhiMove]],
     temps: TempAllocator,
     ctx: EmitContext,
+    counter: tuple[int, int] | None = None,
+    steps: list[PhiMove] | None = None,
 ) -> None:
     """Emit bytecode for a basic block.
 
@@ -1126,18 +1314,43 @@ def emit_block(
         phi_moves: Phi moves for outgoing edges
         temps: Temp allocator
         ctx: Emit context
+        counter: (array field CP index, element) of a profile counter to
+            increment on entry, for profile builds
+        steps: Induction steps hoisted off a back edge (hoist_step_moves),
+            emitted before the terminator
     """
     # Emit block label
     ctx.emit(ops.label(block.label))
 
+    if counter is not None:
+        emit_counter_increment(*counter, ctx)
+
     # Emit expression trees (except terminator)
     for tree in trees[:-1]:
         emit_expr(tree, ctx)
 
+    if steps:
+        emit_phi_moves_optimized(steps, temps, ctx.emit)
+
     # Emit terminator with phi moves
     emit_terminator(trees[-1], phi_moves, temps, ctx)
 
 
+def emit_counter_increment(field_cp: int, index: int, ctx: EmitContext) -> None:
+    """Emit counters[index] += 1 on a static short[] field.
+
+    JCVM's sinc only works on locals, so the counter is read, incremented
+    and written back in place: getstatic_a, index, dup2, saload, +1, sastore.
+    """
+    ctx.emit(ops.getstatic_a(field_cp))
+    ctx.emit(ops.sconst(index))
+    ctx.emit(ops.dup2())
+    ctx.emit(ops.saload())
+    ctx.emit(ops.sconst(1))
+    ctx.emit(ops.sadd())
+    ctx.emit(ops.sastore())
+
+
 # === Function Compilation ===
 
 
@@ -1148,6 +1361,8 @@ class FunctionCode:
     instructions: tuple[ops.Instruction, ...]
     max_stack: int
     max_locals: int
+    # Global peephole hits per pattern
+    peephole_hits: Mapping[str, int] = field(default_factory=lambda: dict[str, int]())
 
 
 def compile_function(
@@ -1158,6 +1373,10 @@ def compile_function(
     cp: "ConstantPool",
     limits: Limits | None = None,
     offset_phi_info: OffsetPhiInfo | None = None,
+    facts: FunctionFacts | None = None,
+    costs: CostModel | None = None,
+    counters: Mapping[BlockLabel, int] | None = None,
+    frequencies: Mapping[BlockLabel, float] | None = None,
 ) -> FunctionCode:
     """Compile a function to bytecode.
 
@@ -1169,6 +1388,13 @@ def compile_function(
         cp: Constant pool with API registry and CP indices
         limits: Resource limits (uses defaults if None)
         offset_phi_info: Offset phi detection results (for GlobalRef/InlineGEP sources)
+        facts: Def map and CFG shared with analysis (built if None)
+        costs: Target cost model for switch lowering and peephole caching
+        counters: Profile counter index per instrumented block, for
+            profile builds (requires cp.profile)
+        frequencies: Relative block frequencies; if given, blocks are laid
+            out in hot fallthrough chains instead of source order, and
+            switch cases are weighted by their targets' frequencies
 
     Returns:
         FunctionCode with instructions, max_stack, max_locals
@@ -1185,6 +1411,15 @@ def compile_function(
             if sf_cp is not None:
                 scalar_field_lookup[(sf.mem_array, sf.mem_offset)] = (sf_cp, sf.jc_type)
 
+    if facts is None:
+        facts = FunctionFacts(func)
+
+    # Order blocks so hot successors fall through
+    blocks = list(func.blocks)
+    if frequencies is not None:
+        by_label = {block.label: block for block in blocks}
+        blocks = [by_label[label] for label in layout_blocks(func, frequencies, facts.successors)]
+
     # Create build context using ConstantPool's stored references
     build_ctx = create_build_context(
         func=func,
@@ -1198,31 +1433,46 @@ def compile_function(
         offset_phi_info=offset_phi_info,
         scalar_field_lookup=scalar_field_lookup,
         constructor_cp=cp.constructor_cp,
+        facts=facts,
     )
 
     # Create emit context and temp allocator
     temps = TempAllocator(first_slot=locals.first_temp_slot)
-    emit_ctx = EmitContext(limits=limits, temps=temps)
+    emit_ctx = EmitContext(limits=limits, temps=temps, costs=costs, frequencies=frequencies)
+
+    # Profile counters live in one static array
+    counters = counters or {}
+    counters_cp = cp.profile.counters if counters and cp.profile is not None else None
 
     # Emit each block
-    for block in func.blocks:
+    for i, block in enumerate(blocks):
+        emit_ctx.next_label = blocks[i + 1].label if i + 1 < len(blocks) else None
+
         # Build expression trees
         trees = build_block_trees(block, build_ctx)
 
         # Build phi moves for outgoing edges
         phi_moves = build_block_phi_moves(block, func, phi_info, locals, offset_phi_info)
+        steps = hoist_step_moves(block, phi_moves, locals, offset_phi_info, facts)
 
         # Emit the block
-        emit_block(block, trees, phi_moves, temps, emit_ctx)
+        counter = None
+        if counters_cp is not None and block.label in counters:
+            counter = (counters_cp, counters[block.label])
+        emit_block(block, trees, phi_moves, temps, emit_ctx, counter, steps)
+
+    # Out-of-line phi move stubs
+    emit_ctx.instructions.extend(emit_ctx.deferred)
 
     # Compute final max_locals
     max_locals = locals.first_temp_slot + temps.max_temps_used
 
     # Peephole optimize before stack analysis
     emit_ctx.instructions, extra_locals = peephole_optimize(
-        emit_ctx.instructions, max_locals
+        emit_ctx.instructions, max_locals, costs
     )
     max_locals += extra_locals
+    emit_ctx.instructions, peephole_hits = global_peephole_optimize(emit_ctx.instructions)
 
     # Compute max_stack via CFG analysis
     try:
@@ -1247,6 +1497,7 @@ def compile_function(
         instructions=tuple(emit_ctx.instructions),
         max_stack=max_stack,
         max_locals=max_locals,
+        peephole_hits=peephole_hits,
     )
 
 
@@ -0,0 +1,481 @@
+"""Cross-label peephole optimizer driven by local slot dataflow.
+
+jcc.codegen.peephole only rewrites straight-line windows, so it cannot see
+that a phi move stores a value no path ever reads, or that a slot already
+holds the constant a block is about to store into it. This pass builds the
+CFG of the emitted instructions (jcc.codegen.stack), solves two dataflow
+problems over the local slots, and rewrites through a table of patterns:
+
+- liveness (backward): which slots may still be read after an instruction
+- copies (forward, must): which slots hold a known constant, or a copy of
+  another slot, before an instruction
+
+Each Pattern matches a window of instruction kinds and checks the facts at
+its position. The rewrites of one pattern are collected over the whole
+function and applied together, then the facts are recomputed and the table
+is tried again, until no pattern fires. Every rewrite removes instructions
+or shortens one, so this terminates.
+
+Rewrites of one pattern never invalidate each other's facts: each removes
+an instruction that does nothing in the original program, or a value no
+one reads. Rewrites of different patterns can (removing a dead store
+changes what a slot holds), which is why facts are recomputed in between.
+"""
+
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Literal
+
+from jcc.codegen import ops
+from jcc.codegen.ops import Instruction
+from jcc.codegen.stack import (
+    BasicBlock,
+    block_successors,
+    build_basic_blocks,
+    build_label_to_block,
+)
+
+# Local access mnemonics by type prefix; INTs take two slots
+_WIDTH = {"s": 1, "a": 1, "i": 2}
+_LOADS = {"s": ops.sload, "i": ops.iload, "a": ops.aload}
+_CONSTS = {"s": ops.sconst, "i": ops.iconst}
+_POPS = {1: ops.pop, 2: ops.pop2}
+_GOTOS = frozenset({"goto", "goto_w"})
+
+_LocalKind = Literal["load", "store", "inc"]
+
+
+@dataclass(frozen=True)
+class _Copy:
+    """What a slot is known to hold: a constant, or the value of another slot."""
+
+    prefix: str  # "s", "i" or "a"
+    source: str  # "const" or "slot"
+    value: int  # The constant, or the source slot
+
+
+@dataclass(frozen=True)
+class SlotFacts:
+    """Dataflow facts about the local slots at each instruction.
+
+    Attributes:
+        live_after: Per instruction, the slots that may be read later.
+        copies_before: Per instruction, slot -> what it holds on every path.
+        blocks: Basic blocks of the instructions.
+        predecessors: Per block index, the blocks that can pass control to it.
+    """
+
+    live_after: tuple[frozenset[int], ...]
+    copies_before: tuple[Mapping[int, _Copy], ...]
+    blocks: tuple[BasicBlock, ...]
+    predecessors: tuple[tuple[int, ...], ...]
+
+
+@dataclass(frozen=True)
+class Match:
+    """A pattern's window in the instruction list."""
+
+    instructions: list[Instruction]
+    start: int
+    facts: SlotFacts
+    block: int  # Index of the basic block the window starts in
+
+
+# Indices to replace, each with a list of instructions (empty to remove)
+Edits = dict[int, list[Instruction]]
+
+
+@dataclass(frozen=True)
+class Pattern:
+    """One rewrite of the table.
+
+    Attributes:
+        name: Name the hits are counted under.
+        shape: Accepted instruction kinds (see _kind) per window position.
+        rewrite: Edits for a window of that shape, or None if the facts
+            do not allow it. Edits may reach outside the window.
+    """
+
+    name: str
+    shape: tuple[frozenset[str], ...]
+    rewrite: Callable[[Match], Edits | None]
+
+
+def global_peephole_optimize(
+    instructions: list[Instruction],
+) -> tuple[list[Instruction], dict[str, int]]:
+    """Apply PATTERNS until none matches.
+
+    Returns (optimized instructions, hits per pattern name). Only patterns
+    that fired appear in the hits.
+    """
+    hits: dict[str, int] = {}
+    changed = True
+    while changed:
+        changed = False
+        facts = analyze_slots(instructions)
+        for pattern in PATTERNS:
+            edits, count = _collect_edits(pattern, instructions, facts)
+            if count:
+                instructions = _apply(instructions, edits)
+                hits[pattern.name] = hits.get(pattern.name, 0) + count
+                changed = True
+                break
+    return instructions, hits
+
+
+def analyze_slots(instructions: list[Instruction]) -> SlotFacts:
+    """Solve slot liveness and slot copies over the instruction CFG."""
+    blocks = build_basic_blocks(instructions)
+    label_to_block = build_label_to_block(blocks)
+    successors = [
+        block_successors(instructions, blocks, label_to_block, b) for b in range(len(blocks))
+    ]
+    predecessors: list[list[int]] = [[] for _ in blocks]
+    for b, succs in enumerate(successors):
+        for succ in succs:
+            predecessors[succ].append(b)
+
+    live_after = _liveness(instructions, blocks, successors)
+    copies_before = _copies(instructions, blocks, successors, predecessors)
+    return SlotFacts(
+        live_after=tuple(live_after),
+        copies_before=tuple(copies_before),
+        blocks=tuple(blocks),
+        predecessors=tuple(tuple(p) for p in predecessors),
+    )
+
+
+# === Instruction decoding ===
+
+
+def _local(instr: Instruction) -> tuple[_LocalKind, str, int] | None:
+    """(kind, prefix, slot) of a local load, store or increment, else None."""
+    m = instr.mnemonic
+    if m in ("sinc", "iinc"):
+        return "inc", m[0], int(instr.operands[0])
+    base, _, suffix = m.partition("_")
+    kind = base[1:]
+    if kind not in ("load", "store") or base[0] not in _WIDTH:
+        return None
+    if suffix:
+        if not suffix.isdigit():
+            return None
+        slot = int(suffix)
+    else:
+        slot = int(instr.operands[0])
+    return kind, base[0], slot
+
+
+def _matched(instr: Instruction) -> tuple[str, int]:
+    """(prefix, slot) of a local access a pattern matched by kind."""
+    local = _local(instr)
+    assert local is not None
+    return local[1], local[2]
+
+
+def _constant(instr: Instruction) -> tuple[str, int] | None:
+    """(prefix, value) of a short or int constant push, else None."""
+    m = instr.mnemonic
+    if m in ("sconst_m1", "iconst_m1"):
+        return m[0], -1
+    if m.startswith(("sconst_", "iconst_")):
+        return m[0], int(m[7:])
+    if m in ("bspush", "sspush"):
+        return "s", int(instr.operands[0])
+    if m in ("bipush", "sipush", "iipush"):
+        return "i", int(instr.operands[0])
+    return None
+
+
+def _kind(instr: Instruction) -> str:
+    """Kind a pattern shape matches: load, store, inc, const, dup, label or other."""
+    local = _local(instr)
+    if local is not None:
+        return local[0]
+    if _constant(instr) is not None:
+        return "const"
+    if instr.mnemonic in ("dup", "dup2"):
+        return "dup"
+    if instr.mnemonic == "label":
+        return "label"
+    return "other"
+
+
+def _slots(prefix: str, slot: int) -> frozenset[int]:
+    return frozenset(range(slot, slot + _WIDTH[prefix]))
+
+
+def _reads_writes(instr: Instruction) -> tuple[frozenset[int], frozenset[int]]:
+    """Slots an instruction reads and writes."""
+    local = _local(instr)
+    if local is None:
+        return frozenset(), frozenset()
+    kind, prefix, slot = local
+    slots = _slots(prefix, slot)
+    if kind == "load":
+        return slots, frozenset()
+    if kind == "store":
+        return frozenset(), slots
+    return slots, slots
+
+
+# === Dataflow ===
+
+
+def _liveness(
+    instructions: list[Instruction],
+    blocks: list[BasicBlock],
+    successors: list[list[int]],
+) -> list[frozenset[int]]:
+    """Slots that may be read after each instruction."""
+    live_in: list[frozenset[int]] = [frozenset() for _ in blocks]
+    changed = True
+    while changed:
+        changed = False
+        for b in reversed(range(len(blocks))):
+            live = frozenset[int]().union(*(live_in[s] for s in successors[b]))
+            for i in reversed(range(blocks[b].start_idx, blocks[b].end_idx)):
+                reads, writes = _reads_writes(instructions[i])
+                live = (live - writes) | reads
+            if live != live_in[b]:
+                live_in[b] = live
+                changed = True
+
+    live_after: list[frozenset[int]] = [frozenset()] * len(instructions)
+    for b, block in enumerate(blocks):
+        live = frozenset[int]().union(*(live_in[s] for s in successors[b]))
+        for i in reversed(range(block.start_idx, block.end_idx)):
+            live_after[i] = live
+            reads, writes = _reads_writes(instructions[i])
+            live = (live - writes) | reads
+    return live_after
+
+
+def _copies(
+    instructions: list[Instruction],
+    blocks: list[BasicBlock],
+    successors: list[list[int]],
+    predecessors: list[list[int]],
+) -> list[Mapping[int, _Copy]]:
+    """What each slot holds on every path to each instruction."""
+    # None is "not reached yet", the top of the meet
+    out: list[dict[int, _Copy] | None] = [None] * len(blocks)
+    worklist = list(range(len(blocks)))
+    while worklist:
+        b = worklist.pop(0)
+        state = _block_entry(b, out, predecessors)
+        for i in range(blocks[b].start_idx, blocks[b].end_idx):
+            state = _transfer(instructions, i, blocks[b], state)
+        if state != out[b]:
+            out[b] = state
+            worklist.extend(s for s in successors[b] if s not in worklist)
+
+    copies_before: list[Mapping[int, _Copy]] = [{}] * len(instructions)
+    for b, block in enumerate(blocks):
+        state = _block_entry(b, out, predecessors)
+        for i in range(block.start_idx, block.end_idx):
+            copies_before[i] = state
+            state = _transfer(instructions, i, block, state)
+    return copies_before
+
+
+def _block_entry(
+    b: int,
+    out: list[dict[int, _Copy] | None],
+    predecessors: list[list[int]],
+) -> dict[int, _Copy]:
+    """Copies holding on every reached edge into block b (none at entry)."""
+    if b == 0:
+        return {}
+    states = [state for p in predecessors[b] if (state := out[p]) is not None]
+    if not states:
+        return {}
+    first, *rest = states
+    return {slot: copy for slot, copy in first.items() if all(s.get(slot) == copy for s in rest)}
+
+
+def _transfer(
+    instructions: list[Instruction],
+    i: int,
+    block: BasicBlock,
+    state: dict[int, _Copy],
+) -> dict[int, _Copy]:
+    instr = instructions[i]
+    local = _local(instr)
+    if local is None or local[0] == "load":
+        return state
+    kind, prefix, slot = local
+    written = _slots(prefix, slot)
+    stored: _Copy | None = None
+    if kind == "store" and i > block.start_idx:
+        stored = _pushed(instructions[i - 1], prefix, state)
+    elif kind == "inc":
+        known = state.get(slot)
+        if known is not None and known.source == "const":
+            bits = 16 if prefix == "s" else 32
+            value = (known.value + int(instr.operands[1])) & ((1 << bits) - 1)
+            stored = _Copy(prefix, "const", value - (1 << bits) if value >> (bits - 1) else value)
+    state = {
+        s: copy
+        for s, copy in state.items()
+        if not (_slots(copy.prefix, s) & written)
+        and not (copy.source == "slot" and _slots(copy.prefix, copy.value) & written)
+    }
+    if stored is not None and not (
+        stored.source == "slot" and _slots(prefix, stored.value) & written
+    ):
+        state[slot] = stored
+    return state
+
+
+def _pushed(instr: Instruction, prefix: str, state: Mapping[int, _Copy]) -> _Copy | None:
+    """What instr pushes, as a copy of prefix type, if it is a known load or constant."""
+    constant = _constant(instr)
+    if constant is not None:
+        return _Copy(prefix, "const", constant[1]) if constant[0] == prefix else None
+    local = _local(instr)
+    if local is None or local[0] != "load" or local[1] != prefix:
+        return None
+    # Follow the source's own copy, so chains of copies compare equal
+    return state.get(local[2]) or _Copy(prefix, "slot", local[2])
+
+
+# === Patterns ===
+
+
+def _redundant_store(match: Match) -> Edits | None:
+    """Drop `push X; store N` when N already holds X."""
+    i = match.start
+    push, store = match.instructions[i], match.instructions[i + 1]
+    prefix, slot = _matched(store)
+    state = match.facts.copies_before[i]
+    value = _pushed(push, prefix, state)
+    if value is None:
+        return None
+    if value != state.get(slot) and value != _Copy(prefix, "slot", slot):
+        return None
+    return {i: [], i + 1: []}
+
+
+def _dead_push_store(match: Match) -> Edits | None:
+    """Drop `push X; store N` when N is not read before being overwritten."""
+    i = match.start
+    push, store = match.instructions[i], match.instructions[i + 1]
+    if push.pushes - push.pops != store.pops:
+        return None
+    prefix, slot = _matched(store)
+    if _slots(prefix, slot) & match.facts.live_after[i + 1]:
+        return None
+    return {i: [], i + 1: []}
+
+
+def _dead_store(match: Match) -> Edits | None:
+    """Replace a dead `store N` with a pop of the stored value."""
+    i = match.start
+    store = match.instructions[i]
+    prefix, slot = _matched(store)
+    if _slots(prefix, slot) & match.facts.live_after[i]:
+        return None
+    return {i: [_POPS[store.pops]()]}
+
+
+def _dead_inc(match: Match) -> Edits | None:
+    """Drop an increment of a slot that is not read afterwards."""
+    i = match.start
+    prefix, slot = _matched(match.instructions[i])
+    if _slots(prefix, slot) & match.facts.live_after[i]:
+        return None
+    return {i: []}
+
+
+def _known_load(match: Match) -> Edits | None:
+    """Load a slot's known value in a shorter form: a small constant or a low slot."""
+    i = match.start
+    load = match.instructions[i]
+    if not load.operands:
+        return None  # Already the one-byte form
+    prefix, slot = _matched(load)
+    known = match.facts.copies_before[i].get(slot)
+    if known is None or known.prefix != prefix:
+        return None
+    if known.source == "slot":
+        replacement = _LOADS[prefix](known.value)
+    elif prefix in _CONSTS:
+        replacement = _CONSTS[prefix](known.value)
+    else:
+        return None
+    return {i: [replacement]} if not replacement.operands else None
+
+
+def _merge_load(match: Match) -> Edits | None:
+    """Keep a value on the stack across a merge instead of going through a slot.
+
+    When every predecessor of a label ends with `store N` (just before its
+    goto, or falling through) and the label is followed by `load N` with N
+    dead afterwards, the stores and the load go: each predecessor arrives
+    with the value on the stack.
+    """
+    i = match.start
+    facts = match.facts
+    load = match.instructions[i + 1]
+    prefix, slot = _matched(load)
+    if match.block == 0 or _slots(prefix, slot) & facts.live_after[i + 1]:
+        return None
+    predecessors = facts.predecessors[match.block]
+    if not predecessors:
+        return None
+
+    edits: Edits = {i + 1: []}
+    for p in predecessors:
+        block = facts.blocks[p]
+        last = block.end_idx - 1
+        if match.instructions[last].mnemonic in _GOTOS:
+            last -= 1
+        elif p + 1 != match.block:
+            return None
+        if last < block.start_idx or _local(match.instructions[last]) != ("store", prefix, slot):
+            return None
+        edits[last] = []
+    return edits
+
+
+_PUSH = frozenset({"load", "const", "dup"})
+
+PATTERNS: tuple[Pattern, ...] = (
+    Pattern("redundant_store", (frozenset({"load", "const"}), frozenset({"store"})),
+            _redundant_store),
+    Pattern("dead_store", (_PUSH, frozenset({"store"})), _dead_push_store),
+    Pattern("dead_store", (frozenset({"store"}),), _dead_store),
+    Pattern("dead_inc", (frozenset({"inc"}),), _dead_inc),
+    Pattern("merge_load", (frozenset({"label"}), frozenset({"load"})), _merge_load),
+    Pattern("known_load", (frozenset({"load"}),), _known_load),
+)
+
+
+def _collect_edits(
+    pattern: Pattern,
+    instructions: list[Instruction],
+    facts: SlotFacts,
+) -> tuple[Edits, int]:
+    """Non-overlapping edits of one pattern over the whole function, and their count."""
+    edits: Edits = {}
+    count = 0
+    width = len(pattern.shape)
+    for b, block in enumerate(facts.blocks):
+        for i in range(block.start_idx, block.end_idx - width + 1):
+            window = instructions[i:i + width]
+            if not all(_kind(instr) in kinds for instr, kinds in zip(window, pattern.shape, strict=True)):
+                continue
+            found = pattern.rewrite(Match(instructions, i, facts, b))
+            if found is not None and not (found.keys() & edits.keys()):
+                edits.update(found)
+                count += 1
+    return edits, count
+
+
+def _apply(instructions: list[Instruction], edits: Edits) -> list[Instruction]:
+    result: list[Instruction] = []
+    for i, instr in enumerate(instructions):
+        result.extend(edits.get(i, [instr]))
+    return result
@@ -0,0 +1,62 @@
+"""Frequency-driven block ordering.
+
+Blocks are emitted in the order returned here instead of LLVM source
+order. Every block ends in an explicit jump, so any order is correct; a
+good one lets the hot successor of each block fall through, which saves
+an executed goto and keeps hot code within short branch range.
+
+The ordering is a greedy chain: starting at the entry, repeatedly place
+the hottest unplaced successor of the last block. When a chain ends, a
+new one starts at the hottest remaining block. Cold blocks (frequency 0)
+go last, in source order. Ties keep source order.
+"""
+
+from collections.abc import Mapping
+
+from jcc.ir.module import Function
+from jcc.ir.types import BlockLabel
+
+
+def layout_blocks(
+    func: Function,
+    frequencies: Mapping[BlockLabel, float],
+    successors: Mapping[BlockLabel, list[BlockLabel]],
+) -> tuple[BlockLabel, ...]:
+    """Order a function's blocks into hot fallthrough chains.
+
+    Args:
+        func: The function; its first block stays first.
+        frequencies: Relative execution frequency of each block.
+        successors: Successor labels of each block.
+
+    Returns:
+        Every block label of func, entry first.
+    """
+    labels = [block.label for block in func.blocks]
+    position = {label: i for i, label in enumerate(labels)}
+
+    def heat(label: BlockLabel, after: int) -> tuple[float, bool, int]:
+        # Hotter first; on a tie, the source-order successor, then earliest
+        return (frequencies.get(label, 0.0), position[label] == after + 1, -position[label])
+
+    order: list[BlockLabel] = []
+    placed: set[BlockLabel] = set()
+    current: BlockLabel | None = labels[0]
+    while current is not None:
+        order.append(current)
+        placed.add(current)
+
+        here = position[current]
+        chain = [
+            s for s in successors.get(current, [])
+            if s in position and s not in placed and frequencies.get(s, 0.0) > 0
+        ]
+        if not chain:
+            chain = [
+                label for label in labels
+                if label not in placed and frequencies.get(label, 0.0) > 0
+            ]
+        current = max(chain, key=lambda s: heat(s, here)) if chain else None
+
+    order.extend(label for label in labels if label not in placed)
+    return tuple(order)
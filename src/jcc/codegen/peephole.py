@@ -7,18 +7,28 @@ is needed because each pattern is independent.
 
 Peephole patterns must not cross label boundaries — a label is a potential
 branch target, so instructions before and after a label may not execute
-consecutively.
+consecutively. Patterns that need to see across labels live in
+jcc.codegen.global_peephole, which runs afterwards on slot dataflow.
 """
 
+from itertools import accumulate
+
+from jcc.analysis.cost import CostModel
+from jcc.analysis.frequency import LOOP_WEIGHT
 from jcc.codegen import ops
 from jcc.codegen.ops import Instruction
 
 
 def peephole_optimize(
-    instructions: list[Instruction], num_locals: int = 0
+    instructions: list[Instruction],
+    num_locals: int = 0,
+    costs: CostModel | None = None,
 ) -> tuple[list[Instruction], int]:
     """Apply all peephole optimizations.
 
+    With a cost model, the caching passes cache a value only where the
+    model says it saves time; without one they use fixed thresholds.
+
     Returns (optimized instructions, extra locals needed).
     The caller must add extra_locals to the function's .locals count.
     """
@@ -31,11 +41,12 @@ def peephole_optimize(
     result = optimize_cyclic_moves(result)
     result = fuse_materialized_branches(result)
     result = optimize_store_load_dup(result)
-    result, extra_locals = cache_frequent_constants(result, num_locals)
-    result, aref_locals = cache_array_refs(result, num_locals + extra_locals)
+    result, extra_locals = cache_frequent_constants(result, num_locals, costs)
+    result, aref_locals = cache_array_refs(result, num_locals + extra_locals, costs)
     extra_locals += aref_locals
-    result, sf_locals = cache_scalar_fields(result, num_locals + extra_locals)
+    result, sf_locals = cache_scalar_fields(result, num_locals + extra_locals, costs)
     extra_locals += sf_locals
+    result = order_cache_slots(result, num_locals, extra_locals)
     return result, extra_locals
 
 
@@ -575,24 +586,35 @@ def _try_fuse_bool(
 
 
 def cache_frequent_constants(
-    instructions: list[Instruction], num_locals: int = 0
+    instructions: list[Instruction],
+    num_locals: int = 0,
+    costs: CostModel | None = None,
 ) -> tuple[list[Instruction], int]:
     """Cache frequently-used iipush constants in local slots.
 
     For each iipush value appearing 3+ times, caches it in a local slot
-    at function start, replacing all occurrences with iload.
+    at function start, replacing all occurrences with iload. With a cost
+    model, a value is cached when its loop-weighted uses save more than
+    the iipush+istore in the prologue.
 
     Returns (optimized instructions, extra locals needed).
     """
     # Pass 1: count iipush value frequencies
     counts: dict[int, int] = {}
-    for instr in instructions:
+    for instr, weight in zip(instructions, _use_weights(instructions, costs)):
         if instr.mnemonic == "iipush":
             val = int(instr.operands[0])
-            counts[val] = counts.get(val, 0) + 1
+            counts[val] = counts.get(val, 0) + weight
 
-    # Filter to values with 3+ uses (break-even point)
-    cacheable = {val: count for val, count in counts.items() if count >= 3}
+    if costs is None:
+        # Filter to values with 3+ uses (break-even point)
+        cacheable = {val: count for val, count in counts.items() if count >= 3}
+    else:
+        cacheable = {
+            val: count
+            for val, count in counts.items()
+            if costs.saves("iipush", "iload", ("iipush", "istore"), count)
+        }
     if not cacheable:
         return instructions, 0
 
@@ -630,22 +652,33 @@ def cache_frequent_constants(
 
 
 def cache_array_refs(
-    instructions: list[Instruction], num_locals: int = 0
+    instructions: list[Instruction],
+    num_locals: int = 0,
+    costs: CostModel | None = None,
 ) -> tuple[list[Instruction], int]:
-    """Cache all getstatic_a loads in local aref slots.
+    """Cache getstatic_a loads in local aref slots.
 
     Every getstatic_a is hoisted to the prologue and replaced with aload.
     Even for single-use fields this is a net win: aload (6.1µs) is faster
-    than getstatic_a, and most functions are called from loops.
+    than getstatic_a, and most functions are called from loops. With a
+    cost model, only fields whose loop-weighted uses pay for the prologue
+    getstatic_a+astore are cached.
 
     Returns (optimized instructions, extra locals needed).
     """
     # Pass 1: collect all getstatic_a CP indices
     counts: dict[int, int] = {}
-    for instr in instructions:
+    for instr, weight in zip(instructions, _use_weights(instructions, costs)):
         if instr.mnemonic == "getstatic_a":
             cp = int(instr.operands[0])
-            counts[cp] = counts.get(cp, 0) + 1
+            counts[cp] = counts.get(cp, 0) + weight
+
+    if costs is not None:
+        counts = {
+            cp: count
+            for cp, count in counts.items()
+            if costs.saves("getstatic_a", "aload", ("getstatic_a", "astore"), count)
+        }
 
     if not counts:
         return instructions, 0
@@ -684,7 +717,9 @@ def cache_array_refs(
 
 
 def cache_scalar_fields(
-    instructions: list[Instruction], num_locals: int = 0
+    instructions: list[Instruction],
+    num_locals: int = 0,
+    costs: CostModel | None = None,
 ) -> tuple[list[Instruction], int]:
     """Cache repeated getstatic_s/getstatic_b loads in local slots.
 
@@ -694,19 +729,34 @@ def cache_scalar_fields(
     Every getstatic_s/getstatic_b is hoisted to the prologue and replaced
     with sload. Even for single-use fields this is a net win: sload (5.9µs)
     is faster than getstatic_s, and most functions are called from loops.
+    With a cost model, a field is cached only when its loop-weighted reads
+    save more than the prologue and the write-through dup+sstore cost.
 
     Returns (optimized instructions, extra locals needed).
     """
     # Pass 1: count getstatic_s/getstatic_b and putstatic_s/putstatic_b
     counts: dict[tuple[str, int], int] = {}  # (get_mnemonic, cp) -> count
-    for instr in instructions:
+    reads: dict[tuple[str, int], int] = {}
+    for instr, weight in zip(instructions, _use_weights(instructions, costs)):
         if instr.mnemonic in ("getstatic_s", "getstatic_b"):
             key = (instr.mnemonic, int(instr.operands[0]))
-            counts[key] = counts.get(key, 0) + 1
+            counts[key] = counts.get(key, 0) + weight
+            reads[key] = reads.get(key, 0) + weight
         elif instr.mnemonic in ("putstatic_s", "putstatic_b"):
             get_mn = "getstatic_s" if instr.mnemonic == "putstatic_s" else "getstatic_b"
             key = (get_mn, int(instr.operands[0]))
-            counts[key] = counts.get(key, 0) + 1
+            counts[key] = counts.get(key, 0) + weight
+
+    if costs is not None:
+        write_through = costs.sequence_cost(("dup", "sstore"))
+        counts = {
+            key: count
+            for key, count in counts.items()
+            if costs.saves(
+                key[0], "sload", (key[0], "sstore"), reads.get(key, 0),
+                extra=(count - reads.get(key, 0)) * write_through,
+            )
+        }
 
     if not counts:
         return instructions, 0
@@ -743,3 +793,111 @@ def cache_scalar_fields(
         result.append(instr)
 
     return init_prefix + result, extra_locals
+
+
+# === Cache slot ordering ===
+
+# Local load/store mnemonics (and their _N forms) by constructor
+_LOCAL_ACCESS = {
+    "sload": ops.sload,
+    "sstore": ops.sstore,
+    "iload": ops.iload,
+    "istore": ops.istore,
+    "aload": ops.aload,
+    "astore": ops.astore,
+}
+
+
+def _parse_local_access(instr: Instruction) -> tuple[str, int] | None:
+    """Extract (base mnemonic, slot) from a local load/store, or None."""
+    if instr.mnemonic in _LOCAL_ACCESS:
+        return instr.mnemonic, int(instr.operands[0])
+    base, _, suffix = instr.mnemonic.rpartition("_")
+    if base in _LOCAL_ACCESS and suffix.isdigit():
+        return base, int(suffix)
+    return None
+
+
+def order_cache_slots(
+    instructions: list[Instruction],
+    first_slot: int,
+    num_slots: int,
+) -> list[Instruction]:
+    """Renumber the caching passes' slots, most accessed first.
+
+    Each caching pass numbers its own caches, one pass after another, so
+    a hot array ref can sit behind every cached constant. This renumbers
+    the num_slots slots from first_slot together by loop-weighted access
+    count, so the hottest caches get the lowest numbers (and, in functions
+    with few locals, the one-byte load forms). INT constants stay two
+    slots wide.
+    """
+    if num_slots == 0:
+        return instructions
+
+    end = first_slot + num_slots
+    heat: dict[int, int] = {}
+    width: dict[int, int] = {}
+    for instr, weight in zip(instructions, _loop_weights(instructions)):
+        access = _parse_local_access(instr)
+        if access is not None and first_slot <= access[1] < end:
+            mnemonic, slot = access
+            heat[slot] = heat.get(slot, 0) + weight
+            width[slot] = 2 if mnemonic[0] == "i" else 1
+
+    renumber: dict[int, int] = {}
+    next_slot = first_slot
+    for slot in sorted(heat, key=lambda s: (-heat[s], s)):
+        renumber[slot] = next_slot
+        next_slot += width[slot]
+
+    result: list[Instruction] = []
+    for instr in instructions:
+        access = _parse_local_access(instr)
+        if access is not None and access[1] in renumber:
+            mnemonic, slot = access
+            result.append(_LOCAL_ACCESS[mnemonic](renumber[slot]))
+        else:
+            result.append(instr)
+    return result
+
+
+# === Use weighting ===
+
+
+def _use_weights(instructions: list[Instruction], costs: CostModel | None) -> list[int]:
+    """Estimated executions of each instruction per call, relative to one.
+
+    Without a cost model every instruction counts once. Otherwise each
+    level of loop nesting multiplies the weight by LOOP_WEIGHT.
+    """
+    if costs is None:
+        return [1] * len(instructions)
+    return _loop_weights(instructions)
+
+
+def _loop_weights(instructions: list[Instruction]) -> list[int]:
+    """LOOP_WEIGHT to the loop nesting depth of each instruction.
+
+    A backward branch to a label marks the instructions between them as
+    a loop.
+    """
+    label_at = {
+        instr.operands[0]: i for i, instr in enumerate(instructions) if instr.mnemonic == "label"
+    }
+
+    # Furthest backward branch to each label closes that label's loop
+    loop_end: dict[int, int] = {}
+    for i, instr in enumerate(instructions):
+        if instr.mnemonic == "label":
+            continue
+        for operand in instr.operands:
+            start = label_at.get(operand) if isinstance(operand, str) else None
+            if start is not None and start < i:
+                loop_end[start] = i
+
+    delta = [0] * (len(instructions) + 1)
+    for start, end in loop_end.items():
+        delta[start] += 1
+        delta[end + 1] -= 1
+    return [LOOP_WEIGHT**depth for depth in accumulate(delta[:-1])]
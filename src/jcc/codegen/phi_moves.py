@@ -16,11 +16,12 @@ from dataclasses import dataclass, field
 from typing import Callable
 
 from jcc.analysis.locals import FunctionLocals
-from jcc.analysis.offset_phi import OffsetPhiInfo
+from jcc.analysis.offset_phi import OffsetPhiInfo, OffsetStep
 from jcc.analysis.phi import PhiInfo
 from jcc.codegen import ops
+from jcc.ir.facts import FunctionFacts
 from jcc.ir.module import Block
-from jcc.ir.types import BlockLabel, JCType
+from jcc.ir.types import BlockLabel, JCType, SSAName
 from jcc.ir.values import Const, GlobalRef, InlineGEP, SSARef, Undef
 
 # Type alias for emit callback
@@ -45,14 +46,21 @@ class SlotSource:
     source_type: JCType | None = None  # Set when source type differs from dest type
 
 
-PhiMoveSource = ConstSource | SlotSource
+@dataclass(frozen=True)
+class StepSource:
+    """Phi source is the destination slot plus a constant (an induction step)."""
+
+    delta: int
+
+
+PhiMoveSource = ConstSource | SlotSource | StepSource
 
 
 @dataclass(frozen=True)
 class PhiMove:
     """A single phi move at a control flow edge.
 
-    Represents: dest_slot := source (constant or slot)
+    Represents: dest_slot := source (constant, slot, or dest_slot + step)
     """
 
     dest_slot: int
@@ -150,6 +158,10 @@ def build_phi_moves(
             offset_or_name = offset_phi_info.get_offset(instr.result, from_block)
             if isinstance(offset_or_name, int):
                 source = ConstSource(value=offset_or_name)
+            elif isinstance(offset_or_name, OffsetStep):
+                if offset_or_name.delta == 0:
+                    continue
+                source = StepSource(delta=offset_or_name.delta)
             else:
                 source_slot = locals.get_slot(offset_or_name)
                 if source_slot == dest_slot:
@@ -223,6 +235,98 @@ def build_all_phi_moves(
     return result
 
 
+def hoist_step_moves(
+    block: Block,
+    moves: dict[BlockLabel, list[PhiMove]],
+    locals: FunctionLocals,
+    offset_phi_info: OffsetPhiInfo | None,
+    facts: FunctionFacts,
+) -> list[PhiMove]:
+    """Take induction steps off a conditional back edge, to run before the branch.
+
+    Moves on one edge of a conditional branch need their own block and a
+    goto. An offset phi stepped on a loop's back edge (see jcc.opt.ivsr) is
+    dead on the loop's exits when all its users are inside the loop, so its
+    sinc can run in the latch instead, as long as the branch condition and
+    the other moves on the edge do not read it.
+
+    Args:
+        block: The latch block.
+        moves: Phi moves per successor of block. Hoisted moves are removed.
+        locals: Slot assignments and types
+        offset_phi_info: Offset phi detection results
+        facts: Def/use maps, CFG and loops of the function
+
+    Returns:
+        The hoisted step moves, to emit before the branch.
+    """
+    successors = facts.successors.get(block.label, [])
+    if offset_phi_info is None or len(successors) < 2:
+        return []
+
+    hoisted: list[PhiMove] = []
+    for header in successors:
+        body = facts.loops.get(header)
+        if body is None or block.label not in body or header not in moves:
+            continue
+        if any(s in body for s in successors if s != header):
+            continue
+        header_block = facts.func.block_map[header]
+        for phi in header_block.phi_instructions:
+            if not offset_phi_info.is_offset_phi(phi.result):
+                continue
+            if not isinstance(offset_phi_info.get_offset(phi.result, block.label), OffsetStep):
+                continue
+            slot = locals.get_slot(phi.result)
+            move = next(
+                (
+                    m for m in moves[header]
+                    if m.dest_slot == slot and isinstance(m.source, StepSource)
+                ),
+                None,
+            )
+            if move is None or any(
+                isinstance(m.source, SlotSource) and m.source.slot == slot for m in moves[header]
+            ):
+                continue
+            if not _used_only_in(phi.result, body, facts):
+                continue
+            if any(
+                _reads(op.name, phi.result, facts, locals)
+                for op in block.terminator.operands if isinstance(op, SSARef)
+            ):
+                continue
+            moves[header].remove(move)
+            hoisted.append(move)
+        if not moves[header]:
+            del moves[header]
+    return hoisted
+
+
+def _used_only_in(name: SSAName, body: frozenset[BlockLabel], facts: FunctionFacts) -> bool:
+    """Whether every use of name is in a block of body."""
+    ref = SSARef(name=name)
+    return all(
+        ref not in instr.operands
+        for block in facts.func.blocks if block.label not in body
+        for instr in block.all_instructions
+    )
+
+
+def _reads(name: SSAName, target: SSAName, facts: FunctionFacts, locals: FunctionLocals) -> bool:
+    """Whether evaluating name reads target's slot: name's tree, up to slotted values."""
+    if name == target:
+        return True
+    if locals.has_slot(name):
+        return False
+    defn = facts.def_map.get(name)
+    if defn is None:
+        return False
+    return any(
+        _reads(op.name, target, facts, locals) for op in defn.operands if isinstance(op, SSARef)
+    )
+
+
 # === Emitting Phi Moves ===
 
 
@@ -230,6 +334,11 @@ def _emit_source_load(move: PhiMove, emit_fn: EmitFn) -> None:
     """Emit a source load, with type conversion if source type differs from dest type."""
     if isinstance(move.source, ConstSource):
         emit_fn(ops.const_for_type(move.source.value, move.dest_type))
+    elif isinstance(move.source, StepSource):
+        # Peephole turns load/const/add/store of one slot into sinc
+        emit_fn(ops.load_for_type(move.dest_slot, move.dest_type))
+        emit_fn(ops.const_for_type(move.source.delta, move.dest_type))
+        emit_fn(ops.sadd() if move.dest_type != JCType.INT else ops.iadd())
     elif move.source.source_type is not None:
         # Source type differs from dest (e.g., INT index → SHORT offset phi)
         emit_fn(ops.load_for_type(move.source.slot, move.source.source_type))
@@ -162,7 +162,7 @@ class BasicBlock:
     label: BlockLabel | None = None  # Label if block starts with one
 
 
-def _build_basic_blocks(instructions: list[Instruction]) -> list[BasicBlock]:
+def build_basic_blocks(instructions: list[Instruction]) -> list[BasicBlock]:
     """Build basic blocks from instruction list.
 
     Block boundaries are:
@@ -201,7 +201,7 @@ def _build_basic_blocks(instructions: list[Instruction]) -> list[BasicBlock]:
     return blocks
 
 
-def _build_label_to_block(blocks: list[BasicBlock]) -> dict[BlockLabel, int]:
+def build_label_to_block(blocks: list[BasicBlock]) -> dict[BlockLabel, int]:
     """Build mapping from labels to block indices."""
     result: dict[BlockLabel, int] = {}
     for i, block in enumerate(blocks):
@@ -210,6 +210,40 @@ def _build_label_to_block(blocks: list[BasicBlock]) -> dict[BlockLabel, int]:
     return result
 
 
+def block_successors(
+    instructions: list[Instruction],
+    blocks: list[BasicBlock],
+    label_to_block: dict[BlockLabel, int],
+    block_idx: int,
+) -> list[int]:
+    """Indices of the blocks control can pass to from the end of a block."""
+    block = blocks[block_idx]
+    successors: list[int] = []
+
+    # Check last instruction for branches
+    last_idx = block.end_idx - 1
+    if last_idx >= block.start_idx:
+        last_instr = instructions[last_idx]
+
+        if _is_branch(last_instr):
+            # Add branch targets
+            for target in _get_branch_targets(last_instr):
+                if target in label_to_block:
+                    successors.append(label_to_block[target])
+
+            # Conditional branches also fall through
+            if last_instr.mnemonic in _COND_BRANCHES:
+                if block_idx + 1 < len(blocks):
+                    successors.append(block_idx + 1)
+
+        elif not _is_terminator(last_instr):
+            # Fall through to next block
+            if block_idx + 1 < len(blocks):
+                successors.append(block_idx + 1)
+
+    return successors
+
+
 def compute_max_stack(instructions: list[Instruction] | tuple[Instruction, ...]) -> int:
     """Compute maximum stack depth via CFG analysis.
 
@@ -224,11 +258,11 @@ def compute_max_stack(instructions: list[Instruction] | tuple[Instruction, ...])
         return 2  # Minimum safety margin
 
     # Build CFG
-    blocks = _build_basic_blocks(instr_list)
+    blocks = build_basic_blocks(instr_list)
     if not blocks:
         return 2
 
-    label_to_block = _build_label_to_block(blocks)
+    label_to_block = build_label_to_block(blocks)
 
     # Worklist algorithm
     # entry_depths[block_idx] = stack depth when entering that block
@@ -254,29 +288,7 @@ def compute_max_stack(instructions: list[Instruction] | tuple[Instruction, ...])
             depth += pushes
             max_depth = max(max_depth, depth)
 
-        # Find successors
-        successors: list[int] = []
-
-        # Check last instruction for branches
-        last_idx = block.end_idx - 1
-        if last_idx >= block.start_idx:
-            last_instr = instr_list[last_idx]
-
-            if _is_branch(last_instr):
-                # Add branch targets
-                for target in _get_branch_targets(last_instr):
-                    if target in label_to_block:
-                        successors.append(label_to_block[target])
-
-                # Conditional branches also fall through
-                if last_instr.mnemonic in _COND_BRANCHES:
-                    if block_idx + 1 < len(blocks):
-                        successors.append(block_idx + 1)
-
-            elif not _is_terminator(last_instr):
-                # Fall through to next block
-                if block_idx + 1 < len(blocks):
-                    successors.append(block_idx + 1)
+        successors = block_successors(instr_list, blocks, label_to_block, block_idx)
 
         # Propagate to successors
         for succ_idx in successors:
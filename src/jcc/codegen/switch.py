@@ -0,0 +1,325 @@
+"""Switch lowering plans.
+
+A switch can dispatch through one stableswitch, one slookupswitch, a chain
+of equality tests, or a binary tree of range tests (value < pivot) whose
+leaves are any of those. Hot cases can also be tested first and the rest
+dispatched by a table or lookup. plan_switch picks the mix with the lowest
+expected cost under a CostModel.
+
+Expected cost weighs each case by how often it is taken. Without profile
+weights every case, and the default, is equally likely. Default values are
+spread over the case ranges in proportion to their number of cases.
+
+Every probe reloads the switch value, so a value that is not already in a
+local is stored to a temp first unless the plan is a single table or
+lookup. The costs of all plans are stack-neutral sequences, so comparing
+them is exact under the cost model's zero point (see jcc.analysis.cost).
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import cache
+
+from jcc.analysis.cost import CostModel
+from jcc.analysis.locals import Limits
+from jcc.ir.types import BlockLabel, JCType
+
+# Longest chain of equality tests considered for one range
+MAX_COMPARE_CHAIN = 6
+
+# Hottest cases that may be tested ahead of a table or lookup
+MAX_PEELED = 3
+
+# Ranges with more cases try only their widest gaps (and the weighted
+# median) as split points, keeping planning fast
+_ALL_SPLITS_LIMIT = 16
+_WIDEST_GAPS = 4
+
+Cases = tuple[tuple[int, BlockLabel], ...]
+
+
+@dataclass(frozen=True)
+class TableLeaf:
+    """A tableswitch over [low, high]; values in range but not in cases go to default."""
+
+    low: int
+    high: int
+    cases: Cases
+
+
+@dataclass(frozen=True)
+class LookupLeaf:
+    """A lookupswitch over cases."""
+
+    cases: Cases
+
+
+@dataclass(frozen=True)
+class CompareChain:
+    """Equality tests in order, then rest (None: go to default)."""
+
+    cases: Cases
+    rest: SwitchPlan | None = None
+
+
+@dataclass(frozen=True)
+class RangeSplit:
+    """Values below pivot dispatch through below, the rest through above."""
+
+    pivot: int
+    below: SwitchPlan
+    above: SwitchPlan
+
+
+SwitchPlan = TableLeaf | LookupLeaf | CompareChain | RangeSplit
+
+
+def cases_of(plan: SwitchPlan) -> Cases:
+    """Every case a plan dispatches, in plan order."""
+    match plan:
+        case TableLeaf(cases=cases) | LookupLeaf(cases=cases):
+            return cases
+        case CompareChain(cases=cases, rest=rest):
+            return cases + (cases_of(rest) if rest is not None else ())
+        case RangeSplit(below=below, above=above):
+            return cases_of(below) + cases_of(above)
+
+
+@dataclass(frozen=True)
+class _Priced:
+    """A plan with its weighted cost and approximate size in bytes."""
+
+    cost: float
+    size: int
+    plan: SwitchPlan
+
+    def key(self) -> tuple[float, int]:
+        return (round(self.cost, 6), self.size)
+
+
+def plan_switch(
+    cases: Cases,
+    ty: JCType,
+    costs: CostModel,
+    limits: Limits,
+    weights: Mapping[BlockLabel, float] | None = None,
+    default: BlockLabel | None = None,
+    in_slot: bool = True,
+) -> SwitchPlan:
+    """Choose how to dispatch a switch.
+
+    Args:
+        cases: (value, target) pairs; must not be empty.
+        ty: Type of the switch value, SHORT or INT.
+        costs: Cost model to price the candidates with.
+        limits: Table size limits (switch_max_range, switch_density_threshold).
+        weights: Relative frequency of each target block, if known. A
+            target's weight is shared by the cases that lead to it.
+        default: Default target, to look up its weight.
+        in_slot: Whether the value is already in a local, so each probe
+            reloads it without first storing it to a temp.
+
+    Returns:
+        The cheapest plan.
+    """
+    ordered = tuple(sorted(cases))
+    case_weight, default_weight = _case_weights(ordered, weights, default)
+    return _Planner(ordered, case_weight, default_weight, ty, costs, limits).best(in_slot)
+
+
+def _case_weights(
+    cases: Cases,
+    weights: Mapping[BlockLabel, float] | None,
+    default: BlockLabel | None,
+) -> tuple[tuple[float, ...], float]:
+    """Weight of each case and of the default, uniform without a profile."""
+    uniform = (tuple(1.0 for _ in cases), 1.0)
+    if weights is None:
+        return uniform
+
+    sharing: dict[BlockLabel, int] = {}
+    for _, target in cases:
+        sharing[target] = sharing.get(target, 0) + 1
+    per_case = tuple(weights.get(target, 0.0) / sharing[target] for _, target in cases)
+    if default is None or default in sharing:
+        default_weight = 0.0
+    else:
+        default_weight = weights.get(default, 0.0)
+
+    if sum(per_case) + default_weight <= 0:
+        return uniform
+    return per_case, default_weight
+
+
+class _Planner:
+    """Memoized search over contiguous ranges of the sorted cases."""
+
+    def __init__(
+        self,
+        cases: Cases,
+        weights: tuple[float, ...],
+        default_weight: float,
+        ty: JCType,
+        costs: CostModel,
+        limits: Limits,
+    ) -> None:
+        self.cases = cases
+        self.weights = weights
+        self.default_share = default_weight / len(cases)
+        self.prefix = [0.0]
+        for w in weights:
+            self.prefix.append(self.prefix[-1] + w)
+        self.ty = ty
+        self.costs = costs
+        self.limits = limits
+
+        wide = ty == JCType.INT
+        self.load = costs.cost("iload" if wide else "sload")
+        self.store = costs.cost("istore" if wide else "sstore")
+        self.table = costs.cost("itableswitch" if wide else "stableswitch")
+        # INT compares go through icmp and a compare-to-zero branch
+        self.int_compare = costs.sequence_cost(("icmp", "ifeq"))
+
+        # Probe costs against each case value
+        self.equal_cost = [self.equal_test(value) for value, _ in cases]
+        self.less_cost = [self.less_test(value) for value, _ in cases]
+
+        self.range = cache(self._range)
+
+    # --- Probe costs ---
+
+    def equal_test(self, value: int) -> float:
+        """Load, compare against value, branch if equal."""
+        if self.ty == JCType.INT:
+            return self.load + self.costs.const_cost(value, self.ty) + self.int_compare
+        if value == 0:
+            return self.load + self.costs.cost("ifeq")
+        return self.load + self.costs.const_cost(value, self.ty) + self.costs.cost("if_scmpeq")
+
+    def less_test(self, pivot: int) -> float:
+        """Load, compare against pivot, branch if greater or equal."""
+        if self.ty == JCType.INT:
+            return self.load + self.costs.const_cost(pivot, self.ty) + self.int_compare
+        return self.load + self.costs.const_cost(pivot, self.ty) + self.costs.cost("if_scmplt")
+
+    # --- Ranges ---
+
+    def mass(self, i: int, j: int) -> float:
+        """Weight of values dispatched through cases[i..j], default included."""
+        return self.prefix[j + 1] - self.prefix[i] + self.default_share * (j - i + 1)
+
+    def leaves(self, i: int, j: int) -> list[_Priced]:
+        """Single table or lookup over cases[i..j], priced with their load."""
+        cases = self.cases[i : j + 1]
+        mass = self.mass(i, j)
+        low, high = cases[0][0], cases[-1][0]
+        span = high - low + 1
+
+        leaves = [
+            _Priced(
+                mass * (self.load + self.costs.lookupswitch_cost(len(cases))),
+                9 + 6 * len(cases),
+                LookupLeaf(cases),
+            )
+        ]
+        if (
+            span <= self.limits.switch_max_range
+            and len(cases) / span > self.limits.switch_density_threshold
+        ):
+            leaves.append(
+                _Priced(mass * (self.load + self.table), 11 + 2 * span, TableLeaf(low, high, cases))
+            )
+        return leaves
+
+    def chain(self, order: list[int], rest: _Priced | None, rest_mass: float) -> _Priced:
+        """Equality tests of cases in order, then rest or the default."""
+        cost = 0.0
+        spent = 0.0
+        for k in order:
+            spent += self.equal_cost[k]
+            cost += self.weights[k] * spent
+        cost += rest_mass * spent
+        size = 6 * len(order)
+        if rest is None:
+            return _Priced(cost, size + 3, CompareChain(tuple(self.cases[k] for k in order)))
+        return _Priced(
+            cost + rest.cost,
+            size + rest.size,
+            CompareChain(tuple(self.cases[k] for k in order), rest.plan),
+        )
+
+    def splits(self, i: int, j: int) -> list[int]:
+        """Indices s where cases[i..s] and cases[s+1..j] may be split."""
+        if j - i + 1 <= _ALL_SPLITS_LIMIT:
+            return list(range(i, j))
+        half = self.mass(i, j) / 2
+        median = i
+        while median < j - 1 and self.mass(i, median) < half:
+            median += 1
+        # Widest first; among equal gaps, the most balanced
+        gaps = sorted(
+            range(i, j),
+            key=lambda s: (self.cases[s][0] - self.cases[s + 1][0], abs(s - median), s),
+        )
+        return sorted(set(gaps[:_WIDEST_GAPS]) | {median})
+
+    def _range(self, i: int, j: int) -> _Priced:
+        """Cheapest plan for cases[i..j], each probe loading the value."""
+        candidates = self.leaves(i, j)
+
+        n = j - i + 1
+        if n <= MAX_COMPARE_CHAIN:
+            hottest = sorted(range(i, j + 1), key=lambda k: (-self.weights[k], k))
+            candidates.append(self.chain(hottest, None, self.default_share * n))
+
+        mass = self.mass(i, j)
+        for s in self.splits(i, j):
+            below, above = self.range(i, s), self.range(s + 1, j)
+            candidates.append(
+                _Priced(
+                    mass * self.less_cost[s + 1] + below.cost + above.cost,
+                    7 + below.size + above.size,
+                    RangeSplit(self.cases[s + 1][0], below.plan, above.plan),
+                )
+            )
+        return min(candidates, key=_Priced.key)
+
+    # --- Whole switch ---
+
+    def best(self, in_slot: bool) -> SwitchPlan:
+        last = len(self.cases) - 1
+        mass = self.mass(0, last)
+
+        candidates = [self.range(0, last)]
+        if len(self.cases) > 1:
+            candidates.extend(self.peeled())
+
+        if in_slot:
+            return min(candidates, key=_Priced.key).plan
+
+        # The value is on the stack for the first probe. A lone table or
+        # lookup uses it there; anything else stores it to a temp first.
+        leaves = [
+            _Priced(p.cost - mass * self.load, p.size, p.plan) for p in self.leaves(0, last)
+        ]
+        stored = [_Priced(p.cost + mass * self.store, p.size + 2, p.plan) for p in candidates]
+        return min(leaves + stored, key=_Priced.key).plan
+
+    def peeled(self) -> list[_Priced]:
+        """Hottest cases tested first, the rest dispatched by a table or lookup."""
+        hottest = sorted(range(len(self.cases)), key=lambda k: (-self.weights[k], k))
+        plans: list[_Priced] = []
+        for count in range(1, min(MAX_PEELED, len(self.cases) - 1) + 1):
+            peeled = hottest[:count]
+            rest = _Planner(
+                tuple(c for k, c in enumerate(self.cases) if k not in peeled),
+                tuple(w for k, w in enumerate(self.weights) if k not in peeled),
+                self.default_share * len(self.cases),
+                self.ty,
+                self.costs,
+                self.limits,
+            )
+            last = len(rest.cases) - 1
+            best_rest = min(rest.leaves(0, last), key=_Priced.key)
+            plans.append(self.chain(peeled, best_rest, rest.mass(0, last)))
+        return plans
@@ -0,0 +1,111 @@
+#pragma once
+
+// jcc_fb_delta.h - Delta-encoded framebuffer replies
+//
+// Include after the demo's jcc_fb.h, which defines framebuffer and FB_SIZE,
+// and reply to frame requests with fb_send(apdu, buffer[APDU_P1]). Drivers
+// opt in with `fb_encoding = "delta"` under [driver] in jcc.toml (see
+// jcc.driver.screen.FrameDecoder); P1 of the request picks the reply:
+//
+//   P1 = 0                                 framebuffer as is
+//   P1 = FB_P1_DELTA | FB_P1_KEYFRAME      flags=KEYFRAME block, framebuffer
+//   P1 = FB_P1_DELTA                       flags=0 block, bitmap, dirty blocks
+//
+// The framebuffer is split into blocks of FB_DELTA_BLOCK bytes (the last may
+// be short). The bitmap has one bit per block, MSB first, set when the block
+// changed since the previous delta or keyframe reply; the changed blocks
+// follow in order. A demo with a column layout can set FB_DELTA_BLOCK to its
+// column size, so a dirty bit is a dirty column.
+//
+// Costs FB_SIZE + FB_DELTA_BITMAP bytes of globals. FB_DELTA_BLOCK is at
+// most 255, so it fits the reply's block byte.
+
+#ifndef FB_DELTA_BLOCK
+#define FB_DELTA_BLOCK 8
+#endif
+
+#define FB_P1_DELTA 0x01
+#define FB_P1_KEYFRAME 0x02
+
+#define FB_DELTA_KEYFRAME 0x01
+
+#define FB_DELTA_HEADER 2
+#define FB_DELTA_BLOCKS ((FB_SIZE + FB_DELTA_BLOCK - 1) / FB_DELTA_BLOCK)
+#define FB_DELTA_BITMAP ((FB_DELTA_BLOCKS + 7) / 8)
+
+// The frame the driver holds, as of the last delta or keyframe reply
+byte fb_delta_prev[FB_SIZE];
+byte fb_delta_dirty[FB_DELTA_BITMAP];
+
+// Send the framebuffer as the reply to a frame request with the given P1.
+void fb_send(APDU apdu, byte p1) {
+    byte *buffer;
+    short block;
+    short off;
+    short len;
+    short start;
+    short total;
+    byte mask;
+
+    APDU_setOutgoing(apdu);
+
+    if ((p1 & FB_P1_DELTA) == 0) {
+        APDU_setOutgoingLength(apdu, FB_SIZE);
+        APDU_sendBytesLong(apdu, framebuffer, 0, FB_SIZE);
+        return;
+    }
+
+    buffer = APDU_getBuffer(apdu);
+    buffer[1] = (byte)FB_DELTA_BLOCK;
+
+    if (p1 & FB_P1_KEYFRAME) {
+        buffer[0] = FB_DELTA_KEYFRAME;
+        Util_arrayCopyNonAtomic(framebuffer, 0, fb_delta_prev, 0, FB_SIZE);
+        APDU_setOutgoingLength(apdu, FB_DELTA_HEADER + FB_SIZE);
+        APDU_sendBytes(apdu, 0, FB_DELTA_HEADER);
+        APDU_sendBytesLong(apdu, framebuffer, 0, FB_SIZE);
+        return;
+    }
+    buffer[0] = 0;
+
+    // Mark the blocks that differ from the driver's copy
+    memset_bytes_at(fb_delta_dirty, 0, 0, FB_DELTA_BITMAP);
+    total = 0;
+    for (block = 0; block < FB_DELTA_BLOCKS; block++) {
+        off = block * FB_DELTA_BLOCK;
+        len = FB_SIZE - off;
+        if (len > FB_DELTA_BLOCK)
+            len = FB_DELTA_BLOCK;
+        if (Util_arrayCompare(framebuffer, off, fb_delta_prev, off, len) != 0) {
+            mask = (byte)(0x80 >> (block & 7));
+            fb_delta_dirty[block >> 3] =
+                (byte)((fb_delta_dirty[block >> 3] & 0xFF) |
+                       (mask & 0xFF)); // jcc:ignore-sign-extension
+            total = total + len;
+        }
+    }
+
+    APDU_setOutgoingLength(apdu, FB_DELTA_HEADER + FB_DELTA_BITMAP + total);
+    APDU_sendBytes(apdu, 0, FB_DELTA_HEADER);
+    APDU_sendBytesLong(apdu, fb_delta_dirty, 0, FB_DELTA_BITMAP);
+
+    // Send each run of dirty blocks with one call, and remember it as sent
+    start = -1;
+    for (block = 0; block <= FB_DELTA_BLOCKS; block++) {
+        off = block * FB_DELTA_BLOCK;
+        mask = 0;
+        if (block < FB_DELTA_BLOCKS)
+            mask = (byte)((fb_delta_dirty[block >> 3] & 0xFF) &
+                          (0x80 >> (block & 7))); // jcc:ignore-sign-extension
+        if (mask != 0) {
+            if (start < 0)
+                start = off;
+        } else if (start >= 0) {
+            if (off > FB_SIZE)
+                off = FB_SIZE;
+            APDU_sendBytesLong(apdu, framebuffer, start, off - start);
+            Util_arrayCopyNonAtomic(framebuffer, start, fb_delta_prev, start, off - start);
+            start = -1;
+        }
+    }
+}
@@ -3,6 +3,7 @@
 from .apdu import build_apdu, parse_response
 from .base import BaseDriver
 from .config import ControlsConfig, DriverConfig, load_config
+from .daemon import SessionDaemon, stop_daemon
 from .display import DisplayConfig, GameDisplay
 from .screen import Framebuffer, ScreenConfig
 from .session import (
@@ -26,6 +27,9 @@ __all__ = [
     "ControlsConfig",
     "DriverConfig",
     "load_config",
+    # Daemon
+    "SessionDaemon",
+    "stop_daemon",
     # Display
     "DisplayConfig",
     "GameDisplay",
@@ -9,7 +9,7 @@ from pathlib import Path
 from .apdu import build_apdu
 from .config import DriverConfig, load_config
 from .display import DisplayConfig, GameDisplay
-from .screen import Framebuffer
+from .screen import Framebuffer, FrameDecoder
 from .session import CardSession, Session, SimSession, get_session, load_applet, load_applet_card, unload_applet
 
 
@@ -82,18 +82,27 @@ class BaseDriver:
             print("No screen configuration", file=sys.stderr)
             return
 
+        frames = FrameDecoder(self.config.screen)
         with self.get_session(backend) as session:
             for i in range(frame + 1):
                 apdu = build_apdu(
                     self.INS_FRAME,
+                    p1=frames.p1,
                     data=self.get_initial_input(),
-                    ne=self.config.screen.framebuffer_size,
+                    ne=self.config.screen.reply_size,
                 )
                 data, sw = session.send(apdu)
 
                 if sw != 0x9000:
                     print(f"Error at frame {i}: SW={sw:04X}", file=sys.stderr)
                     return
+                # A corrupt delta is dropped; the next request asks for a keyframe
+                try:
+                    data = frames.decode(data)
+                except ValueError as e:
+                    print(f"Bad frame {i}: {e}", file=sys.stderr)
+                    if i == frame:
+                        return
 
             fb = Framebuffer(self.config.screen, data)
             if hex_mode:
@@ -116,6 +125,7 @@ class BaseDriver:
             return
 
         term = Terminal()
+        frames = FrameDecoder(self.config.screen)
         frame_time = 1.0 / self.config.target_fps
         frame_count = 0
         mode = "CARD" if backend == "card" else "SIM"
@@ -241,14 +251,19 @@ class BaseDriver:
             if not self.config.continuous_frames:
                 apdu = build_apdu(
                     self.INS_FRAME,
+                    p1=frames.p1,
                     data=self.get_initial_input(),
-                    ne=self.config.screen.framebuffer_size,
+                    ne=self.config.screen.reply_size,
                 )
                 data, sw = session.send(apdu)
                 if sw == 0x9000:
-                    fb = Framebuffer(self.config.screen, data)
-                    output = display.render(term, fb, 0, mode, 0, 0, set())
-                    print(output, end="", flush=True)
+                    try:
+                        fb = Framebuffer(self.config.screen, frames.decode(data))
+                    except ValueError:
+                        pass  # The first input's frame requests a keyframe
+                    else:
+                        output = display.render(term, fb, 0, mode, 0, 0, set())
+                        print(output, end="", flush=True)
 
             while running:
                 frame_start = time.time()
@@ -308,8 +323,9 @@ class BaseDriver:
                 # Send frame request
                 apdu = build_apdu(
                     self.INS_FRAME,
+                    p1=frames.p1,
                     data=input_data,
-                    ne=self.config.screen.framebuffer_size,
+                    ne=self.config.screen.reply_size,
                 )
                 data, sw = session.send(apdu)
 
@@ -317,28 +333,34 @@ class BaseDriver:
                     print(term.home + term.clear + f"Error: SW={sw:04X}")
                     return
 
-                # Render
-                fb = Framebuffer(self.config.screen, data)
-                frame_count += 1
-
-                # Calculate FPS
-                now = time.time()
-                elapsed = now - last_time
-                fps = 1.0 / elapsed if elapsed > 0 else 0
-                last_time = now
-
-                # Track peak frame time
-                frame_time_ms = (time.time() - frame_start) * 1000
-                frame_times.append((now, frame_time_ms))
-                cutoff = now - 5.0
-                peak_ms = max((ft for ts, ft in frame_times if ts > cutoff), default=0.0)
-
-                # Render with GameDisplay
-                output = display.render(term, fb, frame_count, mode, fps, peak_ms, keys_held)
-                print(output, end="", flush=True)
+                # Render; a corrupt delta is dropped, and the next request
+                # asks for a keyframe
+                try:
+                    data = frames.decode(data)
+                except ValueError:
+                    data = None
+                if data is not None:
+                    fb = Framebuffer(self.config.screen, data)
+                    frame_count += 1
+
+                    # Calculate FPS
+                    now = time.time()
+                    elapsed = now - last_time
+                    fps = 1.0 / elapsed if elapsed > 0 else 0
+                    last_time = now
+
+                    # Track peak frame time
+                    frame_time_ms = (time.time() - frame_start) * 1000
+                    frame_times.append((now, frame_time_ms))
+                    cutoff = now - 5.0
+                    peak_ms = max((ft for ts, ft in frame_times if ts > cutoff), default=0.0)
+
+                    # Render with GameDisplay
+                    output = display.render(term, fb, frame_count, mode, fps, peak_ms, keys_held)
+                    print(output, end="", flush=True)
 
-                # Post-frame hook
-                self.post_frame(session, data)
+                    # Post-frame hook
+                    self.post_frame(session, data)
 
                 # Without Kitty protocol, clear keys after each frame
                 if not use_kitty:
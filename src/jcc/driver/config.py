@@ -92,6 +92,10 @@ def load_config(demo_dir: Path) -> DriverConfig:
             height=driver["screen_height"],
             pixel_format=driver.get("pixel_format", "2bpp"),
             palette=palette,
+            layout=driver.get("fb_layout", "row"),
+            encoding=driver.get("fb_encoding", "raw"),
+            delta_block=driver.get("fb_delta_block", 8),
+            keyframe_interval=driver.get("fb_keyframe_interval", 60),
         )
 
     # Controls config
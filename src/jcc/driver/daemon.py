@@ -0,0 +1,133 @@
+"""Session daemon: one card session shared over a Unix socket.
+
+Holding the session in a long-lived process keeps the card or simulator
+from being reset between driver runs. Clients connect with DaemonSession
+and speak the protocol in jcc.driver.protocol. Each connection is served
+on its own thread; APDUs from all connections go through the one session
+in turn.
+
+Usage:
+    with CardSession(aid) as session:
+        SessionDaemon(session).serve_forever()
+"""
+
+import os
+import socket
+import socketserver
+import sys
+import threading
+
+from .protocol import (
+    DEFAULT_SOCKET,
+    PROTOCOL_VERSION,
+    Op,
+    ProtocolError,
+    decode_apdus,
+    encode_frame,
+    encode_response,
+    encode_responses,
+    read_frame,
+)
+from .session import Session
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Serves the requests of one client connection, in order."""
+
+    server: _Server
+
+    def handle(self) -> None:
+        while True:
+            try:
+                frame = read_frame(self.rfile)
+            except ProtocolError as e:
+                self.wfile.write(encode_frame(Op.ERROR, 0, str(e).encode()))
+                return
+            if frame is None:
+                return
+            op, request_id, payload = frame
+            try:
+                reply_op, reply = self.server.session_daemon.handle(op, payload)
+            except (RuntimeError, OSError, ValueError) as e:
+                # Session and protocol errors (ProtocolError is a RuntimeError)
+                reply_op, reply = Op.ERROR, str(e).encode()
+            except Exception as e:
+                # Anything else (a reader library's own errors) still gets a
+                # reply before it ends the connection
+                self.wfile.write(encode_frame(Op.ERROR, request_id, str(e).encode()))
+                raise
+            self.wfile.write(encode_frame(reply_op, request_id, reply))
+            if op == Op.QUIT:
+                # shutdown() waits for serve_forever(), so not from this thread
+                threading.Thread(target=self.server.shutdown).start()
+                return
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, daemon: SessionDaemon):
+        self.session_daemon = daemon
+        super().__init__(socket_path, _Handler)
+
+
+class SessionDaemon:
+    """Serves a session to DaemonSession clients over a Unix socket."""
+
+    def __init__(self, session: Session, socket_path: str = DEFAULT_SOCKET):
+        """
+        Bind the daemon's socket.
+
+        Args:
+            session: Open session that every APDU is sent through.
+            socket_path: Unix socket to listen on. A stale socket file left
+                by a previous daemon is replaced.
+        """
+        self.session = session
+        self.socket_path = socket_path
+        self._lock = threading.Lock()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self._server = _Server(socket_path, self)
+
+    def handle(self, op: Op, payload: bytes) -> tuple[Op, bytes]:
+        """Carry out one request and return its reply (op, payload)."""
+        if op in (Op.PING, Op.QUIT):
+            return Op.OK, bytes([PROTOCOL_VERSION])
+        if op == Op.APDU:
+            with self._lock:
+                return Op.RESPONSE, encode_response(*self.session.send_raw(payload))
+        if op == Op.BATCH:
+            apdus = decode_apdus(payload)
+            with self._lock:
+                responses = self.session.send_many(apdus)
+            return Op.BATCH_RESPONSE, encode_responses(responses)
+        raise ProtocolError(f"Unexpected request {op.name}")
+
+    def serve_forever(self) -> None:
+        """Serve clients until one sends QUIT, then remove the socket."""
+        print(f"Session daemon listening on {self.socket_path}", file=sys.stderr)
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+            print("Session daemon stopped", file=sys.stderr)
+
+    def close(self) -> None:
+        """Stop listening and remove the socket (the session stays open)."""
+        self._server.server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def stop_daemon(socket_path: str = DEFAULT_SOCKET) -> bool:
+    """Ask the daemon at socket_path to exit. Returns False if none answered."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            sock.sendall(encode_frame(Op.QUIT, 0))
+            with sock.makefile("rb") as reader:
+                frame = read_frame(reader)
+    except (OSError, ProtocolError):
+        return False
+    return frame is not None and frame[0] == Op.OK
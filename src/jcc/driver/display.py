@@ -1,13 +1,184 @@
-"""Terminal display rendering for demo drivers."""
+"""Terminal display rendering for demo drivers.
 
+GameDisplay is retained-mode: it keeps the grid of cells it last drew,
+and each render returns only the cursor moves, SGR changes and characters
+that turn that grid into the new frame. Borders, the background image and
+the framebuffer's frame are laid out once per terminal size; the header,
+the framebuffer and the controls are diffed cell by cell.
+"""
+
+import re
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Protocol
 
 if TYPE_CHECKING:
     from .screen import Framebuffer, ScreenConfig
 
 from .config import ControlsConfig
+from .screen import halfblock_indices, halfblock_palette
+
+DIM = "\033[2m"
+BRIGHT = "\033[1m"
+RESET = "\033[0m"
+
+class Terminal(Protocol):
+    """What rendering needs of a blessed Terminal."""
+
+    @property
+    def width(self) -> int: ...
+
+    @property
+    def height(self) -> int: ...
+
+    @property
+    def home(self) -> str: ...
+
+    @property
+    def clear(self) -> str: ...
+
+
+# A cell's style is (attribute, foreground, background): the attribute is
+# "", "1" (bright) or "2" (dim), the colors None (default) or 24-bit RGB.
+Style = tuple[str, tuple[int, int, int] | None, tuple[int, int, int] | None]
+Cell = tuple[Style, str]
+
+PLAIN: Style = ("", None, None)
+BLANK: Cell = (PLAIN, " ")
+
+_SGR = re.compile(r"\033\[([0-9;:]*)m")
+
+
+def _apply_sgr(style: Style, params: str) -> Style:
+    """Style after an SGR sequence with the given parameters."""
+    attr, fg, bg = style
+    codes = [int(code) for code in re.split("[;:]", params) if code] or [0]
+    i = 0
+    while i < len(codes):
+        code = codes[i]
+        if code == 0:
+            attr, fg, bg = PLAIN
+        elif code in (1, 2):
+            attr = str(code)
+        elif code in (38, 48) and codes[i + 1:i + 2] == [2]:
+            rgb = tuple(codes[i + 2:i + 5])
+            if code == 38:
+                fg = rgb
+            else:
+                bg = rgb
+            i += 4
+        i += 1
+    return attr, fg, bg
+
+
+def parse_cells(text: str, style: Style = PLAIN) -> list[Cell]:
+    """Split text containing SGR sequences into one styled cell per character.
+
+    Understands reset, bright, dim and 24-bit colors, which is all the
+    display writes.
+    """
+    cells = []
+    pos = 0
+    for match in _SGR.finditer(text):
+        cells += ((style, char) for char in text[pos:match.start()])
+        style = _apply_sgr(style, match.group(1))
+        pos = match.end()
+    cells += ((style, char) for char in text[pos:])
+    return cells
+
+
+def _sgr(pen: Style, style: Style) -> str:
+    """Shortest SGR sequence that changes the pen to style."""
+    attr, fg, bg = style
+    if attr != pen[0] or (fg is None and pen[1]) or (bg is None and pen[2]):
+        # Attributes and default colors can only be restored by a reset
+        codes = ["0", attr] if attr else ["0"]
+        set_fg, set_bg = fg is not None, bg is not None
+    else:
+        codes = []
+        set_fg, set_bg = fg != pen[1], bg != pen[2]
+    if set_fg:
+        codes.append("38;2;{};{};{}".format(*fg))
+    if set_bg:
+        codes.append("48;2;{};{};{}".format(*bg))
+    return f"\033[{';'.join(codes)}m"
+
+
+class CellGrid:
+    """The cells a terminal shows, and the writes that change them."""
+
+    def __init__(self, width: int, height: int):
+        """
+        Start from a cleared terminal.
+
+        Args:
+            width: Terminal columns
+            height: Terminal rows
+        """
+        self.width = width
+        self.height = height
+        self.cells = [[BLANK] * width for _ in range(height)]
+        self.pen = PLAIN
+        self.cursor: tuple[int, int] | None = None
+
+    def update(self, out: list[str], x0: int, y: int, cells: list[Cell]) -> None:
+        """
+        Make row y show cells from column x0 on, clipped to the terminal.
+
+        Appends to out the writes for the cells that differ. The cursor is
+        only moved when a write can't continue where the last one ended,
+        and the SGR state only when a cell's style differs from the pen.
+        """
+        if not 0 <= y < self.height:
+            return
+        cells = cells[:max(0, self.width - x0)]
+        row = self.cells[y]
+        if row[x0:x0 + len(cells)] == cells:
+            return
+        for x, cell in enumerate(cells, x0):
+            if row[x] == cell:
+                continue
+            if self.cursor != (x, y):
+                cx, cy = self.cursor or (0, -1)
+                gap = row[cx:x] if cy == y and x - cx <= 2 else None
+                if gap and all(style == self.pen for style, _ in gap):
+                    # Rewriting a couple of unchanged cells beats a cursor move
+                    out.extend(char for _, char in gap)
+                else:
+                    out.append(f"\033[{y + 1};{x + 1}H")
+            style, char = cell
+            if style != self.pen:
+                out.append(_sgr(self.pen, style))
+                self.pen = style
+            out.append(char)
+            row[x] = cell
+            self.cursor = (x + 1, y)
+
+
+@dataclass(frozen=True)
+class _Layout:
+    """Where the UI sits on a terminal of a given size."""
+
+    outer_width: int
+    left: int  # column of the outer border
+    top: int  # row of the outer border
+    height: int  # rows from outer top to outer bottom border
+    fb_rows: int  # half-block lines of the framebuffer
+    fb_pad_left: int
+    fb_pad_right: int
+
+    # Row offsets: outer border, header, framebuffer border, framebuffer
+    # lines, framebuffer border, blank, controls, outer border
+
+    @property
+    def fb_left(self) -> int:
+        """Column of the first framebuffer cell."""
+        return self.left + self.fb_pad_left + 2
+
+    @property
+    def controls_top(self) -> int:
+        """Row offset of the first controls line."""
+        return self.fb_rows + 5
 
 
 @dataclass
@@ -36,6 +207,11 @@ class GameDisplay:
         self.screen = screen
         self._bg_img = None  # Cached background image
         self._bg_loaded = False
+        self._grid: CellGrid | None = None  # What the terminal shows
+        self._layout: _Layout | None = None
+        self._keys: frozenset[str] | None = None  # Keys the controls show held
+        rgb = halfblock_palette(screen)
+        self._fb_cells = [(("", top, bottom), "▀") for top in rgb for bottom in rgb]
 
     def _load_background(self, term_width: int, term_height: int):
         """Load and cache background image if configured."""
@@ -92,44 +268,9 @@ class GameDisplay:
             return self._gradient_color(line_offset, total_lines)
         return ""
 
-    def render(
-        self,
-        term,
-        fb: "Framebuffer",
-        frame_count: int,
-        mode: str,
-        fps: float,
-        peak_ms: float,
-        keys_held: set | None = None,
-    ) -> str:
-        """
-        Render complete UI.
-
-        Args:
-            term: Blessed terminal
-            fb: Framebuffer to render
-            frame_count: Current frame number
-            mode: Display mode (e.g., "SIM", "CARD")
-            fps: Current FPS
-            peak_ms: Peak frame time in ms
-            keys_held: Set of currently held action keys
-
-        Returns:
-            Complete rendered output string
-        """
-        import re
-
-        if keys_held is None:
-            keys_held = set()
-
-        # Load background if configured
-        self._load_background(term.width, term.height)
-
-        # ANSI helpers
-        DIM = "\033[2m"
-        BRIGHT = "\033[1m"
-        RESET = "\033[0m"
 
+    def _compute_layout(self, term_width: int, term_height: int) -> _Layout:
+        """Center the UI on a terminal of the given size."""
         # Calculate dimensions
         inner_width = self.screen.width + 2  # framebuffer + border
 
@@ -141,7 +282,7 @@ class GameDisplay:
 
         # Outer width must fit both framebuffer and header
         outer_width = max(inner_width + 4, min_header_width)
-        left_pad = max(0, (term.width - outer_width) // 2)
+        left_pad = max(0, (term_width - outer_width) // 2)
 
         # UI height calculation
         fb_rows = (self.screen.height + 1) // 2  # half-block rendering
@@ -151,26 +292,7 @@ class GameDisplay:
         else:
             controls_rows = 1  # Just ESC/SPACE line
         ui_height = 1 + 1 + 1 + fb_rows + 1 + 1 + controls_rows + 1
-        top_pad = max(0, (term.height - ui_height) // 2)
-
-        # Build UI elements
-        ui_elements = []  # (line_num, start_col, content)
-        current_line = top_pad
-        ui_start_line = current_line
-
-        # Outer border top
-        color = self._border_color(0, ui_height)
-        ui_elements.append((current_line, left_pad, f"{color}╭{'─' * (outer_width - 2)}╮{RESET}"))
-        current_line += 1
-
-        # Header
-        title = f"{self.config.game_name} [{mode}]"
-        stats = f"Frame {frame_count} │ {fps:.0f} FPS │ Peak {peak_ms:.0f}ms"
-        header_padding = max(1, outer_width - 4 - len(title) - len(stats))
-        color = self._border_color(current_line - ui_start_line, ui_height)
-        header_content = f"{color}│{RESET} {title}{' ' * header_padding}{stats} {color}│{RESET}"
-        ui_elements.append((current_line, left_pad, header_content))
-        current_line += 1
+        top_pad = max(0, (term_height - ui_height) // 2)
 
         # Calculate padding to center framebuffer within outer border
         fb_box_width = self.screen.width + 2  # framebuffer + inner borders
@@ -179,56 +301,67 @@ class GameDisplay:
         fb_pad_left = total_pad // 2
         fb_pad_right = total_pad - fb_pad_left  # Extra space goes to right if odd
 
-        # Framebuffer top border
-        color = self._border_color(current_line - ui_start_line, ui_height)
-        ui_elements.append(
-            (
-                current_line,
-                left_pad,
-                f"{color}│{RESET}{' ' * fb_pad_left}╭{'─' * self.screen.width}╮{' ' * fb_pad_right}{color}│{RESET}",
-            )
-        )
-        current_line += 1
-
-        # Framebuffer content
-        for y in range(0, self.screen.height, 2):
-            color = self._border_color(current_line - ui_start_line, ui_height)
-            row = f"{color}│{RESET}{' ' * fb_pad_left}│"
-            for x in range(self.screen.width):
-                tr, tg, tb = fb.pixel_rgb(x, y)
-                if y + 1 < self.screen.height:
-                    br, bg, bb = fb.pixel_rgb(x, y + 1)
-                else:
-                    br, bg, bb = 0, 0, 0
-                row += f"\033[38;2;{tr};{tg};{tb}m\033[48;2;{br};{bg};{bb}m\u2580"
-            row += f"{RESET}│{' ' * fb_pad_right}{color}│{RESET}"
-            ui_elements.append((current_line, left_pad, row))
-            current_line += 1
-
-        # Framebuffer bottom border
-        color = self._border_color(current_line - ui_start_line, ui_height)
-        ui_elements.append(
-            (
-                current_line,
-                left_pad,
-                f"{color}│{RESET}{' ' * fb_pad_left}╰{'─' * self.screen.width}╯{' ' * fb_pad_right}{color}│{RESET}",
-            )
-        )
-        current_line += 1
-
-        # Blank line
-        color = self._border_color(current_line - ui_start_line, ui_height)
-        ui_elements.append(
-            (
-                current_line,
-                left_pad,
-                f"{color}│{RESET}{' ' * (outer_width - 2)}{color}│{RESET}",
-            )
+        return _Layout(
+            outer_width=outer_width,
+            left=left_pad,
+            top=top_pad,
+            height=ui_height,
+            fb_rows=fb_rows,
+            fb_pad_left=fb_pad_left,
+            fb_pad_right=fb_pad_right,
         )
-        current_line += 1
+
+    def _static_lines(self, layout: _Layout) -> dict[int, str]:
+        """UI lines that only change with the terminal size, by row offset.
+
+        Rows drawn every frame (header, framebuffer, controls) are blanked,
+        so the background doesn't show through before they are drawn.
+        """
+        width = layout.outer_width
+        blank = " " * width
+        lines = {}
+
+        def border(offset: int, inner: str) -> None:
+            color = self._border_color(offset, layout.height)
+            lines[offset] = f"{color}│{RESET}{inner}{color}│{RESET}"
+
+        color = self._border_color(0, layout.height)
+        lines[0] = f"{color}╭{'─' * (width - 2)}╮{RESET}"
+        lines[1] = blank
+
+        pad_left = " " * layout.fb_pad_left
+        pad_right = " " * layout.fb_pad_right
+        fb_width = self.screen.width
+        border(2, f"{pad_left}╭{'─' * fb_width}╮{pad_right}")
+        for offset in range(3, 3 + layout.fb_rows):
+            border(offset, f"{pad_left}│{' ' * fb_width}│{pad_right}")
+        border(3 + layout.fb_rows, f"{pad_left}╰{'─' * fb_width}╯{pad_right}")
+        border(4 + layout.fb_rows, " " * (width - 2))
+
+        for offset in range(layout.controls_top, layout.height - 1):
+            lines[offset] = blank
+
+        color = self._border_color(layout.height - 1, layout.height)
+        lines[layout.height - 1] = f"{color}╰{'─' * (width - 2)}╯{RESET}"
+        return lines
+
+    def _header_line(
+        self, layout: _Layout, frame_count: int, mode: str, fps: float, peak_ms: float
+    ) -> str:
+        """Title and frame statistics."""
+        title = f"{self.config.game_name} [{mode}]"
+        stats = f"Frame {frame_count} │ {fps:.0f} FPS │ Peak {peak_ms:.0f}ms"
+        header_padding = max(1, layout.outer_width - 4 - len(title) - len(stats))
+        color = self._border_color(1, layout.height)
+        return f"{color}│{RESET} {title}{' ' * header_padding}{stats} {color}│{RESET}"
+
+    def _control_lines(self, layout: _Layout, keys_held: frozenset[str]) -> list[str]:
+        """Controls help, highlighting the keys held."""
+        lines = []
+        row = layout.controls_top
 
         # Controls
-        control_width = outer_width - 4
+        control_width = layout.outer_width - 4
 
         def key_style(action):
             if action in keys_held:
@@ -247,51 +380,21 @@ class GameDisplay:
             esc_text = "[ESC ⏻]"
             esc_pad = control_width - 17 - len(esc_text) + 5
 
-            color = self._border_color(current_line - ui_start_line, ui_height)
-            ui_elements.append(
-                (
-                    current_line,
-                    left_pad,
-                    f"{color}│{RESET}  {q_pre}↺Q{q_post}   {w_pre}W{w_post}   {e_pre}E↻{e_post}{' ' * esc_pad}{esc_text} {color}│{RESET}",
-                )
-            )
-            current_line += 1
-            color = self._border_color(current_line - ui_start_line, ui_height)
-            ui_elements.append(
-                (
-                    current_line,
-                    left_pad,
-                    f"{color}│{RESET}       {w_pre}↑{w_post}{' ' * (control_width - 7 + 1)}{color}│{RESET}",
-                )
-            )
-            current_line += 1
-            color = self._border_color(current_line - ui_start_line, ui_height)
-            ui_elements.append(
-                (
-                    current_line,
-                    left_pad,
-                    f"{color}│{RESET}   {a_pre}A ←{a_post}   {d_pre}→ D{d_post}{' ' * (control_width - 11 + 1)}{color}│{RESET}",
-                )
-            )
-            current_line += 1
-            color = self._border_color(current_line - ui_start_line, ui_height)
-            ui_elements.append(
-                (
-                    current_line,
-                    left_pad,
-                    f"{color}│{RESET}       {s_pre}↓{s_post}{' ' * (control_width - 7 + 1)}{color}│{RESET}",
-                )
-            )
-            current_line += 1
-            color = self._border_color(current_line - ui_start_line, ui_height)
-            ui_elements.append(
-                (
-                    current_line,
-                    left_pad,
-                    f"{color}│{RESET}       {s_pre}S{s_post}{' ' * (control_width - 7 + 1)}{color}│{RESET}",
-                )
-            )
-            current_line += 1
+            color = self._border_color(row, layout.height)
+            lines.append(f"{color}│{RESET}  {q_pre}↺Q{q_post}   {w_pre}W{w_post}   {e_pre}E↻{e_post}{' ' * esc_pad}{esc_text} {color}│{RESET}")
+            row += 1
+            color = self._border_color(row, layout.height)
+            lines.append(f"{color}│{RESET}       {w_pre}↑{w_post}{' ' * (control_width - 7 + 1)}{color}│{RESET}")
+            row += 1
+            color = self._border_color(row, layout.height)
+            lines.append(f"{color}│{RESET}   {a_pre}A ←{a_post}   {d_pre}→ D{d_post}{' ' * (control_width - 11 + 1)}{color}│{RESET}")
+            row += 1
+            color = self._border_color(row, layout.height)
+            lines.append(f"{color}│{RESET}       {s_pre}↓{s_post}{' ' * (control_width - 7 + 1)}{color}│{RESET}")
+            row += 1
+            color = self._border_color(row, layout.height)
+            lines.append(f"{color}│{RESET}       {s_pre}S{s_post}{' ' * (control_width - 7 + 1)}{color}│{RESET}")
+            row += 1
 
         elif self.config.controls.wasd:
             # Standard WASD layout with arrows (like DOOM but without Q/E)
@@ -316,59 +419,29 @@ class GameDisplay:
                 - len(space_part.replace(DIM, "").replace(BRIGHT, "").replace(RESET, ""))
                 - len(esc_text)
             )
-            color = self._border_color(current_line - ui_start_line, ui_height)
-            ui_elements.append(
-                (
-                    current_line,
-                    left_pad,
-                    f"{color}│{RESET} {row1}{space_part}{' ' * max(1, pad1)}{esc_text} {color}│{RESET}",
-                )
-            )
-            current_line += 1
+            color = self._border_color(row, layout.height)
+            lines.append(f"{color}│{RESET} {row1}{space_part}{' ' * max(1, pad1)}{esc_text} {color}│{RESET}")
+            row += 1
 
             # Row 2: up arrow
-            color = self._border_color(current_line - ui_start_line, ui_height)
-            ui_elements.append(
-                (
-                    current_line,
-                    left_pad,
-                    f"{color}│{RESET}       {w_pre}↑{w_post}{' ' * (control_width - 6)}{color}│{RESET}",
-                )
-            )
-            current_line += 1
+            color = self._border_color(row, layout.height)
+            lines.append(f"{color}│{RESET}       {w_pre}↑{w_post}{' ' * (control_width - 6)}{color}│{RESET}")
+            row += 1
 
             # Row 3: A ←   → D
-            color = self._border_color(current_line - ui_start_line, ui_height)
-            ui_elements.append(
-                (
-                    current_line,
-                    left_pad,
-                    f"{color}│{RESET}   {a_pre}A ←{a_post}   {d_pre}→ D{d_post}{' ' * (control_width - 10)}{color}│{RESET}",
-                )
-            )
-            current_line += 1
+            color = self._border_color(row, layout.height)
+            lines.append(f"{color}│{RESET}   {a_pre}A ←{a_post}   {d_pre}→ D{d_post}{' ' * (control_width - 10)}{color}│{RESET}")
+            row += 1
 
             # Row 4: down arrow
-            color = self._border_color(current_line - ui_start_line, ui_height)
-            ui_elements.append(
-                (
-                    current_line,
-                    left_pad,
-                    f"{color}│{RESET}       {s_pre}↓{s_post}{' ' * (control_width - 6)}{color}│{RESET}",
-                )
-            )
-            current_line += 1
+            color = self._border_color(row, layout.height)
+            lines.append(f"{color}│{RESET}       {s_pre}↓{s_post}{' ' * (control_width - 6)}{color}│{RESET}")
+            row += 1
 
             # Row 5: S key
-            color = self._border_color(current_line - ui_start_line, ui_height)
-            ui_elements.append(
-                (
-                    current_line,
-                    left_pad,
-                    f"{color}│{RESET}       {s_pre}S{s_post}{' ' * (control_width - 6)}{color}│{RESET}",
-                )
-            )
-            current_line += 1
+            color = self._border_color(row, layout.height)
+            lines.append(f"{color}│{RESET}       {s_pre}S{s_post}{' ' * (control_width - 6)}{color}│{RESET}")
+            row += 1
 
         else:
             # No WASD - just show space action and ESC
@@ -388,56 +461,99 @@ class GameDisplay:
             pad = control_width - len(content.replace(DIM, "").replace(BRIGHT, "").replace(RESET, "")) - len(esc_text)
             pad = max(1, pad)
 
-            color = self._border_color(current_line - ui_start_line, ui_height)
-            ui_elements.append(
-                (
-                    current_line,
-                    left_pad,
-                    f"{color}│{RESET} {content}{' ' * pad}{esc_text} {color}│{RESET}",
-                )
-            )
-            current_line += 1
-
-        # Outer border bottom
-        color = self._border_color(current_line - ui_start_line, ui_height)
-        ui_elements.append((current_line, left_pad, f"{color}╰{'─' * (outer_width - 2)}╯{RESET}"))
-
-        # Build UI element map
-        ui_dict = {}
-        for line_num, start_col, content in ui_elements:
-            display_len = len(re.sub(r"\033\[[0-9;:]+m", "", content))
-            ui_dict[line_num] = (start_col, display_len, content)
-
-        # Composite UI over background
-        output = []
-        for y in range(term.height):
-            if y in ui_dict:
-                ui_start, ui_len, ui_content = ui_dict[y]
-                ui_end = ui_start + ui_len
-
-                line = ""
-                for x in range(ui_start):
-                    if self._bg_img:
-                        r, g, b = self._bg_img.getpixel((x, y))
-                        line += f"\033[48;2;{r};{g};{b}m "
-                    else:
-                        line += " "
-                line += RESET + ui_content + RESET
-                for x in range(ui_end, term.width):
-                    if self._bg_img:
-                        r, g, b = self._bg_img.getpixel((x, y))
-                        line += f"\033[48;2;{r};{g};{b}m "
-                    else:
-                        line += " "
+            color = self._border_color(row, layout.height)
+            lines.append(f"{color}│{RESET} {content}{' ' * pad}{esc_text} {color}│{RESET}")
+            row += 1
+
+        return lines
+
+    def _repaint(self, out: list[str], term_width: int, term_height: int) -> CellGrid:
+        """Lay out a cleared terminal and draw everything but per-frame lines."""
+        self._bg_img = None
+        self._bg_loaded = False
+        self._load_background(term_width, term_height)
+        layout = self._layout = self._compute_layout(term_width, term_height)
+        grid = self._grid = CellGrid(term_width, term_height)
+        self._keys = None
+
+        lines = self._static_lines(layout)
+        for y in range(term_height):
+            if self._bg_img:
+                row = [(("", None, self._bg_img.getpixel((x, y))), " ") for x in range(term_width)]
             else:
-                line = ""
-                for x in range(term.width):
-                    if self._bg_img:
-                        r, g, b = self._bg_img.getpixel((x, y))
-                        line += f"\033[48;2;{r};{g};{b}m "
-                    else:
-                        line += " "
+                row = [BLANK] * term_width
+            text = lines.get(y - layout.top)
+            if text is not None:
+                ui = parse_cells(text)
+                row[layout.left:layout.left + len(ui)] = ui
+            grid.update(out, 0, y, row)
+        return grid
+
+    def _draw(self, out: list[str], offset: int, text: str) -> None:
+        """Draw a UI line with SGR sequences at the given row offset."""
+        layout = self._layout
+        self._grid.update(out, layout.left, layout.top + offset, parse_cells(text))
+
+    def invalidate(self) -> None:
+        """Forget what the terminal shows, so the next render repaints it all."""
+        self._grid = None
+
+    def render(
+        self,
+        term: Terminal,
+        fb: "Framebuffer",
+        frame_count: int,
+        mode: str,
+        fps: float,
+        peak_ms: float,
+        keys_held: set[str] | None = None,
+    ) -> str:
+        """
+        Render the UI as an update to the previously rendered one.
+
+        The first render, and the first after a resize or invalidate(),
+        clears the terminal and paints everything. Later renders write only
+        the cells that changed, so nothing else may draw on the terminal
+        between renders without calling invalidate().
 
-            output.append(line)
+        Args:
+            term: Blessed terminal
+            fb: Framebuffer to render
+            frame_count: Current frame number
+            mode: Display mode (e.g., "SIM", "CARD")
+            fps: Current FPS
+            peak_ms: Peak frame time in ms
+            keys_held: Set of currently held action keys
+
+        Returns:
+            Output to print as is, ending with the SGR state reset
+        """
+        if keys_held is None:
+            keys_held = set()
 
-        return term.home + "\n".join(output) + RESET
+        out = []
+        grid = self._grid
+        if grid is None or (grid.width, grid.height) != (term.width, term.height):
+            out.append(term.home + term.clear)
+            grid = self._repaint(out, term.width, term.height)
+        layout = self._layout
+        grid.cursor = None  # Unknown until the first move
+
+        self._draw(out, 1, self._header_line(layout, frame_count, mode, fps, peak_ms))
+
+        cells = self._fb_cells
+        y = layout.top + 3
+        for line in halfblock_indices(self.screen, fb.rows):
+            grid.update(out, layout.fb_left, y, list(map(cells.__getitem__, line)))
+            y += 1
+
+        keys = frozenset(keys_held)
+        if keys != self._keys:
+            self._keys = keys
+            for offset, text in enumerate(self._control_lines(layout, keys), layout.controls_top):
+                self._draw(out, offset, text)
+
+        if grid.pen != PLAIN:
+            out.append(RESET)
+            grid.pen = PLAIN
+        return "".join(out)
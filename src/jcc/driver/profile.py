@@ -0,0 +1,65 @@
+"""Reading on-card profile counters.
+
+Works with applets built with `profile = true` (see jcc.output.profile):
+the reserved INS returns one page of 16-bit counters and resets them, so
+readings are summed on the host, where they cannot overflow.
+"""
+
+from collections.abc import Sequence
+
+from jcc.output.profile import COUNTERS_PER_PAGE, ProfileLayout
+
+from .apdu import build_apdu
+from .session import Session
+
+
+def decode_counters(data: bytes) -> list[int]:
+    """Split a dump response into unsigned big-endian 16-bit counters."""
+    return [int.from_bytes(data[i : i + 2], "big") for i in range(0, len(data) - 1, 2)]
+
+
+def fetch_counters(session: Session, layout: ProfileLayout) -> list[int]:
+    """Read and reset every counter, one page per APDU."""
+    counts: list[int] = []
+    for page in range(layout.pages):
+        apdu = build_apdu(layout.ins, p1=page, ne=COUNTERS_PER_PAGE * 2)
+        counts.extend(decode_counters(session.send_ok(apdu)))
+    if len(counts) != len(layout.counters):
+        raise RuntimeError(
+            f"Applet returned {len(counts)} counters, profile map has "
+            f"{len(layout.counters)} (is the map from this build?)"
+        )
+    return counts
+
+
+def format_hotspots(
+    layout: ProfileLayout,
+    counts: Sequence[int],
+    frames: int,
+    top: int = 20,
+) -> str:
+    """Hot-spot table: the most executed functions, then blocks if counted.
+
+    Args:
+        layout: Counter mapping of the profiled build.
+        counts: Summed count per counter index.
+        frames: Frames the counts were collected over.
+        top: Rows per table.
+    """
+    lines: list[str] = []
+    per_frame = max(frames, 1)
+
+    entries = [(counts[c.index], c) for c in layout.counters if c.block is None]
+    total = sum(n for n, _ in entries) or 1
+    lines.append(f"{'calls':>10}  {'/frame':>9}  {'share':>6}  function")
+    for n, c in sorted(entries, key=lambda e: -e[0])[:top]:
+        lines.append(f"{n:>10}  {n / per_frame:>9.1f}  {n / total:>6.1%}  {c.function}")
+
+    blocks = [(counts[c.index], c) for c in layout.counters if c.block is not None]
+    if blocks:
+        lines.append("")
+        lines.append(f"{'runs':>10}  {'/frame':>9}  block")
+        for n, c in sorted(blocks, key=lambda e: -e[0])[:top]:
+            lines.append(f"{n:>10}  {n / per_frame:>9.1f}  {c.function}:{c.block}")
+
+    return "\n".join(lines)
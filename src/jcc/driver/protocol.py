@@ -0,0 +1,140 @@
+"""Wire format between DaemonSession and the session daemon (protocol v2).
+
+A client keeps one Unix socket connection open and exchanges
+length-prefixed binary frames, all integers big-endian:
+
+    frame = length:u32 op:u8 request_id:u32 payload
+
+length counts everything after itself. Requests and their replies:
+
+    PING   (empty)                      -> OK version:u8
+    APDU   command APDU bytes            -> RESPONSE sw:u16 data
+    BATCH  count:u32 (len:u32 apdu)*     -> BATCH_RESPONSE count:u32 (sw:u16 len:u32 data)*
+    QUIT   (empty)                      -> OK version:u8, then the daemon exits
+
+Any request may get ERROR with a UTF-8 message instead. Replies carry
+the request_id of their request, so a client can pipeline several
+requests before reading.
+"""
+
+import struct
+from enum import IntEnum
+from typing import BinaryIO
+
+PROTOCOL_VERSION = 2
+DEFAULT_SOCKET = "/tmp/jcc-session.sock"
+
+# Largest frame either side accepts: a batch of extended APDUs
+MAX_FRAME = 16 * 1024 * 1024
+
+_HEADER = struct.Struct(">IBI")
+_U32 = struct.Struct(">I")
+_RESPONSE = struct.Struct(">HI")
+
+
+class ProtocolError(RuntimeError):
+    """Malformed or unexpected frame."""
+
+
+class Op(IntEnum):
+    """Frame opcodes."""
+
+    PING = 1
+    APDU = 2
+    BATCH = 3
+    QUIT = 4
+    OK = 0x81
+    RESPONSE = 0x82
+    BATCH_RESPONSE = 0x83
+    ERROR = 0xFF
+
+
+def encode_frame(op: Op, request_id: int, payload: bytes = b"") -> bytes:
+    """Frame payload as op for request_id."""
+    return _HEADER.pack(5 + len(payload), op, request_id) + payload
+
+
+def read_frame(stream: BinaryIO) -> tuple[Op, int, bytes] | None:
+    """Read one frame as (op, request_id, payload), or None at end of stream.
+
+    Raises:
+        ProtocolError: If the stream ends inside a frame, or the frame is
+            oversized or has an unknown op.
+    """
+    header = stream.read(_HEADER.size)
+    if not header:
+        return None
+    if len(header) < _HEADER.size:
+        raise ProtocolError("Connection closed inside a frame header")
+    length, op, request_id = _HEADER.unpack(header)
+    if not 5 <= length <= MAX_FRAME:
+        raise ProtocolError(f"Bad frame length {length}")
+    payload = stream.read(length - 5)
+    if len(payload) < length - 5:
+        raise ProtocolError("Connection closed inside a frame")
+    try:
+        return Op(op), request_id, payload
+    except ValueError:
+        raise ProtocolError(f"Unknown op 0x{op:02X}") from None
+
+
+def encode_apdus(apdus: list[bytes]) -> bytes:
+    """BATCH payload for apdus."""
+    parts = [_U32.pack(len(apdus))]
+    for apdu in apdus:
+        parts += (_U32.pack(len(apdu)), apdu)
+    return b"".join(parts)
+
+
+def decode_apdus(payload: bytes) -> list[bytes]:
+    """APDUs of a BATCH payload."""
+    try:
+        (count,), offset = _U32.unpack_from(payload), _U32.size
+        apdus = []
+        for _ in range(count):
+            (size,) = _U32.unpack_from(payload, offset)
+            offset += _U32.size
+            apdus.append(payload[offset:offset + size])
+            offset += size
+    except struct.error:
+        raise ProtocolError("Malformed BATCH payload") from None
+    if offset != len(payload) or any(len(apdu) < 4 for apdu in apdus):
+        raise ProtocolError("Malformed BATCH payload")
+    return apdus
+
+
+def encode_response(data: bytes, sw: int) -> bytes:
+    """RESPONSE payload for one APDU's reply."""
+    return sw.to_bytes(2, "big") + data
+
+
+def decode_response(payload: bytes) -> tuple[bytes, int]:
+    """(data, sw) of a RESPONSE payload."""
+    if len(payload) < 2:
+        raise ProtocolError("Malformed RESPONSE payload")
+    return payload[2:], int.from_bytes(payload[:2], "big")
+
+
+def encode_responses(responses: list[tuple[bytes, int]]) -> bytes:
+    """BATCH_RESPONSE payload for (data, sw) replies."""
+    parts = [_U32.pack(len(responses))]
+    for data, sw in responses:
+        parts += (_RESPONSE.pack(sw, len(data)), data)
+    return b"".join(parts)
+
+
+def decode_responses(payload: bytes) -> list[tuple[bytes, int]]:
+    """(data, sw) replies of a BATCH_RESPONSE payload."""
+    try:
+        (count,), offset = _U32.unpack_from(payload), _U32.size
+        responses = []
+        for _ in range(count):
+            sw, size = _RESPONSE.unpack_from(payload, offset)
+            offset += _RESPONSE.size
+            responses.append((payload[offset:offset + size], sw))
+            offset += size
+    except struct.error:
+        raise ProtocolError("Malformed BATCH_RESPONSE payload") from None
+    if offset != len(payload):
+        raise ProtocolError("Malformed BATCH_RESPONSE payload")
+    return responses
@@ -1,9 +1,13 @@
 """Framebuffer rendering utilities.
 
-Supports multiple pixel formats and rendering modes.
+Supports multiple pixel formats and rendering modes. A frame is decoded
+once into rows of palette indices with per-format bytes.translate tables
+and strided slices, so renderers never unpack bits pixel by pixel.
 """
 
 from dataclasses import dataclass, field
+from functools import cache, cached_property
+from operator import add
 from typing import Literal
 
 
@@ -32,14 +36,32 @@ PALETTE_4BPP = [
 
 @dataclass
 class ScreenConfig:
-    """Configuration for screen rendering."""
+    """Configuration for screen rendering.
+
+    layout is how jcc_fb.h stores pixels: "row" packs each row in turn,
+    "column" packs each column in turn, top to bottom, starting every
+    column on a fresh byte.
+
+    encoding is how frame replies are sent: "raw" is the framebuffer as
+    is, "delta" the format of fb_send in jcc_fb_delta.h, with blocks of
+    delta_block bytes and a keyframe at least every keyframe_interval
+    frames (see FrameDecoder).
+    """
 
     width: int
     height: int
     pixel_format: Literal["1bpp", "2bpp", "4bpp"] = "2bpp"
     palette: list[tuple[int, int, int]] = field(default_factory=list)
+    layout: Literal["row", "column"] = "row"
+    encoding: Literal["raw", "delta"] = "raw"
+    delta_block: int = 8
+    keyframe_interval: int = 60
 
     def __post_init__(self):
+        if self.encoding not in ("raw", "delta"):
+            raise ValueError(f"Unknown framebuffer encoding: {self.encoding}")
+        if not 1 <= self.delta_block <= 255:
+            raise ValueError(f"Delta block size must be 1-255 bytes, not {self.delta_block}")
         if not self.palette:
             if self.pixel_format == "1bpp":
                 self.palette = PALETTE_1BPP
@@ -48,13 +70,125 @@ class ScreenConfig:
             elif self.pixel_format == "4bpp":
                 self.palette = PALETTE_4BPP
 
+    @property
+    def bits_per_pixel(self) -> int:
+        return int(self.pixel_format[0])
+
+    @property
+    def column_bytes(self) -> int:
+        """Bytes per column in the column layout."""
+        return (self.height * self.bits_per_pixel + 7) // 8
+
     @property
     def framebuffer_size(self) -> int:
         """Calculate expected framebuffer size in bytes."""
-        bits_per_pixel = int(self.pixel_format[0])
-        total_bits = self.width * self.height * bits_per_pixel
+        if self.layout == "column":
+            return self.width * self.column_bytes
+        total_bits = self.width * self.height * self.bits_per_pixel
         return (total_bits + 7) // 8
 
+    @property
+    def delta_bitmap_size(self) -> int:
+        """Bytes of the dirty-block bitmap in a delta reply."""
+        blocks = -(-self.framebuffer_size // self.delta_block)
+        return (blocks + 7) // 8
+
+    @property
+    def reply_size(self) -> int:
+        """Longest frame reply in this encoding, the Ne of frame requests."""
+        if self.encoding == "delta":
+            return _DELTA_HEADER + self.delta_bitmap_size + self.framebuffer_size
+        return self.framebuffer_size
+
+
+# Frame request P1 and reply flags of fb_send in jcc_fb_delta.h
+FB_P1_DELTA = 0x01
+FB_P1_KEYFRAME = 0x02
+FB_DELTA_KEYFRAME = 0x01
+_DELTA_HEADER = 2  # flags, block size
+
+
+def _unpack_tables(bits: int) -> list[bytes]:
+    """bytes.translate tables, one per pixel in a byte, MSB first."""
+    mask = (1 << bits) - 1
+    return [
+        bytes((b >> shift) & mask for b in range(256))
+        for shift in range(8 - bits, -1, -bits)
+    ]
+
+
+_UNPACK = {f"{bits}bpp": _unpack_tables(bits) for bits in (1, 2, 4)}
+
+
+def decode(config: ScreenConfig, data: bytes) -> list[bytes]:
+    """Unpack a framebuffer into rows of palette indices, one byte per pixel.
+
+    Missing trailing bytes read as index 0.
+    """
+    tables = _UNPACK.get(config.pixel_format)
+    if tables is None:
+        raise ValueError(f"Unknown pixel format: {config.pixel_format}")
+    data = bytes(data[:config.framebuffer_size]).ljust(config.framebuffer_size, b"\0")
+    ppb = len(tables)
+    pixels = bytearray(len(data) * ppb)
+    for i, table in enumerate(tables):
+        pixels[i::ppb] = data.translate(table)
+
+    width, height = config.width, config.height
+    if config.layout == "column":
+        stride = config.column_bytes * ppb
+        return [bytes(pixels[y::stride]) for y in range(height)]
+    return [bytes(pixels[y * width:(y + 1) * width]) for y in range(height)]
+
+
+def halfblock_palette(config: ScreenConfig) -> list[tuple[int, int, int]]:
+    """RGB of every index the pixel format can hold, then black for padding.
+
+    Half-block cell index top * (colors + 1) + bottom picks the top color
+    from this list by division and the bottom color by remainder.
+    """
+    palette = config.palette
+    colors = 1 << config.bits_per_pixel
+    return [palette[i] if i < len(palette) else (0, 0, 0) for i in range(colors)] + [(0, 0, 0)]
+
+
+@cache
+def _halfblock_cells(rgb: tuple[tuple[int, int, int], ...]) -> tuple[str, ...]:
+    return tuple(
+        f"\033[38;2;{tr};{tg};{tb}m\033[48;2;{br};{bg};{bb}m\u2580"
+        for tr, tg, tb in rgb
+        for br, bg, bb in rgb
+    )
+
+
+def halfblock_indices(config: ScreenConfig, rows: list[bytes]) -> list[list[int]]:
+    """Pair decoded rows into half-block cells, two pixel rows per line.
+
+    Each cell is top * (colors + 1) + bottom, indexing halfblock_palette
+    pairs; an odd last row gets the padding index (black) at the bottom.
+    """
+    n = (1 << config.bits_per_pixel) + 1
+    # Top index pre-multiplied by n, so a cell is top + bottom
+    scale = bytes(min(i * n, 255) for i in range(256))
+    blank = bytes([n - 1]) * config.width
+    lines = []
+    for y in range(0, len(rows), 2):
+        top = rows[y].translate(scale)
+        bottom = rows[y + 1] if y + 1 < len(rows) else blank
+        lines.append(list(map(add, top, bottom)))
+    return lines
+
+
+def halfblock_rows(config: ScreenConfig, rows: list[bytes]) -> list[str]:
+    """Render decoded rows as true-color half blocks, two pixel rows per line.
+
+    The top pixel is the foreground of '▀' and the bottom pixel its
+    background; an odd last row gets a black bottom. Each line is left
+    in the last cell's colors.
+    """
+    cells = _halfblock_cells(tuple(halfblock_palette(config)))
+    return ["".join(map(cells.__getitem__, line)) for line in halfblock_indices(config, rows)]
+
 
 class Framebuffer:
     """Framebuffer for rendering pixel data."""
@@ -70,42 +204,14 @@ class Framebuffer:
         self.config = config
         self.data = data
 
+    @cached_property
+    def rows(self) -> list[bytes]:
+        """Palette index of every pixel, row by row (see decode)."""
+        return decode(self.config, self.data)
+
     def pixel(self, x: int, y: int) -> int:
         """Get pixel value at (x, y)."""
-        if self.config.pixel_format == "1bpp":
-            return self._pixel_1bpp(x, y)
-        elif self.config.pixel_format == "2bpp":
-            return self._pixel_2bpp(x, y)
-        elif self.config.pixel_format == "4bpp":
-            return self._pixel_4bpp(x, y)
-        else:
-            raise ValueError(f"Unknown pixel format: {self.config.pixel_format}")
-
-    def _pixel_1bpp(self, x: int, y: int) -> int:
-        """Get 1bpp pixel (8 pixels per byte, MSB first)."""
-        byte_idx = (y * self.config.width + x) // 8
-        bit_idx = 7 - ((y * self.config.width + x) % 8)
-        if byte_idx >= len(self.data):
-            return 0
-        return (self.data[byte_idx] >> bit_idx) & 1
-
-    def _pixel_2bpp(self, x: int, y: int) -> int:
-        """Get 2bpp pixel (4 pixels per byte, MSB first)."""
-        byte_idx = (y * self.config.width + x) // 4
-        shift = 6 - 2 * ((y * self.config.width + x) % 4)
-        if byte_idx >= len(self.data):
-            return 0
-        return (self.data[byte_idx] >> shift) & 0x03
-
-    def _pixel_4bpp(self, x: int, y: int) -> int:
-        """Get 4bpp pixel (2 pixels per byte, high nibble first)."""
-        byte_idx = (y * self.config.width + x) // 2
-        if byte_idx >= len(self.data):
-            return 0
-        if x & 1:
-            return self.data[byte_idx] & 0x0F  # Low nibble
-        else:
-            return (self.data[byte_idx] >> 4) & 0x0F  # High nibble
+        return self.rows[y][x]
 
     def pixel_rgb(self, x: int, y: int) -> tuple[int, int, int]:
         """Get RGB color at (x, y)."""
@@ -114,19 +220,18 @@ class Framebuffer:
             return self.config.palette[idx]
         return (0, 0, 0)
 
+    def _render_chars(self, chars: list[str]) -> str:
+        """One character per pixel, chosen by palette index."""
+        return "\n".join("".join(map(chars.__getitem__, row)) for row in self.rows)
+
     def render_ascii(self) -> str:
         """Render as ASCII art."""
         chars = " .:-=+*#%@"
-        lines = []
-        for y in range(self.config.height):
-            row = ""
-            for x in range(self.config.width):
-                r, g, b = self.pixel_rgb(x, y)
-                brightness = (r + g + b) // 3
-                char_idx = min(len(chars) - 1, brightness // 28)
-                row += chars[char_idx]
-            lines.append(row)
-        return "\n".join(lines)
+        shades = []
+        for idx in range(1 << self.config.bits_per_pixel):
+            r, g, b = self.config.palette[idx] if idx < len(self.config.palette) else (0, 0, 0)
+            shades.append(chars[min(len(chars) - 1, (r + g + b) // 3 // 28)])
+        return self._render_chars(shades)
 
     def render_blocks(self, header: str = None) -> str:
         """
@@ -138,42 +243,111 @@ class Framebuffer:
         if header:
             lines.append(header)
         lines.append("+" + "-" * self.config.width + "+")
-
-        for y in range(0, self.config.height, 2):
-            row = "|"
-            for x in range(self.config.width):
-                tr, tg, tb = self.pixel_rgb(x, y)
-                if y + 1 < self.config.height:
-                    br, bg, bb = self.pixel_rgb(x, y + 1)
-                else:
-                    br, bg, bb = 0, 0, 0
-                # ANSI true color: foreground (top), background (bottom)
-                row += f"\033[38;2;{tr};{tg};{tb}m\033[48;2;{br};{bg};{bb}m\u2580"
-            lines.append(row + "\033[0m|")
-
+        lines.extend(f"|{row}\033[0m|" for row in halfblock_rows(self.config, self.rows))
         lines.append("+" + "-" * self.config.width + "+")
         return "\n".join(lines)
 
     def render_hex(self) -> str:
         """Render pixel values as hex digits (0-9A-F)."""
-        lines = []
-        for y in range(self.config.height):
-            row = ""
-            for x in range(self.config.width):
-                row += f"{self.pixel(x, y):X}"
-            lines.append(row)
-        return "\n".join(lines)
+        return self._render_chars(list("0123456789ABCDEF"))
 
     def render_simple(self) -> str:
         """Render using simple block characters (no color)."""
         chars = " ░▒▓█"
-        max_val = 2 ** int(self.config.pixel_format[0]) - 1
-        lines = []
-        for y in range(self.config.height):
-            row = ""
-            for x in range(self.config.width):
-                p = self.pixel(x, y)
-                char_idx = p * (len(chars) - 1) // max_val if max_val > 0 else 0
-                row += chars[char_idx]
-            lines.append(row)
-        return "\n".join(lines)
+        max_val = 2 ** self.config.bits_per_pixel - 1
+        return self._render_chars(
+            [chars[p * (len(chars) - 1) // max_val] for p in range(max_val + 1)]
+        )
+
+
+class FrameDecoder:
+    """Rebuilds whole framebuffers from frame replies.
+
+    With the "delta" encoding, p1 asks the applet for either a keyframe
+    or the blocks changed since the last reply, and decode patches those
+    into the frame held here. A keyframe is requested first, every
+    keyframe_interval frames, and after reset() or a malformed reply, so
+    a lost reply can't leave the picture wrong for long. With "raw", p1
+    is 0 and replies are whole framebuffers.
+    """
+
+    def __init__(self, config: ScreenConfig):
+        """
+        Start with no frame, so the first request is for a keyframe.
+
+        Args:
+            config: Screen configuration, including the encoding
+        """
+        self.config = config
+        self._frame: bytearray | None = None
+        self._deltas = 0  # Delta replies since the last keyframe
+
+    @property
+    def p1(self) -> int:
+        """P1 of the next frame request."""
+        if self.config.encoding != "delta":
+            return 0
+        if self._frame is None or self._deltas >= self.config.keyframe_interval:
+            return FB_P1_DELTA | FB_P1_KEYFRAME
+        return FB_P1_DELTA
+
+    def reset(self) -> None:
+        """Ask for a keyframe next, e.g. after a failed frame request."""
+        self._frame = None
+
+    def decode(self, reply: bytes) -> bytes:
+        """
+        Whole framebuffer of a reply to a request made with p1.
+
+        Raises:
+            ValueError: If a delta reply is malformed, uses another block
+                size than the config, or has no keyframe to apply to.
+        """
+        if self.config.encoding != "delta":
+            return reply
+        try:
+            return self._apply(reply)
+        except ValueError:
+            self._frame = None
+            raise
+
+    def _apply(self, reply: bytes) -> bytes:
+        config = self.config
+        size = config.framebuffer_size
+        if len(reply) < _DELTA_HEADER:
+            raise ValueError(f"Delta reply of {len(reply)} bytes has no header")
+        flags, block = reply[0], reply[1]
+        if block != config.delta_block:
+            raise ValueError(
+                f"Applet sends {block}-byte blocks, but fb_delta_block is {config.delta_block}"
+            )
+        body = reply[_DELTA_HEADER:]
+
+        if flags & FB_DELTA_KEYFRAME:
+            if len(body) != size:
+                raise ValueError(f"Keyframe of {len(body)} bytes, expected {size}")
+            self._frame = bytearray(body)
+            self._deltas = 0
+            return bytes(body)
+        if self._frame is None:
+            raise ValueError("Delta reply without a keyframe before it")
+
+        bitmap = int.from_bytes(body[:config.delta_bitmap_size], "big")
+        bits = config.delta_bitmap_size * 8
+        dirty = [
+            off
+            for i, off in enumerate(range(0, size, block))
+            if bitmap >> (bits - 1 - i) & 1
+        ]
+        expected = config.delta_bitmap_size + sum(min(block, size - off) for off in dirty)
+        if len(body) != expected:
+            raise ValueError(f"Delta reply of {len(body)} bytes, its bitmap implies {expected}")
+
+        frame = self._frame
+        pos = config.delta_bitmap_size
+        for off in dirty:
+            n = min(block, size - off)
+            frame[off:off + n] = body[pos:pos + n]
+            pos += n
+        self._deltas += 1
+        return bytes(frame)
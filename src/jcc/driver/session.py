@@ -8,10 +8,30 @@ import os
 import socket
 import subprocess
 import sys
+from collections.abc import Sequence
 from typing import Protocol, Self
 
 from jcc.jcdk import config_dir, sim_client_cmd
 
+from .protocol import (
+    DEFAULT_SOCKET,
+    PROTOCOL_VERSION,
+    Op,
+    ProtocolError,
+    decode_response,
+    decode_responses,
+    encode_apdus,
+    encode_frame,
+    read_frame,
+)
+
+# Request text SimSession writes ahead of reading replies. Small enough to
+# fit the pipe buffer, so JCCClient can never block us on a full stdout.
+_PIPE_WINDOW = 32 * 1024
+
+# APDUs per DaemonSession BATCH request, keeping replies under MAX_FRAME
+_BATCH_SIZE = 128
+
 
 class Session(Protocol):
     """Protocol for card sessions."""
@@ -20,6 +40,14 @@ class Session(Protocol):
         """Send APDU and return (data, status_word)."""
         ...
 
+    def send_raw(self, apdu: bytes) -> tuple[bytes, int]:
+        """Send APDU bytes and return (data, status_word)."""
+        ...
+
+    def send_many(self, apdus: Sequence[bytes]) -> list[tuple[bytes, int]]:
+        """Send independent APDUs in order and return each (data, status_word)."""
+        ...
+
     def send_ok(self, apdu_hex: str) -> bytes:
         """Send APDU, raise if SW != 9000, return data."""
         ...
@@ -69,6 +97,35 @@ class SimSession:
         """Send APDU and return (data, status_word)."""
         self.proc.stdin.write(apdu_hex + "\n")
         self.proc.stdin.flush()
+        return self._parse(self._read_line())
+
+    def send_raw(self, apdu: bytes) -> tuple[bytes, int]:
+        """Send APDU bytes and return (data, status_word)."""
+        return self.send(apdu.hex())
+
+    def send_many(self, apdus: Sequence[bytes]) -> list[tuple[bytes, int]]:
+        """Send independent APDUs in order and return each (data, status_word).
+
+        Writes a window of APDUs, then reads their replies, so the
+        simulator never waits on a round trip within a window.
+        """
+        responses: list[tuple[bytes, int]] = []
+        start = 0
+        while start < len(apdus):
+            end, size = start + 1, 2 * len(apdus[start]) + 1
+            while end < len(apdus) and size + 2 * len(apdus[end]) + 1 <= _PIPE_WINDOW:
+                size += 2 * len(apdus[end]) + 1
+                end += 1
+            self.proc.stdin.write("".join(apdu.hex() + "\n" for apdu in apdus[start:end]))
+            self.proc.stdin.flush()
+            # Read the whole window before raising, to stay in step
+            lines = [self._read_line() for _ in range(start, end)]
+            responses.extend(self._parse(line) for line in lines)
+            start = end
+        return responses
+
+    def _read_line(self) -> str:
+        """Read one reply line, raising if the simulator died."""
         line = self.proc.stdout.readline()
         if not line:
             # Process died — collect stderr for diagnostics
@@ -80,6 +137,11 @@ class SimSession:
             if stderr:
                 msg += f"\n{stderr.strip()}"
             raise RuntimeError(msg)
+        return line
+
+    @staticmethod
+    def _parse(line: str) -> tuple[bytes, int]:
+        """(data, status_word) of a reply line."""
         resp = json.loads(line)
         if "error" in resp:
             raise RuntimeError(resp["error"])
@@ -143,9 +205,22 @@ class CardSession:
 
     def send(self, apdu_hex: str) -> tuple[bytes, int]:
         """Send APDU and return (data, status_word)."""
-        data, sw1, sw2 = self.conn.transmit(list(bytes.fromhex(apdu_hex)))
+        return self.send_raw(bytes.fromhex(apdu_hex))
+
+    def send_raw(self, apdu: bytes) -> tuple[bytes, int]:
+        """Send APDU bytes and return (data, status_word)."""
+        data, sw1, sw2 = self.conn.transmit(list(apdu))
         return bytes(data), (sw1 << 8) | sw2
 
+    def send_many(self, apdus: Sequence[bytes]) -> list[tuple[bytes, int]]:
+        """Send independent APDUs in order and return each (data, status_word)."""
+        transmit = self.conn.transmit
+        responses = []
+        for apdu in apdus:
+            data, sw1, sw2 = transmit(list(apdu))
+            responses.append((bytes(data), (sw1 << 8) | sw2))
+        return responses
+
     def send_ok(self, apdu_hex: str) -> bytes:
         """Send APDU, raise if SW != 9000, return data."""
         data, sw = self.send(apdu_hex)
@@ -167,7 +242,12 @@ class CardSession:
 
 
 class DaemonSession:
-    """Session that talks to a persistent Unix socket daemon."""
+    """Session that talks to a persistent Unix socket daemon (jcc.driver.daemon).
+
+    One connection stays open for the session's lifetime. submit() and
+    receive() pipeline APDUs: several can be in flight before the first
+    reply is read.
+    """
 
     def __init__(self, socket_path: str = None):
         """
@@ -176,43 +256,92 @@ class DaemonSession:
         Args:
             socket_path: Path to Unix socket (default: /tmp/jcc-session.sock)
         """
-        self.socket_path = socket_path or "/tmp/jcc-session.sock"
+        self.socket_path = socket_path or DEFAULT_SOCKET
         if not os.path.exists(self.socket_path):
             raise RuntimeError(f"Daemon not running (no socket at {self.socket_path})")
         self._sock = None
+        self._reader = None
+        self._next_id = 0
+        # Replies read while waiting for an earlier request's reply
+        self._replies: dict[int, tuple[Op, bytes]] = {}
 
     def _connect(self):
         if self._sock is None:
             self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
             self._sock.connect(self.socket_path)
+            self._reader = self._sock.makefile("rb")
 
-    def _send_command(self, cmd: dict) -> dict:
+    def _request(self, op: Op, payload: bytes = b"") -> int:
+        """Send a request and return its ID without waiting for the reply."""
         self._connect()
-        self._sock.sendall((json.dumps(cmd) + "\n").encode("utf-8"))
-        response = self._sock.recv(65536).decode("utf-8").strip()
-        self._sock.close()
-        self._sock = None
-        return json.loads(response)
+        request_id = self._next_id
+        self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+        self._sock.sendall(encode_frame(op, request_id, payload))
+        return request_id
+
+    def _reply(self, request_id: int, expected: Op) -> bytes:
+        """Wait for the reply to request_id and return its payload."""
+        while request_id not in self._replies:
+            frame = read_frame(self._reader)
+            if frame is None:
+                self.close()
+                raise RuntimeError("Daemon closed the connection")
+            op, reply_id, payload = frame
+            self._replies[reply_id] = (op, payload)
+        op, payload = self._replies.pop(request_id)
+        if op == Op.ERROR:
+            raise RuntimeError(payload.decode("utf-8", "replace"))
+        if op != expected:
+            raise ProtocolError(f"Expected {expected.name} reply, got {op.name}")
+        return payload
+
+    def ping(self) -> int:
+        """Check the daemon answers; returns its protocol version."""
+        return self._reply(self._request(Op.PING), Op.OK)[0]
+
+    def submit(self, apdu_hex: str) -> int:
+        """Send an APDU without waiting; pass the returned ID to receive()."""
+        return self._request(Op.APDU, bytes.fromhex(apdu_hex))
+
+    def receive(self, request_id: int) -> tuple[bytes, int]:
+        """Wait for a submitted APDU and return (data, status_word)."""
+        return decode_response(self._reply(request_id, Op.RESPONSE))
 
     def send(self, apdu_hex: str) -> tuple[bytes, int]:
         """Send APDU and return (data, status_word)."""
-        resp = self._send_command({"action": "apdu", "apdu": apdu_hex})
-        if "error" in resp:
-            raise RuntimeError(resp["error"])
-        return bytes.fromhex(resp.get("data", "")), resp.get("sw", 0)
+        return self.send_raw(bytes.fromhex(apdu_hex))
+
+    def send_raw(self, apdu: bytes) -> tuple[bytes, int]:
+        """Send APDU bytes and return (data, status_word)."""
+        return self.receive(self._request(Op.APDU, apdu))
+
+    def send_many(self, apdus: Sequence[bytes]) -> list[tuple[bytes, int]]:
+        """Send independent APDUs in order and return each (data, status_word).
+
+        Each BATCH request carries up to _BATCH_SIZE APDUs.
+        """
+        responses: list[tuple[bytes, int]] = []
+        for start in range(0, len(apdus), _BATCH_SIZE):
+            batch = list(apdus[start:start + _BATCH_SIZE])
+            request_id = self._request(Op.BATCH, encode_apdus(batch))
+            responses += decode_responses(self._reply(request_id, Op.BATCH_RESPONSE))
+        return responses
 
     def send_ok(self, apdu_hex: str) -> bytes:
         """Send APDU, raise if SW != 9000, return data."""
-        resp = self._send_command({"action": "apdu_ok", "apdu": apdu_hex})
-        if "error" in resp:
-            raise RuntimeError(resp["error"])
-        return bytes.fromhex(resp.get("data", ""))
+        data, sw = self.send(apdu_hex)
+        if sw != 0x9000:
+            raise RuntimeError(f"APDU failed: SW={sw:04X}")
+        return data
 
     def close(self) -> None:
         """Close the connection (daemon stays running)."""
         if self._sock:
+            self._reader.close()
             self._sock.close()
             self._sock = None
+            self._reader = None
+            self._replies.clear()
 
     def __enter__(self) -> Self:
         return self
@@ -221,17 +350,13 @@ class DaemonSession:
         self.close()
 
 
-def daemon_is_running(socket_path: str = "/tmp/jcc-session.sock") -> bool:
+def daemon_is_running(socket_path: str = DEFAULT_SOCKET) -> bool:
     """Check if a daemon is running at the given socket path."""
     if not os.path.exists(socket_path):
         return False
     try:
-        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        sock.connect(socket_path)
-        sock.sendall(b'{"action":"ping"}\n')
-        response = sock.recv(1024).decode("utf-8")
-        sock.close()
-        return json.loads(response).get("ok", False)
+        with DaemonSession(socket_path) as session:
+            return session.ping() == PROTOCOL_VERSION
     except Exception:
         return False
 
@@ -264,7 +389,7 @@ def get_session(
         return SimSession(applet_aid)
     else:
         # Auto-detect
-        socket_path = daemon_socket or "/tmp/jcc-session.sock"
+        socket_path = daemon_socket or DEFAULT_SOCKET
         if daemon_is_running(socket_path):
             return DaemonSession(socket_path)
         return SimSession(applet_aid)
@@ -0,0 +1,172 @@
+"""Content-addressed build cache for incremental builds.
+
+Artifacts live in build/.jcc-cache/ and are keyed by a digest of their
+inputs, so a lookup can never return a stale result:
+
+- builds/<key>/: the finished CAP and JCA for a whole build, keyed by
+  the .ll text, jcc.toml, JCDK version, cost model and compiler version.
+- functions/<key>.pkl: a user function's FunctionCode, keyed by the
+  function IR, its analysis results, the allocation and the constant pool.
+
+After a successful build, entries that the build did not use are pruned.
+"""
+
+import hashlib
+import json
+import pickle
+import shutil
+from collections.abc import Iterable, Mapping
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any, cast
+
+from jcc import __version__
+from jcc.codegen.emit import FunctionCode
+
+CACHE_DIR_NAME = ".jcc-cache"
+
+# Bump when the layout of cached artifacts changes.
+_FORMAT_VERSION = 2
+
+
+def fingerprint(*objs: object) -> str:
+    """Compute a stable digest of IR and analysis objects.
+
+    Unlike repr(), the encoding is independent of set iteration order and
+    hash randomization. Dataclass fields declared with repr=False are
+    derived caches and are skipped.
+    """
+    h = hashlib.sha256(f"{__version__}\0{_FORMAT_VERSION}\0".encode())
+    for obj in objs:
+        h.update(_encode(obj).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _encode(obj: object) -> str:
+    match obj:
+        case None | bool() | int() | float() | str() | bytes():
+            return repr(obj)
+        case Enum():
+            return f"{type(obj).__name__}.{obj.name}"
+        case tuple() | list():
+            elements = cast(Iterable[object], obj)
+            return "(" + ",".join(_encode(x) for x in elements) + ")"
+        case frozenset() | set():
+            members = cast(Iterable[object], obj)
+            return "{" + ",".join(sorted(_encode(x) for x in members)) + "}"
+        case Mapping():
+            mapping = cast(Mapping[object, object], obj)
+            items = sorted(f"{_encode(k)}:{_encode(v)}" for k, v in mapping.items())
+            return "{" + ",".join(items) + "}"
+        case _ if is_dataclass(obj):
+            parts = [
+                f"{f.name}={_encode(getattr(obj, f.name))}"
+                for f in fields(obj)
+                if f.repr
+            ]
+            return f"{type(obj).__name__}(" + ",".join(parts) + ")"
+        case _ if hasattr(obj, "__dict__"):
+            return f"{type(obj).__name__}{_encode(vars(obj))}"
+        case _:
+            return repr(obj)
+
+
+class BuildCache:
+    """Content-addressed artifact store rooted at build/.jcc-cache/."""
+
+    def __init__(self, build_dir: Path) -> None:
+        self.root = build_dir / CACHE_DIR_NAME
+        self._used_functions: set[str] = set()
+
+    # --- Whole-build artifacts ---
+
+    def build_key(
+        self,
+        ll_text: str,
+        config_text: bytes,
+        javacard_version: str,
+        export_dir: Path,
+        costs: object = None,
+        block_counts: bytes | None = None,
+    ) -> str:
+        """Key for a whole build from its top-level inputs.
+
+        costs is the resolved cost model, since a results.json it names
+        can change without jcc.toml changing. block_counts is the content
+        of the [options].block_profile counts file, for the same reason.
+        """
+        return fingerprint(
+            ll_text, config_text, javacard_version, str(export_dir), costs, block_counts,
+        )
+
+    def restore_build(self, key: str, output_dir: Path) -> Path | None:
+        """Copy a cached CAP (and JCA) into output_dir.
+
+        Returns:
+            Path to the restored CAP file, or None on a miss.
+        """
+        entry = self.root / "builds" / key
+        try:
+            manifest: dict[str, Any] = json.loads((entry / "manifest.json").read_text())
+            files: list[str] = manifest["files"]
+            cap_name: str = manifest["cap"]
+        except (OSError, ValueError, KeyError):
+            return None
+        if not all((entry / name).exists() for name in files):
+            return None
+        for name in files:
+            shutil.copy2(entry / name, output_dir / name)
+        return output_dir / cap_name
+
+    def store_build(self, key: str, cap_path: Path) -> None:
+        """Record the CAP (and sibling JCA) produced for a build key.
+
+        Other build entries are removed, since only the latest inputs
+        can be hit again without a source change being reverted.
+        """
+        builds = self.root / "builds"
+        entry = builds / key
+        files = [p for p in (cap_path, cap_path.with_suffix(".jca")) if p.exists()]
+        if builds.exists():
+            for old in builds.iterdir():
+                if old.name != key:
+                    shutil.rmtree(old, ignore_errors=True)
+        entry.mkdir(parents=True, exist_ok=True)
+        for path in files:
+            shutil.copy2(path, entry / path.name)
+        manifest = {"cap": cap_path.name, "files": [p.name for p in files]}
+        (entry / "manifest.json").write_text(json.dumps(manifest))
+
+    # --- Per-function artifacts ---
+
+    def load_function(self, key: str) -> FunctionCode | None:
+        """Load a cached FunctionCode, or None on a miss."""
+        self._used_functions.add(key)
+        path = self.root / "functions" / f"{key}.pkl"
+        try:
+            with open(path, "rb") as f:
+                code = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        return code if isinstance(code, FunctionCode) else None
+
+    def store_function(self, key: str, code: FunctionCode) -> None:
+        """Store a compiled FunctionCode."""
+        self._used_functions.add(key)
+        directory = self.root / "functions"
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / f"{key}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(code, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(directory / f"{key}.pkl")
+
+    def prune_functions(self) -> None:
+        """Remove function entries not used by this build."""
+        directory = self.root / "functions"
+        if not directory.exists():
+            return
+        for path in directory.glob("*.pkl"):
+            if path.stem not in self._used_functions:
+                path.unlink(missing_ok=True)
@@ -19,8 +19,10 @@ Key metadata nodes:
 from __future__ import annotations
 
 import re
+from collections.abc import Mapping
 from dataclasses import dataclass
 
+from jcc.ir.source import IRSource
 from jcc.ir.types import GlobalName, JCType, SSAName
 
 
@@ -82,17 +84,19 @@ DebugType = DebugStructType | DebugArrayType | DebugScalarType
 # === Metadata Parsing ===
 
 
-def extract_global_debug_types(llvm_ir: str) -> dict[GlobalName, DebugType]:
+def extract_global_debug_types(llvm_ir: str | IRSource) -> dict[GlobalName, DebugType]:
     """Extract debug type info for all globals from LLVM IR text.
 
     Parses !dbg metadata attached to each global and follows the type graph
     to build DebugStructType, DebugArrayType, or DebugScalarType.
     """
-    # Step 1: Parse all metadata nodes
-    metadata = _parse_metadata_nodes(llvm_ir)
+    source = IRSource.of(llvm_ir)
 
-    # Step 2: Find !dbg references on globals
-    global_dbg_refs = _extract_global_dbg_refs(llvm_ir)
+    # Step 1: Metadata nodes
+    metadata = source.metadata
+
+    # Step 2: !dbg references on globals
+    global_dbg_refs = source.global_dbg_refs
 
     # Step 3: Resolve each global's type
     result: dict[GlobalName, DebugType] = {}
@@ -104,7 +108,7 @@ def extract_global_debug_types(llvm_ir: str) -> dict[GlobalName, DebugType]:
     return result
 
 
-def extract_alloca_debug_types(llvm_ir: str) -> dict[SSAName, DebugType]:
+def extract_alloca_debug_types(llvm_ir: str | IRSource) -> dict[SSAName, DebugType]:
     """Extract debug type info for allocas from LLVM IR text.
 
     Parses #dbg_declare intrinsics that associate allocas with DILocalVariable
@@ -113,11 +117,15 @@ def extract_alloca_debug_types(llvm_ir: str) -> dict[SSAName, DebugType]:
     Format: #dbg_declare(ptr %name, !N, !DIExpression(), !M)
     Where !N is a DILocalVariable with a type reference.
     """
-    # Step 1: Parse all metadata nodes
-    metadata = _parse_metadata_nodes(llvm_ir)
+    source = IRSource.of(llvm_ir)
+
+    # Step 1: Metadata nodes
+    metadata = source.metadata
 
-    # Step 2: Find #dbg_declare references
-    alloca_dbg_refs = _extract_dbg_declare_refs(llvm_ir)
+    # Step 2: Find #dbg_declare references (only function bodies can hold them)
+    alloca_dbg_refs: dict[SSAName, str] = {}
+    for _, func_text in source.functions():
+        alloca_dbg_refs.update(_extract_dbg_declare_refs(func_text))
 
     # Step 3: Resolve each alloca's type via DILocalVariable
     result: dict[SSAName, DebugType] = {}
@@ -129,7 +137,9 @@ def extract_alloca_debug_types(llvm_ir: str) -> dict[SSAName, DebugType]:
     return result
 
 
-def extract_function_param_typedefs(llvm_ir: str) -> dict[str, tuple[str | None, ...]]:
+def extract_function_param_typedefs(
+    llvm_ir: str | IRSource,
+) -> dict[str, tuple[str | None, ...]]:
     """Extract typedef names for function parameters from debug info.
 
     For each function, returns a tuple of typedef names for each parameter.
@@ -142,7 +152,7 @@ def extract_function_param_typedefs(llvm_ir: str) -> dict[str, tuple[str | None,
         Dict mapping function name to tuple of typedef names (or None) per param.
         E.g., {"sendResult": ("APDU", None, None)} for sendResult(APDU, byte*, short)
     """
-    metadata = _parse_metadata_nodes(llvm_ir)
+    metadata = IRSource.of(llvm_ir).metadata
     result: dict[str, tuple[str | None, ...]] = {}
 
     # Find all DISubprogram nodes
@@ -168,7 +178,7 @@ def extract_function_param_typedefs(llvm_ir: str) -> dict[str, tuple[str | None,
 
 def _extract_subroutine_param_typedefs(
     type_ref: str,
-    metadata: dict[str, str],
+    metadata: Mapping[str, str],
 ) -> tuple[str | None, ...] | None:
     """Extract typedef names from DISubroutineType parameters.
 
@@ -209,7 +219,7 @@ def _extract_subroutine_param_typedefs(
     return tuple(param_typedefs)
 
 
-def _get_typedef_name(type_ref: str, metadata: dict[str, str]) -> str | None:
+def _get_typedef_name(type_ref: str, metadata: Mapping[str, str]) -> str | None:
     """Get the type name if type_ref points to a named type.
 
     Matches both:
@@ -271,7 +281,7 @@ def _extract_dbg_declare_refs(llvm_ir: str) -> dict[SSAName, str]:
 
 def _resolve_local_variable_type(
     dbg_id: str,
-    metadata: dict[str, str],
+    metadata: Mapping[str, str],
 ) -> DebugType | None:
     """Resolve a DILocalVariable reference to its DebugType.
 
@@ -294,43 +304,9 @@ def _resolve_local_variable_type(
 # === Internal Parsing Helpers ===
 
 
-def _parse_metadata_nodes(llvm_ir: str) -> dict[str, str]:
-    """Parse metadata nodes into a map from ID to full node text.
-
-    Extracts lines like:
-        !0 = !DIGlobalVariableExpression(var: !1, expr: !DIExpression())
-    into {"!0": "!DIGlobalVariableExpression(var: !1, expr: !DIExpression())"}
-    """
-    metadata: dict[str, str] = {}
-    # Match metadata definitions: !N = <content>
-    pattern = re.compile(r"^(![\w.]+)\s*=\s*(.+)$", re.MULTILINE)
-    for match in pattern.finditer(llvm_ir):
-        node_id = match.group(1)
-        content = match.group(2).strip()
-        metadata[node_id] = content
-    return metadata
-
-
-def _extract_global_dbg_refs(llvm_ir: str) -> dict[GlobalName, str]:
-    """Extract !dbg references from global variable declarations.
-
-    Finds lines like:
-        @values = hidden global [8 x i16] zeroinitializer, align 16, !dbg !5
-    and extracts {"@values": "!5"}
-    """
-    refs: dict[GlobalName, str] = {}
-    # Match global declarations with !dbg metadata
-    pattern = re.compile(r"^(@[\w.]+)\s*=.*!dbg\s+(![\w.]+)", re.MULTILINE)
-    for match in pattern.finditer(llvm_ir):
-        global_name = GlobalName(match.group(1))
-        dbg_id = match.group(2)
-        refs[global_name] = dbg_id
-    return refs
-
-
 def _resolve_global_type(
     dbg_id: str,
-    metadata: dict[str, str],
+    metadata: Mapping[str, str],
 ) -> DebugType | None:
     """Resolve a global's !dbg reference to its DebugType.
 
@@ -360,7 +336,7 @@ def _resolve_global_type(
 
 def _resolve_type(
     type_ref: str,
-    metadata: dict[str, str],
+    metadata: Mapping[str, str],
 ) -> DebugType | None:
     """Resolve a type reference to a DebugType.
 
@@ -437,7 +413,7 @@ def _parse_basic_type(node: str) -> DebugScalarType | None:
 
 def _parse_array_type(
     node: str,
-    metadata: dict[str, str],
+    metadata: Mapping[str, str],
 ) -> DebugArrayType | None:
     """Parse DICompositeType with DW_TAG_array_type."""
     base_ref = _extract_field(node, "baseType")
@@ -472,7 +448,7 @@ def _parse_array_type(
 
 def _parse_struct_type(
     node: str,
-    metadata: dict[str, str],
+    metadata: Mapping[str, str],
 ) -> DebugStructType | None:
     """Parse DICompositeType with DW_TAG_structure_type."""
     name = _extract_string_field(node, "name") or "<anonymous>"
@@ -497,7 +473,7 @@ def _parse_struct_type(
 
 def _parse_struct_fields(
     elements_ref: str,
-    metadata: dict[str, str],
+    metadata: Mapping[str, str],
 ) -> list[DebugField]:
     """Parse struct field list from elements reference."""
     fields: list[DebugField] = []
@@ -528,7 +504,7 @@ def _parse_struct_fields(
 
 def _parse_member_field(
     node: str,
-    metadata: dict[str, str],
+    metadata: Mapping[str, str],
 ) -> DebugField | None:
     """Parse DIDerivedType with DW_TAG_member into DebugField.
 
@@ -572,7 +548,7 @@ def _parse_member_field(
 
 def _get_array_count(
     elements_ref: str,
-    metadata: dict[str, str],
+    metadata: Mapping[str, str],
 ) -> int | None:
     """Get array element count from elements (DISubrange) reference."""
     node = metadata.get(elements_ref)
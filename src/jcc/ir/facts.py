@@ -0,0 +1,160 @@
+"""Per-function IR facts shared by analysis and codegen.
+
+Def/use maps, CFG edges, block order, dominators and loops are derived from a
+Function on first use and memoized. One FunctionFacts is created per
+function after lowering and passed through analysis and codegen, so each
+structure is built at most once per function per build.
+"""
+
+from collections.abc import Mapping
+from functools import cached_property
+
+from jcc.ir.instructions import Instruction
+from jcc.ir.module import Function
+from jcc.ir.types import BlockLabel, SSAName
+from jcc.ir.utils import build_definition_map, build_successor_map, build_use_map
+
+
+class FunctionFacts:
+    """Lazily computed, memoized structural facts about one function.
+
+    Every attribute is computed on first access. The function must not
+    change afterwards; lowering passes that rewrite a function produce a
+    new Function, which needs its own FunctionFacts.
+
+    Attributes:
+        func: The function these facts describe.
+    """
+
+    def __init__(self, func: Function) -> None:
+        self.func = func
+
+    @cached_property
+    def def_map(self) -> dict[SSAName, Instruction]:
+        """SSA name → defining instruction."""
+        return build_definition_map(self.func)
+
+    @cached_property
+    def use_map(self) -> dict[SSAName, list[Instruction]]:
+        """SSA name → instructions that use it as an operand."""
+        return build_use_map(self.func)
+
+    @cached_property
+    def successors(self) -> dict[BlockLabel, list[BlockLabel]]:
+        """Block label → successor labels, deduplicated, in terminator order."""
+        return build_successor_map(self.func)
+
+    @cached_property
+    def predecessors(self) -> dict[BlockLabel, list[BlockLabel]]:
+        """Block label → predecessor labels, in block order."""
+        preds: dict[BlockLabel, list[BlockLabel]] = {b.label: [] for b in self.func.blocks}
+        for block in self.func.blocks:
+            for succ in self.successors[block.label]:
+                preds.setdefault(succ, []).append(block.label)
+        return preds
+
+    @cached_property
+    def rpo(self) -> tuple[BlockLabel, ...]:
+        """Blocks reachable from the entry, in reverse postorder."""
+        entry = self.func.entry_block.label
+        postorder: list[BlockLabel] = []
+        visited = {entry}
+        stack = [(entry, iter(self.successors[entry]))]
+        while stack:
+            label, succs = stack[-1]
+            for succ in succs:
+                if succ not in visited:
+                    visited.add(succ)
+                    stack.append((succ, iter(self.successors[succ])))
+                    break
+            else:
+                stack.pop()
+                postorder.append(label)
+        return tuple(reversed(postorder))
+
+    @cached_property
+    def rpo_index(self) -> Mapping[BlockLabel, int]:
+        """Position of each reachable block in rpo."""
+        return {label: i for i, label in enumerate(self.rpo)}
+
+    @cached_property
+    def idom(self) -> Mapping[BlockLabel, BlockLabel]:
+        """Immediate dominator of each reachable block except the entry.
+
+        Uses the iterative algorithm of Cooper, Harvey and Kennedy ("A
+        Simple, Fast Dominance Algorithm") over reverse postorder.
+        """
+        rpo = self.rpo
+        index = self.rpo_index
+        doms: dict[BlockLabel, BlockLabel] = {rpo[0]: rpo[0]}
+
+        def intersect(a: BlockLabel, b: BlockLabel) -> BlockLabel:
+            while a != b:
+                while index[a] > index[b]:
+                    a = doms[a]
+                while index[b] > index[a]:
+                    b = doms[b]
+            return a
+
+        changed = True
+        while changed:
+            changed = False
+            for label in rpo[1:]:
+                new_idom: BlockLabel | None = None
+                for pred in self.predecessors[label]:
+                    if pred not in doms:
+                        continue  # Unprocessed or unreachable
+                    new_idom = pred if new_idom is None else intersect(pred, new_idom)
+                if new_idom is not None and doms.get(label) != new_idom:
+                    doms[label] = new_idom
+                    changed = True
+
+        del doms[rpo[0]]
+        return doms
+
+    def dominates(self, a: BlockLabel, b: BlockLabel) -> bool:
+        """Whether every path from the entry to b passes through a.
+
+        Unreachable blocks are dominated by nothing and dominate nothing.
+        """
+        if a not in self.rpo_index or b not in self.rpo_index:
+            return False
+        idom = self.idom
+        while b != a:
+            parent = idom.get(b)
+            if parent is None:
+                return False
+            b = parent
+        return True
+
+    @cached_property
+    def loops(self) -> Mapping[BlockLabel, frozenset[BlockLabel]]:
+        """Natural loop body of each loop header, the header included.
+
+        An edge to a block that dominates its source is a back edge. The
+        natural loop of its target (the header) is the header plus every
+        block that reaches the source without passing through the header;
+        back edges to one header form a single loop.
+        """
+        bodies: dict[BlockLabel, set[BlockLabel]] = {}
+        for label in self.rpo:
+            for succ in self.successors[label]:
+                if not self.dominates(succ, label):
+                    continue
+                body = bodies.setdefault(succ, {succ})
+                stack = [label]
+                while stack:
+                    block = stack.pop()
+                    if block not in body:
+                        body.add(block)
+                        stack.extend(p for p in self.predecessors[block] if p in self.rpo_index)
+        return {header: frozenset(body) for header, body in bodies.items()}
+
+    @cached_property
+    def loop_depth(self) -> Mapping[BlockLabel, int]:
+        """Loop nesting depth of each reachable block, 0 outside any loop."""
+        depth = dict.fromkeys(self.rpo, 0)
+        for body in self.loops.values():
+            for block in body:
+                depth[block] += 1
+        return depth
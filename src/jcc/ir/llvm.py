@@ -14,6 +14,7 @@ from pathlib import Path
 
 from llvmlite import binding as llvm
 
+from jcc.ir.source import IRSource
 from jcc.ir.types import LLVMType
 
 
@@ -89,8 +90,9 @@ class LLVMBlock:
 class LLVMFunction:
     """Wrapper around llvmlite function."""
 
-    def __init__(self, ref: llvm.ValueRef) -> None:
+    def __init__(self, ref: llvm.ValueRef, source_text: str | None = None) -> None:
         self._ref = ref
+        self._source_text = source_text
         self._block_labels: list[str] | None = None
 
     @property
@@ -101,12 +103,29 @@ class LLVMFunction:
     def is_declaration(self) -> bool:
         return self._ref.is_declaration
 
-    def _ensure_block_labels(self) -> list[str]:
-        """Extract block labels from function IR (lazy computation)."""
+    def _ensure_block_labels(self, numeric_block_count: int) -> list[str]:
+        """Extract block labels from function IR (lazy computation).
+
+        The function's text in the original .ll source is tried first, which
+        avoids having llvmlite print the function again. Source written by
+        hand may lack the preds comments used to find the entry label, so
+        the printed IR is the fallback whenever the source doesn't yield
+        exactly one label per numeric block.
+        """
         if self._block_labels is None:
             from jcc.ir.patterns import extract_function_block_labels
 
-            self._block_labels = extract_function_block_labels(str(self._ref))
+            labels: list[str] | None = None
+            if self._source_text is not None:
+                try:
+                    labels = extract_function_block_labels(self._source_text)
+                except ValueError:
+                    labels = None
+                if labels is not None and len(labels) != numeric_block_count:
+                    labels = None
+            if labels is None:
+                labels = extract_function_block_labels(str(self._ref))
+            self._block_labels = labels
         return self._block_labels
 
     @property
@@ -123,7 +142,7 @@ class LLVMFunction:
         # Validate label extraction upfront if we have numeric blocks
         extracted_labels: list[str] | None = None
         if numeric_block_count > 0:
-            extracted_labels = self._ensure_block_labels()
+            extracted_labels = self._ensure_block_labels(numeric_block_count)
             assert len(extracted_labels) >= numeric_block_count, (
                 f"Function {self.name}: extracted {len(extracted_labels)} labels "
                 f"but have {numeric_block_count} numeric blocks"
@@ -192,16 +211,24 @@ class LLVMModule:
     def __init__(self, ref: llvm.ModuleRef, ir_text: str) -> None:
         self._ref = ref
         self._ir_text = ir_text
+        self._source: IRSource | None = None
 
     @property
     def ir_text(self) -> str:
         """Get the raw IR text (for debug info parsing)."""
         return self._ir_text
 
+    @property
+    def source(self) -> IRSource:
+        """Index of the raw IR text, built on first use and shared by consumers."""
+        if self._source is None:
+            self._source = IRSource(self._ir_text)
+        return self._source
+
     @property
     def functions(self) -> Iterator[LLVMFunction]:
         for func in self._ref.functions:
-            yield LLVMFunction(func)
+            yield LLVMFunction(func, self.source.function_text(func.name))
 
     @property
     def global_variables(self) -> Iterator[LLVMGlobal]:
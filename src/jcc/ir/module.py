@@ -355,9 +355,9 @@ def parse_module(llvm_module: LLVMModule) -> Module:
     """
     parser = LLVMParser()
 
-    # Extract debug type info from raw IR
-    debug_types = extract_global_debug_types(llvm_module.ir_text)
-    alloca_debug_types = extract_alloca_debug_types(llvm_module.ir_text)
+    # Extract debug type info from the indexed raw IR
+    debug_types = extract_global_debug_types(llvm_module.source)
+    alloca_debug_types = extract_alloca_debug_types(llvm_module.source)
 
     # First pass: collect allocas and create synthetic globals
     synthetic_globals, alloca_mappings = _collect_allocas_as_globals(
@@ -0,0 +1,134 @@
+"""Indexed view of LLVM IR text.
+
+The .ll text is scanned once for its top-level structure: metadata node
+definitions, global definitions, attribute groups and function bodies. Consumers that
+used to run their own whole-file regexes (debug info, range metadata,
+block label recovery) look things up in this index instead.
+"""
+
+import re
+from collections.abc import Iterator, Mapping
+from types import MappingProxyType
+
+from jcc.ir.types import GlobalName
+
+# Top-level lines, in one alternation so the text is scanned once:
+#   !N = <node>                     metadata definition
+#   @name = <definition>            global definition
+#   attributes #N = { ... }         attribute group
+#   define ... @name(               function start
+#   }                               function end
+_TOP_LEVEL = re.compile(
+    r"^(?:"
+    r"(?P<meta>![\w.]+)\s*=\s*(?P<node>.+)"
+    r"|(?P<global>@[\w.]+)\s*=(?P<gdef>.*)"
+    r"|attributes\s+(?P<group>#\d+)\s*=\s*\{(?P<attrs>.*)\}"
+    r"|define\b[^@\n]*@(?:\"(?P<qfunc>[^\"]+)\"|(?P<func>[-\w.$]+))\s*\("
+    r"|(?P<end>\})"
+    r")",
+    re.MULTILINE,
+)
+
+_GLOBAL_DBG = re.compile(r".*!dbg\s+(![\w.]+)")
+
+# One attribute: "key"="value", "key", name(args) or a bare keyword. Metadata
+# attachments (!dbg !12) are matched so they aren't read as keywords.
+_ATTRIBUTE = re.compile(r'![\w.]+|"[^"]*"(?:="[^"]*")?|[\w.-]+(?:\([^)]*\))?')
+
+_ATTRIBUTE_GROUP_REF = re.compile(r"#\d+")
+
+
+class IRSource:
+    """LLVM IR text with an index built in a single pass.
+
+    Attributes:
+        text: The full IR text.
+        metadata: Metadata node ID ("!12") → node text.
+        global_dbg_refs: Global name → ID of its attached !dbg node.
+        attribute_groups: Attribute group ID ("#3") → its keyword
+            attributes (noinline, nounwind, ...).
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        metadata: dict[str, str] = {}
+        global_dbg_refs: dict[GlobalName, str] = {}
+        attribute_groups: dict[str, frozenset[str]] = {}
+        spans: dict[str, tuple[int, int]] = {}
+
+        current: str | None = None
+        start = 0
+        for m in _TOP_LEVEL.finditer(text):
+            if m.group("meta") is not None:
+                metadata[m.group("meta")] = m.group("node").strip()
+            elif m.group("global") is not None:
+                dbg = _GLOBAL_DBG.match(m.group("gdef"))
+                if dbg is not None:
+                    global_dbg_refs[GlobalName(m.group("global"))] = dbg.group(1)
+            elif m.group("group") is not None:
+                attribute_groups[m.group("group")] = _keyword_attributes(m.group("attrs"))
+            elif m.group("end") is not None:
+                if current is not None:
+                    spans[current] = (start, m.end())
+                    current = None
+            else:
+                current = m.group("func") or m.group("qfunc")
+                start = m.start()
+
+        self.metadata: Mapping[str, str] = MappingProxyType(metadata)
+        self.global_dbg_refs: Mapping[GlobalName, str] = MappingProxyType(global_dbg_refs)
+        self.attribute_groups: Mapping[str, frozenset[str]] = MappingProxyType(attribute_groups)
+        self._spans = spans
+
+    @classmethod
+    def of(cls, source: IRSource | str) -> IRSource:
+        """Return source as an IRSource, indexing it if given raw text."""
+        return source if isinstance(source, IRSource) else cls(source)
+
+    def function_text(self, name: str) -> str | None:
+        """Text of a function definition, from `define` to its closing brace."""
+        span = self._spans.get(name)
+        if span is None:
+            return None
+        return self.text[span[0] : span[1]]
+
+    def functions(self) -> Iterator[tuple[str, str]]:
+        """Iterate over (name, text) for each defined function, in order."""
+        for name, (start, end) in self._spans.items():
+            yield name, self.text[start:end]
+
+    def function_attributes(self, name: str) -> frozenset[str]:
+        """Keyword attributes of a function definition (alwaysinline, noinline, ...).
+
+        Collects the attribute groups referenced on the define line and any
+        keywords written inline after the parameter list. Unknown functions
+        have none.
+        """
+        text = self.function_text(name)
+        if text is None:
+            return frozenset()
+        header = text[: text.find("{")]
+        tail = header[_close_paren(header, header.find("(")) + 1 :]
+
+        attributes = set(_keyword_attributes(tail))
+        for ref in _ATTRIBUTE_GROUP_REF.findall(tail):
+            attributes |= self.attribute_groups.get(ref, frozenset())
+        return frozenset(attributes)
+
+
+def _keyword_attributes(text: str) -> frozenset[str]:
+    """Bare keyword attributes in an attribute list, without string attributes."""
+    return frozenset(a for a in _ATTRIBUTE.findall(text) if a.isidentifier())
+
+
+def _close_paren(text: str, start: int) -> int:
+    """Index of the parenthesis closing the one at start (or the end of text)."""
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == "(":
+            depth += 1
+        elif text[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(text)
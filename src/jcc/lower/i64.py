@@ -39,6 +39,7 @@ from jcc.ir.module import (
     StructArrayInit,
 )
 from jcc.ir.types import GlobalName, JCType, LLVMType, SSAName
+from jcc.ir.utils import build_definition_map
 from jcc.ir.values import Const, GlobalRef, SSARef, Value
 
 _LLVM_ELEM = {JCType.BYTE: "i8", JCType.SHORT: "i16", JCType.INT: "i32"}
@@ -157,12 +158,7 @@ def _collect_const_arrays(module: Module) -> list[_ConstArray]:
 def _lower_function(func: Function, const_arrays: list[_ConstArray]) -> Function:
     """Lower i64 patterns in a single function."""
     # Build def map for the whole function
-    def_map: dict[SSAName, Instruction] = {}
-    for block in func.blocks:
-        for instr in block.all_instructions:
-            result = get_result(instr)
-            if result is not None:
-                def_map[result] = instr
+    def_map = build_definition_map(func)
 
     # Find all i64 chains
     chains = _find_chains(def_map, const_arrays)
@@ -0,0 +1,140 @@
+"""IR optimization passes.
+
+clang optimizes the C source, but jcc's own lowering (intrinsics, i64
+patterns, sign extension) and inlining create redundancy clang never saw:
+duplicate compares from min/max lowering, re-materialized shifts, constant
+arguments flowing into inlined bodies. These passes clean up the typed
+Module before analysis:
+
+- sccp: sparse conditional constant propagation (jcc.opt.sccp)
+- gvn: global value numbering and algebraic simplification (jcc.opt.gvn)
+- licm: loop-invariant code motion (jcc.opt.licm)
+- dce: dead instruction elimination (jcc.opt.dce)
+
+They run in that order over every function. After global allocation,
+optimize_allocated runs the passes that depend on the memory layout:
+
+- ivsr: induction-variable strength reduction (jcc.opt.ivsr)
+
+Each can be turned off in the [opt] table of jcc.toml.
+"""
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+from jcc.analysis.globals import AllocationResult
+from jcc.ir.module import Function, Module
+from jcc.opt.dce import eliminate_dead_code
+from jcc.opt.gvn import number_values
+from jcc.opt.ivsr import reduce_strength
+from jcc.opt.licm import hoist_invariants
+from jcc.opt.rewrite import function_size
+from jcc.opt.sccp import propagate_constants
+
+# Pass name → per-function pass, in run order
+PASSES: dict[str, Callable[[Function, Module], Function]] = {
+    "sccp": propagate_constants,
+    "gvn": number_values,
+    "licm": hoist_invariants,
+    "dce": eliminate_dead_code,
+}
+
+# Pass name → per-function pass that needs the global allocation, in run order
+ALLOCATED_PASSES: dict[str, Callable[[Function, Module, AllocationResult], Function]] = {
+    "ivsr": reduce_strength,
+}
+
+
+@dataclass(frozen=True)
+class PassStats:
+    """Instruction counts around one pass, summed over all functions.
+
+    Attributes:
+        name: Pass name.
+        before: IR instructions (terminators included) before the pass.
+        after: IR instructions after the pass.
+    """
+
+    name: str
+    before: int
+    after: int
+
+
+def optimize_module(
+    module: Module,
+    passes: Iterable[str] = PASSES,
+) -> tuple[Module, tuple[PassStats, ...]]:
+    """Run the enabled passes over every function.
+
+    Args:
+        module: Module after lowering and inlining.
+        passes: Names of the passes to run. They always run in PASSES
+            order. Names from ALLOCATED_PASSES are accepted and skipped.
+
+    Returns:
+        The module (unchanged if no pass changed anything) and the
+        instruction counts around each pass that ran.
+
+    Raises:
+        ValueError: If a pass name is unknown.
+    """
+    enabled = _check_names(passes)
+    return _run_passes(
+        module,
+        [(name, lambda f, run=run: run(f, module)) for name, run in PASSES.items()
+         if name in enabled],
+    )
+
+
+def optimize_allocated(
+    module: Module,
+    allocation: AllocationResult,
+    passes: Iterable[str] = ALLOCATED_PASSES,
+) -> tuple[Module, tuple[PassStats, ...]]:
+    """Run the enabled passes that need the global allocation.
+
+    Args:
+        module: Module the allocation was computed for.
+        allocation: Result of analyze_module. The passes keep it valid.
+        passes: Names of the passes to run. They always run in
+            ALLOCATED_PASSES order. Names from PASSES are accepted and
+            skipped.
+
+    Returns:
+        The module (unchanged if no pass changed anything) and the
+        instruction counts around each pass that ran.
+
+    Raises:
+        ValueError: If a pass name is unknown.
+    """
+    enabled = _check_names(passes)
+    return _run_passes(
+        module,
+        [(name, lambda f, run=run: run(f, module, allocation))
+         for name, run in ALLOCATED_PASSES.items() if name in enabled],
+    )
+
+
+def _check_names(passes: Iterable[str]) -> set[str]:
+    enabled = set(passes)
+    unknown = enabled - PASSES.keys() - ALLOCATED_PASSES.keys()
+    if unknown:
+        raise ValueError(f"Unknown optimization pass: {', '.join(sorted(unknown))}")
+    return enabled
+
+
+def _run_passes(
+    module: Module,
+    runs: list[tuple[str, Callable[[Function], Function]]],
+) -> tuple[Module, tuple[PassStats, ...]]:
+    functions = dict(module.functions)
+    stats: list[PassStats] = []
+    for name, run in runs:
+        before = sum(function_size(f) for f in functions.values())
+        functions = {fname: run(func) for fname, func in functions.items()}
+        after = sum(function_size(f) for f in functions.values())
+        stats.append(PassStats(name=name, before=before, after=after))
+
+    if all(functions[name] is func for name, func in module.functions.items()):
+        return module, tuple(stats)
+    return Module(globals=module.globals, functions=functions), tuple(stats)
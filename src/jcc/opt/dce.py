@@ -0,0 +1,68 @@
+"""Dead instruction elimination.
+
+Mark and sweep over SSA: stores, calls and terminators are live, and so is
+every instruction defining an operand of a live one. Everything else is
+removed, including cycles of phis that only feed each other (a loop
+counter whose value is never read).
+
+Loads have no side effects in the IR and are removed when unused, as in
+LLVM. A dead load can still fail at run time on JCVM with an index out of
+bounds, but only where the C program already has undefined behavior.
+"""
+
+from jcc.ir.instructions import CallInst, Instruction, StoreInst, get_result
+from jcc.ir.module import Block, Function, Module
+from jcc.ir.types import SSAName
+from jcc.ir.values import SSARef
+from jcc.opt.rewrite import with_blocks
+
+
+def eliminate_dead_code(func: Function, module: Module) -> Function:
+    """Remove instructions whose results are never used.
+
+    Returns:
+        The function without dead instructions, or func itself if there
+        were none.
+    """
+    defs: dict[SSAName, Instruction] = {}
+    live: set[SSAName] = set()
+    worklist: list[Instruction] = []
+    for block in func.blocks:
+        for instr in block.instructions:
+            result = get_result(instr)
+            if result is not None:
+                defs[result] = instr
+            if _has_side_effects(instr):
+                worklist.append(instr)
+        worklist.append(block.terminator)
+
+    while worklist:
+        instr = worklist.pop()
+        for operand in instr.operands:
+            if isinstance(operand, SSARef) and operand.name not in live:
+                live.add(operand.name)
+                defn = defs.get(operand.name)
+                if defn is not None:
+                    worklist.append(defn)
+
+    def keep(instr: Instruction) -> bool:
+        result = get_result(instr)
+        return result is None or result in live or _has_side_effects(instr)
+
+    if all(keep(i) for block in func.blocks for i in block.instructions):
+        return func
+    return with_blocks(
+        func,
+        [
+            Block(
+                label=block.label,
+                instructions=tuple(i for i in block.instructions if keep(i)),
+                terminator=block.terminator,
+            )
+            for block in func.blocks
+        ],
+    )
+
+
+def _has_side_effects(instr: Instruction) -> bool:
+    return isinstance(instr, (StoreInst, CallInst))
@@ -0,0 +1,99 @@
+"""Constant folding with LLVM integer semantics.
+
+Values are kept sign-normalized to their type's width, as the parser reads
+them (i16 65535 is -1). i1 constants are BYTE 0/1; an i1 true that reaches
+a sext keeps its from_i1 flag and extends to -1.
+
+Folds that would trap at run time or are poison in LLVM (division by
+zero, shifts by the type's width or more) return None and are left to
+execute.
+"""
+
+from jcc.ir.instructions import BinaryOp, CastInst, ICmpPred
+from jcc.ir.types import JCType
+
+# Bit width of the integer types constants are folded for
+BITS: dict[JCType, int] = {JCType.BYTE: 8, JCType.SHORT: 16, JCType.INT: 32}
+
+
+def wrap(value: int, ty: JCType) -> int:
+    """value truncated to ty's width, as a signed number."""
+    bits = BITS[ty]
+    value &= (1 << bits) - 1
+    return value - (1 << bits) if value >> (bits - 1) else value
+
+
+def unsigned(value: int, ty: JCType) -> int:
+    """value truncated to ty's width, as an unsigned number."""
+    return value & ((1 << BITS[ty]) - 1)
+
+
+def fold_binary(op: BinaryOp, left: int, right: int, ty: JCType) -> int | None:
+    """Result of a binary op on constants, or None if it must not be folded."""
+    bits = BITS[ty]
+    match op:
+        case "add":
+            return wrap(left + right, ty)
+        case "sub":
+            return wrap(left - right, ty)
+        case "mul":
+            return wrap(left * right, ty)
+        case "and":
+            return wrap(left & right, ty)
+        case "or":
+            return wrap(left | right, ty)
+        case "xor":
+            return wrap(left ^ right, ty)
+        case "sdiv" | "srem" if right != 0:
+            quotient = abs(left) // abs(right)
+            if (left < 0) != (right < 0):
+                quotient = -quotient
+            return wrap(quotient if op == "sdiv" else left - quotient * right, ty)
+        case "udiv" | "urem" if right != 0:
+            a, b = unsigned(left, ty), unsigned(right, ty)
+            return wrap(a // b if op == "udiv" else a % b, ty)
+        case "shl" if 0 <= right < bits:
+            return wrap(left << right, ty)
+        case "ashr" if 0 <= right < bits:
+            return wrap(left >> right, ty)
+        case "lshr" if 0 <= right < bits:
+            return wrap(unsigned(left, ty) >> right, ty)
+        case _:
+            return None
+
+
+def fold_icmp(pred: ICmpPred, left: int, right: int, ty: JCType) -> int:
+    """Result (0 or 1) of an integer comparison of constants."""
+    if pred in ("ult", "ule", "ugt", "uge"):
+        left, right = unsigned(left, ty), unsigned(right, ty)
+    match pred:
+        case "eq":
+            result = left == right
+        case "ne":
+            result = left != right
+        case "slt" | "ult":
+            result = left < right
+        case "sle" | "ule":
+            result = left <= right
+        case "sgt" | "ugt":
+            result = left > right
+        case "sge" | "uge":
+            result = left >= right
+    return int(result)
+
+
+def fold_cast(instr: CastInst, value: int) -> int | None:
+    """Result of an integer cast of a constant, or None if not foldable."""
+    if instr.from_ty not in BITS or instr.to_ty not in BITS:
+        return None
+    match instr.op:
+        case "trunc" | "freeze":
+            return wrap(value, instr.to_ty)
+        case "sext":
+            if "from_i1" in instr.flags:
+                return wrap(-(value & 1), instr.to_ty)
+            return wrap(wrap(value, instr.from_ty), instr.to_ty)
+        case "zext":
+            return wrap(unsigned(value, instr.from_ty), instr.to_ty)
+        case _:
+            return None
@@ -0,0 +1,201 @@
+"""Global value numbering.
+
+Blocks are visited in reverse postorder, so every dominator of a block is
+seen before it. Each pure instruction is keyed by its opcode, type and
+operands (after earlier replacements), and an instruction whose key
+already has a leader in a dominating block, or earlier in the same block,
+is removed and its uses point at the leader. Commutative operands and
+compare operands are put in a canonical order first, so a + b matches
+b + a and a < b matches b > a.
+
+Loads from constant globals are numbered too, keyed through the GEPs that
+address them, so two reads of CONST_S[i] become one. Other loads are left
+alone; any store or call in between could change them. GEPs themselves are
+not numbered: codegen folds them into every access anyway.
+
+Before numbering, algebraic identities are simplified: x + 0, x * 1,
+x & -1, shifts by 0 and the like become x, x - x and x ^ x become 0, a
+compare of a value with itself becomes a constant, and a select between
+equal values becomes that value.
+"""
+
+from collections.abc import Hashable, Mapping
+
+from jcc.ir.facts import FunctionFacts
+from jcc.ir.instructions import (
+    BinaryInst,
+    CastInst,
+    GEPInst,
+    ICmpInst,
+    ICmpPred,
+    Instruction,
+    LoadInst,
+    PhiInst,
+    SelectInst,
+    get_result,
+)
+from jcc.ir.module import Block, Function, Module
+from jcc.ir.types import BlockLabel, JCType, SSAName
+from jcc.ir.values import Const, SSARef, Value
+from jcc.opt.fold import BITS, wrap
+from jcc.opt.rewrite import reads_constant, replace_operands, substitute, with_blocks
+
+_COMMUTATIVE = frozenset({"add", "mul", "and", "or", "xor"})
+
+# Predicate with operands swapped: a < b is b > a
+_SWAPPED: dict[ICmpPred, ICmpPred] = {
+    "eq": "eq", "ne": "ne",
+    "slt": "sgt", "sgt": "slt", "sle": "sge", "sge": "sle",
+    "ult": "ugt", "ugt": "ult", "ule": "uge", "uge": "ule",
+}
+
+# x op x for a predicate op
+_REFLEXIVE: dict[ICmpPred, int] = {
+    "eq": 1, "sle": 1, "sge": 1, "ule": 1, "uge": 1,
+    "ne": 0, "slt": 0, "sgt": 0, "ult": 0, "ugt": 0,
+}
+
+# x op c == x
+_RIGHT_IDENTITY: dict[str, int] = {
+    "add": 0, "sub": 0, "or": 0, "xor": 0, "shl": 0, "ashr": 0, "lshr": 0,
+    "mul": 1, "sdiv": 1, "udiv": 1, "and": -1,
+}
+
+
+def number_values(func: Function, module: Module) -> Function:
+    """Remove instructions that recompute an available value.
+
+    Returns:
+        The rewritten function, or func itself if nothing was redundant.
+    """
+    facts = FunctionFacts(func)
+    replacements: dict[SSAName, Value] = {}
+    leaders: dict[Hashable, list[tuple[BlockLabel, SSAName]]] = {}
+    geps: dict[SSAName, GEPInst] = {}
+    kept: dict[BlockLabel, list[Instruction]] = {}
+
+    for label in facts.rpo:
+        block = func.block_map[label]
+        instructions: list[Instruction] = []
+        for instr in block.instructions:
+            instr = replace_operands(instr, replacements)
+            result = get_result(instr)
+            if isinstance(instr, GEPInst):
+                geps[instr.result] = instr
+
+            simplified = _simplify(instr)
+            if simplified is not None and result is not None:
+                replacements[result] = simplified
+                continue
+
+            key = _key(instr, label, geps, facts.def_map, module)
+            if key is not None and result is not None:
+                leader = _available(leaders.get(key, ()), label, facts)
+                if leader is not None:
+                    replacements[result] = SSARef(leader)
+                    continue
+                leaders.setdefault(key, []).append((label, result))
+            instructions.append(instr)
+        kept[label] = instructions
+
+    if not replacements:
+        return func
+    # Back-edge phi operands were visited before the values they name
+    blocks = [
+        Block(
+            label=block.label,
+            instructions=tuple(kept.get(block.label, block.instructions)),
+            terminator=block.terminator,
+        )
+        for block in func.blocks
+    ]
+    return substitute(with_blocks(func, blocks), replacements)
+
+
+def _available(
+    leaders: list[tuple[BlockLabel, SSAName]] | tuple[()],
+    label: BlockLabel,
+    facts: FunctionFacts,
+) -> SSAName | None:
+    """A leader whose block dominates label (or is label), if any."""
+    for block, name in leaders:
+        if block == label or facts.dominates(block, label):
+            return name
+    return None
+
+
+def _simplify(instr: Instruction) -> Value | None:
+    """A value instr always equals, by an algebraic identity."""
+    if isinstance(instr, SelectInst) and instr.true_val == instr.false_val:
+        return instr.true_val
+
+    if isinstance(instr, ICmpInst) and instr.left == instr.right and _is_ssa(instr.left):
+        return Const(value=_REFLEXIVE[instr.pred], ty=JCType.BYTE)
+
+    if not isinstance(instr, BinaryInst) or instr.ty not in BITS:
+        return None
+    left, right = instr.left, instr.right
+    if left == right and _is_ssa(left):
+        if instr.op in ("and", "or"):
+            return left
+        if instr.op in ("sub", "xor"):
+            return Const(value=0, ty=instr.ty)
+    if instr.op in _COMMUTATIVE and isinstance(left, Const):
+        left, right = right, left
+    if isinstance(right, Const) and _is_ssa(left):
+        constant = wrap(right.value, instr.ty)
+        if _RIGHT_IDENTITY.get(instr.op) == constant:
+            return left
+        if instr.op in ("mul", "and") and constant == 0:
+            return Const(value=0, ty=instr.ty)
+    return None
+
+
+def _is_ssa(value: Value) -> bool:
+    return isinstance(value, SSARef)
+
+
+def _key(
+    instr: Instruction,
+    label: BlockLabel,
+    geps: Mapping[SSAName, GEPInst],
+    def_map: Mapping[SSAName, Instruction],
+    module: Module,
+) -> Hashable | None:
+    """Value number key of instr, or None if it is not numbered."""
+    match instr:
+        case BinaryInst(op=op, left=left, right=right, ty=ty):
+            a, b = _operand_key(left, geps), _operand_key(right, geps)
+            if op in _COMMUTATIVE and repr(b) < repr(a):
+                a, b = b, a
+            return ("binary", op, ty, a, b)
+        case ICmpInst(pred=pred, left=left, right=right, ty=ty):
+            a, b = _operand_key(left, geps), _operand_key(right, geps)
+            if repr(b) < repr(a):
+                a, b, pred = b, a, _SWAPPED[pred]
+            return ("icmp", pred, ty, a, b)
+        case CastInst(op=op, operand=operand, from_ty=from_ty, to_ty=to_ty, flags=flags):
+            return ("cast", op, from_ty, to_ty, flags, _operand_key(operand, geps))
+        case SelectInst(cond=cond, true_val=t, false_val=f, ty=ty):
+            return ("select", ty, *(_operand_key(v, geps) for v in (cond, t, f)))
+        case PhiInst(incoming=incoming, ty=ty):
+            # Only identical phis of the same block are equal
+            return ("phi", label, ty, tuple(sorted(incoming, key=repr)))
+        case LoadInst(ty=ty, ptr=ptr) if reads_constant(instr, def_map, module.globals):
+            return ("load", ty, _operand_key(ptr, geps))
+        case _:
+            return None
+
+
+def _operand_key(value: Value, geps: Mapping[SSAName, GEPInst]) -> Hashable:
+    """Key of an operand; a GEP result is keyed by the address it computes."""
+    if isinstance(value, SSARef) and value.name in geps:
+        gep = geps[value.name]
+        return (
+            "gep",
+            gep.source_type,
+            gep.inbounds,
+            _operand_key(gep.base, geps),
+            tuple(_operand_key(i, geps) for i in gep.indices),
+        )
+    return value
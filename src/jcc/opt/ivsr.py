@@ -0,0 +1,256 @@
+"""Induction-variable strength reduction.
+
+codegen addresses a global array element as an index into one of the
+shared memory arrays: mem_offset + i * scale, where scale is 2 for
+decomposed INTs and the field's elem_count for a struct array in SOA
+layout. In a loop that counts i by a constant, every access pays that
+multiply and add again. This pass gives each such address its own pointer
+phi, advanced on the back edge by a constant byte GEP:
+
+    loop:                                     loop:
+      %i = phi [0, %entry], [%i.next, %loop]    %i = phi [0, %entry], [%i.next, %loop]
+                                                %p.iv = phi [@PIPES+4, %entry], [%p.iv.next, %loop]
+      %p = gep [3 x %Pipe], @PIPES, 0, %i, 2
+      %v = load i16, ptr %p                     %v = load i16, ptr %p.iv
+      %i.next = add %i, 1                       %i.next = add %i, 1
+                                                %p.iv.next = gep i8, ptr %p.iv, 6
+
+jcc.analysis.offset_phi resolves the new phi to a SHORT offset slot whose
+back-edge move is a step, emitted as one sinc, and each access loads that
+slot as its index. The old GEP, and the counter if nothing else reads it,
+are dead afterwards.
+
+The pass runs after global allocation: the memory layout decides both
+whether an address can be stepped and whether stepping saves anything (an
+access already indexed by i alone is left as is).
+
+What is handled:
+- Loops with one entry edge and one back edge.
+- Counters that start at a constant and add a constant per iteration.
+- GEPs on a global whose only dynamic index is the counter, as the element
+  index of an integer array or the struct index of a struct array, and
+  whose users are all loads and stores through them.
+"""
+
+from collections.abc import Mapping
+
+from jcc.analysis.globals import AllocatedStruct, AllocationResult, GlobalInfo
+from jcc.analysis.offset_phi import mem_offset_at, mem_step
+from jcc.ir.facts import FunctionFacts
+from jcc.ir.instructions import BinaryInst, GEPInst, Instruction, LoadInst, PhiInst, StoreInst
+from jcc.ir.module import Block, Function, Module
+from jcc.ir.types import BlockLabel, GlobalName, JCType, LLVMType, SSAName
+from jcc.ir.values import Const, GlobalRef, InlineGEP, SSARef, Value
+from jcc.opt.dce import eliminate_dead_code
+from jcc.opt.fold import BITS, wrap
+from jcc.opt.rewrite import substitute, with_blocks
+
+_INT_BYTES = {"i8": 1, "i16": 2, "i32": 4}
+_I8 = LLVMType("i8")
+
+
+def reduce_strength(func: Function, module: Module, allocation: AllocationResult) -> Function:
+    """Replace counter-indexed global addresses in loops with stepped pointers.
+
+    Returns:
+        The rewritten function, or func itself if no address was reduced.
+    """
+    facts = FunctionFacts(func)
+    names = set(facts.def_map) | {p.name for p in func.params}
+    phis: dict[BlockLabel, list[PhiInst]] = {}
+    steps: dict[BlockLabel, list[GEPInst]] = {}
+    replacements: dict[SSAName, Value] = {}
+
+    for header, body in facts.loops.items():
+        preds = facts.predecessors[header]
+        entries = [p for p in preds if p not in body and p in facts.rpo_index]
+        latches = [p for p in preds if p in body]
+        if len(entries) != 1 or len(latches) != 1:
+            continue
+        entry, latch = entries[0], latches[0]
+        created: dict[tuple[GlobalName, int, int], SSAName] = {}
+
+        for phi in func.block_map[header].phi_instructions:
+            counter = _counter(phi, entry, latch, facts.def_map)
+            if counter is None:
+                continue
+            init, step = counter
+            for label in facts.rpo:
+                if label not in body:
+                    continue
+                for instr in func.block_map[label].instructions:
+                    if not isinstance(instr, GEPInst) or instr.result in replacements:
+                        continue
+                    if not _only_accessed(instr.result, facts.use_map):
+                        continue
+                    address = _address(instr, phi.result, allocation)
+                    if address is None:
+                        continue
+                    global_name, base, scale = address
+                    key = (global_name, base + init * scale, step * scale)
+                    if key not in created:
+                        if not _profitable(allocation, global_name, base, scale, step):
+                            continue
+                        pointer = _fresh(SSAName(f"{instr.result}.iv"), names)
+                        advanced = _fresh(SSAName(f"{pointer}.next"), names)
+                        start = InlineGEP(base=global_name, indices=(key[1],), source_type=_I8)
+                        phis.setdefault(header, []).append(
+                            PhiInst(
+                                result=pointer,
+                                incoming=((start, entry), (SSARef(name=advanced), latch)),
+                                ty=JCType.REF,
+                            )
+                        )
+                        steps.setdefault(latch, []).append(
+                            GEPInst(
+                                result=advanced,
+                                base=SSARef(name=pointer),
+                                indices=(Const(value=key[2], ty=JCType.INT),),
+                                source_type=_I8,
+                                inbounds=True,
+                            )
+                        )
+                        created[key] = pointer
+                    replacements[instr.result] = SSARef(name=created[key])
+
+    if not replacements:
+        return func
+    blocks: list[Block] = []
+    for block in func.blocks:
+        instructions = list(block.instructions)
+        new_phis = phis.get(block.label, [])
+        if new_phis:
+            first = next(
+                (i for i, instr in enumerate(instructions) if not isinstance(instr, PhiInst)),
+                len(instructions),
+            )
+            instructions[first:first] = new_phis
+        instructions.extend(steps.get(block.label, []))
+        blocks.append(
+            Block(label=block.label, instructions=tuple(instructions), terminator=block.terminator)
+        )
+    return eliminate_dead_code(substitute(with_blocks(func, blocks), replacements), module)
+
+
+def _counter(
+    phi: PhiInst,
+    entry: BlockLabel,
+    latch: BlockLabel,
+    def_map: Mapping[SSAName, Instruction],
+) -> tuple[int, int] | None:
+    """(initial value, step) of a basic induction variable, or None."""
+    if phi.ty not in BITS or len(phi.incoming) != 2:
+        return None
+    values = {label: value for value, label in phi.incoming}
+    init, update = values.get(entry), values.get(latch)
+    if not isinstance(init, Const) or not isinstance(update, SSARef):
+        return None
+    defn = def_map.get(update.name)
+    if not isinstance(defn, BinaryInst) or defn.op not in ("add", "sub"):
+        return None
+    this = SSARef(name=phi.result)
+    if defn.left == this and isinstance(defn.right, Const):
+        step = defn.right.value
+    elif defn.op == "add" and defn.right == this and isinstance(defn.left, Const):
+        step = defn.left.value
+    else:
+        return None
+    step = wrap(step, defn.ty)
+    return wrap(init.value, phi.ty), step if defn.op == "add" else -step
+
+
+def _only_accessed(name: SSAName, use_map: Mapping[SSAName, list[Instruction]]) -> bool:
+    """Whether every use of name is the address of a load or store."""
+    uses = use_map.get(name, [])
+    pointer = SSARef(name=name)
+    return bool(uses) and all(
+        (isinstance(use, LoadInst) and use.ptr == pointer)
+        or (isinstance(use, StoreInst) and use.ptr == pointer and use.value != pointer)
+        for use in uses
+    )
+
+
+def _address(
+    gep: GEPInst,
+    counter: SSAName,
+    allocation: AllocationResult,
+) -> tuple[GlobalName, int, int] | None:
+    """Byte address of gep as (global, base, scale), meaning base + counter * scale.
+
+    None unless the counter is gep's only dynamic index and steps over the
+    elements of an integer array or the structs of a struct array.
+    """
+    if not isinstance(gep.base, GlobalRef):
+        return None
+    info = allocation.lookup(gep.base.name)
+    if info is None:
+        return None
+
+    indices = gep.indices
+    element = gep.source_type.strip()
+    if element.startswith("["):
+        # Form A: [N x T], the first index dereferences the pointer
+        if not indices or not (isinstance(indices[0], Const) and indices[0].value == 0):
+            return None
+        indices = indices[1:]
+        element = element[1:-1].split(" x ", 1)[-1].strip()
+    if not indices or indices[0] != SSARef(name=counter):
+        return None
+    rest = [i.value for i in indices[1:] if isinstance(i, Const)]
+    if len(rest) != len(indices) - 1:
+        return None
+
+    if isinstance(info, GlobalInfo):
+        size = _INT_BYTES.get(element)
+        # The element must be exactly what codegen indexes by
+        elem_size = info.mem_array.element_type.byte_size * (2 if info.decomposed_int else 1)
+        if rest or size is None or size != elem_size:
+            return None
+        return (gep.base.name, 0, size)
+
+    assert isinstance(info, AllocatedStruct)
+    field_index = rest[0] if rest else 0
+    if len(rest) > 2 or not 0 <= field_index < len(info.fields):
+        return None
+    field = info.fields[field_index]
+    base = field.byte_offset
+    if len(rest) == 2:
+        base += rest[1] * field.jc_type.byte_size
+    # Stay inside the field, where codegen's index stays too
+    if info.field_at_byte_offset(base) is not field:
+        return None
+    return (gep.base.name, base, info.stride)
+
+
+def _profitable(
+    allocation: AllocationResult,
+    global_name: GlobalName,
+    base: int,
+    scale: int,
+    step: int,
+) -> bool:
+    """Whether the layout can follow the pointer and indexing by it saves work.
+
+    codegen indexes the original address with mem_offset + counter * delta;
+    a stepped pointer pays off unless that is the counter itself.
+    """
+    info = allocation.lookup(global_name)
+    assert info is not None
+    start = mem_offset_at(info, base)
+    if start is None:
+        return False
+    mem_offset, field_offset = start
+    delta = mem_step(info, field_offset, scale)
+    if delta is None or mem_step(info, field_offset, scale * step) is None:
+        return False
+    return (mem_offset, delta) != (0, 1)
+
+
+def _fresh(name: SSAName, names: set[SSAName]) -> SSAName:
+    """name, suffixed if needed to be unique in names, which it is added to."""
+    candidate, suffix = name, 0
+    while candidate in names:
+        suffix += 1
+        candidate = SSAName(f"{name}{suffix}")
+    names.add(candidate)
+    return candidate
@@ -0,0 +1,274 @@
+"""Loop-invariant code motion.
+
+An instruction in a loop whose operands are all defined outside it (or are
+themselves hoisted) computes the same value on every iteration. This pass
+moves such instructions to the loop's preheader, the one block outside the
+loop that enters it, so they run once per loop entry:
+
+    loop:                                 preheader:
+      %k = shl i16 %n, 2                    %k = shl i16 %n, 2
+      %v = load CONST_S[%k]                 %v = load CONST_S[%k]
+      ...                                 loop: ...
+
+Loops are visited innermost first, so a value hoisted out of an inner loop
+can leave its enclosing loop too. A loop entered from a single block that
+has other successors gets a new preheader on that edge; loops entered from
+several blocks are left alone.
+
+What moves:
+- Arithmetic, casts and selects on INT, SHORT or BYTE values. Division and
+  remainder only when the divisor is a non-zero constant, or when the
+  instruction runs on every pass through the loop.
+- Loads from constant globals (CONST_* arrays), which no store can change.
+  Their index may be out of bounds when the loop is skipped, so they only
+  move when they run on every pass through the loop, unless the address is
+  constant.
+- Compares, except those feeding a branch: codegen fuses a compare into
+  its branch, which beats loading a precomputed flag.
+- GEPs, only along with a load that uses them.
+
+"Runs on every pass" means its block dominates every block that leaves the
+loop, as in LLVM's isGuaranteedToExecute, and no call can run before it on
+the way through the loop: a call may throw (ISOException.throwIt, the bounds
+checks of Util.arrayCopy), and a hoisted division or load must not throw
+in its place. Any call earlier in the block, or in a loop block before it in
+reverse postorder (which covers every path from the header), counts.
+"""
+
+from jcc.ir.facts import FunctionFacts
+from jcc.ir.instructions import (
+    BinaryInst,
+    BranchInst,
+    CallInst,
+    CastInst,
+    GEPInst,
+    ICmpInst,
+    Instruction,
+    LoadInst,
+    PhiInst,
+    ReturnInst,
+    SelectInst,
+    SwitchInst,
+    TerminatorInst,
+    UnreachableInst,
+    get_result,
+)
+from jcc.ir.module import Block, Function, Module
+from jcc.ir.types import BlockLabel, SSAName
+from jcc.ir.values import Const, GlobalRef, InlineGEP, SSARef, Value
+from jcc.opt.fold import BITS
+from jcc.opt.rewrite import reads_constant, with_blocks
+
+_DIVISIONS = frozenset({"sdiv", "udiv", "srem", "urem"})
+_VALUE_CASTS = frozenset({"trunc", "sext", "zext", "freeze"})
+
+
+def hoist_invariants(func: Function, module: Module) -> Function:
+    """Move loop-invariant instructions into loop preheaders.
+
+    Returns:
+        The rewritten function, or func itself if nothing moved.
+    """
+    facts = FunctionFacts(func)
+    loops = facts.loops
+    headers = sorted(loops, key=lambda h: (len(loops[h]), facts.rpo_index[h]))
+    for header in headers:
+        hoisted = _hoist_loop(func, facts, header, module)
+        if hoisted is not func:
+            func = hoisted
+            facts = FunctionFacts(func)
+    return func
+
+
+def _hoist_loop(
+    func: Function,
+    facts: FunctionFacts,
+    header: BlockLabel,
+    module: Module,
+) -> Function:
+    """Hoist the invariants of the loop headed by header."""
+    body = facts.loops.get(header)
+    if body is None:
+        return func
+    entries = [p for p in facts.predecessors[header] if p not in body and p in facts.rpo_index]
+    if len(entries) != 1:
+        return func
+
+    exiting = [
+        label for label in body
+        if any(s not in body for s in facts.successors[label])
+        or isinstance(func.block_map[label].terminator, (ReturnInst, UnreachableInst))
+    ]
+    branch_conds = {
+        b.terminator.cond.name
+        for b in func.blocks
+        if isinstance(b.terminator, BranchInst) and isinstance(b.terminator.cond, SSARef)
+    }
+
+    def_block: dict[SSAName, BlockLabel] = {}
+    for block in func.blocks:
+        for instr in block.instructions:
+            result = get_result(instr)
+            if result is not None:
+                def_block[result] = block.label
+
+    moved: set[SSAName] = set()
+
+    def invariant(value: Value) -> bool:
+        if not isinstance(value, SSARef) or value.name in moved:
+            return True
+        # Parameters have no defining block
+        return def_block.get(value.name) not in body
+
+    hoisted: list[Instruction] = []
+    called = False  # A call may have run (and thrown) on the way here
+    for label in facts.rpo:
+        if label not in body:
+            continue
+        dominates_exits = all(facts.dominates(label, e) for e in exiting)
+        for instr in func.block_map[label].instructions:
+            always = dominates_exits and not called
+            if isinstance(instr, CallInst):
+                called = True
+                continue
+            if not all(invariant(op) for op in instr.operands):
+                continue
+            if not _movable(instr, always, branch_conds, facts, module):
+                continue
+            moved.add(instr.result)  # type: ignore[attr-defined]
+            hoisted.append(instr)
+
+    # GEPs only move with a user that moves
+    needed: set[SSAName] = set()
+    kept: list[Instruction] = []
+    for instr in reversed(hoisted):
+        if isinstance(instr, GEPInst) and instr.result not in needed:
+            continue
+        kept.append(instr)
+        needed.update(op.name for op in instr.operands if isinstance(op, SSARef))
+    kept.reverse()
+    if not any(not isinstance(i, GEPInst) for i in kept):
+        return func
+
+    return _rewrite(func, facts, header, entries[0], body, kept)
+
+
+def _movable(
+    instr: Instruction,
+    always: bool,
+    branch_conds: set[SSAName],
+    facts: FunctionFacts,
+    module: Module,
+) -> bool:
+    """Whether instr may run in the preheader instead of the loop."""
+    match instr:
+        case BinaryInst(op=op, right=right, ty=ty) if ty in BITS:
+            if op in _DIVISIONS:
+                return always or (isinstance(right, Const) and right.value != 0)
+            return True
+        case CastInst(op=op, from_ty=from_ty, to_ty=to_ty):
+            return op in _VALUE_CASTS and from_ty in BITS and to_ty in BITS
+        case SelectInst(ty=ty):
+            return ty in BITS
+        case ICmpInst(result=result, ty=ty):
+            return ty in BITS and result not in branch_conds
+        case GEPInst():
+            return True
+        case LoadInst(ptr=ptr):
+            return reads_constant(instr, facts.def_map, module.globals) and (
+                always or isinstance(ptr, (GlobalRef, InlineGEP))
+            )
+        case _:
+            return False
+
+
+def _rewrite(
+    func: Function,
+    facts: FunctionFacts,
+    header: BlockLabel,
+    entry: BlockLabel,
+    body: frozenset[BlockLabel],
+    hoisted: list[Instruction],
+) -> Function:
+    """Move hoisted to the end of the preheader, creating one if needed."""
+    removed = {id(i) for i in hoisted}
+    blocks: list[Block] = []
+    for block in func.blocks:
+        if block.label in body:
+            block = Block(
+                label=block.label,
+                instructions=tuple(i for i in block.instructions if id(i) not in removed),
+                terminator=block.terminator,
+            )
+        blocks.append(block)
+
+    if facts.successors[entry] == [header]:
+        index = next(i for i, b in enumerate(blocks) if b.label == entry)
+        pre = blocks[index]
+        blocks[index] = Block(
+            label=pre.label,
+            instructions=pre.instructions + tuple(hoisted),
+            terminator=pre.terminator,
+        )
+        return with_blocks(func, blocks)
+
+    # Split the entry edge: entry → preheader → header
+    labels = {b.label for b in func.blocks}
+    preheader = BlockLabel(f"{header}.preheader")
+    suffix = 0
+    while preheader in labels:
+        suffix += 1
+        preheader = BlockLabel(f"{header}.preheader{suffix}")
+
+    result: list[Block] = []
+    for block in blocks:
+        if block.label == header:
+            result.append(
+                Block(
+                    label=preheader,
+                    instructions=tuple(hoisted),
+                    terminator=BranchInst(cond=None, true_label=header, false_label=None),
+                )
+            )
+            block = Block(
+                label=block.label,
+                instructions=tuple(
+                    _relabel_phi(i, entry, preheader) if isinstance(i, PhiInst) else i
+                    for i in block.instructions
+                ),
+                terminator=block.terminator,
+            )
+        elif block.label == entry:
+            block = Block(
+                label=block.label,
+                instructions=block.instructions,
+                terminator=_retarget(block.terminator, header, preheader),
+            )
+        result.append(block)
+    return with_blocks(func, result)
+
+
+def _relabel_phi(phi: PhiInst, old: BlockLabel, new: BlockLabel) -> PhiInst:
+    return PhiInst(
+        result=phi.result,
+        incoming=tuple((v, new if pred == old else pred) for v, pred in phi.incoming),
+        ty=phi.ty,
+    )
+
+
+def _retarget(term: TerminatorInst, old: BlockLabel, new: BlockLabel) -> TerminatorInst:
+    """term with every edge to old sent to new."""
+    if isinstance(term, BranchInst):
+        return BranchInst(
+            cond=term.cond,
+            true_label=new if term.true_label == old else term.true_label,
+            false_label=new if term.false_label == old else term.false_label,
+        )
+    if isinstance(term, SwitchInst):
+        return SwitchInst(
+            value=term.value,
+            default=new if term.default == old else term.default,
+            cases=tuple((v, new if t == old else t) for v, t in term.cases),
+            ty=term.ty,
+        )
+    return term
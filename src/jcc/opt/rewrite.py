@@ -0,0 +1,109 @@
+"""Helpers shared by the optimization passes."""
+
+from collections.abc import Mapping
+from dataclasses import fields, replace
+from typing import cast
+
+from jcc.ir.instructions import (
+    BinaryInst,
+    CastInst,
+    GEPInst,
+    ICmpInst,
+    Instruction,
+    LoadInst,
+    PhiInst,
+    SelectInst,
+)
+from jcc.ir.module import Block, Function, Global
+from jcc.ir.types import GlobalName, SSAName
+from jcc.ir.values import GlobalRef, InlineGEP, SSARef, Value
+
+
+def function_size(func: Function) -> int:
+    """Number of IR instructions in func, terminators included."""
+    return sum(len(block.instructions) + 1 for block in func.blocks)
+
+
+def with_blocks(func: Function, blocks: list[Block]) -> Function:
+    """Copy of func with new blocks."""
+    return Function(
+        name=func.name,
+        params=func.params,
+        return_type=func.return_type,
+        blocks=tuple(blocks),
+    )
+
+
+def resolve(values: Mapping[SSAName, Value], value: Value) -> Value:
+    """Follow replacement chains (%a → %b → 3) to the final value."""
+    while isinstance(value, SSARef) and value.name in values:
+        value = values[value.name]
+    return value
+
+
+def replace_operands[I: Instruction](instr: I, values: Mapping[SSAName, Value]) -> I:
+    """Copy of instr with SSARef operands replaced through values.
+
+    Walks every field, so it covers phi incoming pairs and GEP indices.
+    Defined names are left alone.
+    """
+
+    def remap(field: object) -> object:
+        if isinstance(field, SSARef):
+            return resolve(values, field)
+        if isinstance(field, tuple):
+            return tuple(remap(item) for item in cast(tuple[object, ...], field))
+        return field
+
+    if not values or not any(isinstance(op, SSARef) and op.name in values for op in instr.operands):
+        return instr
+    return replace(instr, **{f.name: remap(getattr(instr, f.name)) for f in fields(instr)})
+
+
+def substitute(func: Function, values: Mapping[SSAName, Value]) -> Function:
+    """Copy of func with every use of the names in values replaced."""
+    if not values:
+        return func
+    return with_blocks(
+        func,
+        [
+            Block(
+                label=block.label,
+                instructions=tuple(replace_operands(i, values) for i in block.instructions),
+                terminator=replace_operands(block.terminator, values),
+            )
+            for block in func.blocks
+        ],
+    )
+
+
+def is_pure(instr: Instruction) -> bool:
+    """Whether instr computes a value without side effects or memory reads."""
+    return isinstance(instr, (BinaryInst, ICmpInst, CastInst, SelectInst, GEPInst, PhiInst))
+
+
+def reads_constant(
+    instr: Instruction,
+    def_map: Mapping[SSAName, Instruction],
+    globals: Mapping[GlobalName, Global],
+) -> bool:
+    """Whether instr is a load from a constant global (a CONST_* array)."""
+    if not isinstance(instr, LoadInst):
+        return False
+    root = _pointer_root(instr.ptr, def_map)
+    return root is not None and root in globals and globals[root].is_constant
+
+
+def _pointer_root(ptr: Value, def_map: Mapping[SSAName, Instruction]) -> GlobalName | None:
+    """Global a pointer is derived from through GEPs, if any."""
+    while True:
+        if isinstance(ptr, GlobalRef):
+            return ptr.name
+        if isinstance(ptr, InlineGEP):
+            return ptr.get_root_global()
+        if not isinstance(ptr, SSARef):
+            return None
+        defn = def_map.get(ptr.name)
+        if not isinstance(defn, GEPInst):
+            return None
+        ptr = defn.base
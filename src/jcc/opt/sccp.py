@@ -0,0 +1,313 @@
+"""Sparse conditional constant propagation.
+
+Wegman and Zadeck's algorithm ("Constant Propagation with Conditional
+Branches"): every SSA value starts unknown and only moves down the lattice
+unknown → constant → varying, while blocks are visited only once an edge
+into them is found executable. A phi meets just the values arriving over
+executable edges, so constants survive through branches that can never be
+taken.
+
+Afterwards, values found constant are replaced by Const operands and their
+definitions dropped, branches and switches on constants become
+unconditional, unreachable blocks are removed, and phis lose the incoming
+values of edges that are never taken (a phi left with one is replaced by
+its value).
+
+Integer folding follows LLVM semantics (see jcc.opt.fold). Loads, calls,
+parameters, undef and values of non-integer types are varying.
+"""
+
+from collections import deque
+from enum import Enum
+from typing import Final
+
+from jcc.ir.facts import FunctionFacts
+from jcc.ir.instructions import (
+    BinaryInst,
+    BranchInst,
+    CastInst,
+    ICmpInst,
+    Instruction,
+    PhiInst,
+    SelectInst,
+    SwitchInst,
+    TerminatorInst,
+    get_result,
+)
+from jcc.ir.module import Block, Function, Module
+from jcc.ir.types import BlockLabel, SSAName
+from jcc.ir.utils import get_instruction_type
+from jcc.ir.values import Const, SSARef, Value
+from jcc.opt.fold import BITS, fold_binary, fold_cast, fold_icmp, wrap
+from jcc.opt.rewrite import replace_operands, resolve, with_blocks
+
+
+class _Varying(Enum):
+    """Lattice bottom: more than one value at run time."""
+
+    VARYING = "VARYING"
+
+    def __repr__(self) -> str:
+        return "VARYING"
+
+
+# Lattice: absent (unknown) > int (constant) > VARYING
+VARYING: Final = _Varying.VARYING
+Lattice = int | _Varying | None
+
+
+def propagate_constants(func: Function, module: Module) -> Function:
+    """Run SCCP on one function.
+
+    Returns:
+        The rewritten function, or func itself if nothing changed.
+    """
+    solver = _Solver(func)
+    solver.solve()
+    return solver.rewrite()
+
+
+def _meet(a: Lattice, b: Lattice) -> Lattice:
+    if a is None:
+        return b
+    if b is None or a == b:
+        return a
+    return VARYING
+
+
+class _Solver:
+    def __init__(self, func: Function) -> None:
+        self.func = func
+        self.facts = FunctionFacts(func)
+        self.values: dict[SSAName, Lattice] = {p.name: VARYING for p in func.params}
+        self.edges: set[tuple[BlockLabel, BlockLabel]] = set()
+        self.reached: set[BlockLabel] = set()
+
+        # Instruction → its block, for revisiting the users of a changed value
+        self.block_of: dict[int, BlockLabel] = {}
+        for block in func.blocks:
+            for instr in block.all_instructions:
+                self.block_of[id(instr)] = block.label
+
+        self.flow: deque[tuple[BlockLabel | None, BlockLabel]] = deque()
+        self.ssa: deque[SSAName] = deque()
+
+    # --- Solving ---
+
+    def solve(self) -> None:
+        self.flow.append((None, self.func.entry_block.label))
+        while self.flow or self.ssa:
+            while self.flow:
+                pred, label = self.flow.popleft()
+                self.visit_edge(pred, label)
+            while self.ssa:
+                name = self.ssa.popleft()
+                for user in self.facts.use_map.get(name, ()):
+                    label = self.block_of[id(user)]
+                    if label in self.reached:
+                        self.visit(user, label)
+
+    def visit_edge(self, pred: BlockLabel | None, label: BlockLabel) -> None:
+        if pred is not None:
+            if (pred, label) in self.edges:
+                return
+            self.edges.add((pred, label))
+        block = self.func.block_map[label]
+        if label in self.reached:
+            # Only the phis see the new edge
+            for phi in block.phi_instructions:
+                self.visit(phi, label)
+            return
+        self.reached.add(label)
+        for instr in block.all_instructions:
+            self.visit(instr, label)
+
+    def visit(self, instr: Instruction, label: BlockLabel) -> None:
+        if isinstance(instr, BranchInst):
+            self.visit_branch(instr, label)
+            return
+        if isinstance(instr, SwitchInst):
+            self.visit_switch(instr, label)
+            return
+        result = get_result(instr)
+        if result is None:
+            return
+        new = _meet(self.values.get(result), self.evaluate(instr, label))
+        if new != self.values.get(result):
+            self.values[result] = new
+            self.ssa.append(result)
+
+    def visit_branch(self, instr: BranchInst, label: BlockLabel) -> None:
+        if instr.cond is None or instr.false_label is None:
+            self.flow.append((label, instr.true_label))
+            return
+        cond = self.value_of(instr.cond)
+        if cond is None:
+            return
+        if cond is VARYING or cond:
+            self.flow.append((label, instr.true_label))
+        if cond is VARYING or not cond:
+            self.flow.append((label, instr.false_label))
+
+    def visit_switch(self, instr: SwitchInst, label: BlockLabel) -> None:
+        value = self.value_of(instr.value)
+        if value is None:
+            return
+        if value is VARYING:
+            targets = [instr.default, *(target for _, target in instr.cases)]
+        else:
+            targets = [_switch_target(instr, value)]
+        for target in targets:
+            self.flow.append((label, target))
+
+    def value_of(self, value: Value) -> Lattice:
+        if isinstance(value, SSARef):
+            return self.values.get(value.name)
+        if isinstance(value, Const) and value.ty in BITS:
+            return wrap(value.value, value.ty)
+        return VARYING
+
+    def evaluate(self, instr: Instruction, label: BlockLabel) -> Lattice:
+        """Lattice value of instr's result from its operands' values."""
+        if isinstance(instr, PhiInst):
+            result: Lattice = None
+            for value, pred in instr.incoming:
+                if (pred, label) in self.edges:
+                    result = _meet(result, self.value_of(value))
+            return result
+
+        if isinstance(instr, SelectInst):
+            cond = self.value_of(instr.cond)
+            if cond is None:
+                return None
+            if cond is VARYING:
+                return _meet(self.value_of(instr.true_val), self.value_of(instr.false_val))
+            return self.value_of(instr.true_val if cond else instr.false_val)
+
+        if isinstance(instr, BinaryInst) and instr.ty in BITS:
+            left, right = self.value_of(instr.left), self.value_of(instr.right)
+            absorbing = _absorbing(instr)
+            if absorbing is not None and absorbing in (left, right):
+                return absorbing
+            if left is None or right is None:
+                return None
+            if left is VARYING or right is VARYING:
+                return VARYING
+            folded = fold_binary(instr.op, left, right, instr.ty)
+            return VARYING if folded is None else folded
+
+        if isinstance(instr, ICmpInst) and instr.ty in BITS:
+            left, right = self.value_of(instr.left), self.value_of(instr.right)
+            if left is None or right is None:
+                return None
+            if left is VARYING or right is VARYING:
+                return VARYING
+            return fold_icmp(instr.pred, left, right, instr.ty)
+
+        if isinstance(instr, CastInst):
+            operand = self.value_of(instr.operand)
+            if operand is None:
+                return None
+            if operand is VARYING:
+                return VARYING
+            folded = fold_cast(instr, operand)
+            return VARYING if folded is None else folded
+
+        return VARYING
+
+    # --- Rewriting ---
+
+    def rewrite(self) -> Function:
+        constants: dict[SSAName, Value] = {}
+        for block in self.func.blocks:
+            if block.label not in self.reached:
+                continue
+            for instr in block.instructions:
+                result = get_result(instr)
+                value = self.values.get(result) if result is not None else None
+                ty = get_instruction_type(instr)
+                if isinstance(value, int) and ty is not None:
+                    constants[result] = Const(value=value, ty=ty)  # type: ignore[index]
+
+        # Phis left with a single executable edge become their value
+        singles: dict[SSAName, Value] = {}
+        blocks: list[Block] = []
+        for block in self.func.blocks:
+            if block.label not in self.reached:
+                continue
+            instructions: list[Instruction] = []
+            for instr in block.instructions:
+                result = get_result(instr)
+                if result in constants:
+                    continue
+                if isinstance(instr, PhiInst):
+                    incoming = tuple(
+                        (value, pred)
+                        for value, pred in instr.incoming
+                        if (pred, block.label) in self.edges
+                    )
+                    if len({value for value, _ in incoming}) == 1:
+                        singles[instr.result] = incoming[0][0]
+                        continue
+                    if incoming != instr.incoming:
+                        instr = PhiInst(result=instr.result, incoming=incoming, ty=instr.ty)
+                instructions.append(instr)
+            blocks.append(
+                Block(
+                    label=block.label,
+                    instructions=tuple(instructions),
+                    terminator=self.rewrite_terminator(block),
+                )
+            )
+
+        replacements = constants | singles
+        changed = (
+            len(blocks) != len(self.func.blocks)
+            or bool(replacements)
+            or any(new != old for new, old in zip(blocks, self.func.blocks, strict=True))
+        )
+        if not changed:
+            return self.func
+        # Resolve chains up front so a phi's value that is itself replaced
+        # is seen through
+        final = {name: resolve(replacements, value) for name, value in replacements.items()}
+        return with_blocks(
+            self.func,
+            [
+                Block(
+                    label=b.label,
+                    instructions=tuple(replace_operands(i, final) for i in b.instructions),
+                    terminator=replace_operands(b.terminator, final),
+                )
+                for b in blocks
+            ],
+        )
+
+    def rewrite_terminator(self, block: Block) -> TerminatorInst:
+        term = block.terminator
+        taken = [
+            succ for succ in self.facts.successors[block.label]
+            if (block.label, succ) in self.edges
+        ]
+        if isinstance(term, (BranchInst, SwitchInst)) and len(taken) == 1:
+            if isinstance(term, SwitchInst) or term.cond is not None:
+                return BranchInst(cond=None, true_label=taken[0], false_label=None)
+        return term
+
+
+def _absorbing(instr: BinaryInst) -> int | None:
+    """Operand value that fixes the result whatever the other is (x*0, x&0, x|-1)."""
+    match instr.op:
+        case "mul" | "and":
+            return 0
+        case "or":
+            return -1
+        case _:
+            return None
+
+
+def _switch_target(instr: SwitchInst, value: int) -> BlockLabel:
+    for case, target in instr.cases:
+        if wrap(case, instr.ty) == value:
+            return target
+    return instr.default
@@ -0,0 +1,860 @@
+"""Native CAP file writer.
+
+Serializes a Package straight to a CAP archive (format 2.2), without
+going through JCA text and the JCDK capgen tool. Selected with
+[options].cap_writer = "native"; capgen remains the default and serves
+as the reference output.
+
+Components written: Header, Directory, Applet, Import, ConstantPool,
+Class, Method, StaticField, RefLocation and Descriptor.
+"""
+
+import re
+import struct
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from jcc import __version__
+from jcc.api.types import APIRegistry
+from jcc.cap.models import ComponentTag, CPTag
+from jcc.cap.opcodes import OPCODES
+from jcc.codegen import ops
+from jcc.output.constant_pool import CPEntry, CPEntryKind
+from jcc.output.jca import finalize_instructions
+from jcc.output.structure import Field, Method, Package
+
+
+class CapWriteError(Exception):
+    """Package cannot be serialized to a CAP file."""
+
+
+_MAGIC = 0xDECAFFED
+_CAP_MINOR_VERSION = 2
+_CAP_MAJOR_VERSION = 2
+
+# Header flags
+_ACC_INT = 0x01
+_ACC_APPLET = 0x04
+
+# Class/field/method access flags
+_ACCESS_FLAGS = {
+    "public": 0x01,
+    "private": 0x02,
+    "protected": 0x04,
+    "static": 0x08,
+    "final": 0x10,
+}
+_ACC_INIT = 0x80
+
+# Method header
+_ACC_EXTENDED = 0x80
+
+# Token value for private members
+_NO_TOKEN = 0xFF
+
+# Entry in a public virtual method table for a method this class inherits
+_INHERITED_METHOD = 0xFFFF
+
+# The applet class follows the u2 signature_pool_length in the Class component
+_CLASS_OFFSET = 2
+
+# Component file order in the archive (load order)
+_COMPONENT_ORDER = (
+    ComponentTag.HEADER,
+    ComponentTag.DIRECTORY,
+    ComponentTag.IMPORT,
+    ComponentTag.APPLET,
+    ComponentTag.CLASS,
+    ComponentTag.METHOD,
+    ComponentTag.STATICFIELD,
+    ComponentTag.CONSTANTPOOL,
+    ComponentTag.REFLOCATION,
+    ComponentTag.DESCRIPTOR,
+)
+
+_COMPONENT_NAMES = {
+    ComponentTag.HEADER: "Header",
+    ComponentTag.DIRECTORY: "Directory",
+    ComponentTag.APPLET: "Applet",
+    ComponentTag.IMPORT: "Import",
+    ComponentTag.CONSTANTPOOL: "ConstantPool",
+    ComponentTag.CLASS: "Class",
+    ComponentTag.METHOD: "Method",
+    ComponentTag.STATICFIELD: "StaticField",
+    ComponentTag.REFLOCATION: "RefLocation",
+    ComponentTag.DESCRIPTOR: "Descriptor",
+}
+
+# Fixed timestamp so identical packages produce identical archives
+_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def write_cap(package: Package, api: APIRegistry, output_dir: Path) -> Path:
+    """Write a CAP file for a package.
+
+    Args:
+        package: Package structure to serialize.
+        api: API registry, for resolving class names in descriptors.
+        output_dir: Directory to write the CAP file.
+
+    Returns:
+        Path to the generated CAP file.
+
+    Raises:
+        CapWriteError: If the package uses a construct the writer cannot encode.
+    """
+    components = build_components(package, api)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cap_path = output_dir / f"{package.applet_class.name}.cap"
+    base = f"{package.name}/javacard"
+    manifest = f"Manifest-Version: 1.0\r\nCreated-By: jcc {__version__}\r\n\r\n"
+
+    with zipfile.ZipFile(cap_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        _write_entry(zf, "META-INF/MANIFEST.MF", manifest.encode())
+        for tag in _COMPONENT_ORDER:
+            _write_entry(zf, f"{base}/{_COMPONENT_NAMES[tag]}.cap", components[tag])
+
+    return cap_path
+
+
+def build_components(package: Package, api: APIRegistry) -> dict[ComponentTag, bytes]:
+    """Serialize a package to CAP components.
+
+    Args:
+        package: Package structure to serialize.
+        api: API registry, for resolving class names in descriptors.
+
+    Returns:
+        Mapping of component tag to component bytes (tag, size and info).
+
+    Raises:
+        CapWriteError: If the package uses a construct the writer cannot encode.
+    """
+    return _CapBuilder(package, api).build()
+
+
+def _write_entry(zf: zipfile.ZipFile, name: str, data: bytes) -> None:
+    info = zipfile.ZipInfo(name, date_time=_ZIP_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    zf.writestr(info, data)
+
+
+def _component(tag: ComponentTag, info: bytes) -> bytes:
+    """Prefix component info with its tag and u2 size."""
+    if len(info) > 0xFFFF:
+        raise CapWriteError(f"{_COMPONENT_NAMES[tag]} component exceeds 65535 bytes")
+    return struct.pack(">BH", tag, len(info)) + info
+
+
+def _u1(value: int) -> bytes:
+    return struct.pack(">B", value)
+
+
+def _u2(value: int) -> bytes:
+    return struct.pack(">H", value)
+
+
+def _access_flags(access: str) -> int:
+    flags = 0
+    for word in access.split():
+        flags |= _ACCESS_FLAGS[word]
+    return flags
+
+
+def _parse_version(version: str) -> tuple[int, int]:
+    """Parse "major.minor" into (minor, major), the CAP field order."""
+    major, _, minor = version.partition(".")
+    return int(minor or 0), int(major)
+
+
+def _parse_aid(aid: str) -> bytes:
+    """Parse a JCA-style AID ("0xA0:0x00:...") into bytes."""
+    return bytes(int(b, 16) for b in aid.split(":"))
+
+
+def _package_info(version: str, aid: bytes) -> bytes:
+    minor, major = _parse_version(version)
+    return bytes((minor, major, len(aid))) + aid
+
+
+# === Bytecode assembly ===
+
+_OPCODE_BY_MNEMONIC = {info.mnemonic: info for info in OPCODES.values()}
+
+# Conditional branches and their 16-bit-offset forms
+_WIDE_BRANCH = {
+    name: f"{name}_w"
+    for name in (
+        "ifeq", "ifne", "iflt", "ifge", "ifgt", "ifle", "ifnull", "ifnonnull",
+        "if_acmpeq", "if_acmpne", "if_scmpeq", "if_scmpne",
+        "if_scmplt", "if_scmpge", "if_scmpgt", "if_scmple", "goto",
+    )
+}
+_BRANCHES = frozenset(_WIDE_BRANCH) | frozenset(_WIDE_BRANCH.values())
+
+_TABLE_SWITCHES = frozenset({"stableswitch", "itableswitch"})
+_LOOKUP_SWITCHES = frozenset({"slookupswitch", "ilookupswitch"})
+
+# Instructions whose single-byte operand is a constant pool index
+_BYTE_INDEX_INSTRUCTIONS = frozenset(
+    f"{op}_{t}{suffix}"
+    for op in ("getfield", "putfield")
+    for t in "absi"
+    for suffix in ("", "_this")
+)
+
+# checkcast/instanceof carry an atype byte before the u2 index
+_TYPED_INDEX_INSTRUCTIONS = frozenset({"checkcast", "instanceof"})
+
+
+def _is_int_instruction(mnemonic: str) -> bool:
+    if mnemonic.startswith("i"):
+        return not mnemonic.startswith(("if", "invoke", "instanceof"))
+    return mnemonic == "s2i" or mnemonic.endswith(("_i", "_i_this", "_i_w"))
+
+
+@dataclass(frozen=True)
+class _AssembledMethod:
+    """Bytecode for one method.
+
+    Attributes:
+        bytecode: Encoded instructions (without the method header).
+        byte_indices: Offsets in bytecode of 1-byte constant pool indices.
+        byte2_indices: Offsets in bytecode of 2-byte constant pool indices.
+        uses_int: Whether any instruction operates on int values.
+    """
+
+    bytecode: bytes
+    byte_indices: tuple[int, ...]
+    byte2_indices: tuple[int, ...]
+    uses_int: bool
+
+
+def _instruction_size(instr: ops.Instruction) -> int:
+    m = instr.mnemonic
+    if m == "label":
+        return 0
+    if m == "stableswitch":
+        return 7 + (int(instr.operands[2]) - int(instr.operands[1]) + 1) * 2
+    if m == "itableswitch":
+        return 11 + (int(instr.operands[2]) - int(instr.operands[1]) + 1) * 2
+    if m == "slookupswitch":
+        return 5 + int(instr.operands[1]) * 4
+    if m == "ilookupswitch":
+        return 5 + int(instr.operands[1]) * 6
+    if m in _TYPED_INDEX_INSTRUCTIONS:
+        return 4
+    info = _OPCODE_BY_MNEMONIC.get(m)
+    if info is None or info.size is None:
+        raise CapWriteError(f"Unknown instruction: {m}")
+    return info.size
+
+
+def _layout(
+    instrs: list[ops.Instruction],
+) -> tuple[list[int], dict[str, int]]:
+    """Compute the byte offset of every instruction and label."""
+    positions: list[int] = []
+    labels: dict[str, int] = {}
+    pos = 0
+    for instr in instrs:
+        positions.append(pos)
+        if instr.mnemonic == "label":
+            labels[str(instr.operands[0])] = pos
+        else:
+            pos += _instruction_size(instr)
+    return positions, labels
+
+
+def _relax_branches(instrs: list[ops.Instruction]) -> tuple[list[int], dict[str, int]]:
+    """Switch short branches whose target is out of range to their wide forms.
+
+    finalize_instructions() already relaxes branches, but its size table
+    falls back to a guess for mnemonics it does not know, so a short branch
+    may still miss its target. Since widening only grows code, repeating
+    until no branch changes terminates.
+    """
+    while True:
+        positions, labels = _layout(instrs)
+        changed = False
+        for i, instr in enumerate(instrs):
+            wide = _WIDE_BRANCH.get(instr.mnemonic)
+            if wide is None:
+                continue
+            target = str(instr.operands[0])
+            if target not in labels:
+                raise CapWriteError(f"Undefined label: {target}")
+            if not -128 <= labels[target] - positions[i] <= 127:
+                instrs[i] = ops.Instruction(wide, instr.operands, instr.pops, instr.pushes)
+                changed = True
+        if not changed:
+            return positions, labels
+
+
+def _assemble(method: Method) -> _AssembledMethod:
+    """Encode a method's instructions as JCVM bytecode."""
+    instrs = list(finalize_instructions(method.code.instructions))
+    positions, labels = _relax_branches(instrs)
+
+    out = bytearray()
+    byte_indices: list[int] = []
+    byte2_indices: list[int] = []
+    uses_int = False
+
+    def offset_to(label: object, pc: int) -> int:
+        target = str(label)
+        if target not in labels:
+            raise CapWriteError(f"Undefined label in {method.name}: {target}")
+        return labels[target] - pc
+
+    for instr, pc in zip(instrs, positions, strict=True):
+        m = instr.mnemonic
+        if m == "label":
+            continue
+        operands = instr.operands
+        info = _OPCODE_BY_MNEMONIC.get(m)
+        if info is None:
+            raise CapWriteError(f"Unknown instruction in {method.name}: {m}")
+        uses_int = uses_int or _is_int_instruction(m)
+        out.append(info.value)
+
+        if m in _TABLE_SWITCHES:
+            default, low, high, *targets = operands
+            value_fmt = ">i" if m == "itableswitch" else ">h"
+            out += struct.pack(">h", offset_to(default, pc))
+            out += struct.pack(value_fmt, int(low)) + struct.pack(value_fmt, int(high))
+            for target in targets:
+                out += struct.pack(">h", offset_to(target, pc))
+        elif m in _LOOKUP_SWITCHES:
+            default, npairs, *pairs = operands
+            value_fmt = ">i" if m == "ilookupswitch" else ">h"
+            out += struct.pack(">hH", offset_to(default, pc), int(npairs))
+            for value, target in zip(pairs[::2], pairs[1::2], strict=True):
+                out += struct.pack(value_fmt, int(value))
+                out += struct.pack(">h", offset_to(target, pc))
+        elif m in _BRANCHES:
+            fmt = ">h" if m.endswith("_w") else ">b"
+            out += struct.pack(fmt, offset_to(operands[0], pc))
+        elif m in _TYPED_INDEX_INSTRUCTIONS:
+            # ops emit only the index; atype 0 selects a class reference
+            atype, index = (0, operands[0]) if len(operands) == 1 else operands
+            out.append(int(atype))
+            byte2_indices.append(len(out))
+            out += _u2(int(index))
+        elif m == "invokeinterface":
+            raise CapWriteError("invokeinterface is not supported by the native CAP writer")
+        elif m in ("dup_x", "swap_x"):
+            mn, n = (operands[0], None) if len(operands) == 1 else operands
+            out.append(int(mn) if n is None else (int(mn) << 4) | int(n))
+        else:
+            for kind, value in zip(info.operand_types, operands, strict=True):
+                v = int(value)
+                if kind == "cp":
+                    byte2_indices.append(len(out))
+                    out += _u2(v)
+                elif kind in ("u1", "atype"):
+                    if m in _BYTE_INDEX_INSTRUCTIONS:
+                        byte_indices.append(len(out))
+                    out += struct.pack(">B", v)
+                elif kind == "s1":
+                    out += struct.pack(">b", v)
+                elif kind == "s2":
+                    out += struct.pack(">h", v)
+                elif kind == "u2":
+                    out += _u2(v)
+                elif kind == "i4":
+                    out += struct.pack(">i", v)
+                else:
+                    raise CapWriteError(f"Unsupported operand type {kind} for {m}")
+
+        if len(out) != pc + _instruction_size(instr):
+            raise CapWriteError(f"Encoding size mismatch for {m} in {method.name}")
+
+    if len(out) > 0xFFFF:
+        raise CapWriteError(
+            f"Method {method.name} bytecode is {len(out)} bytes, "
+            f"exceeds JCVM limit of 65535 bytes"
+        )
+
+    return _AssembledMethod(
+        bytecode=bytes(out),
+        byte_indices=tuple(byte_indices),
+        byte2_indices=tuple(byte2_indices),
+        uses_int=uses_int,
+    )
+
+
+# === Types ===
+
+# Type descriptor nibbles (JCVM spec 6.14)
+_PRIMITIVE_NIBBLES = {"V": 0x1, "Z": 0x2, "B": 0x3, "S": 0x4, "I": 0x5}
+_ARRAY_NIBBLES = {"Z": 0xA, "B": 0xB, "S": 0xC, "I": 0xD}
+_REF_NIBBLE = 0x6
+_REF_ARRAY_NIBBLE = 0xE
+
+# JCA field type names → JVM descriptor characters
+_FIELD_TYPE_CHARS = {"boolean": "Z", "byte": "B", "short": "S", "int": "I"}
+
+# Primitive field sizes in the static field image
+_PRIMITIVE_SIZES = {"Z": 1, "B": 1, "S": 2, "I": 4}
+
+# array_init_info type codes
+_ARRAY_INIT_TYPES = {"Z": 2, "B": 3, "S": 4, "I": 5}
+
+_EXTERNAL_REF = re.compile(r"^(\d+)\.(\d+)(?:\.(\d+))?(\(.*)?$")
+_INTERNAL_METHOD = re.compile(r"^([\w$]+)/([\w$<>]+)(\(.*)$")
+_INTERNAL_FIELD = re.compile(r"^(\S+) ([\w$]+)/([\w$]+)$")
+
+
+def _field_descriptor(type_desc: str) -> str:
+    """Convert a JCA field type ("short", "byte[]") to a JVM descriptor."""
+    dims = type_desc.count("[]")
+    base = type_desc.replace("[]", "")
+    if base not in _FIELD_TYPE_CHARS:
+        raise CapWriteError(f"Unsupported field type: {type_desc}")
+    return "[" * dims + _FIELD_TYPE_CHARS[base]
+
+
+class _TypeTable:
+    """Builds the type_descriptor_info of the Descriptor component."""
+
+    def __init__(self, resolve_class: _ClassResolver, cp_count: int) -> None:
+        self._resolve_class = resolve_class
+        self._data = bytearray()
+        self._offsets: dict[bytes, int] = {}
+        # Offsets are relative to type_descriptor_info, which starts with
+        # constant_pool_count and constant_pool_types[]
+        self._base = 2 + 2 * cp_count
+
+    def add(self, descriptor: str) -> int:
+        """Add a field or method descriptor and return its offset."""
+        nibbles = self._nibbles(descriptor)
+        count = len(nibbles)
+        if count % 2:
+            nibbles.append(0)
+        encoded = _u1(count) + bytes(
+            (nibbles[i] << 4) | nibbles[i + 1] for i in range(0, len(nibbles), 2)
+        )
+        if encoded not in self._offsets:
+            self._offsets[encoded] = self._base + len(self._data)
+            self._data += encoded
+        return self._offsets[encoded]
+
+    @property
+    def data(self) -> bytes:
+        return bytes(self._data)
+
+    def _nibbles(self, descriptor: str) -> list[int]:
+        nibbles: list[int] = []
+        i = 0
+        while i < len(descriptor):
+            c = descriptor[i]
+            if c in "()":
+                i += 1
+                continue
+            if c == "[":
+                elem = descriptor[i + 1]
+                if elem == "L":
+                    end = descriptor.index(";", i)
+                    nibbles.append(_REF_ARRAY_NIBBLE)
+                    nibbles += self._class_nibbles(descriptor[i + 2 : end])
+                    i = end + 1
+                elif elem in _ARRAY_NIBBLES:
+                    nibbles.append(_ARRAY_NIBBLES[elem])
+                    i += 2
+                else:
+                    raise CapWriteError(f"Unsupported array type in descriptor: {descriptor}")
+            elif c == "L":
+                end = descriptor.index(";", i)
+                nibbles.append(_REF_NIBBLE)
+                nibbles += self._class_nibbles(descriptor[i + 1 : end])
+                i = end + 1
+            elif c in _PRIMITIVE_NIBBLES:
+                nibbles.append(_PRIMITIVE_NIBBLES[c])
+                i += 1
+            else:
+                raise CapWriteError(f"Unsupported type in descriptor: {descriptor}")
+        return nibbles
+
+    def _class_nibbles(self, class_name: str) -> list[int]:
+        ref = self._resolve_class(class_name)
+        return [(ref >> shift) & 0xF for shift in (12, 8, 4, 0)]
+
+
+class _ClassResolver:
+    """Resolves class names to class_ref values."""
+
+    def __init__(self, package: Package, api: APIRegistry) -> None:
+        self._package = package
+        self._api = api
+
+    def __call__(self, class_name: str) -> int:
+        own = self._package.applet_class.name
+        if class_name in (own, f"{self._package.name}/{own}"):
+            return _CLASS_OFFSET
+        pkg = class_name.rsplit("/", 1)[0]
+        cls = self._api.get_class(class_name)
+        if pkg not in self._package.imports or cls is None:
+            raise CapWriteError(f"Cannot resolve class reference: {class_name}")
+        return _external_class_ref(self._package.imports.index(pkg), cls.token)
+
+
+def _external_class_ref(package_index: int, class_token: int) -> int:
+    return 0x8000 | (package_index << 8) | class_token
+
+
+def _parse_ref(ref: str) -> int:
+    """Parse a JCA "pkg.token" class reference."""
+    pkg, _, token = ref.partition(".")
+    return _external_class_ref(int(pkg), int(token))
+
+
+def _method_nargs(method: Method) -> int:
+    """Parameter slots of a method, including 'this' for instance methods."""
+    params = method.descriptor[1 : method.descriptor.index(")")]
+    params = re.sub(r"L[^;]+;", "L", params)
+    params = re.sub(r"\[+.", "L", params)
+    nargs = sum(2 if c == "I" else 1 for c in params)
+    if "static" not in method.access.split():
+        nargs += 1
+    return nargs
+
+
+# === Component builder ===
+
+
+@dataclass(frozen=True)
+class _StaticFieldLayout:
+    """Static field image layout.
+
+    References come first (those with array initializers, then the rest),
+    followed by primitives. All primitives are default-initialized.
+    """
+
+    order: tuple[Field, ...]
+    offsets: dict[str, int]
+    reference_count: int
+    default_value_count: int
+    array_inits: tuple[bytes, ...]
+
+    @property
+    def image_size(self) -> int:
+        return 2 * self.reference_count + self.default_value_count
+
+
+def _layout_static_fields(fields: tuple[Field, ...]) -> _StaticFieldLayout:
+    initialized: list[Field] = []
+    references: list[Field] = []
+    primitives: list[Field] = []
+    for field in fields:
+        if "static" not in field.access.split():
+            raise CapWriteError(f"Instance fields are not supported: {field.name}")
+        if field.type_desc.endswith("[]"):
+            (initialized if field.initial_values else references).append(field)
+        elif field.initial_values:
+            raise CapWriteError(f"Initialized primitive fields are not supported: {field.name}")
+        else:
+            primitives.append(field)
+
+    offsets: dict[str, int] = {}
+    pos = 0
+    for field in initialized + references:
+        offsets[field.name] = pos
+        pos += 2
+    reference_end = pos
+    for field in primitives:
+        offsets[field.name] = pos
+        pos += _PRIMITIVE_SIZES[_field_descriptor(field.type_desc)]
+
+    array_inits: list[bytes] = []
+    for field in initialized:
+        elem = _field_descriptor(field.type_desc)[1:]
+        if elem not in _ARRAY_INIT_TYPES:
+            raise CapWriteError(f"Unsupported array initializer type: {field.type_desc}")
+        size = _PRIMITIVE_SIZES[elem]
+        mask = (1 << (8 * size)) - 1
+        assert field.initial_values is not None
+        values = b"".join(
+            (v & mask).to_bytes(size, "big") for v in field.initial_values
+        )
+        if len(values) > 0xFFFF:
+            raise CapWriteError(f"Array initializer for {field.name} exceeds 65535 bytes")
+        array_inits.append(_u1(_ARRAY_INIT_TYPES[elem]) + _u2(len(values)) + values)
+
+    return _StaticFieldLayout(
+        order=tuple(initialized + references + primitives),
+        offsets=offsets,
+        reference_count=reference_end // 2,
+        default_value_count=pos - reference_end,
+        array_inits=tuple(array_inits),
+    )
+
+
+class _CapBuilder:
+    """Builds all CAP components for one package."""
+
+    def __init__(self, package: Package, api: APIRegistry) -> None:
+        self.package = package
+        self.cls = package.applet_class
+        self.resolve_class = _ClassResolver(package, api)
+        self.fields = _layout_static_fields(self.cls.fields)
+        self.assembled = [_assemble(m) for m in self.cls.methods]
+        self.method_offsets: list[int] = []
+        self.method_headers: list[bytes] = []
+
+    def build(self) -> dict[ComponentTag, bytes]:
+        # Method comes first: other components refer to method offsets
+        method = self._method_component()
+        components = {
+            ComponentTag.METHOD: method,
+            ComponentTag.HEADER: self._header_component(),
+            ComponentTag.APPLET: self._applet_component(),
+            ComponentTag.IMPORT: self._import_component(),
+            ComponentTag.CONSTANTPOOL: self._constant_pool_component(),
+            ComponentTag.CLASS: self._class_component(),
+            ComponentTag.STATICFIELD: self._static_field_component(),
+            ComponentTag.REFLOCATION: self._ref_location_component(),
+            ComponentTag.DESCRIPTOR: self._descriptor_component(),
+        }
+        components[ComponentTag.DIRECTORY] = self._directory_component(components)
+        return components
+
+    # --- Header, Directory, Applet, Import ---
+
+    def _uses_int(self) -> bool:
+        if any(a.uses_int for a in self.assembled):
+            return True
+        descriptors = [m.descriptor for m in self.cls.methods]
+        descriptors += [_field_descriptor(f.type_desc) for f in self.cls.fields]
+        descriptors += [d for e in self.package.constant_pool if (d := self._cp_descriptor(e))]
+        return any("I" in re.sub(r"L[^;]+;", "", d) for d in descriptors)
+
+    def _header_component(self) -> bytes:
+        flags = _ACC_APPLET | (_ACC_INT if self._uses_int() else 0)
+        name = self.package.name.encode()
+        info = (
+            struct.pack(">IBBB", _MAGIC, _CAP_MINOR_VERSION, _CAP_MAJOR_VERSION, flags)
+            + _package_info(self.package.version, bytes(self.package.aid))
+            + _u1(len(name))
+            + name
+        )
+        return _component(ComponentTag.HEADER, info)
+
+    def _directory_component(self, components: dict[ComponentTag, bytes]) -> bytes:
+        # The Directory's own size is fixed: 12 sizes, static field sizes, 3 counts
+        directory_size = 12 * 2 + 3 * 2 + 3
+        info = bytearray()
+        for tag in ComponentTag:
+            if tag == ComponentTag.DIRECTORY:
+                info += _u2(directory_size)
+            elif tag in components:
+                info += _u2(len(components[tag]) - 3)
+            else:
+                info += _u2(0)
+        info += _u2(self.fields.image_size)
+        info += _u2(len(self.fields.array_inits))
+        info += _u2(sum(len(a) - 3 for a in self.fields.array_inits))
+        info += bytes((len(self.package.imports), 1, 0))
+        return _component(ComponentTag.DIRECTORY, bytes(info))
+
+    def _applet_component(self) -> bytes:
+        install = self._method_index("install")
+        aid = bytes(self.package.applet_aid)
+        info = _u1(1) + _u1(len(aid)) + aid + _u2(self.method_offsets[install])
+        return _component(ComponentTag.APPLET, info)
+
+    def _import_component(self) -> bytes:
+        info = bytearray(_u1(len(self.package.imports)))
+        for imp in self.package.imports:
+            aid = _parse_aid(self.package.import_aids[imp])
+            info += _package_info(self.package.import_versions.get(imp, "1.0"), aid)
+        return _component(ComponentTag.IMPORT, bytes(info))
+
+    # --- Constant pool ---
+
+    def _method_index(self, name: str, descriptor: str | None = None) -> int:
+        for i, m in enumerate(self.cls.methods):
+            if m.name == name and (descriptor is None or m.descriptor == descriptor):
+                return i
+        raise CapWriteError(f"Method not found in {self.cls.name}: {name}{descriptor or ''}")
+
+    def _cp_entry(self, entry: CPEntry) -> bytes:
+        kind, value = entry.kind, entry.value
+        if kind == CPEntryKind.CLASS_REF:
+            if value == self.cls.name:
+                return _u1(CPTag.CLASSREF) + _u2(_CLASS_OFFSET) + _u1(0)
+            return _u1(CPTag.CLASSREF) + _u2(_parse_ref(value)) + _u1(0)
+
+        external = _EXTERNAL_REF.match(value)
+        if kind == CPEntryKind.VIRTUAL_METHOD_REF and external and external[3]:
+            pkg, cls, token = int(external[1]), int(external[2]), int(external[3])
+            return _u1(CPTag.VIRTUALMETHODREF) + _u2(_external_class_ref(pkg, cls)) + _u1(token)
+        if kind == CPEntryKind.STATIC_METHOD_REF:
+            if external and external[3]:
+                pkg, cls, token = int(external[1]), int(external[2]), int(external[3])
+                return bytes((CPTag.STATICMETHODREF, 0x80 | pkg, cls, token))
+            internal = _INTERNAL_METHOD.match(value)
+            if internal and internal[1] == self.cls.name:
+                index = self._method_index(internal[2], internal[3])
+                return _u1(CPTag.STATICMETHODREF) + _u1(0) + _u2(self.method_offsets[index])
+        if kind == CPEntryKind.STATIC_FIELD_REF:
+            internal = _INTERNAL_FIELD.match(value)
+            if internal and internal[2] == self.cls.name and internal[3] in self.fields.offsets:
+                offset = self.fields.offsets[internal[3]]
+                return _u1(CPTag.STATICFIELDREF) + _u1(0) + _u2(offset)
+
+        raise CapWriteError(f"Unsupported constant pool entry: {kind.value} {value}")
+
+    def _cp_descriptor(self, entry: CPEntry) -> str | None:
+        """JVM descriptor of a constant pool entry's type (None for class refs)."""
+        if entry.kind == CPEntryKind.CLASS_REF:
+            return None
+        if entry.kind == CPEntryKind.STATIC_FIELD_REF:
+            return _field_descriptor(entry.value.split(" ", 1)[0])
+        return entry.value[entry.value.index("(") :]
+
+    def _constant_pool_component(self) -> bytes:
+        entries = self.package.constant_pool
+        info = _u2(len(entries)) + b"".join(self._cp_entry(e) for e in entries)
+        return _component(ComponentTag.CONSTANTPOOL, info)
+
+    # --- Class ---
+
+    def _class_component(self) -> bytes:
+        virtual = {
+            m.vtable_index: self.method_offsets[i]
+            for i, m in enumerate(self.cls.methods)
+            if m.vtable_index is not None
+            and "static" not in m.access.split()
+            and m.name != "<init>"
+        }
+        base = min(virtual, default=0)
+        count = max(virtual) - base + 1 if virtual else 0
+
+        info = bytearray(_u2(0))  # signature_pool_length
+        info += _u1(len(self.cls.implements))  # flags (none) | interface_count
+        info += _u2(_parse_ref(self.cls.extends_ref))
+        info += bytes((0, 0xFF, 0))  # declared_instance_size, first_reference_token, count
+        info += bytes((base, count, 0, 0))  # public/package method table base and count
+        for token in range(base, base + count):
+            info += _u2(virtual.get(token, _INHERITED_METHOD))
+        for ref, _comment in self.cls.implements:
+            info += _u2(_parse_ref(ref)) + _u1(0)
+        return _component(ComponentTag.CLASS, bytes(info))
+
+    # --- Method, StaticField, RefLocation ---
+
+    def _method_header(self, method: Method) -> bytes:
+        max_stack = method.code.max_stack
+        # Written as-is, like capgen does with the JCA .locals directive
+        max_locals = method.code.max_locals
+        nargs = _method_nargs(method)
+        if max(max_stack, nargs, max_locals) > 0xFF:
+            raise CapWriteError(f"Method {method.name} exceeds header limits")
+        if max_stack > 0xF or nargs > 0xF or max_locals > 0xF:
+            return bytes((_ACC_EXTENDED, max_stack, nargs, max_locals))
+        return bytes((max_stack, (nargs << 4) | max_locals))
+
+    def _method_component(self) -> bytes:
+        info = bytearray(_u1(0))  # handler_count
+        for method, assembled in zip(self.cls.methods, self.assembled, strict=True):
+            header = self._method_header(method)
+            self.method_offsets.append(len(info))
+            self.method_headers.append(header)
+            info += header + assembled.bytecode
+        return _component(ComponentTag.METHOD, bytes(info))
+
+    def _static_field_component(self) -> bytes:
+        layout = self.fields
+        info = (
+            _u2(layout.image_size)
+            + _u2(layout.reference_count)
+            + _u2(len(layout.array_inits))
+            + b"".join(layout.array_inits)
+            + _u2(layout.default_value_count)
+            + _u2(0)  # non_default_value_count
+        )
+        return _component(ComponentTag.STATICFIELD, info)
+
+    def _ref_location_component(self) -> bytes:
+        byte_locations: list[int] = []
+        byte2_locations: list[int] = []
+        for offset, header, assembled in zip(
+            self.method_offsets, self.method_headers, self.assembled, strict=True
+        ):
+            start = offset + len(header)
+            byte_locations += [start + i for i in assembled.byte_indices]
+            byte2_locations += [start + i for i in assembled.byte2_indices]
+
+        info = bytearray()
+        for locations in (byte_locations, byte2_locations):
+            encoded = _encode_offsets(locations)
+            info += _u2(len(encoded)) + encoded
+        return _component(ComponentTag.REFLOCATION, bytes(info))
+
+    # --- Descriptor ---
+
+    def _descriptor_component(self) -> bytes:
+        cp = self.package.constant_pool
+        types = _TypeTable(self.resolve_class, len(cp))
+
+        cp_types = bytearray()
+        for entry in cp:
+            descriptor = self._cp_descriptor(entry)
+            cp_types += _u2(0xFFFF if descriptor is None else types.add(descriptor))
+
+        fields = bytearray()
+        for field in self.fields.order:
+            flags = _access_flags(field.access)
+            token = _NO_TOKEN if flags & _ACCESS_FLAGS["private"] else 0
+            descriptor = _field_descriptor(field.type_desc)
+            if descriptor in _PRIMITIVE_NIBBLES:
+                type_ref = 0x8000 | _PRIMITIVE_NIBBLES[descriptor]
+            else:
+                type_ref = types.add(descriptor)
+            fields += bytes((token, flags, 0)) + _u2(self.fields.offsets[field.name])
+            fields += _u2(type_ref)
+
+        methods = bytearray()
+        for i, method in enumerate(self.cls.methods):
+            flags = _access_flags(method.access)
+            if method.name == "<init>":
+                flags |= _ACC_INIT
+            token = _NO_TOKEN if method.vtable_index is None else method.vtable_index
+            methods += bytes((token, flags))
+            methods += _u2(self.method_offsets[i])
+            methods += _u2(types.add(method.descriptor))
+            methods += _u2(len(self.assembled[i].bytecode))
+            methods += _u2(0) + _u2(0)  # exception_handler_count, index
+
+        info = bytearray(_u1(1))  # class_count
+        info += bytes((self.cls.token, _ACCESS_FLAGS["public"]))
+        info += _u2(_CLASS_OFFSET)
+        info += _u1(len(self.cls.implements))
+        info += _u2(len(self.fields.order)) + _u2(len(self.cls.methods))
+        for ref, _comment in self.cls.implements:
+            info += _u2(_parse_ref(ref))
+        info += fields + methods
+        info += _u2(len(cp)) + cp_types + types.data
+        return _component(ComponentTag.DESCRIPTOR, bytes(info))
+
+
+def _encode_offsets(locations: list[int]) -> bytes:
+    """Delta-encode RefLocation offsets.
+
+    Each entry is the distance from the previous location (the first from
+    the start of the Method component info). A byte of 255 means "advance
+    255 and continue", so larger gaps are split across several bytes.
+    """
+    out = bytearray()
+    prev = 0
+    for loc in locations:
+        delta = loc - prev
+        while delta >= 255:
+            out.append(255)
+            delta -= 255
+        out.append(delta)
+        prev = loc
+    return bytes(out)
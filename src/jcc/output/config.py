@@ -6,7 +6,7 @@ names, and JavaCard version.
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, cast
 
 import tomllib
 
@@ -15,6 +15,10 @@ class ConfigError(Exception):
     """Configuration file error."""
 
 
+# IR optimization passes, in run order (jcc.opt.PASSES, then jcc.opt.ALLOCATED_PASSES)
+OPT_PASSES = ("sccp", "gvn", "licm", "dce", "ivsr")
+
+
 @dataclass(frozen=True)
 class ProjectConfig:
     """Project configuration from jcc.toml.
@@ -27,6 +31,24 @@ class ProjectConfig:
         applet_aid: Applet AID as tuple of bytes (5-16 bytes).
         javacard_version: JavaCard SDK version (e.g., "3.2.0").
         build_command: Optional frontend build command.
+        cap_writer: CAP backend, "capgen" (JCDK tool) or "native" (in-process).
+        cost_model: Instruction timings for codegen decisions: a bundled
+            table name or a bench results.json path relative to jcc.toml.
+            None selects the default table.
+        inline_always: Functions to inline at every call site.
+        inline_never: Functions never to inline.
+        inline_max_size: Largest callee, in IR instructions, inlined for
+            its size alone. None selects the inliner's default; 0 turns
+            size-based inlining off.
+        profile: Instrument user functions with execution counters and
+            answer profile_ins with their values (see output/profile.py).
+        profile_blocks: Also count every basic block, not just entries.
+        profile_ins: INS byte reserved for dumping the counters.
+        block_profile: Counts file from `jcc profile --save`, relative to
+            jcc.toml, to lay out blocks by. None estimates block
+            frequencies from loop nesting.
+        opt_passes: IR optimization passes to run (see jcc.opt), all by
+            default.
     """
 
     package_name: str
@@ -39,6 +61,19 @@ class ProjectConfig:
     has_intx: bool = False
     use_scalar_fields: bool = False
     build_command: str | None = None
+    cap_writer: str = "capgen"
+    cost_model: str | None = None
+    inline_always: tuple[str, ...] = ()
+    inline_never: tuple[str, ...] = ()
+    inline_max_size: int | None = None
+    profile: bool = False
+    profile_blocks: bool = False
+    profile_ins: int = 0xFE
+    block_profile: str | None = None
+    opt_passes: tuple[str, ...] = OPT_PASSES
+
+
+CAP_WRITERS = ("capgen", "native")
 
 
 def load_config(config_path: Path) -> ProjectConfig:
@@ -57,6 +92,19 @@ def load_config(config_path: Path) -> ProjectConfig:
 
             [options]
             javacard_version = "3.0.4"
+            cost_model = "bench/results.json"  # optional
+            profile = true  # optional, see `jcc profile`
+            profile_blocks = true
+            profile_ins = 0xFE
+            block_profile = "build/counts.json"  # optional, see `jcc profile --save`
+
+            [inline]  # optional
+            always = ["fillVerticalColumn"]
+            never = ["debug_dump"]
+            max_size = 24
+
+            [opt]  # optional, every pass on by default
+            licm = false
 
             [build]
             command = "clang ... -o build/main.ll"
@@ -115,6 +163,52 @@ def load_config(config_path: Path) -> ProjectConfig:
         # Scalar static fields (optional, default false)
         use_scalar_fields = options.get("use_scalar_fields", False)
 
+        # CAP backend (optional, default capgen)
+        cap_writer = options.get("cap_writer", "capgen")
+        if cap_writer not in CAP_WRITERS:
+            raise ConfigError(
+                f"Invalid [options].cap_writer {cap_writer!r} (expected one of: "
+                f"{', '.join(CAP_WRITERS)})"
+            )
+
+        # Cost model (optional, default bundled table)
+        cost_model = options.get("cost_model")
+
+        # Profiling counters (optional, default off)
+        profile = options.get("profile", False)
+        profile_blocks = options.get("profile_blocks", False)
+        profile_ins = options.get("profile_ins", 0xFE)
+        if not isinstance(profile_ins, int) or not 0 <= profile_ins <= 0xFF:
+            raise ConfigError(
+                f"Invalid [options].profile_ins {profile_ins!r} (expected a byte, 0x00-0xFF)"
+            )
+
+        # Measured block counts for layout (optional, default static estimate)
+        block_profile = options.get("block_profile")
+
+        # Inlining (optional)
+        inline = data.get("inline", {})
+        inline_always = _inline_names(inline, "always")
+        inline_never = _inline_names(inline, "never")
+        inline_max_size = inline.get("max_size")
+        if inline_max_size is not None and (
+            not isinstance(inline_max_size, int) or inline_max_size < 0
+        ):
+            raise ConfigError(
+                f"Invalid [inline].max_size {inline_max_size!r} (expected a non-negative integer)"
+            )
+
+        # IR optimization passes (optional, all on by default)
+        opt = data.get("opt", {})
+        for key, enabled in opt.items():
+            if key not in OPT_PASSES:
+                raise ConfigError(
+                    f"Unknown [opt] pass {key!r} (expected one of: {', '.join(OPT_PASSES)})"
+                )
+            if not isinstance(enabled, bool):
+                raise ConfigError(f"Invalid [opt].{key} {enabled!r} (expected true or false)")
+        opt_passes = tuple(name for name in OPT_PASSES if opt.get(name, True))
+
         # Build command (optional)
         build = data.get("build", {})
         build_command = build.get("command")
@@ -130,11 +224,34 @@ def load_config(config_path: Path) -> ProjectConfig:
             has_intx=has_intx,
             use_scalar_fields=use_scalar_fields,
             build_command=build_command,
+            cap_writer=cap_writer,
+            cost_model=cost_model,
+            inline_always=inline_always,
+            inline_never=inline_never,
+            inline_max_size=inline_max_size,
+            profile=profile,
+            profile_blocks=profile_blocks,
+            profile_ins=profile_ins,
+            block_profile=block_profile,
+            opt_passes=opt_passes,
         )
     except KeyError as e:
         raise ConfigError(f"Missing required config field: {e}") from e
 
 
+def _inline_names(table: dict[str, Any], key: str) -> tuple[str, ...]:
+    """Read an optional list of function names from the [inline] table.
+
+    Raises:
+        ConfigError: If the value is not a list of strings.
+    """
+    names: object = table.get(key, [])
+    items = cast(list[object], names) if isinstance(names, list) else None
+    if items is None or not all(isinstance(n, str) for n in items):
+        raise ConfigError(f"Invalid [inline].{key} (expected a list of function names)")
+    return tuple(cast(list[str], items))
+
+
 def parse_aid(aid_str: str) -> tuple[int, ...]:
     """Parse AID string like 'A0000000620300F002'.
 
@@ -8,6 +8,7 @@ from collections.abc import Mapping
 from dataclasses import dataclass
 from enum import Enum
 from types import MappingProxyType
+from typing import cast
 
 from jcc.analysis.globals import (
     CONST_ARRAYS,
@@ -22,6 +23,7 @@ from jcc.ir.module import Module
 from jcc.ir.types import JCType
 from jcc.output.config import ProjectConfig
 from jcc.output.descriptor import Descriptor, jca_array_type
+from jcc.output.profile import PROFILE_FIELD
 
 
 class CPEntryKind(Enum):
@@ -57,6 +59,25 @@ class ConstantPoolError(Exception):
     """Constant pool building or access error."""
 
 
+@dataclass(frozen=True)
+class ProfileRefs:
+    """CP indices used by profile builds (see output/profile.py).
+
+    Attributes:
+        counters: The PROFILE short[] static field.
+        make_transient: JCSystem.makeTransientShortArray(SB)[S.
+        get_buffer: APDU.getBuffer()[B.
+        set_outgoing_and_send: APDU.setOutgoingAndSend(SS)V.
+        set_short: Util.setShort([BSS)S.
+    """
+
+    counters: int
+    make_transient: int
+    get_buffer: int
+    set_outgoing_and_send: int
+    set_short: int
+
+
 class _ConstantPoolBuilder:
     """Mutable builder for ConstantPool.
 
@@ -85,6 +106,7 @@ class _ConstantPoolBuilder:
         self.user_method_desc: dict[str, str] = {}
         self.scalar_field_idx: dict[str, int] = {}  # field_name → CP index
         self.constructor_idx: dict[str, tuple[int, int]] = {}  # intrinsic → (class_cp, init_cp)
+        self.profile: ProfileRefs | None = None
 
         # Stored references
         self.api: APIRegistry | None = None
@@ -418,6 +440,75 @@ class _ConstantPoolBuilder:
 
         self.constructor_idx[intrinsic_name] = (class_cp, init_cp)
 
+    def add_profile_counters(self, api: APIRegistry) -> None:
+        """Add the PROFILE counter field and the methods that dump it.
+
+        Raises ConstantPoolError if a required API method is missing.
+        """
+
+        def virtual(class_name: str, method_name: str, descriptor: str) -> int:
+            method = api.lookup(class_name, method_name)
+            cls = api.get_class(class_name)
+            if method is None or cls is None:
+                raise ConstantPoolError(
+                    f"{class_name}.{method_name}() not found in API registry. "
+                    "Required for profile builds."
+                )
+            pkg_idx = self.track_package(class_name)
+            return self.add_entry(
+                CPEntry(
+                    CPEntryKind.VIRTUAL_METHOD_REF,
+                    f"{pkg_idx}.{cls.token}.{method.method_token}{descriptor}",
+                    f"{method_name}{descriptor}",
+                )
+            )
+
+        counters = self.add_entry(
+            CPEntry(
+                CPEntryKind.STATIC_FIELD_REF,
+                f"{jca_array_type(JCType.SHORT)} {self.config.applet_name}/{PROFILE_FIELD}",
+                PROFILE_FIELD,
+            )
+        )
+
+        # Shared with MEM_S when the program has short globals
+        make_transient = self.make_transient_idx.get(MemArray.MEM_S)
+        if make_transient is None:
+            jcsystem = api.get_class("javacard/framework/JCSystem")
+            method = api.lookup("javacard/framework/JCSystem", "makeTransientShortArray")
+            if jcsystem is None or method is None:
+                raise ConstantPoolError(
+                    "JCSystem.makeTransientShortArray() not found in API registry. "
+                    "Required for profile builds."
+                )
+            pkg_idx = self.track_package("javacard/framework/JCSystem")
+            make_transient = self.add_entry(
+                CPEntry(
+                    CPEntryKind.STATIC_METHOD_REF,
+                    f"{pkg_idx}.{jcsystem.token}.{method.method_token}(SB)[S",
+                    "makeTransientShortArray(SB)[S",
+                )
+            )
+
+        set_short_name = "__java_javacard_framework_Util_setShort"
+        if set_short_name not in self.api_method_idx:
+            method = api.lookup_intrinsic(set_short_name)
+            if method is None:
+                raise ConstantPoolError(
+                    "Util.setShort() not found in API registry. Required for profile builds."
+                )
+            self._add_api_method_entry(set_short_name, method, api)
+
+        self.profile = ProfileRefs(
+            counters=counters,
+            make_transient=make_transient,
+            get_buffer=virtual("javacard/framework/APDU", "getBuffer", "()[B"),
+            set_outgoing_and_send=virtual(
+                "javacard/framework/APDU", "setOutgoingAndSend", "(SS)V"
+            ),
+            set_short=self.api_method_idx[set_short_name],
+        )
+
     def add_user_methods(
         self, module: Module, param_typedefs: dict[str, tuple[str | None, ...]]
     ) -> None:
@@ -497,6 +588,25 @@ class ConstantPool:
     _api: APIRegistry | None
     _user_functions: frozenset[str]
 
+    # Profile builds only
+    _profile: ProfileRefs | None = None
+
+    # --- Pickling (for parallel codegen workers) ---
+
+    def __getstate__(self) -> dict[str, object]:
+        # MappingProxyType can't be pickled; ship the underlying dicts
+        return {
+            name: dict(cast(Mapping[object, object], value))
+            if isinstance(value, MappingProxyType) else value
+            for name, value in self.__dict__.items()
+        }
+
+    def __setstate__(self, state: dict[str, object]) -> None:
+        for name, value in state.items():
+            if isinstance(value, dict):
+                value = MappingProxyType(cast(dict[object, object], value))
+            object.__setattr__(self, name, value)
+
     # --- Public accessors ---
 
     @property
@@ -602,6 +712,11 @@ class ConstantPool:
         """Scalar static field CP indices (field_name → CP index)."""
         return self._scalar_field_idx
 
+    @property
+    def profile(self) -> ProfileRefs | None:
+        """Profile counter CP indices, or None outside profile builds."""
+        return self._profile
+
     @property
     def constructor_cp(self) -> Mapping[str, tuple[int, int]]:
         """Constructor CP indices (intrinsic → (class_cp, init_cp))."""
@@ -644,6 +759,8 @@ class ConstantPool:
         builder.add_scalar_fields(allocation.scalar_fields)
         builder.add_api_methods(module, api)
         builder.add_user_methods(module, param_typedefs)
+        if config.profile:
+            builder.add_profile_counters(api)
 
         # Extended APDU: add javacardx/apdu import for ExtendedLength interface
         if config.extended_apdu:
@@ -677,6 +794,7 @@ class ConstantPool:
             _constructor_idx=MappingProxyType(builder.constructor_idx),
             _api=builder.api,
             _user_functions=builder.user_functions,
+            _profile=builder.profile,
         )
 
 
@@ -1,15 +1,23 @@
 """Output generation — JCA assembly and CAP files from compiled module."""
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
+from jcc.analysis.cost import CostModel
+from jcc.analysis.frequency import FunctionCounts, block_frequencies
 from jcc.analysis.function import FunctionAnalysis
 from jcc.analysis.globals import CONST_ARRAYS, MUTABLE_ARRAYS, AllocationResult
 from jcc.api.types import APIRegistry
 from jcc.codegen.emit import FunctionCode, compile_function
-from jcc.ir.module import Module
-from jcc.ir.types import JCType
+from jcc.incremental import BuildCache, fingerprint
+from jcc.ir.facts import FunctionFacts
+from jcc.ir.module import Function, Module
+from jcc.ir.types import BlockLabel, JCType
 from jcc.jcdk import get_jcdk
 from jcc.output.capgen import run_capgen, run_verifycap
+from jcc.output.capwrite import write_cap
 from jcc.output.config import ProjectConfig, load_config
 from jcc.output.constant_pool import ConstantPool, build_constant_pool
 from jcc.output.descriptor import (
@@ -25,8 +33,19 @@ from jcc.output.lifecycle import (
     build_process_wrapper,
     build_select_method,
 )
+from jcc.output.profile import (
+    PROFILE_FIELD,
+    ProfileLayout,
+    load_block_counts,
+    profile_layout,
+    write_profile_map,
+)
 from jcc.output.structure import Class, Field, Method, Package
 from jcc.output.vtable import VTableEntry, extract_vtable, find_vtable_index
+from jcc.timings import BuildTimings, timed_call
+
+# Phase name of per-function code generation in BuildTimings
+CODEGEN_PHASE = "codegen"
 
 
 class OutputError(Exception):
@@ -48,6 +67,10 @@ def generate_output(
     config_path: Path,
     output_dir: Path,
     param_typedefs: dict[str, tuple[str | None, ...]],
+    cache: BuildCache | None = None,
+    jobs: int = 1,
+    costs: CostModel | None = None,
+    timings: BuildTimings | None = None,
 ) -> Path:
     """Generate CAP file from compiled module.
 
@@ -59,6 +82,13 @@ def generate_output(
         config_path: Path to jcc.toml configuration file.
         output_dir: Directory to write output files.
         param_typedefs: Per-function typedef names from debug info.
+        cache: Incremental build cache for reusing compiled functions.
+        jobs: Number of processes to compile user functions in. 1
+              compiles in this process; 0 uses one process per CPU.
+        costs: Target cost model for codegen decisions.
+        timings: Records codegen (with each compiled function and the
+            global peephole's hits), JCA emission, CAP writing and
+            verification, if given.
 
     Returns:
         Path to the generated CAP file.
@@ -66,6 +96,9 @@ def generate_output(
     Raises:
         OutputError: If output generation fails.
     """
+    if timings is None:
+        timings = BuildTimings()
+
     # 1. Load configuration
     config = load_config(config_path)
 
@@ -81,23 +114,52 @@ def generate_output(
     # 5. Build constant pool
     cp = build_constant_pool(module, allocation, api, config, param_typedefs)
 
+    # 5b. Assign profile counters
+    profile: ProfileLayout | None = None
+    if config.profile:
+        profile = profile_layout(module, config.profile_ins, blocks=config.profile_blocks)
+
+    # 5c. Load measured block counts for layout
+    block_counts: dict[str, FunctionCounts] = {}
+    if config.block_profile is not None:
+        block_counts = load_block_counts(config_path.parent / config.block_profile)
+
     # 6. Compile all methods
-    methods = _compile_all_methods(module, function_analyses, allocation, cp, vtable)
+    with timings.phase(CODEGEN_PHASE):
+        methods = _compile_all_methods(
+            module, function_analyses, allocation, cp, vtable, cache, jobs, costs, profile,
+            block_counts, timings,
+        )
+
+    # 6b. Record global peephole hits, summed over all methods
+    for code, _, _ in methods.values():
+        timings.record_counts({f"peephole {p}": n for p, n in code.peephole_hits.items()})
 
     # 7. Build fields
-    fields = _build_fields(allocation)
+    fields = _build_fields(allocation, profile)
 
     # 8. Assemble package structure
     package = _assemble_package(config, cp, fields, methods, vtable, api)
 
-    # 9. Emit JCA text
-    jca_path = emit_jca(package, output_dir)
+    # 9. Emit JCA text (also kept alongside native CAPs for jca_map tooling)
+    with timings.phase("jca emit"):
+        jca_path = emit_jca(package, output_dir)
 
-    # 10. Run capgen
-    cap_path = run_capgen(jcdk, jca_path)
+    # 10. Write CAP: in-process, or via capgen
+    if config.cap_writer == "native":
+        with timings.phase("cap write"):
+            cap_path = write_cap(package, api, output_dir)
+    else:
+        with timings.phase("capgen"):
+            cap_path = run_capgen(jcdk, jca_path)
 
     # 11. Verify CAP
-    run_verifycap(jcdk, cap_path)
+    with timings.phase("verifycap"):
+        run_verifycap(jcdk, cap_path)
+
+    # 12. Map profile counters back to functions and blocks for `jcc profile`
+    if profile is not None:
+        write_profile_map(profile, output_dir / f"{config.applet_name}.profile.json")
 
     return cap_path
 
@@ -121,9 +183,23 @@ def _compile_all_methods(
     allocation: AllocationResult,
     cp: ConstantPool,
     vtable: tuple[VTableEntry, ...],
+    cache: BuildCache | None = None,
+    jobs: int = 1,
+    costs: CostModel | None = None,
+    profile: ProfileLayout | None = None,
+    block_counts: dict[str, FunctionCounts] | None = None,
+    timings: BuildTimings | None = None,
 ) -> dict[str, tuple[FunctionCode, str, int | None]]:
     """Compile all methods.
 
+    With a cache, user functions whose IR, analysis, allocation and
+    constant pool are unchanged reuse their previously compiled code.
+    The remaining user functions are compiled across jobs processes.
+    Profile builds instrument the user functions with their counters.
+    Blocks are laid out by their measured counts where block_counts has
+    them, and by loop nesting otherwise. Each compiled function's time
+    goes to timings, if given.
+
     Returns dict of name -> (code, access, vtable_index).
     """
     methods: dict[str, tuple[FunctionCode, str, int | None]] = {}
@@ -138,9 +214,9 @@ def _compile_all_methods(
     # - Private static methods: no token (None)
 
     # Lifecycle methods
-    methods["<init>"] = (build_init_method(cp, allocation), "protected", 0)
+    methods["<init>"] = (build_init_method(cp, allocation, profile), "protected", 0)
     methods["install"] = (build_install_method(cp), "public static", 1)
-    methods["process"] = (build_process_wrapper(cp), "public", process_idx)
+    methods["process"] = (build_process_wrapper(cp, profile), "public", process_idx)
 
     # select() method for zeroing scalar fields on applet select
     if allocation.scalar_fields:
@@ -151,31 +227,143 @@ def _compile_all_methods(
             select_idx,
         )
 
-    # User methods (private static - no token needed)
+    # Module-wide inputs shared by every function key
+    shared_key = fingerprint(allocation, cp, costs) if cache is not None else ""
+
+    # Counter index per instrumented block, per function
+    counters: dict[str, dict[BlockLabel, int] | None] = {
+        name: profile.function_counters(name, func.blocks[0].label) if profile else None
+        for name, func in module.functions.items()
+    }
+
+    # Block frequencies for layout, per function
+    block_counts = block_counts or {}
+    frequencies: dict[str, dict[BlockLabel, float]] = {}
     for name, func in module.functions.items():
-        fa = function_analyses[name]
-        code = compile_function(
-            func,
-            fa.locals,
-            fa.phi_info,
-            allocation,
-            cp,
-            offset_phi_info=fa.offset_phi_info,
-        )
+        facts = function_analyses[name].facts
+        if facts is None:
+            facts = FunctionFacts(func)
+        frequencies[name] = block_frequencies(facts, block_counts.get(name))
+
+    # Reuse cached code; everything else is compiled below
+    codes: dict[str, FunctionCode] = {}
+    keys: dict[str, str] = {}
+    for name, func in module.functions.items():
+        if cache is not None:
+            fa = function_analyses[name]
+            keys[name] = fingerprint(
+                shared_key, func, fa.locals, fa.phi_info, fa.offset_phi_info, counters[name],
+                frequencies[name],
+            )
+            code = cache.load_function(keys[name])
+            if code is not None:
+                codes[name] = code
+
+    pending = [name for name in module.functions if name not in codes]
+    compiled = _compile_functions(
+        [module.functions[name] for name in pending],
+        [function_analyses[name] for name in pending],
+        allocation,
+        cp,
+        jobs,
+        costs,
+        [counters[name] for name in pending],
+        [frequencies[name] for name in pending],
+    )
+    for name, (code, wall, cpu) in zip(pending, compiled):
+        codes[name] = code
+        if timings is not None:
+            timings.record_function(CODEGEN_PHASE, name, wall, cpu)
+        if cache is not None:
+            cache.store_function(keys[name], code)
+
+    # User methods (private static - no token needed), in module order
+    for name in module.functions:
         # User's "process" becomes "userProcess"
         method_name = "userProcess" if name == "process" else name
-        methods[method_name] = (code, "private static", None)
+        methods[method_name] = (codes[name], "private static", None)
 
     return methods
 
 
+def _compile_analyzed(
+    func: Function,
+    fa: FunctionAnalysis,
+    counters: dict[BlockLabel, int] | None,
+    frequencies: dict[BlockLabel, float] | None,
+    allocation: AllocationResult,
+    cp: ConstantPool,
+    costs: CostModel | None,
+) -> FunctionCode:
+    """Compile one user function from its analysis results."""
+    return compile_function(
+        func,
+        fa.locals,
+        fa.phi_info,
+        allocation,
+        cp,
+        offset_phi_info=fa.offset_phi_info,
+        facts=fa.facts,
+        costs=costs,
+        counters=counters,
+        frequencies=frequencies,
+    )
+
+
+def _compile_functions(
+    funcs: list[Function],
+    analyses: list[FunctionAnalysis],
+    allocation: AllocationResult,
+    cp: ConstantPool,
+    jobs: int,
+    costs: CostModel | None = None,
+    counters: list[dict[BlockLabel, int] | None] | None = None,
+    frequencies: list[dict[BlockLabel, float] | None] | None = None,
+) -> list[tuple[FunctionCode, float, float]]:
+    """Compile user functions, in a process pool when jobs > 1.
+
+    Returns (code, wall seconds, CPU seconds) in the order of funcs,
+    whatever the job count.
+    """
+    compile_one = partial(
+        timed_call, _compile_analyzed, allocation=allocation, cp=cp, costs=costs,
+    )
+    block_counters: list[dict[BlockLabel, int] | None] = [None] * len(funcs)
+    if counters is not None:
+        block_counters = counters
+    block_freqs: list[dict[BlockLabel, float] | None] = [None] * len(funcs)
+    if frequencies is not None:
+        block_freqs = frequencies
+
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if jobs <= 1 or len(funcs) <= 1:
+        return [
+            compile_one(func, fa, c, f)
+            for func, fa, c, f in zip(funcs, analyses, block_counters, block_freqs)
+        ]
+
+    # Functions are independent; results come back in input order
+    chunksize = max(1, len(funcs) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(
+            compile_one, funcs, analyses, block_counters, block_freqs, chunksize=chunksize,
+        ))
+
+
 def _jca_scalar_type(ty: JCType) -> str:
     """Map JCType to JCA scalar type descriptor."""
     return {JCType.BYTE: "byte", JCType.SHORT: "short", JCType.INT: "int"}[ty]
 
 
-def _build_fields(allocation: AllocationResult) -> tuple[Field, ...]:
-    """Build field definitions for memory arrays, const arrays, and scalar fields."""
+def _build_fields(
+    allocation: AllocationResult,
+    profile: ProfileLayout | None = None,
+) -> tuple[Field, ...]:
+    """Build field definitions for memory arrays, const arrays, and scalar fields.
+
+    Profile builds also get the PROFILE counter array.
+    """
     fields: list[Field] = []
 
     # Scalar static fields (promoted globals — before arrays for cleaner JCA output)
@@ -200,6 +388,16 @@ def _build_fields(allocation: AllocationResult) -> tuple[Field, ...]:
                 )
             )
 
+    # Profile counters (transient, allocated in <init> like the MEM arrays)
+    if profile is not None:
+        fields.append(
+            Field(
+                access="private static",
+                type_desc=jca_array_type(JCType.SHORT),
+                name=PROFILE_FIELD,
+            )
+        )
+
     # Constant arrays (CONST_B/S/I — EEPROM, static final with initializers)
     for mem in CONST_ARRAYS:
         values = allocation.const_values.get(mem)
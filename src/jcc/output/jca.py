@@ -3,6 +3,7 @@
 Converts Package structure to JCA assembly text format for capgen.
 """
 
+from itertools import accumulate
 from pathlib import Path
 from typing import TextIO
 
@@ -169,84 +170,11 @@ _INVERTED_BRANCH: dict[str, str] = {
     "ifnonnull": "ifnull",
 }
 
-# Approximate instruction sizes for offset estimation
-_INSTRUCTION_SIZES: dict[str, int] = {
-    "label": 0,
-    "goto": 3,
-    "goto_w": 5,
-    "tableswitch": 20,  # Variable, estimate high
-    "stableswitch": 20,
-    "lookupswitch": 20,
-    "slookupswitch": 20,
-    "itableswitch": 20,
-    "ilookupswitch": 20,
-}
-_DEFAULT_INSTR_SIZE = 3  # Most instructions are 1-3 bytes
-
-
-def _widen_branches(
-    instructions: tuple[ops.Instruction, ...], label_counter: list[int]
-) -> tuple[ops.Instruction, ...]:
-    """Widen conditional branches that jump too far.
-
-    JCVM conditional branches use 8-bit signed offsets (±127 bytes).
-    For far jumps, we invert the condition and use goto_w:
-
-    Before:  ifeq far_target     (out of range!)
-    After:   ifne _near
-             goto_w far_target
-             _near:
-    """
-    # Build label position map (approximate byte offsets)
-    label_positions: dict[str, int] = {}
-    instr_positions: list[int] = []
-    pos = 0
-    for instr in instructions:
-        instr_positions.append(pos)
-        if instr.mnemonic == "label":
-            label_positions[str(instr.operands[0])] = pos
-        else:
-            pos += _INSTRUCTION_SIZES.get(instr.mnemonic, _DEFAULT_INSTR_SIZE)
-
-    # Find branches that need widening
-    result: list[ops.Instruction] = []
-    for i, instr in enumerate(instructions):
-        if instr.mnemonic not in _CONDITIONAL_BRANCHES:
-            result.append(instr)
-            continue
-
-        target = str(instr.operands[0])
-        target_pos = label_positions.get(target, 0)
-        current_pos = instr_positions[i]
-        offset = target_pos - current_pos
-
-        # Check if within 8-bit signed range (with some margin for safety)
-        if -120 <= offset <= 120:
-            result.append(instr)
-            continue
-
-        # Need to widen: invert condition, add goto_w, add synthetic label
-        inverted = _INVERTED_BRANCH[instr.mnemonic]
-        near_label = f"_W{label_counter[0]}"
-        label_counter[0] += 1
-
-        result.append(ops.Instruction(inverted, (near_label,), instr.pops, 0))
-        result.append(ops.Instruction("goto_w", (target,), 0, 0))
-        result.append(ops.Instruction("label", (near_label,), 0, 0))
-
-    return tuple(result)
-
-
-# === Exact JCVM instruction byte sizes (for goto narrowing) ===
+# === Exact JCVM instruction byte sizes (for branch relaxation) ===
 
 
 def _build_byte_size_map() -> dict[str, int]:
-    """Build mapping of JCVM instruction mnemonics to their exact byte sizes.
-
-    These are the actual JCVM bytecode sizes, NOT the approximate JVM-style
-    sizes in _INSTRUCTION_SIZES (which are only used for branch widening
-    heuristics with a large safety margin).
-    """
+    """Build mapping of JCVM instruction mnemonics to their exact byte sizes."""
     sizes: dict[str, int] = {"label": 0}
 
     # 1-byte: opcode only, no operands
@@ -418,73 +346,89 @@ def _instruction_byte_size(instr: ops.Instruction) -> int:
     return 3  # conservative fallback
 
 
-def _narrow_gotos(
-    instructions: tuple[ops.Instruction, ...],
+# Wide sizes: a conditional branch inverted around a goto_w, and goto_w
+_WIDE_CONDITIONAL_SIZE = 5
+_WIDE_GOTO_SIZE = 3
+
+
+def _relax_branches(
+    instructions: tuple[ops.Instruction, ...], label_counter: list[int]
 ) -> tuple[ops.Instruction, ...]:
-    """Narrow goto_w to goto where the target is within signed-byte range.
+    """Give every branch the smallest encoding that reaches its target.
+
+    JCVM conditional branches use 8-bit signed offsets (±127 bytes).
+    For far jumps, we invert the condition and use goto_w:
+
+    Before:  ifeq far_target     (out of range!)
+    After:   ifne _near
+             goto_w far_target
+             _near:
+
+    goto_w is narrowed to goto where the target is within range.
 
     Algorithm:
-    1. Optimistically convert all goto_w to goto (2 bytes vs 3 bytes)
-    2. Compute exact byte positions for all instructions and labels
-    3. Find the farthest out-of-range goto (|offset| > 127)
-    4. Convert it back to goto_w
-    5. Repeat until all remaining gotos are in range
+    1. Start every branch in its 2-byte form and lay out the code with
+       exact byte sizes (prefix sums over instruction sizes)
+    2. Widen every branch whose target is out of range
+    3. Recompute positions from the first widened instruction onward
+    4. Repeat until all remaining short branches are in range
+
+    Widening only grows code, so a branch that is out of range stays out
+    of range and is never narrowed again.
     """
-    instrs = list(instructions)
-
-    # Find all goto_w instructions and optimistically narrow them
-    goto_indices: set[int] = set()
-    for i, instr in enumerate(instrs):
-        if instr.mnemonic == "goto_w":
-            goto_indices.add(i)
-            instrs[i] = ops.Instruction("goto", instr.operands, 0, 0)
+    sizes = [_instruction_byte_size(instr) for instr in instructions]
+    label_index: dict[str, int] = {}
+    short: list[int] = []  # Indices of branches currently in 2-byte form
+    for i, instr in enumerate(instructions):
+        if instr.mnemonic == "label":
+            label_index[str(instr.operands[0])] = i
+        elif instr.mnemonic in _CONDITIONAL_BRANCHES or instr.mnemonic == "goto_w":
+            short.append(i)
+            sizes[i] = 2
 
-    if not goto_indices:
+    if not short:
         return instructions
 
-    # Iteratively widen back the farthest out-of-range gotos
+    positions = [0, *accumulate(sizes)]
+    wide: set[int] = set()
     while True:
-        # Compute byte positions
-        label_positions: dict[str, int] = {}
-        instr_positions: list[int] = []
-        pos = 0
-        for i, instr in enumerate(instrs):
-            instr_positions.append(pos)
-            if instr.mnemonic == "label":
-                label_positions[str(instr.operands[0])] = pos
+        widened: list[int] = []
+        for i in short:
+            target = label_index.get(str(instructions[i].operands[0]))
+            if target is None or not -128 <= positions[target] - positions[i] <= 127:
+                widened.append(i)
+
+        if not widened:
+            break
+
+        for i in widened:
+            wide.add(i)
+            if instructions[i].mnemonic == "goto_w":
+                sizes[i] = _WIDE_GOTO_SIZE
             else:
-                pos += _instruction_byte_size(instr)
-
-        # Find the farthest out-of-range goto
-        worst_idx = -1
-        worst_abs_offset = 0
-        widen_unknown: list[int] = []
-        for i in goto_indices:
-            target = str(instrs[i].operands[0])
-            target_pos = label_positions.get(target)
-            if target_pos is None:
-                widen_unknown.append(i)
-                continue
-            offset = target_pos - instr_positions[i]
-            if not (-128 <= offset <= 127):
-                abs_offset = abs(offset)
-                if abs_offset > worst_abs_offset:
-                    worst_abs_offset = abs_offset
-                    worst_idx = i
+                sizes[i] = _WIDE_CONDITIONAL_SIZE
 
-        # Widen back any with unknown targets (safety)
-        for i in widen_unknown:
-            instrs[i] = ops.Instruction("goto_w", instrs[i].operands, 0, 0)
-            goto_indices.discard(i)
+        first = widened[0]
+        positions[first:] = accumulate(sizes[first:], initial=positions[first])
+        short = [i for i in short if i not in wide]
 
-        if worst_idx == -1:
-            break  # All remaining gotos are in range
+    result: list[ops.Instruction] = []
+    for i, instr in enumerate(instructions):
+        if instr.mnemonic == "goto_w":
+            mnemonic = "goto_w" if i in wide else "goto"
+            result.append(ops.Instruction(mnemonic, instr.operands, 0, 0))
+        elif i not in wide:
+            result.append(instr)
+        else:
+            inverted = _INVERTED_BRANCH[instr.mnemonic]
+            near_label = f"_W{label_counter[0]}"
+            label_counter[0] += 1
 
-        # Widen the farthest one back to goto_w
-        instrs[worst_idx] = ops.Instruction("goto_w", instrs[worst_idx].operands, 0, 0)
-        goto_indices.discard(worst_idx)
+            result.append(ops.Instruction(inverted, (near_label,), instr.pops, 0))
+            result.append(ops.Instruction("goto_w", instr.operands, 0, 0))
+            result.append(ops.Instruction("label", (near_label,), 0, 0))
 
-    return tuple(instrs)
+    return tuple(result)
 
 
 def _merge_consecutive_labels(
@@ -547,6 +491,24 @@ def _merge_consecutive_labels(
     return tuple(result)
 
 
+def finalize_instructions(
+    instructions: tuple[ops.Instruction, ...],
+) -> tuple[ops.Instruction, ...]:
+    """Post-process method instructions before serialization.
+
+    1. Merge consecutive labels (JCA doesn't allow empty labels)
+    2. Relax branches: widen conditional branches that jump too far (JCVM
+       uses 8-bit offsets) and narrow goto_w to goto where the target is
+       within 1-byte offset range
+
+    Shared by the JCA emitter and the native CAP writer so both produce
+    the same instruction stream.
+    """
+    instructions = _merge_consecutive_labels(instructions)
+    label_counter = [0]  # Mutable counter for generating unique labels
+    return _relax_branches(instructions, label_counter)
+
+
 def _emit_method(f: TextIO, method: Method) -> None:
     """Emit method definition."""
     # Method header - public/protected methods need tokens, private don't
@@ -568,14 +530,7 @@ def _emit_method(f: TextIO, method: Method) -> None:
     if method.descriptor_mappings:
         f.write("\n")
 
-    # Post-process instructions:
-    # 1. Merge consecutive labels (JCA doesn't allow empty labels)
-    # 2. Widen conditional branches that jump too far (JCVM uses 8-bit offsets)
-    # 3. Narrow goto_w to goto where target is within 1-byte offset range
-    instructions = _merge_consecutive_labels(method.code.instructions)
-    label_counter = [0]  # Mutable counter for generating unique labels
-    instructions = _widen_branches(instructions, label_counter)
-    instructions = _narrow_gotos(instructions)
+    instructions = finalize_instructions(method.code.instructions)
 
     # Validate method bytecode size
     bytecode_size = sum(_instruction_byte_size(i) for i in instructions)
@@ -4,6 +4,9 @@ Builds the three required lifecycle methods:
 - <init>()V: Constructor that initializes arrays and registers
 - install([BSB)V: Factory method that creates new instance
 - process(APDU)V: Wrapper that calls user's process function
+
+Profile builds also allocate the PROFILE counters in <init> and answer
+the reserved profile INS in process (see output/profile.py).
 """
 
 from jcc.analysis.globals import MUTABLE_ARRAYS, AllocationResult, ScalarFieldInfo
@@ -11,20 +14,31 @@ from jcc.codegen import ops
 from jcc.codegen.emit import FunctionCode
 from jcc.codegen.stack import compute_max_stack
 from jcc.ir.types import BlockLabel, JCType
-from jcc.output.constant_pool import ConstantPool
+from jcc.output.constant_pool import ConstantPool, ProfileRefs
+from jcc.output.profile import COUNTERS_PER_PAGE, ProfileLayout
+
+# ISO 7816-4 header offsets in the APDU buffer
+_OFFSET_INS = 1
+_OFFSET_P1 = 2
 
 
-def build_init_method(cp: ConstantPool, allocation: AllocationResult) -> FunctionCode:
+def build_init_method(
+    cp: ConstantPool,
+    allocation: AllocationResult,
+    profile: ProfileLayout | None = None,
+) -> FunctionCode:
     """Build applet constructor.
 
     The constructor:
     1. Calls super.<init>()
     2. Allocates transient arrays for MEM_B, MEM_S, MEM_I
+       (and the PROFILE counters in profile builds)
     3. Calls register()
 
     Args:
         cp: Constant pool with all indices resolved.
         allocation: Memory allocation results.
+        profile: Counter layout, for profile builds.
 
     Returns:
         FunctionCode for the <init> method.
@@ -45,6 +59,12 @@ def build_init_method(cp: ConstantPool, allocation: AllocationResult) -> Functio
             instructions.append(ops.invokestatic(cp.get_make_transient(array), 2, 1))
             instructions.append(ops.putstatic_a(cp.get_mem_array(array)))
 
+    if profile is not None and cp.profile is not None:
+        instructions.append(ops.sconst(len(profile.counters)))
+        instructions.append(ops.sconst(1))  # JCSystem.CLEAR_ON_RESET = 1
+        instructions.append(ops.invokestatic(cp.profile.make_transient, 2, 1))
+        instructions.append(ops.putstatic_a(cp.profile.counters))
+
     # Register applet
     instructions.append(ops.aload(0))  # this
     instructions.append(ops.invokevirtual(cp.register, 1, 0))
@@ -91,20 +111,25 @@ def build_install_method(cp: ConstantPool) -> FunctionCode:
     )
 
 
-def build_process_wrapper(cp: ConstantPool) -> FunctionCode:
+def build_process_wrapper(
+    cp: ConstantPool,
+    profile: ProfileLayout | None = None,
+) -> FunctionCode:
     """Build process wrapper method.
 
     The wrapper:
     1. Checks selectingApplet() and returns if true
-    2. Calls setIncomingAndReceive() to get data length
-    3. Calls user's process(apdu, len)
-    4. Returns
+    2. In profile builds, answers the profile INS with a page of counters
+    3. Calls setIncomingAndReceive() to get data length
+    4. Calls user's process(apdu, len)
+    5. Returns
 
     Signature: public process(APDU apdu)
     Calls: userProcess(APDU apdu, short len)
 
     Args:
         cp: Constant pool with all indices resolved.
+        profile: Counter layout, for profile builds.
 
     Returns:
         FunctionCode for the process wrapper method.
@@ -117,6 +142,11 @@ def build_process_wrapper(cp: ConstantPool) -> FunctionCode:
     instructions.append(ops.invokevirtual(cp.selecting_applet, 1, 1))  # returns Z (boolean)
     instructions.append(ops.ifne(return_label))
 
+    max_locals = 2  # this, apdu
+    if profile is not None and cp.profile is not None:
+        instructions.extend(_profile_dump(cp.profile, profile, return_label))
+        max_locals = 6  # this, apdu, buffer, index, end, offset
+
     # len = apdu.setIncomingAndReceive()
     instructions.append(ops.aload(1))  # apdu
     instructions.append(ops.invokevirtual(cp.set_incoming_and_receive, 1, 1))  # returns S
@@ -137,10 +167,89 @@ def build_process_wrapper(cp: ConstantPool) -> FunctionCode:
     return FunctionCode(
         instructions=tuple(instructions),
         max_stack=compute_max_stack(tuple(instructions)),
-        max_locals=2,  # this, apdu
+        max_locals=max_locals,
     )
 
 
+def _profile_dump(
+    refs: ProfileRefs,
+    profile: ProfileLayout,
+    return_label: BlockLabel,
+) -> list[ops.Instruction]:
+    """Answer the profile INS with page P1 of the counters, then reset them.
+
+    Falls through to the user's process for any other INS. The response
+    holds each counter of the page as a big-endian short; a page past the
+    last counter comes back empty.
+
+    Locals: 2 = APDU buffer, 3 = counter index, 4 = page end, 5 = offset.
+    """
+    user_label = BlockLabel("L_user")
+    clamped_label = BlockLabel("L_profile_clamped")
+    loop_label = BlockLabel("L_profile_loop")
+    send_label = BlockLabel("L_profile_send")
+    total = len(profile.counters)
+    ins = profile.ins - 0x100 if profile.ins > 0x7F else profile.ins  # baload sign-extends
+
+    return [
+        # buffer = apdu.getBuffer(); if (buffer[INS] != ins) goto user
+        ops.aload(1),
+        ops.invokevirtual(refs.get_buffer, 1, 1),
+        ops.astore(2),
+        ops.aload(2),
+        ops.sconst(_OFFSET_INS),
+        ops.baload(),
+        ops.sconst(ins),
+        ops.if_scmpne(user_label),
+        # index = buffer[P1] * page; end = min(index + page, total); offset = 0
+        ops.aload(2),
+        ops.sconst(_OFFSET_P1),
+        ops.baload(),
+        ops.sconst(COUNTERS_PER_PAGE),
+        ops.smul(),
+        ops.sstore(3),
+        ops.sload(3),
+        ops.sconst(COUNTERS_PER_PAGE),
+        ops.sadd(),
+        ops.sstore(4),
+        ops.sload(4),
+        ops.sconst(total),
+        ops.if_scmple(clamped_label),
+        ops.sconst(total),
+        ops.sstore(4),
+        ops.label(clamped_label),
+        ops.sconst(0),
+        ops.sstore(5),
+        # while (index < end): setShort(buffer, offset, counters[index]); counters[index] = 0
+        ops.label(loop_label),
+        ops.sload(3),
+        ops.sload(4),
+        ops.if_scmpge(send_label),
+        ops.aload(2),
+        ops.sload(5),
+        ops.getstatic_a(refs.counters),
+        ops.sload(3),
+        ops.saload(),
+        ops.invokestatic(refs.set_short, 3, 1),
+        ops.pop(),
+        ops.getstatic_a(refs.counters),
+        ops.sload(3),
+        ops.sconst(0),
+        ops.sastore(),
+        ops.sinc(3, 1),
+        ops.sinc(5, 2),
+        ops.goto(loop_label),
+        # apdu.setOutgoingAndSend(0, offset)
+        ops.label(send_label),
+        ops.aload(1),
+        ops.sconst(0),
+        ops.sload(5),
+        ops.invokevirtual(refs.set_outgoing_and_send, 3, 0),
+        ops.goto(return_label),
+        ops.label(user_label),
+    ]
+
+
 def build_select_method(
     cp: ConstantPool,
     scalar_fields: tuple[ScalarFieldInfo, ...],
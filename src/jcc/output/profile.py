@@ -0,0 +1,188 @@
+"""On-card profiling counters.
+
+A profile build (`profile = true` in jcc.toml) gives every user function a
+counter in a transient short array, PROFILE, that is incremented on entry.
+With `profile_blocks = true` every other basic block gets one too, so a
+function's entry counter doubles as the count of its entry block.
+
+The process wrapper answers the reserved profile INS with one page of
+counters (P1 selects the page) as big-endian shorts, resetting each counter
+it sends. Counters are 16-bit and wrap, so the host reads them often
+(`jcc profile` dumps after every frame) and sums the readings.
+
+The mapping from counter index to function and block is written next to
+the CAP as <Applet>.profile.json. `jcc profile --save` turns a run into a
+counts file, which `block_profile` in jcc.toml feeds back to block layout.
+"""
+
+import json
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from jcc.analysis.frequency import FunctionCounts
+from jcc.errors import OutputError
+from jcc.ir.module import Module
+from jcc.ir.types import BlockLabel
+
+# Static field holding the counters
+PROFILE_FIELD = "PROFILE"
+
+# Counters per dump response: 240 data bytes fit a short APDU's Le
+COUNTERS_PER_PAGE = 120
+
+# Page numbers travel in P1 and are read back as a signed byte
+_MAX_COUNTERS = COUNTERS_PER_PAGE * 128
+
+
+class ProfileMapError(OutputError):
+    """Missing or malformed profile mapping or counts file."""
+
+
+@dataclass(frozen=True)
+class ProfileCounter:
+    """One execution counter.
+
+    Attributes:
+        index: Position in the PROFILE array.
+        function: User function the counter belongs to.
+        block: Block label, or None for the function entry counter.
+    """
+
+    index: int
+    function: str
+    block: str | None = None
+
+
+@dataclass(frozen=True)
+class ProfileLayout:
+    """Counter assignment for a profile build.
+
+    Attributes:
+        ins: INS byte that dumps the counters.
+        counters: All counters, in index order.
+    """
+
+    ins: int
+    counters: tuple[ProfileCounter, ...]
+
+    def function_counters(self, func_name: str, entry: BlockLabel) -> dict[BlockLabel, int]:
+        """Block label → counter index for one function's instrumented blocks."""
+        return {
+            BlockLabel(c.block) if c.block is not None else entry: c.index
+            for c in self.counters
+            if c.function == func_name
+        }
+
+    @property
+    def pages(self) -> int:
+        """Number of dump requests needed to read every counter."""
+        return -(-len(self.counters) // COUNTERS_PER_PAGE)
+
+
+def profile_layout(module: Module, ins: int, blocks: bool = False) -> ProfileLayout:
+    """Assign counters to the module's functions (and blocks), in module order.
+
+    Raises:
+        ProfileMapError: If there are more counters than the dump can page.
+    """
+    counters: list[ProfileCounter] = []
+    for name, func in module.functions.items():
+        counters.append(ProfileCounter(len(counters), name))
+        if blocks:
+            for block in func.blocks[1:]:
+                counters.append(ProfileCounter(len(counters), name, str(block.label)))
+
+    if len(counters) > _MAX_COUNTERS:
+        raise ProfileMapError(
+            f"Profile needs {len(counters)} counters, more than the {_MAX_COUNTERS} "
+            "the dump command can address (try without profile_blocks)"
+        )
+    return ProfileLayout(ins=ins, counters=tuple(counters))
+
+
+def write_profile_map(layout: ProfileLayout, path: Path) -> Path:
+    """Write the counter mapping file and return its path."""
+    document = {
+        "ins": layout.ins,
+        "page_size": COUNTERS_PER_PAGE,
+        "counters": [
+            {"index": c.index, "function": c.function, "block": c.block}
+            for c in layout.counters
+        ],
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n")
+    return path
+
+
+def load_profile_map(path: Path) -> ProfileLayout:
+    """Read a mapping file written by a profile build.
+
+    Raises:
+        ProfileMapError: If the file can't be read or parsed.
+    """
+    try:
+        document: dict[str, Any] = json.loads(path.read_text())
+        if document["page_size"] != COUNTERS_PER_PAGE:
+            raise ProfileMapError(
+                f"{path} was written for {document['page_size']} counters per page, "
+                f"this jcc reads {COUNTERS_PER_PAGE}; rebuild the applet"
+            )
+        counters = tuple(
+            ProfileCounter(int(c["index"]), str(c["function"]), c["block"])
+            for c in document["counters"]
+        )
+        return ProfileLayout(ins=int(document["ins"]), counters=counters)
+    except OSError as e:
+        raise ProfileMapError(f"Cannot read profile map {path}: {e}") from e
+    except (KeyError, TypeError, ValueError) as e:
+        raise ProfileMapError(f"Malformed profile map {path}: {e}") from e
+
+
+def function_counts(layout: ProfileLayout, counts: Sequence[int]) -> dict[str, FunctionCounts]:
+    """Group summed counter values by function."""
+    calls: dict[str, int] = {}
+    blocks: dict[str, dict[str, int]] = {}
+    for c in layout.counters:
+        if c.block is None:
+            calls[c.function] = counts[c.index]
+        else:
+            blocks.setdefault(c.function, {})[c.block] = counts[c.index]
+    return {
+        name: FunctionCounts(calls=n, blocks=blocks.get(name, {}))
+        for name, n in calls.items()
+    }
+
+
+def write_block_counts(counts: Mapping[str, FunctionCounts], path: Path) -> Path:
+    """Write a counts file for `block_profile` and return its path."""
+    document = {
+        "functions": {
+            name: {"calls": c.calls, "blocks": dict(c.blocks)}
+            for name, c in counts.items()
+        },
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n")
+    return path
+
+
+def load_block_counts(path: Path) -> dict[str, FunctionCounts]:
+    """Read a counts file written by `jcc profile --save`.
+
+    Raises:
+        ProfileMapError: If the file can't be read or parsed.
+    """
+    try:
+        document: dict[str, Any] = json.loads(path.read_text())
+        return {
+            str(name): FunctionCounts(
+                calls=int(c["calls"]),
+                blocks={str(label): int(n) for label, n in c.get("blocks", {}).items()},
+            )
+            for name, c in document["functions"].items()
+        }
+    except OSError as e:
+        raise ProfileMapError(f"Cannot read block counts {path}: {e}") from e
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        raise ProfileMapError(f"Malformed block counts {path}: {e}") from e
@@ -9,21 +9,27 @@ import subprocess
 from pathlib import Path
 
 from jcc.analysis.callgraph import build_call_graph
-from jcc.analysis.function import analyze_all_functions
+from jcc.analysis.cost import select_cost_model
+from jcc.analysis.function import ANALYSIS_PHASE, analyze_all_functions
 from jcc.analysis.globals import MemArray, analyze_module
 from jcc.api.loader import load_api_registry
 from jcc.errors import BuildError, ConfigError
+from jcc.incremental import BuildCache
 from jcc.ir.debug import extract_function_param_typedefs
 from jcc.ir.range_metadata import extract_range_metadata
 from jcc.ir.instructions import LoadInst, StoreInst
 from jcc.ir.intrinsics import lower_module
-from jcc.ir.module import Module, parse_module_from_file
+from jcc.ir.llvm import LLVMModule
+from jcc.ir.module import Module, parse_module
 from jcc.ir.types import JCType
 from jcc.lower.i64 import lower_i64_patterns
+from jcc.lower.inline import DEFAULT_INLINE_SIZE, InlinePolicy, inline_functions
 from jcc.lower.sext import lower_sign_extension_patterns
 from jcc.jcdk import get_jcdk
+from jcc.opt import optimize_allocated, optimize_module
 from jcc.output.config import ProjectConfig, load_config
 from jcc.output.generate import generate_output
+from jcc.timings import BuildTimings
 
 
 def _data_dir() -> Path:
@@ -34,20 +40,34 @@ def _data_dir() -> Path:
 def build_project(
     path: Path,
     llvm_root: Path | None = None,
+    incremental: bool = False,
+    jobs: int = 1,
+    timings: BuildTimings | None = None,
 ) -> Path:
     """Build a project from jcc.toml to CAP file.
 
     Args:
         path: Project directory or path to jcc.toml file.
         llvm_root: LLVM installation directory (for opt passes).
+        incremental: Reuse artifacts from build/.jcc-cache/. An unchanged
+            build returns the cached CAP; otherwise only functions whose
+            inputs changed are recompiled.
+        jobs: Number of processes for per-function analysis and code
+            generation. 0 uses one process per CPU. Output is identical
+            for every job count.
+        timings: Records the cost of each phase, and of each function in
+            analysis and codegen, if given.
 
     Returns:
         Path to the generated CAP file.
 
     Raises:
-        ConfigError: If configuration is invalid.
+        ConfigError: If configuration or the selected cost table is invalid.
         BuildError: If frontend or opt fails.
     """
+    if timings is None:
+        timings = BuildTimings()
+
     # 1. Find and load config
     config_path = find_config(path)
     config = load_config(config_path)
@@ -58,45 +78,96 @@ def build_project(
     # 2. Run frontend command (if specified)
     if config.build_command:
         resolved_llvm_root = llvm_root or find_llvm_root()
-        run_frontend(config.build_command, project_dir, resolved_llvm_root,
-                     javacard_version=config.javacard_version)
+        with timings.phase("frontend"):
+            run_frontend(config.build_command, project_dir, resolved_llvm_root,
+                         javacard_version=config.javacard_version)
 
     # 3. Find .ll file
     ll_path = find_ll_file(config, build_dir)
 
     # 3b. Run range analysis annotation (if plugin available)
     resolved_llvm_root_for_opt = llvm_root or find_llvm_root()
-    run_opt_annotate(ll_path, resolved_llvm_root_for_opt)
+    with timings.phase("opt annotate"):
+        run_opt_annotate(ll_path, resolved_llvm_root_for_opt)
 
-    # 4. Resolve JCDK
+    # 4. Resolve JCDK and the target's instruction costs
     jcdk = get_jcdk(config.javacard_version)
+    costs = select_cost_model(config.cost_model, project_dir)
 
-    # 5. Parse LLVM IR
+    # 4b. Reuse the previous CAP if no input changed
     llvm_ir_text = ll_path.read_text()
-    module = parse_module_from_file(ll_path)
+    cache: BuildCache | None = None
+    build_key = ""
+    if incremental:
+        cache = BuildCache(build_dir)
+        block_counts: bytes | None = None
+        if config.block_profile is not None:
+            counts_path = config_path.parent / config.block_profile
+            # A missing file is reported by generate_output on the miss
+            block_counts = counts_path.read_bytes() if counts_path.exists() else None
+        build_key = cache.build_key(
+            llvm_ir_text, config_path.read_bytes(), config.javacard_version, jcdk.export_dir,
+            costs, block_counts,
+        )
+        cached_cap = cache.restore_build(build_key, build_dir)
+        if cached_cap is not None:
+            return cached_cap
+
+    with timings.phase("parse"):
+        # 5. Parse LLVM IR (the text read above is parsed and indexed only once)
+        llvm_module = LLVMModule.parse_string(llvm_ir_text)
+        module = parse_module(llvm_module)
 
-    # 6. Extract parameter typedef info from debug metadata
-    param_typedefs = extract_function_param_typedefs(llvm_ir_text)
+        # 6. Extract parameter typedef info from debug metadata
+        param_typedefs = extract_function_param_typedefs(llvm_module.source)
 
-    # 6b. Extract range metadata from jcc_annotate plugin (if present)
-    range_info = extract_range_metadata(llvm_ir_text)
+        # 6b. Extract range metadata from jcc_annotate plugin (if present)
+        range_info = extract_range_metadata(llvm_module.source)
 
     # 7. Lower intrinsics
-    module = lower_module(module)
+    with timings.phase("lower intrinsics"):
+        module = lower_module(module)
 
     # 7b. Lower i64 bitmask patterns (LLVM instcombine artifacts)
-    module = lower_i64_patterns(module)
+    with timings.phase("lower i64"):
+        module = lower_i64_patterns(module)
 
     # 7c. Lower shl+ashr sign-extension idioms to trunc+sext
-    module = lower_sign_extension_patterns(module)
+    with timings.phase("lower sext"):
+        module = lower_sign_extension_patterns(module)
+
+    # 7d. Inline small functions into their callers
+    policy = InlinePolicy.from_attributes(
+        {name: llvm_module.source.function_attributes(name) for name in module.functions},
+        always=config.inline_always,
+        never=config.inline_never,
+        max_size=(
+            DEFAULT_INLINE_SIZE if config.inline_max_size is None else config.inline_max_size
+        ),
+    )
+    with timings.phase("inline"):
+        module, range_info = inline_functions(module, policy, range_info=range_info)
+
+    # 7e. Clean up what lowering and inlining left behind
+    with timings.phase("optimize"):
+        module, opt_stats = optimize_module(module, config.opt_passes)
+    for stat in opt_stats:
+        print(f"  {stat.name}: {stat.before} -> {stat.after} instructions")
 
     # 8. Analyze module (globals, recursion check)
-    allocation = analyze_module(
-        module, has_intx=config.has_intx, use_scalar_fields=config.use_scalar_fields,
-    )
+    with timings.phase("module analysis"):
+        allocation = analyze_module(
+            module, has_intx=config.has_intx, use_scalar_fields=config.use_scalar_fields,
+        )
     for arr, size in sorted(allocation.mem_sizes.items(), key=lambda x: x[0].value):
         print(f"  {arr.value}: {size}")
 
+    # 8b. Optimize loop addressing for the allocated memory layout
+    with timings.phase("optimize allocated"):
+        module, opt_stats = optimize_allocated(module, allocation, config.opt_passes)
+    for stat in opt_stats:
+        print(f"  {stat.name}: {stat.before} -> {stat.after} instructions")
+
     # 9. Load API registry (intx needed only when has_intx=True)
     packages = ["javacard.framework", "java.lang"]
     if config.has_intx and (
@@ -107,13 +178,16 @@ def build_project(
             packages.append("javacardx.framework.util.intx")
     if config.extended_apdu:
         packages.append("javacardx.apdu")
-    api = load_api_registry(jcdk, packages)
+    with timings.phase("api registry"):
+        api = load_api_registry(jcdk, packages)
 
     # 10. Build call graph and analyze all functions
-    call_graph = build_call_graph(module)
-    function_analyses = analyze_all_functions(
-        module, call_graph, allocation=allocation, range_info=range_info,
-    )
+    with timings.phase(ANALYSIS_PHASE):
+        call_graph = build_call_graph(module)
+        function_analyses = analyze_all_functions(
+            module, call_graph, allocation=allocation, range_info=range_info, jobs=jobs,
+            costs=costs, timings=timings,
+        )
 
     # 11. Generate output (JCA + CAP)
     cap_path = generate_output(
@@ -124,8 +198,16 @@ def build_project(
         config_path=config_path,
         output_dir=build_dir,
         param_typedefs=param_typedefs,
+        cache=cache,
+        jobs=jobs,
+        costs=costs,
+        timings=timings,
     )
 
+    if cache is not None:
+        cache.store_build(build_key, cap_path)
+        cache.prune_functions()
+
     return cap_path
 
 
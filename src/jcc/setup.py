@@ -343,10 +343,9 @@ def setup_headers() -> None:
     include_dir = CONFIG_DIR / "include"
     include_dir.mkdir(parents=True, exist_ok=True)
 
-    # Copy jcc.h from package data
-    src_jcc_h = Path(__file__).parent / "data" / "include" / "jcc.h"
-    dest_jcc_h = include_dir / "jcc.h"
-    shutil.copy2(src_jcc_h, dest_jcc_h)
+    # Copy jcc.h and the other bundled headers from package data
+    for src_header in (Path(__file__).parent / "data" / "include").glob("*.h"):
+        shutil.copy2(src_header, include_dir / src_header.name)
 
     for export_dir in sorted(versions_dir.glob("api_export_files_*")):
         version = export_dir.name.removeprefix("api_export_files_")
@@ -0,0 +1,167 @@
+"""Per-phase build timings.
+
+build_project records every phase it runs in a BuildTimings:
+
+- wall: elapsed time.
+- cpu: CPU time of this process plus that of child processes that exited
+  during the phase (the frontend, opt, capgen, verifycap and the --jobs
+  worker pools), so it can exceed wall.
+- peak_memory: with trace_memory, the peak of Python allocations traced
+  by tracemalloc during the phase, above what was live when it began.
+  Only this process is traced; --jobs workers are not.
+
+Per-function analysis and codegen also record each function's own wall
+and CPU time, measured in whichever process ran it. Passes may also
+record event counts, such as the global peephole's pattern hits.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Callable, Generator, Mapping
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from jcc import __version__
+
+# Functions listed per phase in reports
+DEFAULT_SLOWEST = 10
+
+
+@dataclass(frozen=True)
+class PhaseTiming:
+    """Cost of one build phase.
+
+    Attributes:
+        name: Phase name.
+        wall: Elapsed seconds.
+        cpu: CPU seconds, including child processes.
+        peak_memory: Peak traced bytes, or None without memory tracing.
+    """
+
+    name: str
+    wall: float
+    cpu: float
+    peak_memory: int | None
+
+
+@dataclass(frozen=True)
+class FunctionTiming:
+    """Cost of one function within a per-function phase.
+
+    Attributes:
+        name: Function name.
+        wall: Elapsed seconds.
+        cpu: CPU seconds of the process that ran it.
+    """
+
+    name: str
+    wall: float
+    cpu: float
+
+
+def timed_call[T](fn: Callable[..., T], *args: Any, **kwargs: Any) -> tuple[T, float, float]:
+    """Call fn, returning its result with the wall and CPU seconds it took.
+
+    Picklable whenever fn is, so pools can run partial(timed_call, fn).
+    """
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def _cpu_time() -> float:
+    """CPU seconds of this process and its exited children."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+class BuildTimings:
+    """Collects phase and per-function timings for one build.
+
+    Attributes:
+        trace_memory: Whether phases record peak memory with tracemalloc.
+            Tracing slows Python code down severalfold.
+        phases: Timings of finished phases, in run order.
+        functions: Phase name -> timings of the functions it ran.
+        counts: Event name -> times it happened during the build.
+    """
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        self.trace_memory = trace_memory
+        self.phases: list[PhaseTiming] = []
+        self.functions: dict[str, list[FunctionTiming]] = {}
+        self.counts: Counter[str] = Counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Generator[None]:
+        """Record the body of a with statement as the phase name."""
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+        wall, cpu = time.perf_counter(), _cpu_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, _cpu_time() - cpu
+            peak: int | None = None
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                if tracing:
+                    tracemalloc.stop()
+            self.phases.append(PhaseTiming(name=name, wall=wall, cpu=cpu, peak_memory=peak))
+
+    def record_function(self, phase: str, name: str, wall: float, cpu: float) -> None:
+        """Record one function's time within phase."""
+        self.functions.setdefault(phase, []).append(FunctionTiming(name=name, wall=wall, cpu=cpu))
+
+    def record_counts(self, counts: Mapping[str, int]) -> None:
+        """Add counts to the build's event counts."""
+        self.counts.update(counts)
+
+    def slowest(self, phase: str, count: int = DEFAULT_SLOWEST) -> list[FunctionTiming]:
+        """The count functions of phase with the most wall time, slowest first."""
+        return sorted(self.functions.get(phase, []), key=lambda f: f.wall, reverse=True)[:count]
+
+    def report(self, slowest: int = DEFAULT_SLOWEST) -> str:
+        """Format the timings as a table, then the slowest functions per phase."""
+        width = max((len(p.name) for p in self.phases), default=0)
+        lines = [f"  {'phase':<{width}}  {'wall':>9}  {'cpu':>9}  {'peak':>10}"]
+        for p in self.phases:
+            peak = "" if p.peak_memory is None else f"{p.peak_memory / 1024:.0f} KiB"
+            lines.append(f"  {p.name:<{width}}  {p.wall:>8.3f}s  {p.cpu:>8.3f}s  {peak:>10}")
+        total_wall = sum(p.wall for p in self.phases)
+        total_cpu = sum(p.cpu for p in self.phases)
+        lines.append(f"  {'total':<{width}}  {total_wall:>8.3f}s  {total_cpu:>8.3f}s")
+        for phase in self.functions:
+            lines.append(f"  slowest in {phase}:")
+            for f in self.slowest(phase, slowest):
+                lines.append(f"    {f.wall:>8.3f}s  {f.cpu:>8.3f}s  {f.name}")
+        if self.counts:
+            lines.append("  counts:")
+            for name, count in sorted(self.counts.items()):
+                lines.append(f"    {count:>8}  {name}")
+        return "\n".join(lines)
+
+    def to_json(self, slowest: int = DEFAULT_SLOWEST) -> dict[str, Any]:
+        """The timings as JSON-ready data, tagged with the compiler version."""
+        return {
+            "version": __version__,
+            "phases": [asdict(p) for p in self.phases],
+            "functions": {
+                phase: [asdict(f) for f in self.slowest(phase, slowest)]
+                for phase in self.functions
+            },
+            "counts": dict(sorted(self.counts.items())),
+        }
+
+    def write_json(self, path: Path, slowest: int = DEFAULT_SLOWEST) -> None:
+        """Write to_json() to path."""
+        path.write_text(json.dumps(self.to_json(slowest), indent=2) + "\n")
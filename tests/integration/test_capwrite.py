@@ -0,0 +1,64 @@
+"""Differential tests: native CAP writer vs capgen.
+
+Each example is built twice, once through capgen and once with
+[options].cap_writer = "native", and the CAP components are compared
+byte for byte.
+"""
+
+import shutil
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from .conftest import EXAMPLES
+from .helpers import build_example
+
+_EXAMPLES = sorted(p.parent.name for p in EXAMPLES.glob("*/jcc.toml"))
+
+
+def _components(cap_path: Path) -> dict[str, bytes]:
+    with zipfile.ZipFile(cap_path) as zf:
+        return {
+            Path(name).name: zf.read(name)
+            for name in zf.namelist()
+            if name.endswith(".cap") and "/javacard/" in name
+        }
+
+
+def _build_native(example_dir: Path, work_dir: Path) -> Path:
+    project = work_dir / example_dir.name
+    shutil.copytree(example_dir, project, ignore=shutil.ignore_patterns("build", "target"))
+
+    config = project / "jcc.toml"
+    text = config.read_text()
+    setting = '[options]\ncap_writer = "native"\n'
+    if "[options]" in text:
+        text = text.replace("[options]\n", setting, 1)
+    else:
+        text += "\n" + setting
+    config.write_text(text)
+
+    result = subprocess.run(
+        [sys.executable, "-m", "jcc", str(project)],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Native build failed for {example_dir.name}:\n{result.stderr}")
+    (cap_path,) = (project / "build").glob("*.cap")
+    return cap_path
+
+
+@pytest.mark.parametrize("example", _EXAMPLES)
+def test_native_matches_capgen(example: str, tmp_path: Path) -> None:
+    """Native CAP components are identical to capgen's."""
+    reference = _components(build_example(EXAMPLES / example))
+    native = _components(_build_native(EXAMPLES / example, tmp_path))
+
+    # capgen may add components the native writer never emits (e.g. Debug)
+    for name in native:
+        assert native[name] == reference.get(name), f"{example}: {name} differs from capgen"
+    assert set(reference) - set(native) <= {"Debug.cap", "Export.cap"}
@@ -4,10 +4,22 @@ These tests verify that generated CAP files can be loaded onto the simulator.
 The simulator fixture (conftest.py) manages the Docker lifecycle.
 """
 
+from itertools import pairwise
 from pathlib import Path
 
+import pytest
+
+from jcc.driver.apdu import build_apdu
+from jcc.driver.config import load_config
+from jcc.driver.screen import FrameDecoder
+from jcc.driver.session import SimSession
+
+from .conftest import SIM_PORT
 from .helpers import build_example, load_applet
 
+# Bad Apple frames to compare; the picture first moves at frame 12
+APPLE_FRAMES = 40
+
 
 def test_minimal_loads(simulator: None, examples_dir: Path) -> None:
     """Test loading minimal example onto simulator."""
@@ -37,3 +49,40 @@ def test_constructor_loads(simulator: None, examples_dir: Path) -> None:
     """Test loading constructor example onto simulator."""
     cap_path = build_example(examples_dir / "constructor")
     load_applet(cap_path, examples_dir / "constructor" / "jcc.toml")
+
+
+def test_apple_delta_frames(
+    simulator: None, examples_dir: Path, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that apple's delta replies rebuild the frames it sends raw.
+
+    Blocks change in one frame and stay put in the next, so a dirty bit
+    kept from the previous delta reply would resend them.
+    """
+    demo_dir = examples_dir / "apple"
+    cap_path = build_example(demo_dir)
+    load_applet(cap_path, demo_dir / "jcc.toml")
+    config = load_config(demo_dir)
+    assert config.screen is not None
+    frame_apdu = build_apdu(0x01, ne=config.screen.framebuffer_size)
+    reset_apdu = build_apdu(0x02)
+
+    monkeypatch.setenv("SIM_PORT", str(SIM_PORT))
+    with SimSession(config.applet_aid) as session:
+        session.send_ok(reset_apdu)
+        raw = [session.send_ok(frame_apdu) for _ in range(APPLE_FRAMES)]
+
+        session.send_ok(reset_apdu)
+        frames = FrameDecoder(config.screen)
+        delta: list[bytes] = []
+        for _ in range(APPLE_FRAMES):
+            apdu = build_apdu(0x01, p1=frames.p1, ne=config.screen.reply_size)
+            delta.append(frames.decode(session.send_ok(apdu)))
+
+    block = config.screen.delta_block
+    changed = [
+        {i for i in range(0, len(b), block) if a[i:i + block] != b[i:i + block]}
+        for a, b in pairwise(raw)
+    ]
+    assert any(now - after for now, after in pairwise(changed))
+    assert delta == raw
@@ -0,0 +1,132 @@
+"""Tests for api/cache.py - on-disk API registry cache."""
+
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from jcc.api import cache
+from jcc.api.loader import load_api_registry
+from jcc.api.parser import ParseResult, parse_exp_text
+from jcc.jcdk import JCDKPaths
+
+EXP_TEXT = """
+CONSTANT_Package_info {
+    minor_version	6
+    major_version	1
+    aid_length	7
+    aid	A0000000620101
+    name_index	5		// javacard/framework
+}
+
+class_info {		// javacard/framework/APDU
+    token	10
+    access_flags	public final
+    name_index	293		// javacard/framework/APDU
+    methods_count	2
+    methods {
+        method_info {
+            token	1
+            access_flags	public
+            name_index	271		// getBuffer
+            Descriptor_Index	268		// ()[B
+        }
+        method_info {
+            token	5
+            access_flags	public static
+            name_index	272		// getCurrentAPDU
+            Descriptor_Index	269		// ()Ljavacard/framework/APDU;
+        }
+    }
+}
+"""
+
+
+@pytest.fixture
+def jcdk(tmp_path: Path) -> JCDKPaths:
+    export_dir = tmp_path / "exports"
+    exp_dir = export_dir / "javacard" / "framework" / "javacard"
+    exp_dir.mkdir(parents=True)
+    (exp_dir / "framework.exp").write_bytes(b"\x00\x01")
+    return JCDKPaths(
+        jc_home=tmp_path,
+        java_home=tmp_path,
+        capgen=tmp_path / "capgen",
+        verifycap=tmp_path / "verifycap",
+        exp2text=tmp_path / "exp2text",
+        export_dir=export_dir,
+    )
+
+
+@pytest.fixture(autouse=True)
+def isolated_config(tmp_path: Path):
+    with mock.patch("jcc.api.cache.config_dir", return_value=tmp_path / "config"):
+        yield
+
+
+class TestPackageKey:
+    def test_stable(self, jcdk: JCDKPaths) -> None:
+        """Same export files produce the same key."""
+        assert cache.package_key(jcdk, "javacard.framework") == cache.package_key(
+            jcdk, "javacard.framework"
+        )
+
+    def test_changes_with_contents(self, jcdk: JCDKPaths) -> None:
+        """Modifying an export file changes the key."""
+        before = cache.package_key(jcdk, "javacard.framework")
+        exp = jcdk.export_dir / "javacard" / "framework" / "javacard" / "framework.exp"
+        exp.write_bytes(b"\x00\x02")
+        assert cache.package_key(jcdk, "javacard.framework") != before
+
+    def test_missing_package(self, jcdk: JCDKPaths) -> None:
+        """Packages without export files are not cacheable."""
+        assert cache.package_key(jcdk, "java.lang") is None
+
+
+class TestRoundTrip:
+    def test_store_and_load(self, jcdk: JCDKPaths) -> None:
+        """A stored ParseResult loads back equal."""
+        result = parse_exp_text(EXP_TEXT)
+        cache.store_cached(jcdk, "javacard.framework", result)
+        loaded = cache.load_cached(jcdk, "javacard.framework")
+        assert loaded == result
+
+    def test_miss(self, jcdk: JCDKPaths) -> None:
+        assert cache.load_cached(jcdk, "javacard.framework") is None
+
+    def test_corrupt_entry_ignored(self, jcdk: JCDKPaths) -> None:
+        """Unreadable entries are treated as misses."""
+        cache.store_cached(jcdk, "javacard.framework", parse_exp_text(EXP_TEXT))
+        (entry,) = cache.list_entries()
+        entry.path.write_text("{not json")
+        assert cache.load_cached(jcdk, "javacard.framework") is None
+
+    def test_version_mismatch_ignored(self, jcdk: JCDKPaths) -> None:
+        cache.store_cached(jcdk, "javacard.framework", parse_exp_text(EXP_TEXT))
+        (entry,) = cache.list_entries()
+        entry.path.write_text(entry.path.read_text().replace('"version":1', '"version":0'))
+        assert cache.load_cached(jcdk, "javacard.framework") is None
+
+    def test_clear(self, jcdk: JCDKPaths) -> None:
+        cache.store_cached(jcdk, "javacard.framework", ParseResult(classes=[], package=None))
+        assert len(cache.list_entries()) == 1
+        assert cache.clear_cache() == 1
+        assert cache.list_entries() == []
+
+
+class TestLoaderUsesCache:
+    def test_exp2text_runs_once(self, jcdk: JCDKPaths) -> None:
+        """Second load is served from cache without running exp2text."""
+        with mock.patch("jcc.api.loader._run_exp2text", return_value=EXP_TEXT) as run:
+            first = load_api_registry(jcdk, ["javacard.framework"])
+            second = load_api_registry(jcdk, ["javacard.framework"])
+        assert run.call_count == 1
+        assert first.classes == second.classes
+        assert second.lookup("javacard/framework/APDU", "getBuffer") is not None
+
+    def test_use_cache_false(self, jcdk: JCDKPaths) -> None:
+        with mock.patch("jcc.api.loader._run_exp2text", return_value=EXP_TEXT) as run:
+            load_api_registry(jcdk, ["javacard.framework"], use_cache=False)
+            load_api_registry(jcdk, ["javacard.framework"], use_cache=False)
+        assert run.call_count == 2
+        assert cache.list_entries() == []
@@ -0,0 +1,103 @@
+"""Tests for cap/verify.py - bytecode verifier."""
+
+from pathlib import Path
+
+from jcc.cap.models import CAPFile, MethodComponent, MethodInfo, VType
+from jcc.cap.opcodes import OPCODES
+from jcc.cap.verify import verify_cap, verify_method
+
+_OP = {info.mnemonic: value for value, info in OPCODES.items()}
+
+
+def _method(*code: str | int, max_locals: int = 2, index: int = 0) -> MethodInfo:
+    """Build a static method from mnemonics and raw operand bytes."""
+    bytecode = bytes(_OP[c] if isinstance(c, str) else c & 0xFF for c in code)
+    return MethodInfo(
+        index=index, offset=0, flags=0x08, max_stack=4, nargs=0,
+        max_locals=max_locals, bytecode=bytecode,
+    )
+
+
+# r0 = 0; while (r0) r0++; return
+_LOOP = _method(
+    "sconst_0", "sstore_0",
+    "sload_0", "ifeq", 7,       # 2: exit loop -> 10
+    "sinc", 0, 1,               # 5
+    "goto", -6,                 # 8: -> 2
+    "return",                   # 10
+)
+
+# if (...) r0 = short else r0 = ref; return (short) r0
+_CONFLICT = _method(
+    "sconst_1", "ifeq", 6,      # 0, 1: -> 7
+    "sconst_0", "sstore_0",     # 3, 4
+    "goto", 5,                  # 5: -> 10
+    "aconst_null", "astore_0",  # 7, 8
+    "nop",                      # 9
+    "sload_0", "sreturn",       # 10
+)
+
+
+class TestVerifyMethod:
+    def test_loop_verifies(self) -> None:
+        result = verify_method(_LOOP)
+        assert result.success
+        assert result.errors == []
+        assert result.warnings == []
+
+    def test_conflicting_merge_reported(self) -> None:
+        result = verify_method(_CONFLICT)
+        assert not result.success
+        (error,) = result.errors
+        assert error.pc == 10
+        assert error.message == "Loading from register r0 with conflicting types"
+        assert error.registers[0] == VType.TOP
+        # Trace follows bytecode order through the pass that failed
+        assert [entry.pc for entry in error.trace] == [0, 1, 3, 4, 7, 8]
+
+    def test_strict_rejects_stack_at_branch_target(self) -> None:
+        method = _method(
+            "sconst_1", "sconst_0", "ifeq", 2,  # 0, 1, 2: -> 4
+            "nop", "sreturn",                   # 4
+        )
+        assert verify_method(method).success
+        result = verify_method(method, strict=True)
+        assert not result.success
+        assert result.errors[0].message == "Non-empty stack at branch target (strict mode)"
+
+    def test_fallthrough_merge_does_not_leak_later_stores(self) -> None:
+        """Stores after a join must not change the state recorded at the join.
+
+        r1 holds an int half on one path and a reference on the other, so it
+        is TOP at pc 16 until the astore there. Leaking that store back into
+        the join's recorded state made the analysis flip forever.
+        """
+        method = _method(
+            "iconst_0", "istore", 0,
+            "aconst_null", "astore", 1,
+            "aconst_null", "astore", 1,
+            "sconst_1", "ifeq_w", 0, 6,   # 9, 10: -> 16
+            "iconst_1", "istore", 0,      # 13
+            "aconst_null", "astore", 1,   # 16
+            "aload", 1, "astore", 1,
+            "sconst_1", "sreturn",
+        )
+        assert verify_method(method).success
+
+
+class TestVerifyCap:
+    def test_parallel_matches_serial(self) -> None:
+        methods = [
+            _method(*code, index=i)
+            for i, code in enumerate([_LOOP.bytecode, _CONFLICT.bytecode] * 3)
+        ]
+        cap = CAPFile(path=Path("test.cap"), method=MethodComponent(methods=methods))
+
+        serial = verify_cap(cap)
+        parallel = verify_cap(cap, workers=2)
+
+        assert [r.method_index for r in parallel] == list(range(6))
+        assert parallel == serial
+
+    def test_no_method_component(self) -> None:
+        assert verify_cap(CAPFile(path=Path("test.cap")), workers=2) == []
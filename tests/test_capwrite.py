@@ -0,0 +1,347 @@
+"""Tests for output/capwrite.py - Native CAP file writer."""
+
+import dataclasses
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from jcc.api.types import APIRegistry, ClassInfo
+from jcc.cap.disasm import disassemble_method, find_branch_targets
+from jcc.cap.models import CPStaticFieldRef, CPStaticMethodRef, CPTag
+from jcc.cap.parse import parse_cap
+from jcc.codegen import ops
+from jcc.codegen.emit import FunctionCode
+from jcc.ir.types import BlockLabel
+from jcc.output.capwrite import CapWriteError, _encode_offsets, write_cap
+from jcc.output.constant_pool import CPEntry, CPEntryKind
+from jcc.output.structure import Class, Field, Method, Package
+from jcc.output.vtable import VTableEntry
+
+# Constant pool indices used by the test package
+_APPLET_INIT = 0
+_OUR_CLASS = 1
+_OUR_INIT = 2
+_REGISTER = 3
+_MEM_B = 4
+_COUNTER = 5
+_CONST_S = 6
+_HELPER = 7
+_GET_BUFFER = 8
+
+
+@pytest.fixture
+def api() -> APIRegistry:
+    return APIRegistry(
+        classes={
+            "javacard/framework/Applet": ClassInfo(
+                name="javacard/framework/Applet", token=3, methods={},
+            ),
+            "javacard/framework/APDU": ClassInfo(
+                name="javacard/framework/APDU", token=10, methods={},
+            ),
+        }
+    )
+
+
+def _method(
+    access: str,
+    name: str,
+    descriptor: str,
+    instructions: list[ops.Instruction],
+    max_stack: int = 2,
+    max_locals: int = 2,
+    vtable_index: int | None = None,
+) -> Method:
+    return Method(
+        access=access,
+        name=name,
+        descriptor=descriptor,
+        code=FunctionCode(tuple(instructions), max_stack=max_stack, max_locals=max_locals),
+        vtable_index=vtable_index,
+    )
+
+
+def _make_package(helper: list[ops.Instruction] | None = None) -> Package:
+    done = BlockLabel("done")
+    if helper is None:
+        helper = [
+            ops.sload(0),
+            ops.ifeq(done),
+            ops.getstatic_s(_COUNTER),
+            ops.sload(1),
+            ops.sadd(),
+            ops.putstatic_s(_COUNTER),
+            ops.label(done),
+            ops.getstatic_a(_CONST_S),
+            ops.sconst(0),
+            ops.saload(),
+            ops.sreturn(),
+        ]
+
+    methods = (
+        _method("protected", "<init>", "()V", [
+            ops.aload(0),
+            ops.invokespecial(_APPLET_INIT, 1, 0),
+            ops.aload(0),
+            ops.invokevirtual(_REGISTER, 1, 0),
+            ops.return_(),
+        ], vtable_index=0),
+        _method("public static", "install", "([BSB)V", [
+            ops.new_(_OUR_CLASS),
+            ops.dup(),
+            ops.invokespecial(_OUR_INIT, 1, 0),
+            ops.pop(),
+            ops.return_(),
+        ], max_locals=3, vtable_index=1),
+        _method("public", "process", "(Ljavacard/framework/APDU;)V", [
+            ops.aload(1),
+            ops.invokevirtual(_GET_BUFFER, 1, 1),
+            ops.pop(),
+            ops.sconst(1),
+            ops.sconst(2),
+            ops.invokestatic(_HELPER, 2, 1),
+            ops.pop(),
+            ops.return_(),
+        ], vtable_index=7),
+        _method("private static", "helper", "(SS)S", helper),
+    )
+
+    fields = (
+        Field(access="private static", type_desc="short", name="counter"),
+        Field(access="private static", type_desc="byte[]", name="MEM_B"),
+        Field(
+            access="private static final",
+            type_desc="short[]",
+            name="CONST_S",
+            initial_values=(1, -1, 0x1234),
+        ),
+    )
+
+    constant_pool = (
+        CPEntry(CPEntryKind.STATIC_METHOD_REF, "0.3.0()V"),
+        CPEntry(CPEntryKind.CLASS_REF, "TestApplet"),
+        CPEntry(CPEntryKind.STATIC_METHOD_REF, "TestApplet/<init>()V"),
+        CPEntry(CPEntryKind.VIRTUAL_METHOD_REF, "0.3.1()V"),
+        CPEntry(CPEntryKind.STATIC_FIELD_REF, "byte[] TestApplet/MEM_B"),
+        CPEntry(CPEntryKind.STATIC_FIELD_REF, "short TestApplet/counter"),
+        CPEntry(CPEntryKind.STATIC_FIELD_REF, "short[] TestApplet/CONST_S"),
+        CPEntry(CPEntryKind.STATIC_METHOD_REF, "TestApplet/helper(SS)S"),
+        CPEntry(CPEntryKind.VIRTUAL_METHOD_REF, "0.10.1()[B"),
+    )
+
+    applet_class = Class(
+        name="TestApplet",
+        token=0,
+        extends="javacard/framework/Applet",
+        extends_ref="0.3",
+        fields=fields,
+        vtable=(VTableEntry(7, "process", "(Ljavacard/framework/APDU;)V"),),
+        methods=methods,
+    )
+
+    return Package(
+        aid=(0xA0, 0x00, 0x00, 0x00, 0x62, 0x03, 0x01),
+        applet_aid=(0xA0, 0x00, 0x00, 0x00, 0x62, 0x03, 0x01, 0x01),
+        version="1.0",
+        name="com/example/test",
+        imports=("javacard/framework",),
+        import_versions={"javacard/framework": "1.6"},
+        import_aids={"javacard/framework": "0xA0:0x00:0x00:0x00:0x62:0x01:0x01"},
+        constant_pool=constant_pool,
+        applet_class=applet_class,
+    )
+
+
+def _decode_offsets(encoded: bytes) -> list[int]:
+    locations: list[int] = []
+    pos = 0
+    for b in encoded:
+        pos += b
+        if b != 255:
+            locations.append(pos)
+    return locations
+
+
+def _component_bytes(cap_path: Path, name: str) -> bytes:
+    with zipfile.ZipFile(cap_path) as zf:
+        return zf.read(f"com/example/test/javacard/{name}.cap")
+
+
+class TestWriteCap:
+    """Tests for write_cap()."""
+
+    def test_archive_layout(self, api: APIRegistry, tmp_path: Path) -> None:
+        """CAP contains every component under <package>/javacard/."""
+        cap_path = write_cap(_make_package(), api, tmp_path)
+
+        assert cap_path == tmp_path / "TestApplet.cap"
+        with zipfile.ZipFile(cap_path) as zf:
+            names = set(zf.namelist())
+        for component in (
+            "Header", "Directory", "Applet", "Import", "ConstantPool",
+            "Class", "Method", "StaticField", "RefLocation", "Descriptor",
+        ):
+            assert f"com/example/test/javacard/{component}.cap" in names
+
+    def test_deterministic(self, api: APIRegistry, tmp_path: Path) -> None:
+        """Writing the same package twice produces identical archives."""
+        first = write_cap(_make_package(), api, tmp_path / "a").read_bytes()
+        second = write_cap(_make_package(), api, tmp_path / "b").read_bytes()
+        assert first == second
+
+    def test_header_and_imports(self, api: APIRegistry, tmp_path: Path) -> None:
+        """Header and Import components round-trip through the CAP parser."""
+        cap = parse_cap(write_cap(_make_package(), api, tmp_path))
+
+        assert cap.header is not None
+        assert cap.header.magic == 0xDECAFFED
+        assert cap.header.flags & 0x04  # ACC_APPLET
+        assert not cap.header.flags & 0x01  # no int usage
+        assert cap.header.package_info is not None
+        assert cap.header.package_info.aid == bytes(_make_package().aid)
+        assert cap.header.package_info.name == "com/example/test"
+
+        assert cap.imports is not None
+        assert cap.imports.count == 1
+        pkg = cap.imports.packages[0]
+        assert (pkg.major_version, pkg.minor_version) == (1, 6)
+        assert pkg.aid == bytes((0xA0, 0x00, 0x00, 0x00, 0x62, 0x01, 0x01))
+
+    def test_methods_and_descriptor(self, api: APIRegistry, tmp_path: Path) -> None:
+        """Descriptor method entries locate each method in the Method component."""
+        cap = parse_cap(write_cap(_make_package(), api, tmp_path))
+
+        assert cap.method is not None
+        assert cap.descriptor is not None
+        methods = cap.descriptor.classes[0].methods
+        assert [m.token for m in methods] == [0, 1, 7, 0xFF]
+        assert methods[0].access_flags & 0x80  # <init>
+        assert len(cap.method.methods) == 4
+
+        process = cap.method.methods[2]
+        assert process.nargs == 2  # this, apdu
+        assert process.bytecode[0] == 0x19  # aload_1
+
+        helper = cap.method.methods[3]
+        assert helper.nargs == 2
+        for instr in disassemble_method(helper).instructions:
+            assert instr.mnemonic != "unknown"
+
+    def test_applet_install_offset(self, api: APIRegistry, tmp_path: Path) -> None:
+        """Applet component points at the install method."""
+        cap = parse_cap(write_cap(_make_package(), api, tmp_path))
+
+        assert cap.applet is not None
+        assert cap.descriptor is not None
+        install = cap.descriptor.classes[0].methods[1]
+        assert cap.applet.applets[0].install_method_offset == install.method_offset
+        assert cap.applet.applets[0].aid == bytes(_make_package().applet_aid)
+
+    def test_constant_pool_internal_refs(self, api: APIRegistry, tmp_path: Path) -> None:
+        """Internal method refs hold Method offsets; field refs hold image offsets."""
+        cap = parse_cap(write_cap(_make_package(), api, tmp_path))
+
+        assert cap.constant_pool is not None
+        assert cap.descriptor is not None
+        entries = cap.constant_pool.entries
+        method_offsets = [m.method_offset for m in cap.descriptor.classes[0].methods]
+
+        helper_ref = entries[_HELPER].entry
+        assert isinstance(helper_ref, CPStaticMethodRef)
+        assert not helper_ref.is_external
+        assert helper_ref.offset == method_offsets[3]
+
+        applet_init = entries[_APPLET_INIT].entry
+        assert isinstance(applet_init, CPStaticMethodRef)
+        assert applet_init.is_external
+        assert (applet_init.package_token, applet_init.class_token) == (0, 3)
+
+        # Image layout: initialized arrays, other references, then primitives
+        offsets = {}
+        for index, name in ((_CONST_S, "CONST_S"), (_MEM_B, "MEM_B"), (_COUNTER, "counter")):
+            ref = entries[index].entry
+            assert isinstance(ref, CPStaticFieldRef)
+            offsets[name] = ref.offset
+        assert offsets == {"CONST_S": 0, "MEM_B": 2, "counter": 4}
+
+        assert entries[_OUR_CLASS].tag == CPTag.CLASSREF
+
+    def test_static_field_image(self, api: APIRegistry, tmp_path: Path) -> None:
+        """Array initializers are encoded big-endian with their byte count."""
+        cap = parse_cap(write_cap(_make_package(), api, tmp_path))
+
+        assert cap.static_field is not None
+        sf = cap.static_field
+        assert sf.image_size == 6
+        assert sf.reference_count == 2
+        assert sf.array_init_count == 1
+
+        data = _component_bytes(cap.path, "StaticField")
+        # tag, size, image_size, reference_count, array_init_count, then the init
+        assert data[9:12] == bytes((4, 0, 6))  # short[], 6 bytes
+        assert data[12:18] == bytes((0x00, 0x01, 0xFF, 0xFF, 0x12, 0x34))
+        # default_value_count (the short), non_default_value_count
+        assert data[18:] == bytes((0, 2, 0, 0))
+
+    def test_ref_locations_point_at_indices(self, api: APIRegistry, tmp_path: Path) -> None:
+        """Every RefLocation offset addresses a constant pool index operand."""
+        cap_path = write_cap(_make_package(), api, tmp_path)
+        cap = parse_cap(cap_path)
+        method_info = _component_bytes(cap_path, "Method")[3:]
+
+        assert cap.ref_location is not None
+        locations = _decode_offsets(cap.ref_location.offsets_to_byte2_indices)
+        indices = [int.from_bytes(method_info[loc : loc + 2]) for loc in locations]
+        assert indices == [
+            _APPLET_INIT, _REGISTER,  # <init>
+            _OUR_CLASS, _OUR_INIT,  # install
+            _GET_BUFFER, _HELPER,  # process
+            _COUNTER, _COUNTER, _CONST_S,  # helper
+        ]
+
+    def test_far_branch(self, api: APIRegistry, tmp_path: Path) -> None:
+        """Branches beyond the 8-bit range still reach their targets."""
+        far = BlockLabel("far")
+        helper = [ops.sload(0), ops.ifeq(far)]
+        helper += [ops.Instruction("nop", (), 0, 0)] * 300
+        helper += [ops.label(far), ops.sconst(0), ops.sreturn()]
+        cap = parse_cap(write_cap(_make_package(helper), api, tmp_path))
+
+        assert cap.method is not None
+        disasm = disassemble_method(cap.method.methods[3])
+        offsets = {i.offset for i in disasm.instructions}
+        assert find_branch_targets(disasm.instructions) <= offsets
+        assert disasm.instructions[-2].offset == 300 + 6  # sload_0, ifne, goto_w
+
+    def test_int_usage_sets_header_flag(self, api: APIRegistry, tmp_path: Path) -> None:
+        """Int instructions set ACC_INT in the header."""
+        helper = [ops.sload(0), ops.s2i(), ops.i2s(), ops.sreturn()]
+        cap = parse_cap(write_cap(_make_package(helper), api, tmp_path))
+
+        assert cap.header is not None
+        assert cap.header.flags & 0x01
+
+    def test_unsupported_entry(self, api: APIRegistry, tmp_path: Path) -> None:
+        """Constant pool kinds the writer cannot encode raise CapWriteError."""
+        package = _make_package()
+        cp = (*package.constant_pool, CPEntry(CPEntryKind.SUPER_METHOD_REF, "0.3.0()V"))
+        package = dataclasses.replace(package, constant_pool=cp)
+
+        with pytest.raises(CapWriteError, match="Unsupported constant pool entry"):
+            write_cap(package, api, tmp_path)
+
+
+class TestEncodeOffsets:
+    """Tests for RefLocation delta encoding."""
+
+    def test_small_gaps(self) -> None:
+        assert _encode_offsets([3, 10, 12]) == bytes((3, 7, 2))
+
+    def test_large_gap_split(self) -> None:
+        assert _encode_offsets([600]) == bytes((255, 255, 90))
+
+    def test_gap_of_exactly_255(self) -> None:
+        encoded = _encode_offsets([255, 256])
+        assert encoded == bytes((255, 0, 1))
+        assert _decode_offsets(encoded) == [255, 256]
@@ -14,7 +14,9 @@ from jcc.codegen.expr import (
     NegExpr,
     SelectExpr,
     StoreSlotStmt,
+    TypedExpr,
 )
+from jcc.codegen.phi_moves import PhiMove
 from jcc.ir.types import BlockLabel, JCType
 
 
@@ -327,6 +329,26 @@ class TestEmitSwitchWithPhiMoves:
         assert case0 not in switch_instr.operands
 
 
+    def test_cost_model_prefers_lookupswitch_for_two_cases(self) -> None:
+        """Two dense cases are cheaper to probe than to index."""
+        from jcc.analysis.cost import bundled_cost_model
+        from jcc.codegen.emit import emit_switch
+        from jcc.codegen.phi_moves import TempAllocator
+
+        default = BlockLabel("default")
+        value = ConstExpr(ty=JCType.SHORT, value=0)
+        two = ((0, BlockLabel("case0")), (1, BlockLabel("case1")))
+        four = tuple((i, BlockLabel(f"case{i}")) for i in range(4))
+
+        ctx = EmitContext(costs=bundled_cost_model())
+        emit_switch(value, default, two, phi_moves={}, temps=TempAllocator(first_slot=10), ctx=ctx)
+        assert "slookupswitch" in [i.mnemonic for i in ctx.instructions]
+
+        ctx = EmitContext(costs=bundled_cost_model())
+        emit_switch(value, default, four, phi_moves={}, temps=TempAllocator(first_slot=10), ctx=ctx)
+        assert "stableswitch" in [i.mnemonic for i in ctx.instructions]
+
+
 class TestEmitUnsignedComparison:
     """Test unsigned comparison emission with XOR transformation."""
 
@@ -380,6 +402,77 @@ class TestEmitUnsignedComparison:
         assert "sxor" not in mnemonics
 
 
+class TestBranchFallthrough:
+    """Conditional branches fall through to the block emitted next."""
+
+    @staticmethod
+    def emit(
+        next_label: str | None,
+        cond: TypedExpr | None = None,
+        phi_moves: dict[BlockLabel, list[PhiMove]] | None = None,
+    ) -> list[tuple[str, tuple[object, ...]]]:
+        from jcc.codegen.emit import emit_conditional_branch
+        from jcc.codegen.phi_moves import TempAllocator
+
+        if cond is None:
+            cond = CompareExpr(
+                ty=JCType.BYTE,
+                pred="slt",
+                left=LoadSlotExpr(ty=JCType.SHORT, slot=0),
+                right=LoadSlotExpr(ty=JCType.SHORT, slot=1),
+                operand_ty=JCType.SHORT,
+            )
+        ctx = EmitContext(next_label=BlockLabel(next_label) if next_label else None)
+        emit_conditional_branch(
+            cond, BlockLabel("then"), BlockLabel("else"), phi_moves or {},
+            TempAllocator(first_slot=10), ctx,
+        )
+        return [(i.mnemonic, i.operands) for i in ctx.instructions + ctx.deferred]
+
+    def test_branches_straight_to_target(self) -> None:
+        code = self.emit(None)
+        assert code[-2:] == [("if_scmpge", ("else",)), ("goto_w", ("then",))]
+
+    def test_true_target_falls_through(self) -> None:
+        code = self.emit("then")
+        assert code[-1] == ("if_scmpge", ("else",))
+
+    def test_false_target_falls_through_by_inverting(self) -> None:
+        code = self.emit("else")
+        assert code[-1] == ("if_scmplt", ("then",))
+
+    def test_inverts_unsigned_predicate(self) -> None:
+        cond = CompareExpr(
+            ty=JCType.BYTE,
+            pred="ult",
+            left=LoadSlotExpr(ty=JCType.SHORT, slot=0),
+            right=LoadSlotExpr(ty=JCType.SHORT, slot=1),
+            operand_ty=JCType.SHORT,
+        )
+        # uge after the sign-bit flip is sge, branched to when false (slt)
+        assert self.emit("else", cond)[-1] == ("if_scmplt", ("then",))
+
+    def test_inverts_materialized_condition(self) -> None:
+        cond = LoadSlotExpr(ty=JCType.BYTE, slot=0)
+        assert self.emit(None, cond)[-2:] == [("ifeq", ("else",)), ("goto_w", ("then",))]
+        assert self.emit("else", cond)[-1] == ("ifne", ("then",))
+
+    def test_phi_moves_go_out_of_line(self) -> None:
+        from jcc.codegen.phi_moves import ConstSource
+
+        moves = {
+            BlockLabel("else"): [
+                PhiMove(dest_slot=5, dest_type=JCType.SHORT, source=ConstSource(value=7))
+            ]
+        }
+        code = self.emit("then", phi_moves=moves)
+        branch, (stub,) = code[2]
+        # Branch to a stub placed after the fallthrough, which moves and jumps
+        assert branch == "if_scmpge"
+        assert code[3] == ("label", (stub,))
+        assert code[-1] == ("goto_w", ("else",))
+
+
 class TestEmitNegExpr:
     """Test emitting negation expressions."""
 
@@ -637,3 +730,57 @@ class TestCompileFunctionIntegration:
 
         mnemonics = [i.mnemonic for i in result.instructions]
         assert "sreturn" in mnemonics
+
+
+class TestParallelCompile:
+    """User functions compiled in a process pool match serial codegen."""
+
+    def test_parallel_matches_serial(self) -> None:
+        from jcc.analysis.function import analyze_function
+        from jcc.analysis.globals import AllocationResult, MemArray
+        from jcc.ir.instructions import BinaryInst, ReturnInst
+        from jcc.ir.module import Block, Function, Parameter
+        from jcc.ir.types import BlockLabel, SSAName
+        from jcc.ir.values import Const, SSARef
+        from jcc.output.generate import _compile_functions
+
+        def make_add(name: str, k: int) -> Function:
+            return Function(
+                name=name,
+                params=(Parameter(name=SSAName("%a"), ty=JCType.SHORT),),
+                return_type=JCType.SHORT,
+                blocks=(
+                    Block(
+                        label=BlockLabel("entry"),
+                        instructions=(
+                            BinaryInst(
+                                result=SSAName("%sum"),
+                                op="add",
+                                left=SSARef(name=SSAName("%a")),
+                                right=Const(value=k, ty=JCType.SHORT),
+                                ty=JCType.SHORT,
+                            ),
+                        ),
+                        terminator=ReturnInst(
+                            value=SSARef(name=SSAName("%sum")),
+                            ty=JCType.SHORT,
+                        ),
+                    ),
+                ),
+            )
+
+        funcs = [make_add(f"f{k}", k) for k in range(6)]
+        analyses = [analyze_function(func) for func in funcs]
+        allocation = AllocationResult(
+            globals={},
+            structs={},
+            mem_sizes={m: 0 for m in MemArray},
+            const_values={},
+        )
+        cp = _make_test_cp()
+
+        serial = [code for code, _, _ in _compile_functions(funcs, analyses, allocation, cp, 1)]
+        parallel = [code for code, _, _ in _compile_functions(funcs, analyses, allocation, cp, 2)]
+
+        assert parallel == serial
+        assert len({code.instructions for code in serial}) == len(funcs)
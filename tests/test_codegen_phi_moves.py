@@ -5,6 +5,7 @@ from jcc.codegen.phi_moves import (
     ConstSource,
     PhiMove,
     SlotSource,
+    StepSource,
     TempAllocator,
     emit_phi_moves,
     emit_phi_moves_optimized,
@@ -156,6 +157,23 @@ class TestEmitPhiMovesOptimized:
         emit_phi_moves_optimized([], temps, instructions.append)
         assert len(instructions) == 0
 
+    def test_step_after_reads_of_old_value(self) -> None:
+        """A step reads its own slot, so moves copying that slot run first."""
+        temps = TempAllocator(first_slot=10)
+        instructions: list[ops.Instruction] = []
+        moves = [
+            PhiMove(dest_slot=0, dest_type=JCType.SHORT, source=StepSource(delta=2)),
+            PhiMove(dest_slot=1, dest_type=JCType.SHORT, source=SlotSource(slot=0)),
+        ]
+        emit_phi_moves_optimized(moves, temps, instructions.append)
+
+        assert temps.max_temps_used == 0
+        # sload/sconst/sadd/sstore on one slot is later peepholed to sinc
+        assert [(i.mnemonic, i.operands) for i in instructions] == [
+            ("sload_0", ()), ("sstore_1", ()),
+            ("sload_0", ()), ("sconst_2", ()), ("sadd", ()), ("sstore_0", ()),
+        ]
+
 
 class TestIntPhiMoves:
     """Test phi moves with INT type (2 slots)."""
@@ -107,6 +107,7 @@ version = "3.2.0"
         assert config.applet_name == "MyApplet"
         assert config.applet_aid == (0xA0, 0x00, 0x00, 0x00, 0x62, 0x03, 0x00, 0xF0, 0x02, 0x01)
         assert config.javacard_version == "3.2.0"
+        assert config.cost_model is None
 
     def test_missing_package_section(self) -> None:
         """Missing [package] section raises ConfigError."""
@@ -164,6 +165,224 @@ version = "3.2.0"
             with pytest.raises(ConfigError, match="Missing required"):
                 load_config(Path(f.name))
 
+    def test_cap_writer_default(self) -> None:
+        """cap_writer defaults to capgen."""
+        toml_content = """
+[package]
+name = "com/example/test"
+aid = "A0000000620300F002"
+
+[applet]
+name = "MyApplet"
+aid = "A0000000620300F00201"
+
+[javacard]
+version = "3.2.0"
+"""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
+            f.write(toml_content)
+            f.flush()
+            config = load_config(Path(f.name))
+
+        assert config.cap_writer == "capgen"
+
+    def test_cap_writer_native(self) -> None:
+        """[options].cap_writer selects the native CAP writer."""
+        toml_content = """
+[package]
+name = "com/example/test"
+aid = "A0000000620300F002"
+
+[applet]
+name = "MyApplet"
+aid = "A0000000620300F00201"
+
+[options]
+javacard_version = "3.0.4"
+cap_writer = "native"
+"""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
+            f.write(toml_content)
+            f.flush()
+            config = load_config(Path(f.name))
+
+        assert config.cap_writer == "native"
+
+    def test_cap_writer_invalid(self) -> None:
+        """Unknown cap_writer raises ConfigError."""
+        toml_content = """
+[package]
+name = "com/example/test"
+aid = "A0000000620300F002"
+
+[applet]
+name = "MyApplet"
+aid = "A0000000620300F00201"
+
+[options]
+javacard_version = "3.0.4"
+cap_writer = "fast"
+"""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
+            f.write(toml_content)
+            f.flush()
+            with pytest.raises(ConfigError, match="cap_writer"):
+                load_config(Path(f.name))
+
+    def test_cost_model(self) -> None:
+        """[options].cost_model names the timing table for codegen."""
+        toml_content = """
+[package]
+name = "com/example/test"
+aid = "A0000000620300F002"
+
+[applet]
+name = "MyApplet"
+aid = "A0000000620300F00201"
+
+[options]
+javacard_version = "3.0.4"
+cost_model = "bench/results.json"
+"""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
+            f.write(toml_content)
+            f.flush()
+            config = load_config(Path(f.name))
+
+        assert config.cost_model == "bench/results.json"
+
+    def test_inline_table(self) -> None:
+        """[inline] lists functions to always or never inline."""
+        toml_content = """
+[package]
+name = "com/example/test"
+aid = "A0000000620300F002"
+
+[applet]
+name = "MyApplet"
+aid = "A0000000620300F00201"
+
+[options]
+javacard_version = "3.0.4"
+
+[inline]
+always = ["fillVerticalColumn"]
+never = ["debug_dump"]
+max_size = 0
+"""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
+            f.write(toml_content)
+            f.flush()
+            config = load_config(Path(f.name))
+
+        assert config.inline_always == ("fillVerticalColumn",)
+        assert config.inline_never == ("debug_dump",)
+        assert config.inline_max_size == 0
+
+    def test_inline_invalid(self) -> None:
+        """A non-list [inline].always raises ConfigError."""
+        toml_content = """
+[package]
+name = "com/example/test"
+aid = "A0000000620300F002"
+
+[applet]
+name = "MyApplet"
+aid = "A0000000620300F00201"
+
+[options]
+javacard_version = "3.0.4"
+
+[inline]
+always = "fillVerticalColumn"
+"""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
+            f.write(toml_content)
+            f.flush()
+            with pytest.raises(ConfigError, match="inline"):
+                load_config(Path(f.name))
+
+    def test_opt_table(self) -> None:
+        """[opt] turns individual passes off; the rest keep their order."""
+        toml_content = """
+[package]
+name = "com/example/test"
+aid = "A0000000620300F002"
+
+[applet]
+name = "MyApplet"
+aid = "A0000000620300F00201"
+
+[options]
+javacard_version = "3.0.4"
+
+[opt]
+licm = false
+sccp = true
+ivsr = false
+"""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
+            f.write(toml_content)
+            f.flush()
+            config = load_config(Path(f.name))
+
+        assert config.opt_passes == ("sccp", "gvn", "dce")
+
+    @pytest.mark.parametrize("entry", ["cse = false", 'gvn = "no"'])
+    def test_opt_invalid(self, entry: str) -> None:
+        """Unknown passes and non-boolean switches raise ConfigError."""
+        toml_content = f"""
+[package]
+name = "com/example/test"
+aid = "A0000000620300F002"
+
+[applet]
+name = "MyApplet"
+aid = "A0000000620300F00201"
+
+[options]
+javacard_version = "3.0.4"
+
+[opt]
+{entry}
+"""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
+            f.write(toml_content)
+            f.flush()
+            with pytest.raises(ConfigError, match=r"\[opt\]"):
+                load_config(Path(f.name))
+
+    def test_profile_options(self) -> None:
+        """[options].profile_ins must be a byte."""
+        toml_content = """
+[package]
+name = "com/example/test"
+aid = "A0000000620300F002"
+
+[applet]
+name = "MyApplet"
+aid = "A0000000620300F00201"
+
+[options]
+javacard_version = "3.0.4"
+profile = true
+profile_ins = 256
+block_profile = "build/counts.json"
+"""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
+            f.write(toml_content)
+            f.flush()
+            with pytest.raises(ConfigError, match="profile_ins"):
+                load_config(Path(f.name))
+
+            Path(f.name).write_text(toml_content.replace("256", "0xF0"))
+            config = load_config(Path(f.name))
+
+        assert config.profile
+        assert not config.profile_blocks
+        assert config.profile_ins == 0xF0
+        assert config.block_profile == "build/counts.json"
+
     def test_file_not_found(self) -> None:
         """Non-existent file raises FileNotFoundError."""
         with pytest.raises(FileNotFoundError):
@@ -1,5 +1,9 @@
 """Tests for output/constant_pool.py - Constant pool building."""
 
+import pickle
+from dataclasses import replace
+from types import MappingProxyType
+
 import pytest
 
 from jcc.analysis.globals import AllocationResult, MemArray
@@ -364,3 +368,71 @@ class TestMappingProperties:
         """user_functions property returns function names."""
         cp = build_constant_pool(simple_module, allocation, api, config, {})
         assert "process" in cp.user_functions
+
+
+class TestProfileEntries:
+    """Tests for the entries of profile builds."""
+
+    def test_profile_refs(
+        self, api: APIRegistry, config: ProjectConfig, simple_module: Module
+    ) -> None:
+        """Adds the counter field and the APDU/Util methods the dump uses."""
+        apdu = api.classes["javacard/framework/APDU"]
+        send = _make_method("javacard/framework/APDU", "setOutgoingAndSend", 7, descriptor="(SS)V")
+        util = ClassInfo(
+            name="javacard/framework/Util",
+            token=16,
+            methods=_wrap_methods(
+                {
+                    "setShort": _make_method(
+                        "javacard/framework/Util",
+                        "setShort",
+                        9,
+                        is_static=True,
+                        descriptor="([BSS)S",
+                        return_type=JCType.SHORT,
+                    ),
+                }
+            ),
+        )
+        api = APIRegistry(
+            classes={
+                **api.classes,
+                "javacard/framework/APDU": replace(
+                    apdu, methods={**apdu.methods, "setOutgoingAndSend": (send,)}
+                ),
+                "javacard/framework/Util": util,
+            }
+        )
+        empty = AllocationResult(globals={}, structs={}, mem_sizes={}, const_values={})
+        cp = build_constant_pool(simple_module, empty, api, replace(config, profile=True), {})
+
+        assert cp.profile is not None
+        assert cp.entries[cp.profile.counters].value == "short[] TestApplet/PROFILE"
+        assert cp.entries[cp.profile.make_transient].value.endswith("(SB)[S")
+        assert cp.entries[cp.profile.set_outgoing_and_send].value.endswith(".7(SS)V")
+        assert cp.entries[cp.profile.set_short].value.endswith(".16.9([BSS)S")
+
+    def test_no_profile_by_default(
+        self, api: APIRegistry, config: ProjectConfig, allocation: AllocationResult,
+        simple_module: Module,
+    ) -> None:
+        cp = build_constant_pool(simple_module, allocation, api, config, {})
+        assert cp.profile is None
+
+
+class TestPickling:
+    """ConstantPool is shipped to parallel codegen workers."""
+
+    def test_round_trip(
+        self,
+        api: APIRegistry,
+        config: ProjectConfig,
+        allocation: AllocationResult,
+        simple_module: Module,
+    ) -> None:
+        cp = build_constant_pool(simple_module, allocation, api, config, {})
+        copy = pickle.loads(pickle.dumps(cp))
+        assert copy == cp
+        assert isinstance(copy.mem_array_cp, MappingProxyType)
+        assert copy.get_user_method("process") == cp.get_user_method("process")
@@ -0,0 +1,89 @@
+"""Tests for analysis/cost.py - instruction cost model."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from jcc.analysis.cost import (
+    CostModelError,
+    bundled_cost_model,
+    cost_model_from_results,
+    load_cost_model,
+    select_cost_model,
+)
+from jcc.ir.types import JCType
+
+
+def results(iterations: int = 1000, **avg_ms: float) -> dict[str, object]:
+    """A results.json document with the given benchmark times."""
+    return {
+        "iterations": iterations,
+        "benchmarks": [{"name": name, "avg_ms": ms} for name, ms in avg_ms.items()],
+    }
+
+
+class TestDerivation:
+    def test_costs_relative_to_pop(self) -> None:
+        # 1000 iterations: 1 ms over the baseline is 1 µs per iteration
+        model = cost_model_from_results(
+            results(empty=30.0, sconst=35.0, sstore_sload=37.0, sload=36.0),
+            "test",
+        )
+        assert model.cost("pop") == 0.0
+        assert model.cost("sconst_5") == pytest.approx(5.0)
+        assert model.cost("sstore_3") == pytest.approx(2.0)  # 7.0 minus the sconst
+        assert model.cost("sload") == pytest.approx(6.0)
+
+    def test_missing_benchmarks_use_default(self) -> None:
+        model = cost_model_from_results(results(empty=30.0, sconst=35.0), "test")
+        assert "sstore" not in model.costs
+        assert model.cost("sstore") == model.default
+        assert model.cost("astore") == model.default
+
+    def test_aliases(self) -> None:
+        model = cost_model_from_results(
+            results(empty=30.0, sconst=35.0, sstore_sload=37.0), "test"
+        )
+        assert model.cost("astore_1") == model.cost("sstore")
+
+    def test_const_cost_uses_encoding(self) -> None:
+        model = bundled_cost_model()
+        assert model.const_cost(3, JCType.SHORT) == model.cost("sconst")
+        assert model.const_cost(-100, JCType.SHORT) == model.cost("bspush")
+        assert model.const_cost(1000, JCType.SHORT) == model.cost("sspush")
+        assert model.const_cost(100_000, JCType.INT) == model.cost("iipush")
+
+    def test_lookupswitch_grows_with_cases(self) -> None:
+        model = bundled_cost_model()
+        assert model.lookupswitch_cost(1) == model.cost("slookupswitch")
+        assert model.lookupswitch_cost(2) < model.lookupswitch_cost(16)
+
+    def test_saves(self) -> None:
+        model = bundled_cost_model()
+        assert model.saves("getstatic_a", "aload", ("getstatic_a", "astore"), 8)
+        assert not model.saves("getstatic_a", "aload", ("getstatic_a", "astore"), 1)
+
+    @pytest.mark.parametrize(
+        "doc",
+        [{}, results(iterations=0, empty=1.0), results(sconst=1.0), {"iterations": 1, "benchmarks": 3}],
+    )
+    def test_malformed(self, doc: dict[str, object]) -> None:
+        with pytest.raises(CostModelError):
+            cost_model_from_results(doc, "bad")
+
+
+class TestLoading:
+    def test_bundled_matches_bench_results(self) -> None:
+        bench = Path(__file__).parent.parent / "examples" / "bench" / "results.json"
+        assert load_cost_model(bench).costs == bundled_cost_model().costs
+
+    def test_select(self, tmp_path: Path) -> None:
+        (tmp_path / "card.json").write_text(json.dumps(results(empty=30.0, sconst=31.0)))
+        assert select_cost_model(None, tmp_path) is bundled_cost_model()
+        assert select_cost_model("j3r180", tmp_path) is bundled_cost_model()
+        assert select_cost_model("card.json", tmp_path).cost("sconst") == pytest.approx(1.0)
+
+    def test_missing_file(self, tmp_path: Path) -> None:
+        with pytest.raises(CostModelError, match="Cannot read"):
+            select_cost_model("nope.json", tmp_path)
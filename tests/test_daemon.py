@@ -0,0 +1,170 @@
+"""Tests for driver/daemon.py and driver/protocol.py - the session daemon."""
+
+import io
+import threading
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import Self
+
+import pytest
+
+from jcc.driver.daemon import SessionDaemon, stop_daemon
+from jcc.driver.protocol import (
+    Op,
+    ProtocolError,
+    decode_apdus,
+    decode_responses,
+    encode_apdus,
+    encode_frame,
+    encode_responses,
+    read_frame,
+)
+from jcc.driver.session import DaemonSession, daemon_is_running
+
+
+class ReaderError(Exception):
+    """Stands in for a reader library error that is not a RuntimeError."""
+
+
+class EchoSession:
+    """Replies with the APDU's data field and SW 9000, or 6D00 for INS FF."""
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+
+    def send(self, apdu_hex: str) -> tuple[bytes, int]:
+        self.sent.append(apdu_hex)
+        apdu = bytes.fromhex(apdu_hex)
+        if apdu[1] == 0xFF:
+            return b"", 0x6D00
+        if apdu[1] == 0xEE:
+            raise RuntimeError("card removed")
+        if apdu[1] == 0xDD:
+            raise ReaderError("reader unplugged")
+        return apdu[5:], 0x9000
+
+    def send_raw(self, apdu: bytes) -> tuple[bytes, int]:
+        return self.send(apdu.hex())
+
+    def send_many(self, apdus: Sequence[bytes]) -> list[tuple[bytes, int]]:
+        return [self.send_raw(apdu) for apdu in apdus]
+
+    def send_ok(self, apdu_hex: str) -> bytes:
+        data, sw = self.send(apdu_hex)
+        if sw != 0x9000:
+            raise RuntimeError(f"APDU failed: SW={sw:04X}")
+        return data
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+@pytest.fixture
+def daemon(tmp_path: Path) -> Iterator[tuple[EchoSession, str]]:
+    session = EchoSession()
+    socket_path = str(tmp_path / "d.sock")
+    server = SessionDaemon(session, socket_path)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield session, socket_path
+    stop_daemon(socket_path)
+    thread.join(timeout=5)
+
+
+class TestProtocol:
+    def test_frames_round_trip(self) -> None:
+        stream = io.BytesIO(encode_frame(Op.APDU, 7, b"\x80\x01") + encode_frame(Op.PING, 8))
+        assert read_frame(stream) == (Op.APDU, 7, b"\x80\x01")
+        assert read_frame(stream) == (Op.PING, 8, b"")
+        assert read_frame(stream) is None
+
+    def test_truncated_frame(self) -> None:
+        with pytest.raises(ProtocolError):
+            read_frame(io.BytesIO(encode_frame(Op.APDU, 1, b"\x80\x01\x00\x00")[:-1]))
+
+    def test_batch_payloads_round_trip(self) -> None:
+        apdus = [b"\x80\x01\x00\x00", b"\x80\x02\x00\x00\x01\xAA"]
+        assert decode_apdus(encode_apdus(apdus)) == apdus
+        responses = [(b"", 0x9000), (b"\x01" * 70000, 0x6A82)]
+        assert decode_responses(encode_responses(responses)) == responses
+
+    def test_malformed_batch(self) -> None:
+        with pytest.raises(ProtocolError):
+            decode_apdus(encode_apdus([b"\x80\x01\x00\x00"])[:-1])
+
+
+class TestDaemon:
+    def test_send(self, daemon: tuple[EchoSession, str]) -> None:
+        _, socket_path = daemon
+        with DaemonSession(socket_path) as session:
+            assert session.send("8001000002BEEF") == (b"\xBE\xEF", 0x9000)
+            assert session.send("80FF0000") == (b"", 0x6D00)
+            with pytest.raises(RuntimeError, match="SW=6D00"):
+                session.send_ok("80FF0000")
+
+    def test_large_response_not_truncated(self, daemon: tuple[EchoSession, str]) -> None:
+        _, socket_path = daemon
+        data = bytes(range(256)) * 200
+        apdu = bytes([0x80, 0x01, 0x00, 0x00, 0x00]) + len(data).to_bytes(2, "big") + data
+        with DaemonSession(socket_path) as session:
+            # The echo starts inside the extended Lc, two bytes before the data
+            assert session.send(apdu.hex())[0][2:] == data
+
+    def test_pipelined_replies_matched_by_id(self, daemon: tuple[EchoSession, str]) -> None:
+        echo, socket_path = daemon
+        with DaemonSession(socket_path) as session:
+            ids = [session.submit(f"8001000001{i:02X}") for i in range(5)]
+            assert session.receive(ids[3]) == (b"\x03", 0x9000)
+            assert [session.receive(i)[0] for i in ids[:3] + ids[4:]] == [
+                b"\x00", b"\x01", b"\x02", b"\x04",
+            ]
+        assert len(echo.sent) == 5
+
+    def test_batch(self, daemon: tuple[EchoSession, str]) -> None:
+        _, socket_path = daemon
+        with DaemonSession(socket_path) as session:
+            assert session.send_many([b"\x80\x01\x00\x00\x01\x2A", b"\x80\xFF\x00\x00"]) == [
+                (b"\x2A", 0x9000),
+                (b"", 0x6D00),
+            ]
+            assert session.send_many([]) == []
+
+    def test_batch_split_across_requests(self, daemon: tuple[EchoSession, str]) -> None:
+        echo, socket_path = daemon
+        apdus = [bytes([0x80, 0x01, 0x00, 0x00, 0x01, i % 256]) for i in range(300)]
+        with DaemonSession(socket_path) as session:
+            responses = session.send_many(apdus)
+        assert [data for data, _ in responses] == [apdu[5:] for apdu in apdus]
+        assert len(echo.sent) == 300
+
+    def test_session_error_keeps_connection(self, daemon: tuple[EchoSession, str]) -> None:
+        _, socket_path = daemon
+        with DaemonSession(socket_path) as session:
+            with pytest.raises(RuntimeError, match="card removed"):
+                session.send("80EE0000")
+            assert session.send("8001000001AA") == (b"\xAA", 0x9000)
+
+    def test_other_error_replied_before_closing(self, daemon: tuple[EchoSession, str]) -> None:
+        _, socket_path = daemon
+        with DaemonSession(socket_path) as session:
+            with pytest.raises(RuntimeError, match="reader unplugged"):
+                session.send("80DD0000")
+        assert daemon_is_running(socket_path)
+
+    def test_ping_and_stop(self, tmp_path: Path) -> None:
+        socket_path = str(tmp_path / "d.sock")
+        server = SessionDaemon(EchoSession(), socket_path)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        assert daemon_is_running(socket_path)
+        assert stop_daemon(socket_path)
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        assert not daemon_is_running(socket_path)
+        assert not stop_daemon(socket_path)
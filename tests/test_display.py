@@ -0,0 +1,187 @@
+"""Tests for driver/display.py - the retained-mode terminal renderer."""
+
+import random
+import re
+from dataclasses import dataclass
+
+from jcc.driver.config import ControlsConfig
+from jcc.driver.display import (
+    BLANK,
+    PLAIN,
+    Cell,
+    CellGrid,
+    DisplayConfig,
+    GameDisplay,
+    parse_cells,
+)
+from jcc.driver.screen import Framebuffer, ScreenConfig
+
+HOME = "\033[H"
+CLEAR = "\033[2J"
+
+
+@dataclass
+class FakeTerm:
+    width: int
+    height: int
+    home: str = HOME
+    clear: str = CLEAR
+
+
+class Emulator:
+    """Applies cursor moves, clears, SGR sequences and text to a cell grid."""
+
+    TOKEN = re.compile(r"\033\[(\d+);(\d+)H|\033\[2J|\033\[H|(\033\[[0-9;:]*m)|(.)", re.S)
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.cells: list[list[Cell]] = [[BLANK] * width for _ in range(height)]
+        self.x = self.y = 0
+        self.style = PLAIN
+
+    def feed(self, output: str) -> None:
+        for match in self.TOKEN.finditer(output):
+            row, col, sgr, char = match.groups()
+            text = match.group()
+            if row:
+                self.y, self.x = int(row) - 1, int(col) - 1
+            elif text == CLEAR:
+                self.cells = [[BLANK] * self.width for _ in self.cells]
+            elif text == HOME:
+                self.x = self.y = 0
+            elif sgr:
+                (self.style, _), = parse_cells(sgr + " ", self.style)
+            elif char == "\n":
+                self.x, self.y = 0, self.y + 1
+            else:
+                if self.x < self.width:
+                    self.cells[self.y][self.x] = (self.style, char)
+                self.x += 1
+
+
+def display(controls: ControlsConfig | None = None, gradient: bool = False) -> GameDisplay:
+    config = DisplayConfig(
+        game_name="Test",
+        controls=controls or ControlsConfig(),
+        gradient_border=gradient,
+    )
+    return GameDisplay(config, ScreenConfig(16, 9, "2bpp"))
+
+
+def frame(seed: int) -> Framebuffer:
+    config = ScreenConfig(16, 9, "2bpp")
+    return Framebuffer(config, random.Random(seed).randbytes(config.framebuffer_size))
+
+
+def full_paint(
+    term: FakeTerm,
+    fb: Framebuffer,
+    frame_count: int = 0,
+    keys_held: set[str] | None = None,
+    controls: ControlsConfig | None = None,
+    gradient: bool = False,
+) -> list[list[Cell]]:
+    """Cells a fresh display paints for one frame."""
+    emulator = Emulator(term.width, term.height)
+    shown = display(controls, gradient)
+    emulator.feed(shown.render(term, fb, frame_count, "SIM", 30.0, 12.0, keys_held))
+    return emulator.cells
+
+
+class TestParseCells:
+    def test_styles(self) -> None:
+        cells = parse_cells("a\033[1mb\033[38;2;1;2;3;48;2;4;5;6mc\033[0md")
+        assert cells == [
+            (PLAIN, "a"),
+            (("1", None, None), "b"),
+            (("1", (1, 2, 3), (4, 5, 6)), "c"),
+            (PLAIN, "d"),
+        ]
+
+
+class TestCellGrid:
+    def test_unchanged_cells_not_written(self) -> None:
+        grid = CellGrid(10, 2)
+        out: list[str] = []
+        grid.update(out, 2, 1, parse_cells("ab"))
+        assert "".join(out) == "\033[2;3Hab"
+        out.clear()
+        grid.update(out, 2, 1, parse_cells("ab"))
+        assert out == []
+
+    def test_sgr_deduplicated(self) -> None:
+        grid = CellGrid(10, 1)
+        out: list[str] = []
+        grid.update(out, 0, 0, parse_cells("\033[38;2;1;1;1mab\033[38;2;2;2;2mc"))
+        assert "".join(out) == "\033[1;1H\033[38;2;1;1;1mab\033[38;2;2;2;2mc"
+
+    def test_short_gaps_rewritten(self) -> None:
+        grid = CellGrid(10, 1)
+        out: list[str] = []
+        grid.update(out, 0, 0, parse_cells("abcdefgh"))
+        out.clear()
+        grid.cursor = None
+        grid.update(out, 0, 0, parse_cells("XbYdefgZ"))
+        assert "".join(out) == "\033[1;1HXbY\033[1;8HZ"
+
+    def test_clipped_to_terminal(self) -> None:
+        grid = CellGrid(3, 1)
+        out: list[str] = []
+        grid.update(out, 1, 0, parse_cells("abcd"))
+        grid.update(out, 0, 5, parse_cells("x"))
+        assert "".join(out) == "\033[1;2Hab"
+
+
+class TestGameDisplay:
+    ARGS = (0, "SIM", 30.0, 12.0)
+
+    def test_updates_match_full_paint(self) -> None:
+        term = FakeTerm(80, 24)
+        shown = display(gradient=True)
+        emulator = Emulator(term.width, term.height)
+        for seed in range(4):
+            emulator.feed(shown.render(term, frame(seed), seed, "SIM", 30.0, 12.0))
+        assert emulator.cells == full_paint(term, frame(3), 3, gradient=True)
+
+    def test_unchanged_frame_writes_nothing(self) -> None:
+        term = FakeTerm(80, 24)
+        shown = display()
+        first = shown.render(term, frame(1), *self.ARGS)
+        assert first.startswith(HOME + CLEAR)
+        assert shown.render(term, frame(1), *self.ARGS) == ""
+
+    def test_only_changed_pixels_written(self) -> None:
+        term = FakeTerm(80, 24)
+        shown = display()
+        fb = frame(1)
+        data = bytearray(fb.data)
+        first = shown.render(term, fb, *self.ARGS)
+        data[0] ^= 0xC0  # top-left pixel
+        update = shown.render(term, Framebuffer(fb.config, bytes(data)), *self.ARGS)
+        assert update.count("▀") == 1
+        assert len(update) < len(first) // 20
+
+    def test_controls_redrawn_when_keys_change(self) -> None:
+        term = FakeTerm(80, 24)
+        controls = ControlsConfig(wasd=True)
+        shown = display(controls)
+        emulator = Emulator(term.width, term.height)
+        emulator.feed(shown.render(term, frame(1), *self.ARGS, {"up"}))
+        emulator.feed(shown.render(term, frame(1), *self.ARGS, {"left"}))
+        assert emulator.cells == full_paint(term, frame(1), keys_held={"left"}, controls=controls)
+        assert shown.render(term, frame(1), *self.ARGS, {"left"}) == ""
+
+    def test_resize_repaints(self) -> None:
+        shown = display()
+        shown.render(FakeTerm(80, 24), frame(1), *self.ARGS)
+        term = FakeTerm(100, 30)
+        emulator = Emulator(term.width, term.height)
+        emulator.feed(shown.render(term, frame(2), *self.ARGS))
+        assert emulator.cells == full_paint(term, frame(2))
+
+    def test_invalidate_repaints(self) -> None:
+        term = FakeTerm(80, 24)
+        shown = display()
+        shown.render(term, frame(1), *self.ARGS)
+        shown.invalidate()
+        assert shown.render(term, frame(1), *self.ARGS).startswith(HOME + CLEAR)
@@ -1,5 +1,6 @@
 """Tests for analysis/escape.py - escape analysis."""
 
+from jcc.analysis.cost import bundled_cost_model
 from jcc.analysis.escape import (
     EscapeInfo,
     analyze_escapes,
@@ -474,3 +475,60 @@ class TestParameterEscape:
 
         # %param is used in a different block
         assert SSAName("%param") in result.escapes
+
+
+# === Cost Model Tests ===
+
+
+def _reused_add(uses: int, p_in_exit: bool) -> Function:
+    """%m = add %p, 1 used `uses` times; %p optionally also used in exit."""
+    p = SSARef(name=SSAName("%p"))
+    one = Const(value=1, ty=JCType.SHORT)
+    m = SSARef(name=SSAName("%m"))
+    exit_instrs: list[Instruction] = []
+    if p_in_exit:
+        exit_instrs.append(
+            BinaryInst(result=SSAName("%z"), op="add", left=p, right=one, ty=JCType.SHORT)
+        )
+    return make_function(
+        "test",
+        [
+            make_block(
+                "entry",
+                [
+                    BinaryInst(result=SSAName("%m"), op="add", left=p, right=one, ty=JCType.SHORT),
+                    *(
+                        BinaryInst(
+                            result=SSAName(f"%u{i}"), op="xor", left=m, right=one, ty=JCType.SHORT
+                        )
+                        for i in range(uses)
+                    ),
+                ],
+                BranchInst(cond=None, true_label=BlockLabel("exit"), false_label=None),
+            ),
+            make_block("exit", exit_instrs),
+        ],
+        params=[Parameter(name=SSAName("%p"), ty=JCType.SHORT)],
+    )
+
+
+class TestCostModelRematerialization:
+    def test_cheap_op_with_two_uses_stays_on_stack(self) -> None:
+        func = _reused_add(uses=2, p_in_exit=True)
+
+        assert SSAName("%m") in analyze_escapes(func, make_empty_phi_info()).escapes
+        result = analyze_escapes(func, make_empty_phi_info(), costs=bundled_cost_model())
+        assert SSAName("%p") in result.escapes
+        assert SSAName("%m") not in result.escapes
+
+    def test_many_uses_escape(self) -> None:
+        func = _reused_add(uses=3, p_in_exit=True)
+        result = analyze_escapes(func, make_empty_phi_info(), costs=bundled_cost_model())
+        assert result.escape_reasons[SSAName("%m")] == "multi-use"
+
+    def test_operand_without_slot_escapes(self) -> None:
+        # %p is used only by %m, so it has no slot to re-read
+        func = _reused_add(uses=2, p_in_exit=False)
+        result = analyze_escapes(func, make_empty_phi_info(), costs=bundled_cost_model())
+        assert SSAName("%p") not in result.escapes
+        assert SSAName("%m") in result.escapes
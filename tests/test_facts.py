@@ -0,0 +1,151 @@
+"""Tests for ir/facts.py - memoized per-function IR facts."""
+
+from jcc.analysis.function import analyze_function
+from jcc.ir.facts import FunctionFacts
+from jcc.ir.instructions import BinaryInst, BranchInst, Instruction, ReturnInst
+from jcc.ir.module import Block, Function, Parameter
+from jcc.ir.types import BlockLabel, JCType, SSAName
+from jcc.ir.values import Const, SSARef
+
+# === Test Helpers ===
+
+
+def make_block(
+    label: str,
+    instructions: list[Instruction],
+    terminator: BranchInst | ReturnInst | None = None,
+) -> Block:
+    """Create a block for testing."""
+    if terminator is None:
+        terminator = ReturnInst(value=None, ty=JCType.VOID)
+    return Block(
+        label=BlockLabel(label),
+        instructions=tuple(instructions),
+        terminator=terminator,
+    )
+
+
+def jump(target: str) -> BranchInst:
+    return BranchInst(cond=None, true_label=BlockLabel(target), false_label=None)
+
+
+def branch(true: str, false: str) -> BranchInst:
+    return BranchInst(
+        cond=SSARef(name=SSAName("%c")),
+        true_label=BlockLabel(true),
+        false_label=BlockLabel(false),
+    )
+
+
+def make_cfg() -> Function:
+    """entry -> (a | b) -> merge -> loop (self loop) -> exit; dead -> exit."""
+    add = BinaryInst(
+        result=SSAName("%x"),
+        op="add",
+        left=SSARef(name=SSAName("%c")),
+        right=Const(value=1, ty=JCType.BYTE),
+        ty=JCType.BYTE,
+    )
+    return Function(
+        name="cfg",
+        params=(Parameter(name=SSAName("%c"), ty=JCType.BYTE),),
+        return_type=JCType.VOID,
+        blocks=(
+            make_block("entry", [add], branch("a", "b")),
+            make_block("a", [], jump("merge")),
+            make_block("b", [], jump("merge")),
+            make_block("merge", [], jump("loop")),
+            make_block("loop", [], branch("loop", "exit")),
+            make_block("dead", [], jump("exit")),
+            make_block("exit", []),
+        ),
+    )
+
+
+def labels(*names: str) -> list[BlockLabel]:
+    return [BlockLabel(n) for n in names]
+
+
+class TestFunctionFacts:
+    def test_def_and_use_maps(self) -> None:
+        facts = FunctionFacts(make_cfg())
+        assert isinstance(facts.def_map[SSAName("%x")], BinaryInst)
+        assert len(facts.use_map[SSAName("%c")]) == 3  # add + two branches
+
+    def test_memoized(self) -> None:
+        facts = FunctionFacts(make_cfg())
+        assert facts.def_map is facts.def_map
+        assert facts.idom is facts.idom
+
+    def test_cfg_edges(self) -> None:
+        facts = FunctionFacts(make_cfg())
+        assert facts.successors[BlockLabel("loop")] == labels("loop", "exit")
+        assert facts.predecessors[BlockLabel("merge")] == labels("a", "b")
+        assert facts.predecessors[BlockLabel("exit")] == labels("loop", "dead")
+        assert facts.predecessors[BlockLabel("entry")] == []
+
+    def test_rpo_excludes_unreachable(self) -> None:
+        rpo = list(FunctionFacts(make_cfg()).rpo)
+        assert rpo[0] == BlockLabel("entry")
+        assert BlockLabel("dead") not in rpo
+        assert rpo.index(BlockLabel("merge")) > rpo.index(BlockLabel("a"))
+        assert rpo.index(BlockLabel("merge")) > rpo.index(BlockLabel("b"))
+        assert rpo[-2:] == labels("loop", "exit")
+
+    def test_dominators(self) -> None:
+        facts = FunctionFacts(make_cfg())
+        assert dict(facts.idom) == dict(
+            zip(
+                labels("a", "b", "merge", "loop", "exit"),
+                labels("entry", "entry", "entry", "merge", "loop"),
+            )
+        )
+        assert facts.dominates(BlockLabel("entry"), BlockLabel("exit"))
+        assert facts.dominates(BlockLabel("loop"), BlockLabel("loop"))
+        assert not facts.dominates(BlockLabel("a"), BlockLabel("merge"))
+        assert not facts.dominates(BlockLabel("dead"), BlockLabel("exit"))
+        assert not facts.dominates(BlockLabel("entry"), BlockLabel("dead"))
+
+    def test_loop_depth(self) -> None:
+        depth = FunctionFacts(make_cfg()).loop_depth
+        assert depth[BlockLabel("loop")] == 1
+        assert depth[BlockLabel("merge")] == 0
+        assert depth[BlockLabel("exit")] == 0
+        assert BlockLabel("dead") not in depth
+
+    def test_nested_loop_depth(self) -> None:
+        func = Function(
+            name="nested",
+            params=(Parameter(name=SSAName("%c"), ty=JCType.BYTE),),
+            return_type=JCType.VOID,
+            blocks=(
+                make_block("entry", [], jump("outer")),
+                make_block("outer", [], jump("inner")),
+                make_block("inner", [], branch("inner", "latch")),
+                make_block("latch", [], branch("outer", "exit")),
+                make_block("exit", []),
+            ),
+        )
+        facts = FunctionFacts(func)
+        depth = facts.loop_depth
+        assert [depth[label] for label in labels("entry", "outer", "inner", "latch", "exit")] == [
+            0, 1, 2, 1, 0,
+        ]
+        assert dict(facts.loops) == {
+            BlockLabel("outer"): frozenset(labels("outer", "inner", "latch")),
+            BlockLabel("inner"): frozenset(labels("inner")),
+        }
+
+
+class TestSharedWithAnalysis:
+    def test_analyze_function_returns_facts(self) -> None:
+        func = make_cfg()
+        facts = FunctionFacts(func)
+        result = analyze_function(func, facts=facts)
+        assert result.facts is facts
+
+    def test_analyze_function_builds_facts(self) -> None:
+        func = make_cfg()
+        result = analyze_function(func)
+        assert result.facts is not None
+        assert result.facts.func is func
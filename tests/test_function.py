@@ -1,7 +1,12 @@
 """Tests for analysis/function.py - per-function analysis orchestration."""
 
 from jcc.analysis.callgraph import build_call_graph
-from jcc.analysis.function import analyze_all_functions, analyze_function
+from jcc.analysis.function import (
+    ANALYSIS_PHASE,
+    _call_graph_levels,
+    analyze_all_functions,
+    analyze_function,
+)
 from jcc.analysis.locals import Limits
 from jcc.ir.instructions import (
     BinaryInst,
@@ -15,6 +20,7 @@ from jcc.ir.instructions import (
 from jcc.ir.module import Block, Function, Module, Parameter
 from jcc.ir.types import BlockLabel, JCType, SSAName
 from jcc.ir.values import Const, SSARef
+from jcc.timings import BuildTimings
 
 
 # === Test Helpers ===
@@ -423,3 +429,86 @@ class TestAnalyzeAllFunctions:
 
         # Caller's %x should stay INT (callee's param is wide)
         assert results["caller"].locals.get_register_type(SSAName("%x")) == JCType.INT
+
+
+def make_caller(name: str, callees: list[str]) -> Function:
+    """Function whose escaping i32 %x is passed to each callee."""
+    x = SSAName("%x")
+    calls: list[Instruction] = [
+        CallInst(result=None, func_name=c, args=(SSARef(name=x),), ty=JCType.VOID)
+        for c in callees
+    ]
+    return make_function(
+        name,
+        [
+            make_block(
+                "entry",
+                [
+                    BinaryInst(
+                        result=x,
+                        op="add",
+                        left=SSARef(name=SSAName("%p")),
+                        right=Const(value=2, ty=JCType.SHORT),
+                        ty=JCType.INT,
+                    ),
+                    *calls,
+                ],
+                BranchInst(cond=None, true_label=BlockLabel("next"), false_label=None),
+            ),
+            make_block(
+                "next",
+                [
+                    ICmpInst(
+                        result=SSAName("%cmp"),
+                        pred="eq",
+                        left=SSARef(name=x),
+                        right=Const(value=0, ty=JCType.SHORT),
+                        ty=JCType.INT,
+                    ),
+                ],
+            ),
+        ],
+        params=[Parameter(name=SSAName("%p"), ty=JCType.INT)],
+    )
+
+
+class TestParallelAnalysis:
+    def make_module(self) -> Module:
+        """top -> (mid -> leaf_a), leaf_b; side -> leaf_b."""
+        return make_module([
+            make_caller("top", ["mid", "leaf_b"]),
+            make_caller("side", ["leaf_b"]),
+            make_caller("mid", ["leaf_a"]),
+            make_caller("leaf_a", []),
+            make_caller("leaf_b", []),
+        ])
+
+    def test_levels(self) -> None:
+        graph = build_call_graph(self.make_module())
+        levels = _call_graph_levels(graph)
+        assert [sorted(level) for level in levels] == [
+            ["leaf_a", "leaf_b"],
+            ["mid", "side"],
+            ["top"],
+        ]
+
+    def test_parallel_matches_serial(self) -> None:
+        module = self.make_module()
+        graph = build_call_graph(module)
+
+        serial = analyze_all_functions(module, graph)
+        parallel = analyze_all_functions(module, graph, jobs=2)
+
+        assert list(parallel) == list(graph.topological_order)
+        assert parallel == serial
+
+    def test_records_function_timings(self) -> None:
+        module = self.make_module()
+        graph = build_call_graph(module)
+
+        for jobs in (1, 2):
+            timings = BuildTimings()
+            analyze_all_functions(module, graph, jobs=jobs, timings=timings)
+            recorded = timings.functions[ANALYSIS_PHASE]
+            assert sorted(f.name for f in recorded) == sorted(module.functions)
+            assert all(f.wall >= 0 and f.cpu >= 0 for f in recorded)
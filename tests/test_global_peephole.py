@@ -0,0 +1,158 @@
+"""Tests for codegen/global_peephole.py - cross-label peephole over slot dataflow."""
+
+from jcc.codegen import ops
+from jcc.codegen.global_peephole import analyze_slots, global_peephole_optimize
+from jcc.codegen.ops import Instruction
+from jcc.codegen.stack import compute_max_stack
+from jcc.ir.types import BlockLabel
+
+
+def label(name: str) -> Instruction:
+    return ops.label(BlockLabel(name))
+
+
+def goto(name: str) -> Instruction:
+    return ops.goto_w(BlockLabel(name))
+
+
+def ifeq(name: str) -> Instruction:
+    return Instruction("ifeq", (BlockLabel(name),), 1, 0)
+
+
+def listing(instrs: list[Instruction]) -> list[tuple[str, tuple[object, ...]]]:
+    return [(i.mnemonic, i.operands) for i in instrs]
+
+
+class TestAnalyzeSlots:
+    def test_liveness_crosses_labels(self) -> None:
+        instrs = [
+            ops.sconst(1), ops.sstore(4),   # 0, 1
+            ops.sload(0), ifeq("skip"),     # 2, 3
+            ops.sconst(2), ops.sstore(5),   # 4, 5
+            label("skip"),                  # 6
+            ops.sload(4), ops.sreturn(),    # 7, 8
+        ]
+        facts = analyze_slots(instrs)
+        assert 4 in facts.live_after[1]
+        assert 5 not in facts.live_after[5]
+        assert facts.live_after[7] == frozenset()
+
+    def test_int_slots_are_two_wide(self) -> None:
+        instrs = [ops.iconst(1), ops.istore(4), ops.sload(5), ops.sreturn()]
+        assert analyze_slots(instrs).live_after[1] == frozenset({5})
+
+    def test_copies_meet_at_merge(self) -> None:
+        instrs = [
+            ops.sload(0), ifeq("else"),
+            ops.sconst(3), ops.sstore(4), ops.sconst(1), ops.sstore(5), goto("end"),
+            label("else"),
+            ops.sconst(3), ops.sstore(4), ops.sconst(2), ops.sstore(5),
+            label("end"),
+            ops.sload(4), ops.sload(5), ops.sadd(), ops.sreturn(),
+        ]
+        copies = analyze_slots(instrs).copies_before[13]
+        assert copies.keys() == {4}
+
+
+class TestGlobalPeephole:
+    def test_redundant_store_across_blocks(self) -> None:
+        instrs = [
+            ops.sconst(0), ops.sstore(4),
+            label("loop"),
+            ops.sload(4), ifeq("done"),
+            ops.sconst(0), ops.sstore(4),   # slot 4 already holds 0
+            goto("loop"),
+            label("done"),
+            ops.sload(4), ops.sreturn(),
+        ]
+        result, hits = global_peephole_optimize(instrs)
+        # Then every load of slot 4 is the constant, and the slot goes
+        assert hits == {"redundant_store": 1, "known_load": 2, "dead_store": 1}
+        assert listing(result) == [
+            ("label", ("loop",)),
+            ("sconst_0", ()), ("ifeq", ("done",)),
+            ("goto_w", ("loop",)),
+            ("label", ("done",)),
+            ("sconst_0", ()), ("sreturn", ()),
+        ]
+
+    def test_dead_store_before_branch(self) -> None:
+        instrs = [
+            ops.sload(0), ops.sstore(4),    # overwritten on every path before read
+            ops.sload(1), ifeq("b"),
+            ops.sconst(1), ops.sstore(4), goto("end"),
+            label("b"),
+            ops.sconst(2), ops.sstore(4),
+            label("end"),
+            ops.sload(4), ops.sreturn(),
+        ]
+        result, hits = global_peephole_optimize(instrs)
+        assert hits["dead_store"] == 1
+        assert listing(result)[:2] == [("sload_1", ()), ("ifeq", ("b",))]
+
+    def test_merge_keeps_value_on_stack(self) -> None:
+        instrs = [
+            ops.sload(0), ifeq("b"),
+            ops.sconst(1), ops.sstore(4), goto("end"),
+            label("b"),
+            ops.sconst(2), ops.sstore(4),
+            label("end"),
+            ops.sload(4), ops.sreturn(),
+        ]
+        result, hits = global_peephole_optimize(instrs)
+        assert hits == {"merge_load": 1}
+        assert listing(result) == [
+            ("sload_0", ()), ("ifeq", ("b",)),
+            ("sconst_1", ()), ("goto_w", ("end",)),
+            ("label", ("b",)),
+            ("sconst_2", ()),
+            ("label", ("end",)),
+            ("sreturn", ()),
+        ]
+        # Both paths arrive with the value on the stack
+        assert compute_max_stack(result) == compute_max_stack(instrs)
+
+    def test_merge_needs_store_on_every_path(self) -> None:
+        instrs = [
+            ops.sconst(1), ops.sstore(4),
+            ops.sload(0), ifeq("end"),
+            ops.sconst(2), ops.sstore(4),
+            label("end"),
+            ops.sload(4), ops.sreturn(),
+        ]
+        result, hits = global_peephole_optimize(instrs)
+        assert "merge_load" not in hits
+        assert ("sload", (4,)) in listing(result)
+
+    def test_known_constant_load_shortened(self) -> None:
+        instrs = [
+            ops.sconst(2), ops.sstore(4),
+            label("loop"),
+            ops.sload(4), ops.sload(5), ops.sadd(), ops.sstore(5),
+            ops.sload(5), ifeq("loop"),
+            ops.sload(4), ops.sreturn(),
+        ]
+        result, hits = global_peephole_optimize(instrs)
+        assert hits["known_load"] == 2
+        # The store to slot 4 then has no readers left
+        assert hits["dead_store"] == 1
+        assert ("sload", (4,)) not in listing(result)
+        assert listing(result)[1:3] == [("sconst_2", ()), ("sload", (5,))]
+
+    def test_loop_carried_slot_kept(self) -> None:
+        instrs = [
+            ops.sconst(0), ops.sstore(4),
+            label("loop"),
+            ops.sinc(4, 1),
+            ops.sload(4), ops.sconst(10), Instruction("if_scmplt", (BlockLabel("loop"),), 2, 0),
+            ops.sload(4), ops.sreturn(),
+        ]
+        result, hits = global_peephole_optimize(instrs)
+        assert hits == {}
+        assert result == instrs
+
+    def test_dead_increment_removed(self) -> None:
+        instrs = [ops.sload(0), ops.sstore(4), ops.sinc(4, 1), ops.sload(0), ops.sreturn()]
+        result, hits = global_peephole_optimize(instrs)
+        assert hits == {"dead_inc": 1, "dead_store": 1}
+        assert listing(result) == [("sload_0", ()), ("sreturn", ())]
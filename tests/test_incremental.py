@@ -0,0 +1,119 @@
+"""Tests for incremental.py - content-addressed build cache."""
+
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from jcc.codegen import ops
+from jcc.codegen.emit import FunctionCode
+from jcc.incremental import BuildCache, fingerprint
+from jcc.ir.types import JCType
+
+
+@dataclass(frozen=True)
+class _Sample:
+    names: frozenset[str]
+    types: dict[str, JCType]
+    derived: int = field(default=0, repr=False)
+
+
+def _code(n: int) -> FunctionCode:
+    return FunctionCode(
+        instructions=(ops.sconst(n), ops.sreturn()),
+        max_stack=1,
+        max_locals=0,
+    )
+
+
+class TestFingerprint:
+    def test_equal_objects(self) -> None:
+        a = _Sample(frozenset({"x", "y"}), {"x": JCType.SHORT})
+        b = _Sample(frozenset({"y", "x"}), {"x": JCType.SHORT})
+        assert fingerprint(a) == fingerprint(b)
+
+    def test_different_objects(self) -> None:
+        a = _Sample(frozenset({"x"}), {"x": JCType.SHORT})
+        b = _Sample(frozenset({"x"}), {"x": JCType.INT})
+        assert fingerprint(a) != fingerprint(b)
+
+    def test_repr_false_fields_ignored(self) -> None:
+        a = _Sample(frozenset(), {}, derived=1)
+        b = _Sample(frozenset(), {}, derived=2)
+        assert fingerprint(a) == fingerprint(b)
+
+    def test_independent_of_hash_seed(self) -> None:
+        """Set ordering differs between processes; the digest must not."""
+        script = (
+            "from jcc.incremental import fingerprint;"
+            "print(fingerprint(frozenset(f'v{i}' for i in range(50))))"
+        )
+        digests = {
+            subprocess.run(
+                [sys.executable, "-c", script],
+                capture_output=True, text=True, check=True,
+                env={"PYTHONHASHSEED": str(seed), "PYTHONPATH": ":".join(sys.path)},
+            ).stdout
+            for seed in (1, 2, 3)
+        }
+        assert len(digests) == 1
+
+
+class TestFunctionCache:
+    def test_round_trip(self, tmp_path: Path) -> None:
+        cache = BuildCache(tmp_path)
+        assert cache.load_function("k") is None
+        cache.store_function("k", _code(1))
+        assert BuildCache(tmp_path).load_function("k") == _code(1)
+
+    def test_prune_unused(self, tmp_path: Path) -> None:
+        first = BuildCache(tmp_path)
+        first.store_function("a", _code(1))
+        first.store_function("b", _code(2))
+
+        second = BuildCache(tmp_path)
+        assert second.load_function("a") == _code(1)
+        second.prune_functions()
+
+        third = BuildCache(tmp_path)
+        assert third.load_function("a") == _code(1)
+        assert third.load_function("b") is None
+
+
+class TestBuildCache:
+    def test_restore(self, tmp_path: Path) -> None:
+        out = tmp_path / "build"
+        out.mkdir()
+        (out / "app.cap").write_bytes(b"CAP")
+        (out / "app.jca").write_text("JCA")
+        cache = BuildCache(out)
+        key = cache.build_key("ll", b"toml", "3.0.4", Path("/exports"))
+        cache.store_build(key, out / "app.cap")
+
+        (out / "app.cap").unlink()
+        (out / "app.jca").unlink()
+        restored = cache.restore_build(key, out)
+        assert restored is not None
+        assert restored == out / "app.cap"
+        assert restored.read_bytes() == b"CAP"
+        assert (out / "app.jca").read_text() == "JCA"
+
+    def test_key_depends_on_inputs(self, tmp_path: Path) -> None:
+        cache = BuildCache(tmp_path)
+        base = cache.build_key("ll", b"toml", "3.0.4", Path("/exports"))
+        assert cache.build_key("ll2", b"toml", "3.0.4", Path("/exports")) != base
+        assert cache.build_key("ll", b"toml2", "3.0.4", Path("/exports")) != base
+        assert cache.build_key("ll", b"toml", "3.2.0", Path("/exports")) != base
+        exports = Path("/exports")
+        counts = cache.build_key("ll", b"toml", "3.0.4", exports, block_counts=b"{}")
+        assert counts != base
+        assert cache.build_key("ll", b"toml", "3.0.4", exports, block_counts=b"[]") != counts
+
+    def test_miss_and_eviction(self, tmp_path: Path) -> None:
+        (tmp_path / "app.cap").write_bytes(b"CAP")
+        cache = BuildCache(tmp_path)
+        assert cache.restore_build("old", tmp_path) is None
+        cache.store_build("old", tmp_path / "app.cap")
+        cache.store_build("new", tmp_path / "app.cap")
+        assert cache.restore_build("old", tmp_path) is None
+        assert cache.restore_build("new", tmp_path) is not None
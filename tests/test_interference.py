@@ -305,6 +305,77 @@ class TestDifferentBlockPhis:
         assert not graph.interferes(SSAName("%a"), SSAName("%b"))
 
 
+class TestLoops:
+    def test_value_live_across_loop_interferes_with_loop_values(self) -> None:
+        """A value used after a loop stays live around the back edge."""
+        func = make_function(
+            "test",
+            [
+                make_block(
+                    "entry",
+                    [
+                        BinaryInst(
+                            result=SSAName("%base"),
+                            op="add",
+                            left=SSARef(name=SSAName("%n")),
+                            right=Const(value=1, ty=JCType.SHORT),
+                            ty=JCType.SHORT,
+                        ),
+                    ],
+                    BranchInst(cond=None, true_label=BlockLabel("loop"), false_label=None),
+                ),
+                make_block(
+                    "loop",
+                    [
+                        PhiInst(
+                            result=SSAName("%i"),
+                            incoming=(
+                                (Const(value=0, ty=JCType.SHORT), BlockLabel("entry")),
+                                (SSARef(name=SSAName("%next")), BlockLabel("body")),
+                            ),
+                            ty=JCType.SHORT,
+                        ),
+                    ],
+                    BranchInst(
+                        cond=SSARef(name=SSAName("%n")),
+                        true_label=BlockLabel("body"),
+                        false_label=BlockLabel("exit"),
+                    ),
+                ),
+                make_block(
+                    "body",
+                    [
+                        BinaryInst(
+                            result=SSAName("%next"),
+                            op="add",
+                            left=SSARef(name=SSAName("%i")),
+                            right=Const(value=1, ty=JCType.SHORT),
+                            ty=JCType.SHORT,
+                        ),
+                    ],
+                    BranchInst(cond=None, true_label=BlockLabel("loop"), false_label=None),
+                ),
+                make_block(
+                    "exit",
+                    [],
+                    ReturnInst(value=SSARef(name=SSAName("%base")), ty=JCType.SHORT),
+                ),
+            ],
+            params=[Parameter(name=SSAName("%n"), ty=JCType.SHORT)],
+            return_type=JCType.SHORT,
+        )
+
+        phi_info = analyze_phis(func)
+        escapes = analyze_escapes(func, phi_info)
+        graph = build_interference_graph(func, escapes, make_empty_narrowing())
+
+        assert SSAName("%base") in graph.nodes
+        assert SSAName("%i") in graph.nodes
+        # %base is only used in exit, but must survive every loop iteration
+        assert graph.interferes(SSAName("%base"), SSAName("%i"))
+        assert graph.validate() == []
+
+
 # === Node Type Tests ===
 
 
@@ -490,3 +561,22 @@ class TestInterferenceGraphMethods:
 
         assert graph.interferes(SSAName("%a"), SSAName("%b"))
         assert graph.interferes(SSAName("%b"), SSAName("%a"))
+
+    def test_adjacency_includes_isolated_nodes(self) -> None:
+        """adjacency has an entry for every node, even without edges."""
+        graph = InterferenceGraph(
+            nodes=frozenset({SSAName("%a"), SSAName("%b"), SSAName("%c")}),
+            edges=frozenset({(SSAName("%a"), SSAName("%b"))}),
+            node_types={
+                SSAName("%a"): JCType.SHORT,
+                SSAName("%b"): JCType.SHORT,
+                SSAName("%c"): JCType.SHORT,
+            },
+        )
+
+        assert graph.adjacency == {
+            SSAName("%a"): frozenset({SSAName("%b")}),
+            SSAName("%b"): frozenset({SSAName("%a")}),
+            SSAName("%c"): frozenset(),
+        }
+        assert not graph.interferes(SSAName("%a"), SSAName("%c"))
@@ -0,0 +1,118 @@
+"""Tests for ir/source.py - single-pass index of LLVM IR text."""
+
+from jcc.ir.debug import extract_alloca_debug_types, extract_global_debug_types
+from jcc.ir.llvm import LLVMModule
+from jcc.ir.range_metadata import ValueRange, extract_range_metadata
+from jcc.ir.source import IRSource
+from jcc.ir.types import GlobalName, JCType, SSAName
+
+_IR = """\
+@counter = global i16 0, align 2, !dbg !0
+@plain = global i8 0, align 1
+
+define i16 @get(i16 %x) {
+entry:
+  %v = load i16, ptr @counter, align 2
+  %w = add i32 0, 1, !jcc.range !7
+  ret i16 %v
+}
+
+define void @"quoted.name"() {
+  %1 = alloca i16, align 2
+    #dbg_declare(ptr %1, !4, !DIExpression(), !6)
+  ret void
+}
+
+!0 = !DIGlobalVariableExpression(var: !1, expr: !DIExpression())
+!1 = distinct !DIGlobalVariable(name: "counter", type: !2)
+!2 = !DIBasicType(name: "short", size: 16, encoding: DW_ATE_signed)
+!4 = !DILocalVariable(name: "tmp", type: !2)
+!6 = !{}
+!7 = !{i32 0, i32 1}
+"""
+
+
+class TestIRSource:
+    def test_metadata_indexed(self) -> None:
+        source = IRSource(_IR)
+        assert source.metadata["!7"] == "!{i32 0, i32 1}"
+        assert source.metadata["!2"].startswith("!DIBasicType")
+
+    def test_global_dbg_refs(self) -> None:
+        source = IRSource(_IR)
+        assert dict(source.global_dbg_refs) == {GlobalName("@counter"): "!0"}
+
+    def test_function_spans(self) -> None:
+        source = IRSource(_IR)
+        names = [name for name, _ in source.functions()]
+        assert names == ["get", "quoted.name"]
+
+        text = source.function_text("get")
+        assert text is not None
+        assert text.startswith("define i16 @get(")
+        assert text.endswith("}")
+        assert "alloca" not in text
+
+    def test_unknown_function(self) -> None:
+        assert IRSource(_IR).function_text("missing") is None
+
+    def test_function_attributes(self) -> None:
+        source = IRSource(
+            "define hidden void @f(ptr dereferenceable(4) %p) local_unnamed_addr #1 !dbg !3 {\n"
+            "  ret void\n"
+            "}\n"
+            "define void @g() alwaysinline {\n"
+            "  ret void\n"
+            "}\n"
+            'attributes #1 = { noinline nounwind memory(read) "target-cpu"="generic" }\n'
+        )
+        assert source.attribute_groups["#1"] == frozenset({"noinline", "nounwind"})
+        assert source.function_attributes("f") == frozenset(
+            {"local_unnamed_addr", "noinline", "nounwind"}
+        )
+        assert source.function_attributes("g") == frozenset({"alwaysinline"})
+        assert source.function_attributes("missing") == frozenset()
+
+    def test_of_reuses_instance(self) -> None:
+        source = IRSource(_IR)
+        assert IRSource.of(source) is source
+        assert IRSource.of(_IR).metadata == source.metadata
+
+
+class TestConsumersAcceptSource:
+    def test_same_results_from_text_and_source(self) -> None:
+        source = IRSource(_IR)
+        assert extract_global_debug_types(source) == extract_global_debug_types(_IR)
+        assert extract_alloca_debug_types(source) == extract_alloca_debug_types(_IR)
+        assert extract_range_metadata(source) == extract_range_metadata(_IR)
+
+    def test_extracted_values(self) -> None:
+        source = IRSource(_IR)
+        globals_ = extract_global_debug_types(source)
+        assert globals_[GlobalName("@counter")].jc_type == JCType.SHORT  # type: ignore[union-attr]
+        assert SSAName("%1") in extract_alloca_debug_types(source)
+        assert extract_range_metadata(source) == {
+            "get": {SSAName("%w"): ValueRange(signed_min=0, signed_max=1)},
+        }
+
+
+class TestModuleSource:
+    def test_source_is_shared(self) -> None:
+        module = LLVMModule.parse_string("define void @f() {\n  ret void\n}\n")
+        assert module.source is module.source
+        assert module.source.function_text("f") is not None
+
+    def test_block_labels_without_preds_comments(self) -> None:
+        """Hand-written IR without preds comments falls back to printed IR."""
+        ir = """\
+define i16 @f(i16 %x) {
+  %c = icmp eq i16 %x, 0
+  br i1 %c, label %1, label %2
+1:
+  ret i16 1
+2:
+  ret i16 0
+}
+"""
+        (func,) = LLVMModule.parse_string(ir).functions
+        assert [b.name for b in func.blocks] == ["0", "1", "2"]
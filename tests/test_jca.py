@@ -9,7 +9,7 @@ from jcc.codegen import ops
 from jcc.codegen.emit import FunctionCode
 from jcc.ir.types import BlockLabel
 from jcc.output.constant_pool import CPEntry, CPEntryKind
-from jcc.output.jca import emit_jca
+from jcc.output.jca import emit_jca, finalize_instructions
 from jcc.output.structure import Class, Field, Method, Package
 from jcc.output.vtable import VTableEntry
 
@@ -411,3 +411,54 @@ class TestGotoNarrowing:
             content = emit_jca(package, Path(tmpdir)).read_text()
             assert "goto CLOSE;" in content
             assert "goto_w FAR;" in content
+
+
+class TestBranchRelaxation:
+    """Tests for exact-size relaxation of conditional branches and gotos."""
+
+    @staticmethod
+    def _filler(n: int) -> list[ops.Instruction]:
+        """n bytes of 1-byte instructions."""
+        return [ops.sconst(0) for _ in range(n)]
+
+    def test_conditional_at_range_limit_stays_short(self) -> None:
+        """A conditional branch exactly 127 bytes forward is not widened."""
+        instrs = (
+            ops.ifeq(BlockLabel("L1")),  # 0
+            *self._filler(125),
+            ops.label(BlockLabel("L1")),  # 127
+            ops.return_(),
+        )
+        result = finalize_instructions(instrs)
+        assert result[0] == instrs[0]
+        assert all(instr.mnemonic != "goto_w" for instr in result)
+
+    def test_conditional_out_of_range_inverted(self) -> None:
+        """A conditional branch one byte too far is inverted around goto_w."""
+        instrs = (
+            ops.ifeq(BlockLabel("L1")),  # 0
+            *self._filler(126),
+            ops.label(BlockLabel("L1")),  # 128
+            ops.return_(),
+        )
+        result = finalize_instructions(instrs)
+        assert [(i.mnemonic, i.operands) for i in result[:3]] == [
+            ("ifne", ("_W0",)),
+            ("goto_w", ("L1",)),
+            ("label", ("_W0",)),
+        ]
+
+    def test_widening_pushes_goto_out_of_range(self) -> None:
+        """A goto in range only while a later branch is short becomes goto_w."""
+        instrs = (
+            ops.goto(BlockLabel("NEAR")),  # 0
+            ops.ifeq(BlockLabel("FAR")),  # 2, widened to 5 bytes
+            *self._filler(123),
+            ops.label(BlockLabel("NEAR")),  # 127 if ifeq stayed short
+            *[ops.getstatic_a(12) for _ in range(100)],
+            ops.label(BlockLabel("FAR")),
+            ops.return_(),
+        )
+        result = finalize_instructions(instrs)
+        assert (result[0].mnemonic, result[1].mnemonic) == ("goto_w", "ifne")
+
@@ -0,0 +1,157 @@
+"""Tests for codegen/layout.py and analysis/frequency.py - block ordering."""
+
+from jcc.analysis.frequency import FunctionCounts, block_frequencies, static_frequencies
+from jcc.analysis.function import analyze_function
+from jcc.analysis.globals import AllocationResult
+from jcc.codegen.emit import compile_function
+from jcc.codegen.layout import layout_blocks
+from jcc.ir.facts import FunctionFacts
+from jcc.ir.instructions import BranchInst, ReturnInst, TerminatorInst, UnreachableInst
+from jcc.ir.module import Block, Function, Parameter
+from jcc.ir.types import BlockLabel, JCType, SSAName
+from jcc.ir.values import SSARef
+from jcc.output.constant_pool import ConstantPool
+
+# === Test Helpers ===
+
+
+def jump(target: str) -> BranchInst:
+    return BranchInst(cond=None, true_label=BlockLabel(target), false_label=None)
+
+
+def branch(true: str, false: str) -> BranchInst:
+    return BranchInst(
+        cond=SSARef(name=SSAName("%c")),
+        true_label=BlockLabel(true),
+        false_label=BlockLabel(false),
+    )
+
+
+def make_function(*blocks: tuple[str, TerminatorInst]) -> Function:
+    return Function(
+        name="f",
+        params=(Parameter(name=SSAName("%c"), ty=JCType.BYTE),),
+        return_type=JCType.VOID,
+        blocks=tuple(
+            Block(label=BlockLabel(label), instructions=(), terminator=term)
+            for label, term in blocks
+        ),
+    )
+
+
+def make_loop() -> Function:
+    """entry -> header; header -> (exit | body); body -> (header | fail)."""
+    return make_function(
+        ("entry", jump("header")),
+        ("header", branch("exit", "body")),
+        ("exit", ReturnInst(value=None, ty=JCType.VOID)),
+        ("fail", UnreachableInst()),
+        ("body", branch("header", "fail")),
+    )
+
+
+def make_cp() -> ConstantPool:
+    return ConstantPool(
+        _entries=(),
+        _packages_used=(),
+        _applet_class_idx=0,
+        _applet_init_idx=1,
+        _register_idx=2,
+        _our_class_idx=3,
+        _our_init_idx=4,
+        _selecting_applet_idx=5,
+        _set_incoming_and_receive_idx=6,
+        _mem_array_idx={},
+        _make_transient_idx={},
+        _api_method_idx={},
+        _user_method_idx={},
+        _user_method_desc={},
+        _scalar_field_idx={},
+        _constructor_idx={},
+        _api=None,
+        _user_functions=frozenset(),
+    )
+
+
+def labels(*names: str) -> tuple[BlockLabel, ...]:
+    return tuple(BlockLabel(n) for n in names)
+
+
+class TestFrequencies:
+    def test_static_weights_loops_and_cold_blocks(self) -> None:
+        freq = static_frequencies(FunctionFacts(make_loop()))
+        assert freq == dict(zip(labels("entry", "header", "exit", "fail", "body"), [1, 8, 1, 0, 8]))
+
+    def test_measured_counts(self) -> None:
+        counts = FunctionCounts(calls=3, blocks={"header": 40, "body": 37, "exit": 3})
+        freq = block_frequencies(FunctionFacts(make_loop()), counts)
+        assert freq[BlockLabel("entry")] == 3
+        assert freq[BlockLabel("body")] == 37
+        assert freq[BlockLabel("fail")] == 0
+
+    def test_entry_counts_alone_fall_back_to_static(self) -> None:
+        facts = FunctionFacts(make_loop())
+        assert block_frequencies(facts, FunctionCounts(calls=5)) == static_frequencies(facts)
+
+
+class TestLayout:
+    def test_hot_successor_follows(self) -> None:
+        func = make_loop()
+        facts = FunctionFacts(func)
+        order = layout_blocks(func, static_frequencies(facts), facts.successors)
+        assert order == labels("entry", "header", "body", "exit", "fail")
+
+    def test_ties_keep_source_order(self) -> None:
+        func = make_function(
+            ("entry", branch("a", "b")),
+            ("a", jump("b")),
+            ("b", ReturnInst(value=None, ty=JCType.VOID)),
+        )
+        facts = FunctionFacts(func)
+        freq = dict.fromkeys(labels("entry", "a", "b"), 1.0)
+        assert layout_blocks(func, freq, facts.successors) == labels("entry", "a", "b")
+
+    def test_cold_entry_stays_first(self) -> None:
+        func = make_loop()
+        freq = dict.fromkeys(labels("entry", "header", "exit", "fail", "body"), 0.0)
+        order = layout_blocks(func, freq, FunctionFacts(func).successors)
+        assert order == labels("entry", "header", "exit", "fail", "body")
+
+    def test_new_chain_starts_at_hottest_block(self) -> None:
+        func = make_function(
+            ("entry", branch("x", "y")),
+            ("x", ReturnInst(value=None, ty=JCType.VOID)),
+            ("y", jump("z")),
+            ("z", ReturnInst(value=None, ty=JCType.VOID)),
+        )
+        freq = dict(zip(labels("entry", "x", "y", "z"), [4.0, 3.0, 1.0, 2.0]))
+        order = layout_blocks(func, freq, FunctionFacts(func).successors)
+        assert order == labels("entry", "x", "z", "y")
+
+
+class TestCompileLayout:
+    def test_loop_body_falls_through(self) -> None:
+        func = make_loop()
+        fa = analyze_function(func)
+        assert fa.facts is not None
+        facts = fa.facts
+        allocation = AllocationResult(globals={}, structs={}, mem_sizes={}, const_values={})
+
+        def compile_with(
+            frequencies: dict[BlockLabel, float] | None,
+        ) -> list[tuple[str, tuple[object, ...]]]:
+            code = compile_function(
+                func, fa.locals, fa.phi_info, allocation, make_cp(),
+                facts=fa.facts, frequencies=frequencies,
+            )
+            return [(i.mnemonic, i.operands) for i in code.instructions]
+
+        # Source order jumps over exit and fail into the loop body
+        assert ("ifeq", ("body",)) in compile_with(None)
+
+        code = compile_with(static_frequencies(facts))
+        assert [ops[0] for m, ops in code if m == "label"] == [
+            "entry", "header", "body", "exit", "fail",
+        ]
+        # The header now only branches to leave the loop
+        assert code[2:5] == [("sload_0", ()), ("ifne", ("exit",)), ("label", ("body",))]
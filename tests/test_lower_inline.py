@@ -0,0 +1,328 @@
+"""Tests for lower/inline.py - function inlining."""
+
+from jcc.analysis.locals import Limits
+from jcc.ir.instructions import (
+    BinaryInst,
+    BranchInst,
+    CallInst,
+    ICmpInst,
+    Instruction,
+    PhiInst,
+    ReturnInst,
+    TerminatorInst,
+)
+from jcc.ir.module import Block, Function, Module, Parameter, validate_block_terminators
+from jcc.ir.range_metadata import ValueRange
+from jcc.ir.types import BlockLabel, JCType, SSAName
+from jcc.ir.values import Const, SSARef, Value
+from jcc.lower.inline import InlinePolicy, inline_functions
+
+# === Helpers ===
+
+
+def ref(name: str) -> SSARef:
+    return SSARef(SSAName(name))
+
+
+def short(value: int) -> Const:
+    return Const(value, JCType.SHORT)
+
+
+def add(result: str, left: Value, right: Value) -> BinaryInst:
+    return BinaryInst(result=SSAName(result), op="add", left=left, right=right, ty=JCType.SHORT)
+
+
+def call(result: str | None, callee: str, *args: Value) -> CallInst:
+    return CallInst(
+        result=SSAName(result) if result else None,
+        func_name=callee,
+        args=args,
+        ty=JCType.SHORT if result else JCType.VOID,
+    )
+
+
+def ret(value: Value | None = None) -> ReturnInst:
+    return ReturnInst(value=value, ty=JCType.SHORT if value else JCType.VOID)
+
+
+def jump(target: str) -> BranchInst:
+    return BranchInst(cond=None, true_label=BlockLabel(target), false_label=None)
+
+
+def block(label: str, instructions: list[Instruction], terminator: TerminatorInst) -> Block:
+    return Block(label=BlockLabel(label), instructions=tuple(instructions), terminator=terminator)
+
+
+def function(
+    name: str,
+    blocks: list[Block],
+    params: tuple[str, ...] = (),
+    returns: JCType = JCType.VOID,
+) -> Function:
+    return Function(
+        name=name,
+        params=tuple(Parameter(SSAName(p), JCType.SHORT) for p in params),
+        return_type=returns,
+        blocks=tuple(blocks),
+    )
+
+
+def make_module(*functions: Function) -> Module:
+    return Module(globals={}, functions={f.name: f for f in functions})
+
+
+def inc() -> Function:
+    """short inc(short %a) { return %a + 1; }"""
+    return function(
+        "inc",
+        [block("entry", [add("%r", ref("%a"), short(1))], ret(ref("%r")))],
+        params=("%a",),
+        returns=JCType.SHORT,
+    )
+
+
+def clamp() -> Function:
+    """short clamp(short %a) { return %a < 0 ? 0 : %a; } with two returns."""
+    cond = ICmpInst(
+        result=SSAName("%neg"), pred="slt", left=ref("%a"), right=short(0), ty=JCType.SHORT,
+    )
+    return function(
+        "clamp",
+        [
+            block(
+                "entry",
+                [cond],
+                BranchInst(
+                    cond=ref("%neg"), true_label=BlockLabel("zero"), false_label=BlockLabel("keep"),
+                ),
+            ),
+            block("zero", [], ret(short(0))),
+            block("keep", [], ret(ref("%a"))),
+        ],
+        params=("%a",),
+        returns=JCType.SHORT,
+    )
+
+
+def calls_in(func: Function) -> list[str]:
+    return [
+        instr.func_name
+        for b in func.blocks
+        for instr in b.instructions
+        if isinstance(instr, CallInst)
+    ]
+
+
+# === Tests ===
+
+
+def test_single_return_value_substituted():
+    caller = function(
+        "caller",
+        [
+            block(
+                "entry",
+                [call("%x", "inc", ref("%p")), add("%y", ref("%x"), ref("%x"))],
+                jump("exit"),
+            ),
+            block("exit", [], ret(ref("%x"))),
+        ],
+        params=("%p",),
+        returns=JCType.SHORT,
+    )
+    module, _ = inline_functions(make_module(inc(), caller))
+
+    assert list(module.functions) == ["caller"]
+    func = module.functions["caller"]
+    validate_block_terminators(func)
+    assert [b.label for b in func.blocks] == ["entry", "_inl0.entry", "_inl0", "exit"]
+
+    body = func.blocks[1].instructions
+    assert body == (add("%_inl0.r", ref("%p"), short(1)),)
+    assert func.blocks[2].instructions == (add("%y", ref("%_inl0.r"), ref("%_inl0.r")),)
+    assert func.blocks[3].terminator == ret(ref("%_inl0.r"))
+
+
+def test_multiple_returns_join_in_phi():
+    caller = function(
+        "caller",
+        [block("entry", [call("%x", "clamp", ref("%p"))], ret(ref("%x")))],
+        params=("%p",),
+        returns=JCType.SHORT,
+    )
+    module, _ = inline_functions(make_module(clamp(), caller))
+
+    func = module.functions["caller"]
+    cont = func.block_map[BlockLabel("_inl0")]
+    assert cont.instructions == (
+        PhiInst(
+            result=SSAName("%x"),
+            incoming=((short(0), BlockLabel("_inl0.zero")), (ref("%p"), BlockLabel("_inl0.keep"))),
+            ty=JCType.SHORT,
+        ),
+    )
+    assert func.block_map[BlockLabel("_inl0.zero")].terminator == jump("_inl0")
+
+
+def test_successor_phis_see_continuation():
+    caller = function(
+        "caller",
+        [
+            block("entry", [call(None, "helper")], jump("exit")),
+            block(
+                "exit",
+                [
+                    PhiInst(
+                        result=SSAName("%v"),
+                        incoming=((short(1), BlockLabel("entry")),),
+                        ty=JCType.SHORT,
+                    ),
+                ],
+                ret(ref("%v")),
+            ),
+        ],
+        returns=JCType.SHORT,
+    )
+    helper = function("helper", [block("entry", [], ret())])
+    module, _ = inline_functions(make_module(helper, caller))
+
+    phi = module.functions["caller"].block_map[BlockLabel("exit")].instructions[0]
+    assert isinstance(phi, PhiInst)
+    assert phi.incoming == ((short(1), BlockLabel("_inl0")),)
+
+
+def test_two_sites_in_one_block():
+    caller = function(
+        "caller",
+        [
+            block(
+                "entry",
+                [call("%x", "inc", ref("%p")), call("%y", "inc", ref("%x"))],
+                ret(ref("%y")),
+            ),
+        ],
+        params=("%p",),
+        returns=JCType.SHORT,
+    )
+    module, _ = inline_functions(make_module(inc(), caller))
+
+    func = module.functions["caller"]
+    assert calls_in(func) == []
+    assert func.block_map[BlockLabel("_inl1.entry")].instructions == (
+        add("%_inl1.r", ref("%_inl0.r"), short(1)),
+    )
+    assert func.blocks[-1].terminator == ret(ref("%_inl1.r"))
+
+
+def test_callees_inlined_first():
+    outer = function(
+        "outer",
+        [block("entry", [call("%y", "inc", ref("%b"))], ret(ref("%y")))],
+        params=("%b",),
+        returns=JCType.SHORT,
+    )
+    caller = function(
+        "caller",
+        [block("entry", [call("%x", "outer", ref("%p"))], ret(ref("%x")))],
+        params=("%p",),
+        returns=JCType.SHORT,
+    )
+    module, _ = inline_functions(make_module(inc(), outer, caller))
+
+    assert list(module.functions) == ["caller"]
+    assert module.functions["caller"].blocks[-1].terminator == ret(ref("%_inl0._inl0.r"))
+
+
+def test_never_and_size_limits():
+    caller = function(
+        "caller",
+        [
+            block(
+                "entry",
+                [call("%x", "inc", ref("%p")), call("%y", "inc", ref("%x"))],
+                ret(ref("%y")),
+            ),
+        ],
+        params=("%p",),
+        returns=JCType.SHORT,
+    )
+    module = make_module(inc(), caller)
+
+    for policy in (InlinePolicy(never=frozenset({"inc"})), InlinePolicy(max_size=1)):
+        result, _ = inline_functions(module, policy)
+        assert result is module
+
+
+def test_single_call_site_allows_larger_callee():
+    caller = function(
+        "caller",
+        [block("entry", [call("%x", "inc", ref("%p"))], ret(ref("%x")))],
+        params=("%p",),
+        returns=JCType.SHORT,
+    )
+    # inc has 2 instructions: too big alone, small enough for its only site
+    result, _ = inline_functions(make_module(inc(), caller), InlinePolicy(max_size=1))
+    assert list(result.functions) == ["caller"]
+
+
+def test_always_overrides_size():
+    caller = function(
+        "caller",
+        [
+            block(
+                "entry",
+                [call("%x", "inc", ref("%p")), call("%y", "inc", ref("%x"))],
+                ret(ref("%y")),
+            ),
+        ],
+        params=("%p",),
+        returns=JCType.SHORT,
+    )
+    policy = InlinePolicy.from_attributes({"inc": frozenset({"alwaysinline"})}, max_size=0)
+    result, _ = inline_functions(make_module(inc(), caller), policy)
+    assert calls_in(result.functions["caller"]) == []
+
+
+def test_noinline_attribute():
+    policy = InlinePolicy.from_attributes(
+        {"inc": frozenset({"noinline"}), "other": frozenset({"nounwind"})},
+        always=["inc"],
+    )
+    assert policy.never == frozenset({"inc"})
+    caller = function(
+        "caller",
+        [block("entry", [call("%x", "inc", ref("%p"))], ret(ref("%x")))],
+        params=("%p",),
+        returns=JCType.SHORT,
+    )
+    module = make_module(inc(), caller)
+    result, _ = inline_functions(module, policy)
+    assert result is module
+
+
+def test_locals_limit_respected():
+    # caller and inc each need a slot for their parameter
+    caller = function(
+        "caller",
+        [block("entry", [call("%x", "inc", ref("%p"))], ret(ref("%x")))],
+        params=("%p",),
+        returns=JCType.SHORT,
+    )
+    module = make_module(inc(), caller)
+    result, _ = inline_functions(module, limits=Limits(max_locals_soft=1))
+    assert result is module
+
+
+def test_ranges_follow_renamed_values():
+    caller = function(
+        "caller",
+        [block("entry", [call("%x", "inc", ref("%p"))], ret(ref("%x")))],
+        params=("%p",),
+        returns=JCType.SHORT,
+    )
+    value_range = ValueRange(signed_min=0, signed_max=10)
+    _, ranges = inline_functions(
+        make_module(inc(), caller),
+        range_info={"inc": {SSAName("%r"): value_range}},
+    )
+    assert ranges == {"caller": {SSAName("%_inl0.r"): value_range}}
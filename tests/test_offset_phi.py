@@ -4,12 +4,18 @@ Tests both constant-offset (GlobalRef/InlineGEP) and dynamic-offset (SSARef→GE
 offset phi detection.
 """
 
-from jcc.analysis.globals import AllocationResult, GlobalInfo, MemArray
-from jcc.analysis.offset_phi import detect_offset_phis
+from jcc.analysis.globals import (
+    AllocatedStruct,
+    AllocationResult,
+    GlobalInfo,
+    MemArray,
+    StructField,
+)
+from jcc.analysis.offset_phi import OffsetStep, detect_offset_phis
 from jcc.analysis.phi import PhiInfo, PhiSource
 from jcc.ir.instructions import GEPInst
-from jcc.ir.types import BlockLabel, GlobalName, LLVMType, SSAName
-from jcc.ir.values import GlobalRef, SSARef
+from jcc.ir.types import BlockLabel, GlobalName, JCType, LLVMType, SSAName
+from jcc.ir.values import Const, GlobalRef, InlineGEP, SSARef
 
 
 def _make_allocation(*globals_list: tuple[str, int]) -> AllocationResult:
@@ -180,3 +186,111 @@ class TestDynamicGepPhiDetection:
         result = detect_offset_phis(phi_info, allocation, def_map=None)
 
         assert not result.is_offset_phi(SSAName("%phi"))
+
+
+def _stepped_phi(start: int, step: int) -> tuple[PhiInfo, dict[SSAName, GEPInst]]:
+    """%p = phi [@BUF+start, entry], [%p.next, latch]; %p.next = gep i8, %p, step."""
+    phi_info = PhiInfo(
+        phi_sources={
+            SSAName("%p"): (
+                PhiSource(
+                    value=InlineGEP(
+                        base=GlobalName("@BUF"), indices=(start,), source_type=LLVMType("i8"),
+                    ),
+                    from_block=BlockLabel("entry"),
+                ),
+                PhiSource(value=SSARef(name=SSAName("%p.next")), from_block=BlockLabel("latch")),
+            ),
+        }
+    )
+    def_map = {
+        SSAName("%p.next"): GEPInst(
+            result=SSAName("%p.next"),
+            base=SSARef(name=SSAName("%p")),
+            indices=(Const(value=step, ty=JCType.INT),),
+            source_type=LLVMType("i8"),
+            inbounds=True,
+        ),
+    }
+    return phi_info, def_map
+
+
+class TestSteppedPhiDetection:
+    """Test offset phis advanced by a constant byte GEP on themselves."""
+
+    def test_step_in_elements(self) -> None:
+        allocation = AllocationResult(
+            globals={
+                GlobalName("@BUF"): GlobalInfo(
+                    name=GlobalName("@BUF"), mem_array=MemArray.MEM_S, mem_offset=10, count=8,
+                ),
+            },
+            structs={}, mem_sizes={}, const_values={},
+        )
+        phi_info, def_map = _stepped_phi(start=4, step=2)
+
+        result = detect_offset_phis(phi_info, allocation, def_map)
+
+        assert result.get_offset(SSAName("%p"), BlockLabel("entry")) == 12
+        assert result.get_offset(SSAName("%p"), BlockLabel("latch")) == OffsetStep(delta=1)
+
+    def test_struct_field_step(self) -> None:
+        """A whole-struct step is elem_count elements in the field's SOA region."""
+        pipes = AllocatedStruct(
+            name=GlobalName("@BUF"),
+            fields=(
+                StructField(byte_offset=0, jc_type=JCType.SHORT, mem_array=MemArray.MEM_S,
+                            mem_offset=0),
+                StructField(byte_offset=2, jc_type=JCType.BYTE, mem_array=MemArray.MEM_B,
+                            mem_offset=5, elem_count=2),
+            ),
+            stride=4,
+            count=3,
+        )
+        allocation = AllocationResult(
+            globals={}, structs={pipes.name: pipes}, mem_sizes={}, const_values={},
+        )
+        phi_info, def_map = _stepped_phi(start=7, step=4)
+
+        result = detect_offset_phis(phi_info, allocation, def_map)
+
+        assert result.get_field_offset(SSAName("%p")) == 2
+        # Struct 1, second byte of the field
+        assert result.get_offset(SSAName("%p"), BlockLabel("entry")) == 5 + 2 + 1
+        assert result.get_offset(SSAName("%p"), BlockLabel("latch")) == OffsetStep(delta=2)
+
+    def test_partial_struct_step_rejected(self) -> None:
+        pipes = AllocatedStruct(
+            name=GlobalName("@BUF"),
+            fields=(
+                StructField(byte_offset=0, jc_type=JCType.SHORT, mem_array=MemArray.MEM_S,
+                            mem_offset=0, elem_count=2),
+            ),
+            stride=4,
+            count=3,
+        )
+        allocation = AllocationResult(
+            globals={}, structs={pipes.name: pipes}, mem_sizes={}, const_values={},
+        )
+        phi_info, def_map = _stepped_phi(start=0, step=2)
+
+        result = detect_offset_phis(phi_info, allocation, def_map)
+
+        assert not result.is_offset_phi(SSAName("%p"))
+
+    def test_only_steps_rejected(self) -> None:
+        """Nothing fixes the global when every source is a step."""
+        phi_info = PhiInfo(
+            phi_sources={
+                SSAName("%p"): (
+                    PhiSource(
+                        value=SSARef(name=SSAName("%p.next")), from_block=BlockLabel("latch"),
+                    ),
+                ),
+            }
+        )
+        _, def_map = _stepped_phi(start=0, step=1)
+
+        result = detect_offset_phis(phi_info, _make_allocation(("@BUF", 0)), def_map)
+
+        assert not result.is_offset_phi(SSAName("%p"))
@@ -0,0 +1,609 @@
+"""Tests for jcc/opt - IR optimization passes."""
+
+import pytest
+
+from jcc.analysis.function import analyze_function
+from jcc.analysis.globals import (
+    AllocatedStruct,
+    AllocationResult,
+    GlobalInfo,
+    MemArray,
+    StructField,
+)
+from jcc.codegen.emit import compile_function
+from jcc.ir.instructions import (
+    BinaryInst,
+    BinaryOp,
+    BranchInst,
+    CallInst,
+    CastInst,
+    GEPInst,
+    ICmpInst,
+    ICmpPred,
+    Instruction,
+    LoadInst,
+    PhiInst,
+    ReturnInst,
+    StoreInst,
+    TerminatorInst,
+    get_result,
+)
+from jcc.ir.module import Block, Function, Global, IntArrayInit, Module, Parameter
+from jcc.ir.types import BlockLabel, GlobalName, JCType, LLVMType, SSAName
+from jcc.ir.values import Const, GlobalRef, InlineGEP, SSARef, Value
+from jcc.opt import ALLOCATED_PASSES, PASSES, optimize_allocated, optimize_module
+from jcc.opt.dce import eliminate_dead_code
+from jcc.opt.fold import fold_binary, fold_cast
+from jcc.opt.gvn import number_values
+from jcc.opt.ivsr import reduce_strength
+from jcc.opt.licm import hoist_invariants
+from jcc.opt.sccp import propagate_constants
+from jcc.output.config import OPT_PASSES
+from jcc.output.constant_pool import ConstantPool
+
+S = JCType.SHORT
+
+
+# === Test Helpers ===
+
+
+def ref(name: str) -> SSARef:
+    return SSARef(name=SSAName(name))
+
+
+def short(value: int) -> Const:
+    return Const(value=value, ty=S)
+
+
+def binary(result: str, op: BinaryOp, left: Value, right: Value) -> BinaryInst:
+    return BinaryInst(result=SSAName(result), op=op, left=left, right=right, ty=S)
+
+
+def icmp(result: str, pred: ICmpPred, left: Value, right: Value) -> ICmpInst:
+    return ICmpInst(result=SSAName(result), pred=pred, left=left, right=right, ty=S)
+
+
+def jump(target: str) -> BranchInst:
+    return BranchInst(cond=None, true_label=BlockLabel(target), false_label=None)
+
+
+def branch(cond: Value, true: str, false: str) -> BranchInst:
+    return BranchInst(cond=cond, true_label=BlockLabel(true), false_label=BlockLabel(false))
+
+
+def ret(value: Value | None = None) -> ReturnInst:
+    return ReturnInst(value=value, ty=S if value is not None else JCType.VOID)
+
+
+def phi(result: str, *incoming: tuple[Value, str]) -> PhiInst:
+    return PhiInst(
+        result=SSAName(result),
+        incoming=tuple((v, BlockLabel(label)) for v, label in incoming),
+        ty=S,
+    )
+
+
+def block(label: str, *instructions: Instruction, term: TerminatorInst) -> Block:
+    return Block(label=BlockLabel(label), instructions=instructions, terminator=term)
+
+
+def function(*blocks: Block, params: tuple[str, ...] = ("%n",)) -> Function:
+    return Function(
+        name="f",
+        params=tuple(Parameter(name=SSAName(p), ty=S) for p in params),
+        return_type=S,
+        blocks=blocks,
+    )
+
+
+TABLE = Global(
+    name=GlobalName("@TABLE"),
+    llvm_type=LLVMType("[4 x i16]"),
+    is_constant=True,
+    initializer=IntArrayInit(values=(1, 2, 3, 4), elem_type=S),
+)
+BUFFER = Global(
+    name=GlobalName("@buffer"), llvm_type=LLVMType("[4 x i16]"), is_constant=False,
+    initializer=None,
+)
+MODULE = Module(globals={TABLE.name: TABLE, BUFFER.name: BUFFER}, functions={})
+
+
+def load_from(result: str, array: Global, index: Value) -> tuple[GEPInst, LoadInst]:
+    gep = GEPInst(
+        result=SSAName(f"{result}.addr"),
+        base=GlobalRef(name=array.name),
+        indices=(short(0), index),
+        source_type=array.llvm_type,
+        inbounds=True,
+    )
+    return gep, LoadInst(result=SSAName(result), ptr=ref(f"{result}.addr"), ty=S)
+
+
+def instructions(func: Function) -> list[Instruction]:
+    return [i for b in func.blocks for i in b.all_instructions]
+
+
+# === Folding ===
+
+
+class TestFold:
+    @pytest.mark.parametrize(
+        ("op", "left", "right", "ty", "expected"),
+        [
+            ("add", 32767, 1, S, -32768),
+            ("sdiv", -7, 2, S, -3),
+            ("srem", -7, 2, S, -1),
+            ("udiv", -2, 2, S, 32767),
+            ("lshr", -1, 12, S, 15),
+            ("ashr", -16, 2, S, -4),
+            ("shl", 1, 31, JCType.INT, -(2**31)),
+            ("sdiv", 1, 0, S, None),
+            ("shl", 1, 16, S, None),
+        ],
+    )
+    def test_binary(self, op: str, left: int, right: int, ty: JCType, expected: int | None) -> None:
+        assert fold_binary(op, left, right, ty) == expected  # type: ignore[arg-type]
+
+    def test_sext_of_i1_true_is_minus_one(self) -> None:
+        cast = CastInst(
+            result=SSAName("%x"), op="sext", operand=Const(value=1, ty=JCType.BYTE),
+            from_ty=JCType.BYTE, to_ty=S, flags=frozenset({"from_i1"}),
+        )
+        assert fold_cast(cast, 1) == -1
+
+
+# === SCCP ===
+
+
+class TestSCCP:
+    def test_constant_branch_removes_dead_arm(self) -> None:
+        func = function(
+            block(
+                "entry",
+                binary("%k", "mul", short(3), short(4)),
+                icmp("%c", "sgt", ref("%k"), short(10)),
+                term=branch(ref("%c"), "yes", "no"),
+            ),
+            block("yes", binary("%a", "add", ref("%n"), ref("%k")), term=jump("join")),
+            block("no", term=jump("join")),
+            block("join", phi("%r", (ref("%a"), "yes"), (short(0), "no")), term=ret(ref("%r"))),
+        )
+        result = propagate_constants(func, MODULE)
+        assert [b.label for b in result.blocks] == ["entry", "yes", "join"]
+        assert result.blocks[0].instructions == ()
+        assert result.blocks[0].terminator == jump("yes")
+        assert result.block_map[BlockLabel("yes")].instructions == (
+            binary("%a", "add", ref("%n"), short(12)),
+        )
+        # The phi lost its only other edge
+        assert result.block_map[BlockLabel("join")].terminator == ret(ref("%a"))
+
+    def test_loop_carried_constant(self) -> None:
+        # %x stays 5 around the loop even though the loop runs %n times
+        func = function(
+            block("entry", term=jump("loop")),
+            block(
+                "loop",
+                phi("%i", (short(0), "entry"), (ref("%j"), "loop")),
+                phi("%x", (short(5), "entry"), (ref("%y"), "loop")),
+                binary("%y", "or", ref("%x"), short(1)),
+                binary("%j", "add", ref("%i"), short(1)),
+                icmp("%c", "slt", ref("%j"), ref("%n")),
+                term=branch(ref("%c"), "loop", "exit"),
+            ),
+            block("exit", term=ret(ref("%y"))),
+        )
+        result = propagate_constants(func, MODULE)
+        assert result.block_map[BlockLabel("exit")].terminator == ret(short(5))
+        assert len(result.block_map[BlockLabel("loop")].instructions) == 3
+
+    def test_division_by_zero_not_folded(self) -> None:
+        func = function(
+            block("entry", binary("%q", "sdiv", short(1), short(0)), term=ret(ref("%q"))),
+        )
+        assert propagate_constants(func, MODULE) is func
+
+
+# === DCE ===
+
+
+class TestDCE:
+    def test_dead_phi_cycle_removed(self) -> None:
+        func = function(
+            block("entry", term=jump("loop")),
+            block(
+                "loop",
+                phi("%i", (short(0), "entry"), (ref("%j"), "loop")),
+                phi("%dead", (short(0), "entry"), (ref("%dead.next"), "loop")),
+                binary("%dead.next", "add", ref("%dead"), short(2)),
+                binary("%j", "add", ref("%i"), short(1)),
+                icmp("%c", "slt", ref("%j"), ref("%n")),
+                term=branch(ref("%c"), "loop", "exit"),
+            ),
+            block("exit", term=ret(ref("%j"))),
+        )
+        loop = eliminate_dead_code(func, MODULE).block_map[BlockLabel("loop")]
+        assert [get_result(i) for i in loop.instructions] == ["%i", "%j", "%c"]
+
+    def test_calls_and_stores_stay(self) -> None:
+        gep, _ = load_from("%v", BUFFER, short(1))
+        func = function(
+            block(
+                "entry",
+                CallInst(result=SSAName("%unused"), func_name="g", args=(), ty=S),
+                gep,
+                StoreInst(value=ref("%n"), ptr=ref("%v.addr"), ty=S),
+                term=ret(),
+            ),
+        )
+        assert eliminate_dead_code(func, MODULE) is func
+
+
+# === GVN ===
+
+
+class TestGVN:
+    def test_dominated_duplicates_merged(self) -> None:
+        func = function(
+            block(
+                "entry",
+                binary("%a", "add", ref("%n"), ref("%m")),
+                icmp("%c", "slt", ref("%n"), ref("%m")),
+                term=branch(ref("%c"), "then", "exit"),
+            ),
+            block(
+                "then",
+                binary("%b", "add", ref("%m"), ref("%n")),
+                icmp("%d", "sgt", ref("%m"), ref("%n")),
+                binary("%e", "xor", ref("%b"), ref("%d")),
+                term=ret(ref("%e")),
+            ),
+            block("exit", term=ret(ref("%a"))),
+            params=("%n", "%m"),
+        )
+        then = number_values(func, MODULE).block_map[BlockLabel("then")]
+        assert then.instructions == (binary("%e", "xor", ref("%a"), ref("%c")),)
+
+    def test_siblings_not_merged(self) -> None:
+        func = function(
+            block(
+                "entry", icmp("%c", "slt", ref("%n"), short(0)), term=branch(ref("%c"), "a", "b")
+            ),
+            block("a", binary("%x", "shl", ref("%n"), short(2)), term=ret(ref("%x"))),
+            block("b", binary("%y", "shl", ref("%n"), short(2)), term=ret(ref("%y"))),
+        )
+        assert number_values(func, MODULE) is func
+
+    def test_identities(self) -> None:
+        func = function(
+            block(
+                "entry",
+                binary("%a", "add", short(0), ref("%n")),
+                binary("%b", "mul", ref("%a"), short(1)),
+                binary("%c", "sub", ref("%b"), ref("%b")),
+                term=ret(ref("%c")),
+            ),
+        )
+        result = number_values(func, MODULE)
+        assert result.blocks[0].instructions == ()
+        assert result.blocks[0].terminator == ret(short(0))
+
+    def test_constant_loads_merged_through_geps(self) -> None:
+        gep1, load1 = load_from("%x", TABLE, ref("%n"))
+        gep2, load2 = load_from("%y", TABLE, ref("%n"))
+        func = function(
+            block(
+                "entry", gep1, load1, gep2, load2,
+                binary("%s", "add", ref("%x"), ref("%y")),
+                term=ret(ref("%s")),
+            ),
+        )
+        result = number_values(func, MODULE)
+        assert load2 not in instructions(result)
+        assert binary("%s", "add", ref("%x"), ref("%x")) in instructions(result)
+
+    def test_mutable_loads_kept(self) -> None:
+        gep1, load1 = load_from("%x", BUFFER, ref("%n"))
+        gep2, load2 = load_from("%y", BUFFER, ref("%n"))
+        func = function(
+            block(
+                "entry", gep1, load1, gep2, load2,
+                binary("%s", "add", ref("%x"), ref("%y")),
+                term=ret(ref("%s")),
+            ),
+        )
+        assert number_values(func, MODULE) is func
+
+
+# === LICM ===
+
+
+def make_loop(
+    *latch: Instruction,
+    header: tuple[Instruction, ...] = (),
+    exit_cond: Value | None = None,
+    guard: bool = True,
+) -> Function:
+    """Loop over %i < %n adding %v to %acc, leaving early when exit_cond holds.
+
+    header instructions run on every pass, latch instructions only when
+    the loop does not leave early. exit_cond defaults to %c, the loop
+    condition. With guard, the entry branches around the loop, so the loop
+    has no dedicated preheader.
+    """
+    if exit_cond is None:
+        exit_cond = ref("%c")
+    entry_term = branch(ref("%g"), "loop", "exit") if guard else jump("loop")
+    exit_phi = [(short(0), "entry")] if guard else []
+    return function(
+        block("entry", icmp("%g", "sgt", ref("%n"), short(0)), term=entry_term),
+        block(
+            "loop",
+            phi("%i", (short(0), "entry"), (ref("%j"), "latch")),
+            phi("%acc", (short(0), "entry"), (ref("%sum"), "latch")),
+            *header,
+            icmp("%c", "sgt", ref("%i"), ref("%m")),
+            term=branch(exit_cond, "exit", "latch"),
+        ),
+        block(
+            "latch",
+            *latch,
+            binary("%sum", "add", ref("%acc"), ref("%v")),
+            binary("%j", "add", ref("%i"), short(1)),
+            icmp("%more", "slt", ref("%j"), ref("%n")),
+            term=branch(ref("%more"), "loop", "exit"),
+        ),
+        block(
+            "exit",
+            phi("%r", *exit_phi, (ref("%acc"), "loop"), (ref("%sum"), "latch")),
+            term=ret(ref("%r")),
+        ),
+        params=("%n", "%m"),
+    )
+
+
+class TestLICM:
+    def test_invariants_move_to_new_preheader(self) -> None:
+        gep, load = load_from("%t", TABLE, ref("%k"))
+        shift = binary("%k", "shl", ref("%m"), short(1))
+        func = make_loop(
+            binary("%v", "add", ref("%t"), ref("%i")),
+            header=(shift, gep, load),
+        )
+        result = hoist_invariants(func, MODULE)
+        assert [b.label for b in result.blocks] == [
+            "entry", "loop.preheader", "loop", "latch", "exit",
+        ]
+        pre = result.block_map[BlockLabel("loop.preheader")]
+        assert pre.instructions == (shift, gep, load)
+        assert pre.terminator == jump("loop")
+        assert result.blocks[0].terminator == branch(ref("%g"), "loop.preheader", "exit")
+        header_phis = list(result.block_map[BlockLabel("loop")].phi_instructions)
+        assert all(label != "entry" for p in header_phis for _, label in p.incoming)
+
+    def test_conditional_division_and_load_stay(self) -> None:
+        # The latch is skipped when the header leaves early, so neither may move
+        gep, load = load_from("%t", TABLE, ref("%m"))
+        func = make_loop(
+            binary("%q", "sdiv", ref("%n"), ref("%m")),
+            gep,
+            load,
+            binary("%v", "add", ref("%q"), ref("%t")),
+        )
+        assert hoist_invariants(func, MODULE) is func
+
+    def test_division_after_call_stays(self) -> None:
+        # The call may throw before the division on the first pass
+        check = CallInst(result=None, func_name="check", args=(ref("%i"),), ty=JCType.VOID)
+        division = binary("%q", "sdiv", ref("%n"), ref("%m"))
+        use = binary("%v", "add", ref("%q"), ref("%i"))
+        func = make_loop(use, header=(check, division))
+        assert hoist_invariants(func, MODULE) is func
+        # Without the call it runs on every pass, so it moves
+        moved = hoist_invariants(make_loop(use, header=(division,)), MODULE)
+        assert moved.block_map[BlockLabel("loop.preheader")].instructions == (division,)
+
+    def test_existing_preheader_reused(self) -> None:
+        func = make_loop(binary("%v", "mul", ref("%n"), ref("%m")), guard=False)
+        result = hoist_invariants(func, MODULE)
+        assert [b.label for b in result.blocks] == ["entry", "loop", "latch", "exit"]
+        assert result.blocks[0].instructions[-1] == binary("%v", "mul", ref("%n"), ref("%m"))
+
+    def test_branch_compare_stays(self) -> None:
+        func = make_loop(
+            binary("%v", "add", ref("%i"), short(1)),
+            header=(icmp("%big", "sgt", ref("%n"), ref("%m")),),
+            exit_cond=ref("%big"),
+        )
+        assert hoist_invariants(func, MODULE) is func
+
+
+# === Strength reduction ===
+
+
+PIPE_ARRAY = LLVMType("[3 x %struct.Pipe]")
+
+# struct Pipe { short x; short y; } PIPES[3], laid out as x[3] then y[3]
+PIPES = AllocatedStruct(
+    name=GlobalName("@PIPES"),
+    fields=(
+        StructField(byte_offset=0, jc_type=S, mem_array=MemArray.MEM_S, mem_offset=0),
+        StructField(byte_offset=2, jc_type=S, mem_array=MemArray.MEM_S, mem_offset=3),
+    ),
+    stride=4,
+    count=3,
+)
+PIPES_ALLOCATION = AllocationResult(
+    globals={
+        BUFFER.name: GlobalInfo(
+            name=BUFFER.name, mem_array=MemArray.MEM_S, mem_offset=6, count=4,
+        ),
+        TABLE.name: GlobalInfo(
+            name=TABLE.name, mem_array=MemArray.CONST_S, mem_offset=0, count=4,
+        ),
+    },
+    structs={PIPES.name: PIPES},
+    mem_sizes={MemArray.MEM_S: 10},
+    const_values={},
+)
+
+
+def pipe_loop(
+    *field: Value,
+    array: Global | None = None,
+    user: Instruction | None = None,
+) -> Function:
+    """Sum the given field of PIPES[%i] (or array[%i]) for %i in 0..%n."""
+    if array is None:
+        base, source_type, indices = PIPES.name, PIPE_ARRAY, (short(0), ref("%i"), *field)
+    else:
+        base, source_type, indices = array.name, array.llvm_type, (short(0), ref("%i"))
+    gep = GEPInst(
+        result=SSAName("%p"),
+        base=GlobalRef(name=base),
+        indices=indices,
+        source_type=source_type,
+        inbounds=True,
+    )
+    return function(
+        block("entry", term=jump("loop")),
+        block(
+            "loop",
+            phi("%i", (short(0), "entry"), (ref("%j"), "loop")),
+            phi("%acc", (short(0), "entry"), (ref("%sum"), "loop")),
+            gep,
+            LoadInst(result=SSAName("%v"), ptr=ref("%p"), ty=S),
+            *([user] if user is not None else []),
+            binary("%sum", "add", ref("%acc"), ref("%v")),
+            binary("%j", "add", ref("%i"), short(1)),
+            icmp("%more", "slt", ref("%j"), ref("%n")),
+            term=branch(ref("%more"), "loop", "exit"),
+        ),
+        block("exit", term=ret(ref("%sum"))),
+    )
+
+
+class TestIVSR:
+    def test_struct_field_gets_stepped_pointer(self) -> None:
+        result = reduce_strength(pipe_loop(short(1)), MODULE, PIPES_ALLOCATION)
+        loop = result.block_map[BlockLabel("loop")]
+        pointer = PhiInst(
+            result=SSAName("%p.iv"),
+            incoming=(
+                (InlineGEP(base=PIPES.name, indices=(2,), source_type=LLVMType("i8")),
+                 BlockLabel("entry")),
+                (ref("%p.iv.next"), BlockLabel("loop")),
+            ),
+            ty=JCType.REF,
+        )
+        assert list(loop.phi_instructions)[-1] == pointer
+        assert LoadInst(result=SSAName("%v"), ptr=ref("%p.iv"), ty=S) in loop.instructions
+        assert loop.instructions[-1] == GEPInst(
+            result=SSAName("%p.iv.next"),
+            base=ref("%p.iv"),
+            indices=(Const(value=4, ty=JCType.INT),),
+            source_type=LLVMType("i8"),
+            inbounds=True,
+        )
+        assert SSAName("%p") not in [get_result(i) for i in loop.instructions]
+
+    def test_offset_array_reduced(self) -> None:
+        # BUFFER starts at MEM_S[6], so BUFFER[%i] costs an add per access
+        result = reduce_strength(pipe_loop(array=BUFFER), MODULE, PIPES_ALLOCATION)
+        loop = result.block_map[BlockLabel("loop")]
+        assert LoadInst(result=SSAName("%v"), ptr=ref("%p.iv"), ty=S) in loop.instructions
+
+    def test_array_indexed_by_counter_left_alone(self) -> None:
+        # TABLE starts at CONST_S[0], so %i already is the index
+        func = pipe_loop(array=TABLE)
+        assert reduce_strength(func, MODULE, PIPES_ALLOCATION) is func
+
+    def test_dynamic_field_index_left_alone(self) -> None:
+        func = pipe_loop(ref("%n"))
+        assert reduce_strength(func, MODULE, PIPES_ALLOCATION) is func
+
+    def test_escaping_address_left_alone(self) -> None:
+        escape = CallInst(result=None, func_name="g", args=(ref("%p"),), ty=JCType.VOID)
+        func = pipe_loop(short(1), user=escape)
+        assert reduce_strength(func, MODULE, PIPES_ALLOCATION) is func
+
+    def test_step_compiles_to_sinc_before_branch(self) -> None:
+        func = reduce_strength(pipe_loop(short(1)), MODULE, PIPES_ALLOCATION)
+        fa = analyze_function(func, allocation=PIPES_ALLOCATION)
+        cp = ConstantPool(
+            _entries=(), _packages_used=(), _applet_class_idx=0, _applet_init_idx=1,
+            _register_idx=2, _our_class_idx=3, _our_init_idx=4, _selecting_applet_idx=5,
+            _set_incoming_and_receive_idx=6, _mem_array_idx={MemArray.MEM_S: 7},
+            _make_transient_idx={}, _api_method_idx={}, _user_method_idx={},
+            _user_method_desc={}, _scalar_field_idx={}, _constructor_idx={}, _api=None,
+            _user_functions=frozenset(),
+        )
+        code = compile_function(
+            func, fa.locals, fa.phi_info, PIPES_ALLOCATION, cp,
+            offset_phi_info=fa.offset_phi_info, facts=fa.facts,
+        )
+        code_ops = [(i.mnemonic, i.operands) for i in code.instructions]
+        assert not any(m in ("smul", "goto") for m, _ in code_ops)
+        sinc = code_ops.index(("sinc", (fa.locals.get_slot(SSAName("%p.iv")), 1)))
+        # Stepped in the loop itself, before the back-edge branch
+        branch_at = code_ops.index(("if_scmplt", ("loop",)))
+        assert sinc < branch_at
+        assert all(m != "label" for m, _ in code_ops[sinc:branch_at])
+
+
+# === Pass manager ===
+
+
+class TestOptimizeModule:
+    def module(self) -> Module:
+        func = function(
+            block(
+                "entry",
+                binary("%k", "add", short(2), short(3)),
+                binary("%a", "add", ref("%n"), ref("%k")),
+                binary("%b", "add", ref("%n"), short(5)),
+                binary("%dead", "mul", ref("%a"), ref("%b")),
+                term=ret(ref("%b")),
+            ),
+        )
+        return Module(globals=MODULE.globals, functions={"f": func})
+
+    def test_stats_per_pass(self) -> None:
+        result, stats = optimize_module(self.module())
+        assert [(s.name, s.before, s.after) for s in stats] == [
+            ("sccp", 5, 4), ("gvn", 4, 3), ("licm", 3, 3), ("dce", 3, 2),
+        ]
+        assert result.functions["f"].blocks[0].terminator == ret(ref("%a"))
+
+    def test_disabled_passes_skipped(self) -> None:
+        module = self.module()
+        result, stats = optimize_module(module, ["dce"])
+        assert [s.name for s in stats] == ["dce"]
+        # %dead, then %a and %k that only fed it
+        assert result.functions["f"].blocks[0].instructions == (
+            binary("%b", "add", ref("%n"), short(5)),
+        )
+
+        unchanged, _ = optimize_module(module, [])
+        assert unchanged is module
+
+    def test_unknown_pass(self) -> None:
+        with pytest.raises(ValueError, match="cse"):
+            optimize_module(self.module(), ["cse"])
+
+    def test_config_names_match(self) -> None:
+        assert (*PASSES, *ALLOCATED_PASSES) == OPT_PASSES
+
+    def test_allocated_passes(self) -> None:
+        module = Module(globals={}, functions={"f": pipe_loop(short(1))})
+        result, stats = optimize_allocated(module, PIPES_ALLOCATION)
+        assert [s.name for s in stats] == ["ivsr"]
+        assert result is not module
+
+        unchanged, _ = optimize_allocated(module, PIPES_ALLOCATION, ["sccp", "dce"])
+        assert unchanged is module
+
+    def test_allocated_passes_skipped_before_allocation(self) -> None:
+        _, stats = optimize_module(self.module(), ["ivsr", "dce"])
+        assert [s.name for s in stats] == ["dce"]
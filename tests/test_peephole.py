@@ -1,7 +1,13 @@
-"""Tests for peephole optimizer — cyclic move optimization."""
+"""Tests for peephole optimizer — cyclic move optimization and caching."""
 
+from jcc.analysis.cost import bundled_cost_model
 from jcc.codegen import ops
-from jcc.codegen.peephole import optimize_cyclic_moves
+from jcc.codegen.peephole import (
+    cache_array_refs,
+    optimize_cyclic_moves,
+    order_cache_slots,
+    peephole_optimize,
+)
 from jcc.ir.types import BlockLabel
 
 
@@ -198,3 +204,79 @@ class TestCyclicMoveNoMatch:
         assert len(result) == 2 + 4 + 2  # before + optimized + after
         assert result[:2] == before
         assert result[-2:] == after
+
+
+class TestCostDrivenCaching:
+    """With a cost model, array refs are cached only where it pays off."""
+
+    def test_single_use_cached_without_model(self) -> None:
+        instrs = [ops.getstatic_a(7), ops.pop()]
+        result, extra = cache_array_refs(instrs, num_locals=2)
+        assert extra == 1
+        assert mnemonics(result) == ["getstatic_a", "astore_2", "aload_2", "pop"]
+
+    def test_single_use_not_cached_with_model(self) -> None:
+        instrs = [ops.getstatic_a(7), ops.pop()]
+        result, extra = cache_array_refs(instrs, num_locals=2, costs=bundled_cost_model())
+        assert extra == 0
+        assert result == instrs
+
+    def test_use_in_loop_cached_with_model(self) -> None:
+        loop = BlockLabel("loop")
+        instrs = [
+            ops.label(loop),
+            ops.getstatic_a(7),
+            ops.pop(),
+            ops.sload(0),
+            ops.ifne(loop),
+        ]
+        result, extra = cache_array_refs(instrs, num_locals=2, costs=bundled_cost_model())
+        assert extra == 1
+        assert "getstatic_a" not in mnemonics(result)[1:]
+
+
+class TestCacheSlotOrder:
+    """Cache slots from every caching pass are numbered by loop-weighted use."""
+
+    def test_hot_cache_gets_lowest_slot(self) -> None:
+        loop = BlockLabel("loop")
+        instrs = [
+            ops.iconst(1000), ops.istore(2),  # constant cache, used once
+            ops.getstatic_a(7), ops.astore(4),  # aref cache, used in the loop
+            ops.iload(2), ops.pop2(),
+            ops.label(loop),
+            ops.aload(4), ops.pop(),
+            ops.sload(0),
+            ops.ifne(loop),
+        ]
+        result = order_cache_slots(instrs, first_slot=2, num_slots=3)
+        assert mnemonics(result) == [
+            mnemonics(instrs)[0], "istore_3",
+            "getstatic_a", "astore_2",
+            "iload_3", "pop2",
+            "label",
+            "aload_2", "pop",
+            "sload_0",
+            "ifne",
+        ]
+
+    def test_slots_below_caches_untouched(self) -> None:
+        instrs = [ops.sload(0), ops.sstore(1), ops.getstatic_a(7), ops.astore(2)]
+        assert order_cache_slots(instrs, first_slot=2, num_slots=1) == instrs
+
+    def test_pipeline_orders_across_passes(self) -> None:
+        loop = BlockLabel("loop")
+        instrs = [
+            ops.iconst(100000), ops.pop2(),
+            ops.iconst(100000), ops.pop2(),
+            ops.iconst(100000), ops.pop2(),
+            ops.label(loop),
+            ops.getstatic_a(7), ops.pop(),
+            ops.sload(0),
+            ops.ifne(loop),
+        ]
+        result, extra = peephole_optimize(instrs, num_locals=1)
+        assert extra == 3
+        # The array ref is used in the loop, so it goes before the constant
+        assert ("aload_1", ()) in [(i.mnemonic, i.operands) for i in result]
+        assert ("iload_2", ()) in [(i.mnemonic, i.operands) for i in result]
@@ -0,0 +1,253 @@
+"""Tests for profile builds - counter layout, instrumentation and dumping."""
+
+import json
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Self
+
+import pytest
+
+from jcc.analysis.frequency import FunctionCounts
+from jcc.analysis.function import analyze_function
+from jcc.analysis.globals import AllocationResult
+from jcc.codegen.emit import compile_function
+from jcc.codegen.stack import compute_max_stack
+from jcc.driver.profile import decode_counters, fetch_counters, format_hotspots
+from jcc.ir.instructions import BranchInst, ReturnInst
+from jcc.ir.module import Block, Function, Module
+from jcc.ir.types import BlockLabel, JCType
+from jcc.output.constant_pool import ConstantPool, ProfileRefs
+from jcc.output.lifecycle import build_init_method, build_process_wrapper
+from jcc.output.profile import (
+    COUNTERS_PER_PAGE,
+    ProfileCounter,
+    ProfileLayout,
+    ProfileMapError,
+    function_counts,
+    load_block_counts,
+    load_profile_map,
+    profile_layout,
+    write_block_counts,
+    write_profile_map,
+)
+
+REFS = ProfileRefs(counters=40, make_transient=41, get_buffer=42, set_outgoing_and_send=43, set_short=44)
+
+
+def make_cp(profile: ProfileRefs | None = REFS) -> ConstantPool:
+    return ConstantPool(
+        _entries=(),
+        _packages_used=(),
+        _applet_class_idx=0,
+        _applet_init_idx=1,
+        _register_idx=2,
+        _our_class_idx=3,
+        _our_init_idx=4,
+        _selecting_applet_idx=5,
+        _set_incoming_and_receive_idx=6,
+        _mem_array_idx={},
+        _make_transient_idx={},
+        _api_method_idx={},
+        _user_method_idx={"process": 30},
+        _user_method_desc={"process": "(Ljavacard/framework/APDU;S)V"},
+        _scalar_field_idx={},
+        _constructor_idx={},
+        _api=None,
+        _user_functions=frozenset(["process", "helper"]),
+        _profile=profile,
+    )
+
+
+def jump(target: str) -> BranchInst:
+    return BranchInst(cond=None, true_label=BlockLabel(target), false_label=None)
+
+
+def void_function(name: str, labels: list[str]) -> Function:
+    """A function whose blocks jump straight through to a return."""
+    blocks = [
+        Block(label=BlockLabel(label), instructions=(), terminator=jump(labels[i + 1]))
+        for i, label in enumerate(labels[:-1])
+    ]
+    blocks.append(
+        Block(label=BlockLabel(labels[-1]), instructions=(), terminator=ReturnInst(None, JCType.VOID))
+    )
+    return Function(name=name, params=(), return_type=JCType.VOID, blocks=tuple(blocks))
+
+
+@pytest.fixture
+def module() -> Module:
+    return Module(
+        globals={},
+        functions={
+            "helper": void_function("helper", ["entry", "loop", "exit"]),
+            "process": void_function("process", ["entry"]),
+        },
+    )
+
+
+class TestLayout:
+    def test_function_counters(self, module: Module) -> None:
+        layout = profile_layout(module, 0xFE)
+        assert layout.counters == (
+            ProfileCounter(0, "helper"),
+            ProfileCounter(1, "process"),
+        )
+        assert layout.function_counters("helper", BlockLabel("entry")) == {BlockLabel("entry"): 0}
+
+    def test_block_counters(self, module: Module) -> None:
+        layout = profile_layout(module, 0xFE, blocks=True)
+        assert [(c.function, c.block) for c in layout.counters] == [
+            ("helper", None),
+            ("helper", "loop"),
+            ("helper", "exit"),
+            ("process", None),
+        ]
+        assert layout.function_counters("helper", BlockLabel("entry")) == {
+            BlockLabel("entry"): 0,
+            BlockLabel("loop"): 1,
+            BlockLabel("exit"): 2,
+        }
+        assert layout.pages == 1
+
+    def test_map_round_trip(self, module: Module, tmp_path: Path) -> None:
+        layout = profile_layout(module, 0xFE, blocks=True)
+        path = write_profile_map(layout, tmp_path / "A.profile.json")
+        assert load_profile_map(path) == layout
+
+    def test_map_page_size_mismatch(self, tmp_path: Path) -> None:
+        path = tmp_path / "A.profile.json"
+        path.write_text(json.dumps({"ins": 254, "page_size": 7, "counters": []}))
+        with pytest.raises(ProfileMapError, match="rebuild"):
+            load_profile_map(path)
+
+    def test_missing_map(self, tmp_path: Path) -> None:
+        with pytest.raises(ProfileMapError, match="Cannot read"):
+            load_profile_map(tmp_path / "missing.json")
+
+    def test_block_counts_round_trip(self, module: Module, tmp_path: Path) -> None:
+        layout = profile_layout(module, 0xFE, blocks=True)
+        counts = function_counts(layout, [3, 24, 3, 1])
+        assert counts == {
+            "helper": FunctionCounts(calls=3, blocks={"loop": 24, "exit": 3}),
+            "process": FunctionCounts(calls=1),
+        }
+        path = write_block_counts(counts, tmp_path / "counts.json")
+        assert load_block_counts(path) == counts
+
+    def test_malformed_block_counts(self, tmp_path: Path) -> None:
+        path = tmp_path / "counts.json"
+        path.write_text(json.dumps({"functions": {"f": {"blocks": {}}}}))
+        with pytest.raises(ProfileMapError, match="Malformed"):
+            load_block_counts(path)
+
+
+class TestInstrumentation:
+    def test_blocks_increment_their_counters(self, module: Module) -> None:
+        func = module.functions["helper"]
+        fa = analyze_function(func)
+        code = compile_function(
+            func,
+            fa.locals,
+            fa.phi_info,
+            AllocationResult(globals={}, structs={}, mem_sizes={}, const_values={}),
+            make_cp(),
+            counters={BlockLabel("entry"): 0, BlockLabel("exit"): 2},
+        )
+        mnemonics = [i.mnemonic for i in code.instructions]
+        assert ("getstatic_a", (40,)) in [(i.mnemonic, i.operands) for i in code.instructions]
+
+        # The array ref itself may be cached in a local by the peephole pass
+        def increments(index: str) -> int:
+            tail = [index, "dup2", "saload", "sconst_1", "sadd", "sastore"]
+            return sum(mnemonics[i : i + 6] == tail for i in range(len(mnemonics)))
+
+        assert increments("sconst_0") == 1
+        assert increments("sconst_1") == 0
+        assert increments("sconst_2") == 1
+        assert mnemonics.index("dup2") > mnemonics.index("label")
+
+    def test_init_allocates_counters(self, module: Module) -> None:
+        layout = profile_layout(module, 0xFE)
+        allocation = AllocationResult(globals={}, structs={}, mem_sizes={}, const_values={})
+        code = build_init_method(make_cp(), allocation, layout)
+        text = [(i.mnemonic, i.operands) for i in code.instructions]
+        assert any(m == "invokestatic" and o[0] == 41 for m, o in text)
+        assert ("putstatic_a", (40,)) in text
+
+    def test_process_wrapper_dumps_counters(self, module: Module) -> None:
+        layout = profile_layout(module, 0xFE)
+        code = build_process_wrapper(make_cp(), layout)
+        text = [(i.mnemonic, i.operands) for i in code.instructions]
+        assert ("bspush", (-2,)) in text  # 0xFE as a signed byte
+        assert any(m == "invokevirtual" and o[0] == 42 for m, o in text)  # getBuffer
+        assert any(m == "invokevirtual" and o[0] == 43 for m, o in text)  # setOutgoingAndSend
+        assert code.max_locals == 6
+        assert code.max_stack == compute_max_stack(code.instructions)
+
+    def test_plain_build_unchanged(self) -> None:
+        code = build_process_wrapper(make_cp(profile=None))
+        assert code.max_locals == 2
+        assert not any(i.mnemonic == "getstatic_a" for i in code.instructions)
+
+
+class FakeSession:
+    """Answers dump requests from a list of counter values."""
+
+    def __init__(self, values: list[int]) -> None:
+        self.values = values
+        self.apdus: list[str] = []
+
+    def send(self, apdu_hex: str) -> tuple[bytes, int]:
+        self.apdus.append(apdu_hex)
+        page = int(apdu_hex[4:6], 16)
+        chunk = self.values[page * COUNTERS_PER_PAGE : (page + 1) * COUNTERS_PER_PAGE]
+        return b"".join(v.to_bytes(2, "big") for v in chunk), 0x9000
+
+    def send_raw(self, apdu: bytes) -> tuple[bytes, int]:
+        return self.send(apdu.hex().upper())
+
+    def send_many(self, apdus: Sequence[bytes]) -> list[tuple[bytes, int]]:
+        return [self.send_raw(apdu) for apdu in apdus]
+
+    def send_ok(self, apdu_hex: str) -> bytes:
+        return self.send(apdu_hex)[0]
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        pass
+
+
+class TestDriver:
+    def test_decode_is_unsigned(self) -> None:
+        assert decode_counters(bytes([0x00, 0x05, 0xFF, 0xFF])) == [5, 65535]
+
+    def test_fetch_reads_every_page(self) -> None:
+        counters = tuple(ProfileCounter(i, f"f{i}") for i in range(COUNTERS_PER_PAGE + 3))
+        layout = ProfileLayout(ins=0xFE, counters=counters)
+        session = FakeSession(list(range(len(counters))))
+        assert fetch_counters(session, layout) == list(range(len(counters)))
+        assert [a[:8] for a in session.apdus] == ["80FE0000", "80FE0100"]
+
+    def test_fetch_rejects_stale_map(self) -> None:
+        layout = ProfileLayout(ins=0xFE, counters=(ProfileCounter(0, "f"), ProfileCounter(1, "g")))
+        with pytest.raises(RuntimeError, match="profile map"):
+            fetch_counters(FakeSession([1]), layout)
+
+    def test_hotspot_table(self) -> None:
+        layout = ProfileLayout(
+            ins=0xFE,
+            counters=(
+                ProfileCounter(0, "draw"),
+                ProfileCounter(1, "draw", "loop"),
+                ProfileCounter(2, "process"),
+            ),
+        )
+        table = format_hotspots(layout, [30, 960, 10], frames=10).splitlines()
+        assert table[1].split() == ["30", "3.0", "75.0%", "draw"]
+        assert table[2].split() == ["10", "1.0", "25.0%", "process"]
+        assert table[-1].split() == ["960", "96.0", "draw:loop"]
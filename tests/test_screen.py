@@ -0,0 +1,227 @@
+"""Tests for driver/screen.py - framebuffer decoding and rendering."""
+
+import random
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Self
+
+import pytest
+
+from jcc.driver.base import BaseDriver
+from jcc.driver.config import load_config
+from jcc.driver.screen import (
+    FB_P1_DELTA,
+    FB_P1_KEYFRAME,
+    Framebuffer,
+    FrameDecoder,
+    ScreenConfig,
+    decode,
+    halfblock_rows,
+)
+from jcc.driver.session import Session
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def reference_pixel(config: ScreenConfig, data: bytes, x: int, y: int) -> int:
+    """Pixel (x, y) unpacked bit by bit, MSB first."""
+    bits = config.bits_per_pixel
+    if config.layout == "column":
+        bit = x * config.column_bytes * 8 + y * bits
+    else:
+        bit = (y * config.width + x) * bits
+    byte = bit // 8
+    if byte >= len(data):
+        return 0
+    return (data[byte] >> (8 - bits - bit % 8)) & ((1 << bits) - 1)
+
+
+def frame(config: ScreenConfig, seed: int = 0) -> bytes:
+    return random.Random(seed).randbytes(config.framebuffer_size)
+
+
+CONFIGS = [
+    ScreenConfig(32, 20, "1bpp"),
+    ScreenConfig(32, 20, "2bpp"),
+    ScreenConfig(48, 32, "4bpp"),
+    ScreenConfig(64, 40, "2bpp", layout="column"),
+    ScreenConfig(6, 5, "2bpp", layout="column"),
+    ScreenConfig(5, 3, "1bpp"),
+]
+
+
+class TestDecode:
+    @pytest.mark.parametrize("config", CONFIGS, ids=repr)
+    def test_matches_bitwise_unpacking(self, config: ScreenConfig) -> None:
+        data = frame(config)
+        rows = decode(config, data)
+        assert len(rows) == config.height
+        assert all(len(row) == config.width for row in rows)
+        assert [list(row) for row in rows] == [
+            [reference_pixel(config, data, x, y) for x in range(config.width)]
+            for y in range(config.height)
+        ]
+
+    def test_column_layout_size(self) -> None:
+        # jcc_fb.h in DOOM: 64 columns of 40 / 4 = 10 bytes
+        assert ScreenConfig(64, 40, "2bpp", layout="column").framebuffer_size == 640
+        # Columns start on a fresh byte
+        assert ScreenConfig(6, 5, "2bpp", layout="column").framebuffer_size == 12
+
+    def test_short_data_reads_as_zero(self) -> None:
+        config = ScreenConfig(8, 2, "2bpp")
+        rows = decode(config, b"\xFF")
+        assert rows == [b"\x03" * 4 + b"\x00" * 4, b"\x00" * 8]
+
+
+class TestRender:
+    def test_blocks_match_per_pixel_colors(self) -> None:
+        config = ScreenConfig(8, 3, "2bpp", palette=[(1, 2, 3), (4, 5, 6), (7, 8, 9)])
+        fb = Framebuffer(config, frame(config, 1))
+        expected: list[str] = []
+        for y in range(0, config.height, 2):
+            row = ""
+            for x in range(config.width):
+                top = fb.pixel_rgb(x, y)
+                bottom = fb.pixel_rgb(x, y + 1) if y + 1 < config.height else (0, 0, 0)
+                row += "\033[38;2;{};{};{}m\033[48;2;{};{};{}m▀".format(*top, *bottom)
+            expected.append(row)
+        assert halfblock_rows(config, fb.rows) == expected
+        assert fb.render_blocks().splitlines()[1] == f"|{expected[0]}\033[0m|"
+
+    def test_blocks_4bpp(self) -> None:
+        config = ScreenConfig(4, 2, "4bpp")
+        fb = Framebuffer(config, bytes([0xF0, 0x12, 0x0F, 0x34]))
+        (line,) = halfblock_rows(config, fb.rows)
+        assert line.startswith("\033[38;2;255;255;255m\033[48;2;0;0;0m▀")
+
+    def test_text_renderers(self) -> None:
+        config = ScreenConfig(4, 2, "2bpp")
+        fb = Framebuffer(config, bytes([0b00011011, 0b11100100]))
+        assert fb.render_hex() == "0123\n3210"
+        assert fb.render_simple() == " ░▒█\n█▒░ "
+        assert fb.render_ascii() == " -*@\n@*- "
+        assert fb.pixel(2, 1) == 1
+
+
+def fb_send(config: ScreenConfig, frame: bytes, prev: bytearray, p1: int) -> bytes:
+    """What fb_send in jcc_fb_delta.h replies, updating prev as the applet does."""
+    if not p1 & FB_P1_DELTA:
+        return frame
+    block = config.delta_block
+    if p1 & FB_P1_KEYFRAME:
+        prev[:] = frame
+        return bytes([1, block]) + frame
+    bitmap = bytearray(config.delta_bitmap_size)
+    blocks: list[bytes] = []
+    for i, off in enumerate(range(0, len(frame), block)):
+        if frame[off:off + block] != bytes(prev[off:off + block]):
+            bitmap[i // 8] |= 0x80 >> (i % 8)
+            blocks.append(frame[off:off + block])
+    prev[:] = frame
+    return bytes([0, block]) + bitmap + b"".join(blocks)
+
+
+class ScriptedSession:
+    """Answers frame requests with scripted replies, recording each P1."""
+
+    def __init__(self, replies: list[bytes]) -> None:
+        self.replies = replies
+        self.p1s: list[int] = []
+
+    def send(self, apdu_hex: str) -> tuple[bytes, int]:
+        self.p1s.append(int(apdu_hex[4:6], 16))
+        return self.replies.pop(0), 0x9000
+
+    def send_raw(self, apdu: bytes) -> tuple[bytes, int]:
+        return self.send(apdu.hex().upper())
+
+    def send_many(self, apdus: Sequence[bytes]) -> list[tuple[bytes, int]]:
+        return [self.send_raw(apdu) for apdu in apdus]
+
+    def send_ok(self, apdu_hex: str) -> bytes:
+        return self.send(apdu_hex)[0]
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        pass
+
+
+class TestFrameDecoder:
+    CONFIG = ScreenConfig(
+        6, 5, "2bpp", layout="column", encoding="delta", delta_block=2, keyframe_interval=4,
+    )
+
+    def test_reconstructs_frames(self) -> None:
+        config = self.CONFIG
+        frames = FrameDecoder(config)
+        rng = random.Random(0)
+        data = bytearray(config.framebuffer_size)
+        prev = bytearray(config.framebuffer_size)
+        p1s: list[int] = []
+        for _ in range(10):
+            data[rng.randrange(len(data))] = rng.randrange(256)
+            p1s.append(frames.p1)
+            reply = fb_send(config, bytes(data), prev, frames.p1)
+            assert len(reply) <= config.reply_size
+            assert frames.decode(reply) == data
+        keyframe = FB_P1_DELTA | FB_P1_KEYFRAME
+        assert p1s == [keyframe] + [FB_P1_DELTA] * 4 + [keyframe] + [FB_P1_DELTA] * 4
+
+    def test_unchanged_frame_is_header_and_bitmap(self) -> None:
+        config = self.CONFIG
+        frames = FrameDecoder(config)
+        data = bytes(range(config.framebuffer_size))
+        prev = bytearray(config.framebuffer_size)
+        frames.decode(fb_send(config, data, prev, frames.p1))
+        reply = fb_send(config, data, prev, frames.p1)
+        assert reply == bytes([0, 2]) + bytes(config.delta_bitmap_size)
+        assert frames.decode(reply) == data
+
+    def test_malformed_reply_requests_keyframe(self) -> None:
+        frames = FrameDecoder(self.CONFIG)
+        frames.decode(bytes([1, 2]) + bytes(12))
+        with pytest.raises(ValueError, match="bitmap implies"):
+            frames.decode(bytes([0, 2, 0x80]))
+        assert frames.p1 == FB_P1_DELTA | FB_P1_KEYFRAME
+        with pytest.raises(ValueError, match="without a keyframe"):
+            frames.decode(bytes([0, 2, 0, 0]))
+
+    def test_block_size_must_match(self) -> None:
+        with pytest.raises(ValueError, match="4-byte blocks"):
+            FrameDecoder(self.CONFIG).decode(bytes([1, 4]) + bytes(12))
+
+    def test_raw_passes_through(self) -> None:
+        frames = FrameDecoder(ScreenConfig(8, 2, "2bpp"))
+        assert frames.p1 == 0
+        assert frames.decode(b"\x01\x02\x03\x04") == b"\x01\x02\x03\x04"
+
+    def test_negotiated_in_jcc_toml(self) -> None:
+        screen = load_config(EXAMPLES / "apple").screen
+        assert screen is not None
+        assert (screen.encoding, screen.delta_block) == ("delta", 4)
+        # Flags, block size, 20-block bitmap and the 80-byte framebuffer
+        assert screen.reply_size == 2 + 3 + 80
+
+    def test_render_skips_corrupt_delta(self, capsys: pytest.CaptureFixture[str]) -> None:
+        screen = load_config(EXAMPLES / "apple").screen
+        assert screen is not None
+        data = bytes(range(screen.framebuffer_size))
+        keyframe = bytes([1, screen.delta_block]) + data
+        session = ScriptedSession([keyframe, bytes([0, screen.delta_block, 0x80]), keyframe])
+
+        class Driver(BaseDriver):
+            def get_session(self, backend: str | None = None) -> Session:
+                return session
+
+        Driver(EXAMPLES / "apple").cmd_render(frame=2, hex_mode=True)
+        keyframe_p1 = FB_P1_DELTA | FB_P1_KEYFRAME
+        assert session.p1s == [keyframe_p1, FB_P1_DELTA, keyframe_p1]
+        out, err = capsys.readouterr()
+        assert "Bad frame 1" in err
+        assert out == Framebuffer(screen, data).render_hex() + "\n"
@@ -0,0 +1,74 @@
+"""Tests for driver/session.py - batched and raw APDU sending."""
+
+import sys
+from collections.abc import Iterator
+
+import pytest
+
+from jcc.driver import session as session_module
+from jcc.driver.session import CardSession, SimSession
+
+# Stands in for JCCClient's session mode: one JSON reply line per APDU line.
+# The reply echoes the APDU, padded out to the length P2 asks for in KiB.
+FAKE_CLIENT = """
+import json, sys
+print(json.dumps({"ready": True}), flush=True)
+for line in sys.stdin:
+    if line.strip() == "quit":
+        break
+    apdu = line.strip().upper()
+    if apdu[2:4] == "EE":
+        print(json.dumps({"error": "bad apdu"}), flush=True)
+        continue
+    data = apdu + "00" * (int(apdu[6:8], 16) * 1024)
+    print(json.dumps({"data": data, "sw": 0x9000}), flush=True)
+"""
+
+
+@pytest.fixture
+def sim(monkeypatch: pytest.MonkeyPatch) -> Iterator[SimSession]:
+    def fake_client_cmd(*args: object) -> list[str]:
+        return [sys.executable, "-c", FAKE_CLIENT]
+
+    monkeypatch.setattr(session_module, "sim_client_cmd", fake_client_cmd)
+    with SimSession("A000000001") as sim:
+        yield sim
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.transmitted: list[list[int]] = []
+
+    def transmit(self, apdu: list[int]) -> tuple[list[int], int, int]:
+        self.transmitted.append(apdu)
+        return apdu[5:], 0x90, 0x00
+
+
+class TestSimSession:
+    def test_send_raw(self, sim: SimSession) -> None:
+        assert sim.send_raw(b"\x80\x01\x00\x00") == (b"\x80\x01\x00\x00", 0x9000)
+
+    def test_send_many_in_order(self, sim: SimSession) -> None:
+        apdus = [bytes([0x80, 0x01, 0x00, 0x00, 0x02]) + i.to_bytes(2, "big") for i in range(2000)]
+        assert sim.send_many(apdus) == [(apdu, 0x9000) for apdu in apdus]
+
+    def test_send_many_large_replies(self, sim: SimSession) -> None:
+        # 200 KiB of replies to one window: more than a pipe holds unread
+        apdus = [bytes([0x80, 0x01, 0x00, 0x08, i]) for i in range(25)]
+        responses = sim.send_many(apdus)
+        assert [len(data) for data, _ in responses] == [5 + 8 * 1024] * 25
+
+    def test_error_keeps_replies_in_step(self, sim: SimSession) -> None:
+        with pytest.raises(RuntimeError, match="bad apdu"):
+            sim.send_many([b"\x80\xEE\x00\x00", b"\x80\x01\x00\x00"])
+        assert sim.send_raw(b"\x80\x02\x00\x00") == (b"\x80\x02\x00\x00", 0x9000)
+
+
+class TestCardSession:
+    def test_send_many(self) -> None:
+        card = CardSession.__new__(CardSession)
+        card.conn = FakeConnection()
+        responses = card.send_many([b"\x80\x01\x00\x00\x01\xAA", b"\x80\x02\x00\x00"])
+        assert responses == [(b"\xAA", 0x9000), (b"", 0x9000)]
+        assert card.conn.transmitted == [[0x80, 0x01, 0x00, 0x00, 0x01, 0xAA], [0x80, 2, 0, 0]]
+        assert card.send("80030000") == (b"", 0x9000)
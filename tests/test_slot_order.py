@@ -0,0 +1,105 @@
+"""Tests for analysis/slot_order.py - frequency-ordered slot numbering."""
+
+from jcc.analysis.function import analyze_function
+from jcc.analysis.graph_color import SlotAssignments
+from jcc.analysis.slot_order import permute_slots
+from jcc.ir.facts import FunctionFacts
+from jcc.ir.instructions import BinaryInst, BranchInst, ICmpInst, PhiInst, ReturnInst
+from jcc.ir.module import Block, Function, Parameter
+from jcc.ir.types import BlockLabel, JCType, SSAName
+from jcc.ir.values import Const, SSARef
+
+# === Test Helpers ===
+
+
+def ref(name: str) -> SSARef:
+    return SSARef(name=SSAName(name))
+
+
+def add(result: str, left: str, k: int, ty: JCType = JCType.SHORT) -> BinaryInst:
+    return BinaryInst(
+        result=SSAName(result), op="add", left=ref(left), right=Const(value=k, ty=ty), ty=ty
+    )
+
+
+def make_loop() -> Function:
+    """short f(short %n): %a = n+1 is only returned; %i/%j count a loop."""
+    return Function(
+        name="f",
+        params=(Parameter(name=SSAName("%n"), ty=JCType.SHORT),),
+        return_type=JCType.SHORT,
+        blocks=(
+            Block(
+                label=BlockLabel("entry"),
+                instructions=(add("%a", "%n", 1),),
+                terminator=BranchInst(cond=None, true_label=BlockLabel("loop"), false_label=None),
+            ),
+            Block(
+                label=BlockLabel("loop"),
+                instructions=(
+                    PhiInst(
+                        result=SSAName("%i"),
+                        incoming=(
+                            (Const(value=0, ty=JCType.SHORT), BlockLabel("entry")),
+                            (ref("%j"), BlockLabel("loop")),
+                        ),
+                        ty=JCType.SHORT,
+                    ),
+                    add("%j", "%i", 1),
+                    ICmpInst(
+                        result=SSAName("%c"), pred="slt", left=ref("%j"), right=ref("%n"),
+                        ty=JCType.SHORT,
+                    ),
+                ),
+                terminator=BranchInst(
+                    cond=ref("%c"), true_label=BlockLabel("loop"), false_label=BlockLabel("exit")
+                ),
+            ),
+            Block(
+                label=BlockLabel("exit"),
+                instructions=(),
+                terminator=ReturnInst(value=ref("%a"), ty=JCType.SHORT),
+            ),
+        ),
+    )
+
+
+class TestPermuteSlots:
+    def test_loop_values_move_first(self) -> None:
+        slots = SlotAssignments(
+            assignments={SSAName("%n"): 0, SSAName("%a"): 1, SSAName("%i"): 2, SSAName("%j"): 2},
+            slot_types={0: JCType.SHORT, 1: JCType.SHORT, 2: JCType.SHORT},
+            num_slots=3,
+        )
+        result = permute_slots(slots, FunctionFacts(make_loop()), first_free=1)
+        assert dict(result.assignments) == {
+            SSAName("%n"): 0, SSAName("%a"): 2, SSAName("%i"): 1, SSAName("%j"): 1,
+        }
+        assert result.num_slots == 3
+
+    def test_int_units_stay_two_wide(self) -> None:
+        slots = SlotAssignments(
+            assignments={SSAName("%n"): 0, SSAName("%a"): 1, SSAName("%j"): 3},
+            slot_types={0: JCType.SHORT, 1: JCType.INT, 2: JCType.INT, 3: JCType.SHORT},
+            num_slots=4,
+        )
+        result = permute_slots(slots, FunctionFacts(make_loop()), first_free=1)
+        assert result.assignments[SSAName("%j")] == 1
+        assert result.assignments[SSAName("%a")] == 2
+        assert dict(result.slot_types) == {
+            0: JCType.SHORT, 1: JCType.SHORT, 2: JCType.INT, 3: JCType.INT,
+        }
+        assert result.validate() == []
+
+    def test_parameters_only(self) -> None:
+        slots = SlotAssignments(
+            assignments={SSAName("%n"): 0}, slot_types={0: JCType.SHORT}, num_slots=1
+        )
+        assert permute_slots(slots, FunctionFacts(make_loop()), first_free=1) is slots
+
+
+class TestAnalysis:
+    def test_loop_counter_gets_first_free_slot(self) -> None:
+        locals = analyze_function(make_loop()).locals
+        assert locals.get_slot(SSAName("%i")) == 1
+        assert locals.get_slot(SSAName("%a")) > 1
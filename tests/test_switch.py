@@ -0,0 +1,112 @@
+"""Tests for codegen/switch.py - cost-driven switch lowering plans."""
+
+import pytest
+
+from jcc.analysis.cost import CostModel, bundled_cost_model
+from jcc.analysis.locals import Limits
+from jcc.codegen.emit import EmitContext, emit_switch
+from jcc.codegen.expr import BinaryExpr, ConstExpr, LoadSlotExpr, TypedExpr
+from jcc.codegen.phi_moves import TempAllocator
+from jcc.codegen.switch import (
+    Cases,
+    CompareChain,
+    LookupLeaf,
+    RangeSplit,
+    TableLeaf,
+    cases_of,
+    plan_switch,
+)
+from jcc.ir.types import BlockLabel, JCType
+
+
+@pytest.fixture(scope="module")
+def costs() -> CostModel:
+    return bundled_cost_model()
+
+
+def numbered(values: range | list[int], prefix: str = "c") -> Cases:
+    return tuple((v, BlockLabel(f"{prefix}{v}")) for v in values)
+
+
+class TestPlan:
+    def test_dense_cases_use_table(self, costs: CostModel) -> None:
+        plan = plan_switch(numbered(range(8)), JCType.SHORT, costs, Limits())
+        assert plan == TableLeaf(0, 7, numbered(range(8)))
+
+    def test_sparse_cases_use_lookup(self, costs: CostModel) -> None:
+        cases = numbered([i * 37 for i in range(12)])
+        assert plan_switch(cases, JCType.SHORT, costs, Limits()) == LookupLeaf(cases)
+
+    def test_dense_clusters_split_into_tables(self, costs: CostModel) -> None:
+        cases = numbered(range(100)) + numbered(range(1000, 1100), "d")
+        plan = plan_switch(cases, JCType.SHORT, costs, Limits())
+        assert isinstance(plan, RangeSplit)
+        assert plan.pivot == 1000
+        assert isinstance(plan.below, TableLeaf) and isinstance(plan.above, TableLeaf)
+
+    def test_hot_case_tested_first(self, costs: CostModel) -> None:
+        cases = numbered([i * 37 for i in range(12)])
+        weights = {target: 1.0 for _, target in cases} | {BlockLabel("c74"): 1000.0}
+        plan = plan_switch(cases, JCType.SHORT, costs, Limits(), weights=weights)
+        assert isinstance(plan, CompareChain)
+        assert plan.cases == ((74, BlockLabel("c74")),)
+        assert isinstance(plan.rest, LookupLeaf)
+        assert sorted(cases_of(plan)) == list(cases)
+
+    def test_value_off_slot_prefers_single_leaf(self, costs: CostModel) -> None:
+        cases = numbered(range(100)) + numbered(range(1000, 1100), "d")
+        plan = plan_switch(cases, JCType.SHORT, costs, Limits(), in_slot=False)
+        assert isinstance(plan, LookupLeaf)
+
+    def test_zero_weights_fall_back_to_uniform(self, costs: CostModel) -> None:
+        cases = numbered(range(8))
+        weights = {target: 0.0 for _, target in cases}
+        assert plan_switch(cases, JCType.SHORT, costs, Limits(), weights=weights) == plan_switch(
+            cases, JCType.SHORT, costs, Limits()
+        )
+
+
+class TestEmit:
+    @staticmethod
+    def emit(
+        value: TypedExpr,
+        cases: Cases,
+        costs: CostModel,
+        frequencies: dict[BlockLabel, float] | None = None,
+    ) -> list[tuple[str, tuple[object, ...]]]:
+        ctx = EmitContext(costs=costs, frequencies=frequencies)
+        emit_switch(
+            value, BlockLabel("default"), cases, phi_moves={},
+            temps=TempAllocator(first_slot=10), ctx=ctx,
+        )
+        return [(i.mnemonic, i.operands) for i in ctx.instructions]
+
+    def test_range_split_reloads_slot(self, costs: CostModel) -> None:
+        cases = numbered(range(100)) + numbered(range(1000, 1100), "d")
+        code = self.emit(LoadSlotExpr(ty=JCType.SHORT, slot=2), cases, costs)
+        mnemonics = [m for m, _ in code]
+        assert mnemonics[:3] == ["sload_2", "sspush", "if_scmpge"]
+        assert mnemonics.count("sload_2") == 3
+        assert mnemonics.count("stableswitch") == 2
+
+    def test_chain_stores_computed_value(self, costs: CostModel) -> None:
+        cases = numbered([i * 37 for i in range(12)])
+        value = BinaryExpr(
+            ty=JCType.SHORT,
+            op="add",
+            left=LoadSlotExpr(ty=JCType.SHORT, slot=1),
+            right=ConstExpr(ty=JCType.SHORT, value=1),
+        )
+        code = self.emit(value, cases, costs, frequencies={BlockLabel("c0"): 1000.0})
+        assert code[3:6] == [("sstore", (10,)), ("sload", (10,)), ("ifeq", ("c0",))]
+        assert code[6][0] == "sload"
+        assert code[7][0] == "slookupswitch"
+
+    def test_int_chain(self, costs: CostModel) -> None:
+        cases = numbered([5] + [i * 70000 for i in range(1, 12)])
+        code = self.emit(
+            LoadSlotExpr(ty=JCType.INT, slot=2), cases, costs,
+            frequencies={BlockLabel("c5"): 1000.0},
+        )
+        assert code[:4] == [("iload_2", ()), ("iconst_5", ()), ("icmp", ()), ("ifeq", ("c5",))]
+        assert [m for m, _ in code[4:6]] == ["iload_2", "ilookupswitch"]
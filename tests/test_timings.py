@@ -0,0 +1,116 @@
+"""Tests for timings.py - per-phase build timings."""
+
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+from jcc import __version__
+from jcc.timings import BuildTimings, timed_call
+
+
+def spin(seconds: float) -> int:
+    """Burn about seconds of CPU time.
+
+    os.times() counts in clock ticks (often 10ms), so tests spin for
+    several ticks to be sure one registers.
+    """
+    end = time.process_time() + seconds
+    n = 0
+    while time.process_time() < end:
+        n += 1
+    return n
+
+
+class TestBuildTimings:
+    def test_phases_in_run_order(self) -> None:
+        timings = BuildTimings()
+        with timings.phase("parse"):
+            spin(0.05)
+        with timings.phase("inline"):
+            pass
+        assert [p.name for p in timings.phases] == ["parse", "inline"]
+        parse = timings.phases[0]
+        assert parse.wall >= 0.05
+        assert parse.cpu > 0
+        assert parse.peak_memory is None
+
+    def test_phase_recorded_on_error(self) -> None:
+        timings = BuildTimings()
+        try:
+            with timings.phase("frontend"):
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        assert [p.name for p in timings.phases] == ["frontend"]
+
+    def test_peak_memory_of_phase(self) -> None:
+        timings = BuildTimings(trace_memory=True)
+        with timings.phase("allocate"):
+            data = bytearray(1 << 20)
+            del data
+        with timings.phase("idle"):
+            pass
+        allocate, idle = timings.phases
+        assert allocate.peak_memory is not None and allocate.peak_memory >= 1 << 20
+        assert idle.peak_memory is not None and idle.peak_memory < 1 << 20
+        # Tracing is only on while a phase runs
+        assert not tracemalloc.is_tracing()
+
+    def test_slowest_functions(self) -> None:
+        timings = BuildTimings()
+        for name, wall in [("a", 0.1), ("b", 0.3), ("c", 0.2)]:
+            timings.record_function("codegen", name, wall, wall)
+        assert [f.name for f in timings.slowest("codegen", 2)] == ["b", "c"]
+        assert timings.slowest("function analysis") == []
+
+    def test_report(self) -> None:
+        timings = BuildTimings()
+        with timings.phase("parse"):
+            pass
+        timings.record_function("codegen", "process", 0.5, 0.25)
+        lines = timings.report().splitlines()
+        assert lines[1].split()[0] == "parse"
+        assert lines[2].split()[0] == "total"
+        assert lines[3] == "  slowest in codegen:"
+        assert lines[4].split() == ["0.500s", "0.250s", "process"]
+
+    def test_counts(self) -> None:
+        timings = BuildTimings()
+        timings.record_counts({"peephole dup": 2, "peephole sinc": 1})
+        timings.record_counts({"peephole dup": 3})
+        assert timings.counts == {"peephole dup": 5, "peephole sinc": 1}
+        lines = timings.report().splitlines()
+        assert lines[-3] == "  counts:"
+        assert [line.split() for line in lines[-2:]] == [
+            ["5", "peephole", "dup"], ["1", "peephole", "sinc"],
+        ]
+
+    def test_json(self, tmp_path: Path) -> None:
+        timings = BuildTimings(trace_memory=True)
+        with timings.phase("verifycap"):
+            pass
+        for i in range(3):
+            timings.record_function("codegen", f"f{i}", i, i)
+        timings.record_counts({"peephole dup": 4})
+        path = tmp_path / "timings.json"
+        timings.write_json(path, slowest=2)
+
+        data = json.loads(path.read_text())
+        assert data["version"] == __version__
+        assert [p["name"] for p in data["phases"]] == ["verifycap"]
+        assert set(data["phases"][0]) == {"name", "wall", "cpu", "peak_memory"}
+        assert data["functions"] == {
+            "codegen": [
+                {"name": "f2", "wall": 2, "cpu": 2},
+                {"name": "f1", "wall": 1, "cpu": 1},
+            ],
+        }
+        assert data["counts"] == {"peephole dup": 4}
+
+
+def test_timed_call() -> None:
+    result, wall, cpu = timed_call(spin, 0.05)
+    assert result > 0
+    assert wall >= 0.05
+    assert cpu > 0